@@ -0,0 +1,87 @@
+"""add badugi hud aggregate tables
+
+Revision ID: 20261019_01
+Revises: 20260504_01
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_01"
+down_revision = "20260504_01"
+branch_labels = None
+depends_on = None
+
+
+ID_TYPE = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "badugi_hand_summaries",
+        sa.Column("id", ID_TYPE, primary_key=True, autoincrement=True),
+        sa.Column("player_id", sa.String(length=64), nullable=False),
+        sa.Column("hand_id", sa.String(length=64), nullable=False),
+        sa.Column("vpip", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pfr", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("aggro_paid", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("call_paid", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("first_ts", sa.DateTime(), nullable=False),
+        sa.Column("last_ts", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("player_id", "hand_id", name="uq_badugi_hand_summaries_player_hand"),
+    )
+    op.create_index(
+        "ix_badugi_hand_summaries_player_last_ts",
+        "badugi_hand_summaries",
+        ["player_id", "last_ts"],
+    )
+    op.create_table(
+        "badugi_player_stats",
+        sa.Column("player_id", sa.String(length=64), primary_key=True),
+        sa.Column("hands", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("vpip_hands", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pfr_hands", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("aggro_paid", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("call_paid", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Backfill from the existing action log so the first HUD read stays cheap.
+    op.execute(
+        """
+        INSERT INTO badugi_hand_summaries
+            (player_id, hand_id, vpip, pfr, aggro_paid, call_paid, first_ts, last_ts)
+        SELECT
+            player_id,
+            hand_id,
+            MAX(CASE WHEN round = 0 AND NOT is_forced AND paid > 0
+                     AND action_type IN ('call', 'bet', 'raise') THEN 1 ELSE 0 END),
+            MAX(CASE WHEN round = 0 AND NOT is_forced AND paid > 0
+                     AND action_type IN ('bet', 'raise') THEN 1 ELSE 0 END),
+            COALESCE(SUM(CASE WHEN NOT is_forced AND paid > 0
+                              AND action_type IN ('bet', 'raise') THEN paid ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN NOT is_forced AND paid > 0
+                              AND action_type = 'call' THEN paid ELSE 0 END), 0),
+            MIN(ts),
+            MAX(ts)
+        FROM badugi_action_logs
+        WHERE phase = 'BET'
+        GROUP BY player_id, hand_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO badugi_player_stats
+            (player_id, hands, vpip_hands, pfr_hands, aggro_paid, call_paid)
+        SELECT player_id, COUNT(*), SUM(vpip), SUM(pfr), SUM(aggro_paid), SUM(call_paid)
+        FROM badugi_hand_summaries
+        GROUP BY player_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("badugi_player_stats")
+    op.drop_index("ix_badugi_hand_summaries_player_last_ts", table_name="badugi_hand_summaries")
+    op.drop_table("badugi_hand_summaries")
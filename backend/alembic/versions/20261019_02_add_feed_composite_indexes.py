@@ -0,0 +1,52 @@
+"""add composite indexes for badugi feeds and keyset pagination
+
+Revision ID: 20261019_02
+Revises: 20261019_01
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_02"
+down_revision = "20261019_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_badugi_action_logs_player_ts",
+        "badugi_action_logs",
+        ["player_id", "ts"],
+    )
+    op.create_index(
+        "ix_badugi_action_logs_player_phase_ts",
+        "badugi_action_logs",
+        ["player_id", "phase", "ts"],
+    )
+    # badugi_hand_logs predates the migration chain (created by create_all),
+    # so only index it where it exists.
+    if not sa.inspect(op.get_bind()).has_table("badugi_hand_logs"):
+        return
+    op.create_index(
+        "ix_badugi_hand_logs_created_at",
+        "badugi_hand_logs",
+        ["created_at"],
+    )
+    op.create_index(
+        "ix_badugi_hand_logs_table_created_at",
+        "badugi_hand_logs",
+        ["table_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("badugi_hand_logs"):
+        existing = {index["name"] for index in inspector.get_indexes("badugi_hand_logs")}
+        for name in ("ix_badugi_hand_logs_table_created_at", "ix_badugi_hand_logs_created_at"):
+            if name in existing:
+                op.drop_index(name, table_name="badugi_hand_logs")
+    op.drop_index("ix_badugi_action_logs_player_phase_ts", table_name="badugi_action_logs")
+    op.drop_index("ix_badugi_action_logs_player_ts", table_name="badugi_action_logs")
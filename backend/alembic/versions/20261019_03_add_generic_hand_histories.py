@@ -0,0 +1,46 @@
+"""add generic hand history table
+
+Revision ID: 20261019_03
+Revises: 20261019_02
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_03"
+down_revision = "20261019_02"
+branch_labels = None
+depends_on = None
+
+
+ID_TYPE = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "generic_hand_histories",
+        sa.Column("id", ID_TYPE, primary_key=True, autoincrement=True),
+        sa.Column("hand_id", sa.String(length=128), nullable=False),
+        sa.Column("variant_id", sa.String(length=64), nullable=True),
+        sa.Column("winner", sa.String(length=255), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("hand_id"),
+    )
+    op.create_index(
+        "ix_generic_hand_histories_updated_at",
+        "generic_hand_histories",
+        ["updated_at", "id"],
+    )
+    op.create_index(
+        "ix_generic_hand_histories_variant_updated_at",
+        "generic_hand_histories",
+        ["variant_id", "updated_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_generic_hand_histories_variant_updated_at", table_name="generic_hand_histories")
+    op.drop_index("ix_generic_hand_histories_updated_at", table_name="generic_hand_histories")
+    op.drop_table("generic_hand_histories")
@@ -0,0 +1,41 @@
+"""add partial unique key for idempotent badugi action batches
+
+Revision ID: 20261019_04
+Revises: 20261019_03
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_04"
+down_revision = "20261019_03"
+branch_labels = None
+depends_on = None
+
+PARTIAL_INDEX_DIALECTS = ("postgresql", "sqlite")
+
+
+def upgrade() -> None:
+    op.add_column(
+        "badugi_action_logs",
+        sa.Column("is_idempotent", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # Existing rows keep is_idempotent = false, so duplicates already stored
+    # do not block the index. MySQL has no partial indexes.
+    if op.get_bind().dialect.name not in PARTIAL_INDEX_DIALECTS:
+        return
+    op.create_index(
+        "uq_badugi_action_logs_idempotent_key",
+        "badugi_action_logs",
+        ["hand_id", "player_id", "seq"],
+        unique=True,
+        postgresql_where=sa.text("is_idempotent"),
+        sqlite_where=sa.text("is_idempotent"),
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        op.drop_index("uq_badugi_action_logs_idempotent_key", table_name="badugi_action_logs")
+    op.drop_column("badugi_action_logs", "is_idempotent")
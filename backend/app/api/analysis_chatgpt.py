@@ -5,11 +5,12 @@ import time
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
-from ..core.openai_client import get_chatgpt_advice, get_play_feedback_advice  # [tournament-feedback]
+from ..core.openai_client import get_chatgpt_advice_async, get_play_feedback_advice_async  # [tournament-feedback]
 from ..dependencies.auth import get_current_user
 from ..models import PlayFeedbackResult, User
 from ..schemas.analysis import (
@@ -121,7 +122,7 @@ def _extract_saved_summary(payload: Any) -> dict[str, Any] | None:
 
 
 @router.post("/advice")
-def request_tournament_advice(
+async def request_tournament_advice(
     payload: WorstSpotPayload,
     current_user: User = Depends(get_current_user),  # noqa: B008  # [tournament-feedback]
 ) -> dict:
@@ -129,37 +130,16 @@ def request_tournament_advice(
 
     _ = current_user  # The dependency enforces authentication even if unused.
     worst_spot = payload.model_dump()
-    return get_chatgpt_advice(worst_spot)
+    return await get_chatgpt_advice_async(worst_spot)
 
 
-@router.post("/play-feedback", response_model=PlayFeedbackResponse)
-def request_play_feedback(
+def _store_feedback_result(
+    db: Session,
+    current_user: User,
     payload: PlayFeedbackPayload,
-    current_user: User = Depends(get_current_user),  # noqa: B008
-    db: Session = Depends(get_db),  # noqa: B008
-) -> PlayFeedbackResponse:
-    """Return ChatGPT-style feedback for a 30+ hand cash or tournament session."""
-
-    _enforce_feedback_rate_limit(current_user)
-    if payload.handCount < payload.minHands:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="At least minHands completed hands are required for play feedback.",
-        )
-
-    sanitized = _scrub_pii(payload.model_dump())
-    advice = get_play_feedback_advice(sanitized)
-    source = "fallback"
-    if advice.get("adviceJa") and advice.get("adviceEn"):
-        fallback_prefix = "セッション解析は受け付けました。"
-        source = "fallback" if advice["adviceJa"].startswith(fallback_prefix) else "openai"
-    response_payload = PlayFeedbackResponse(
-        adviceJa=advice.get("adviceJa", ""),
-        adviceEn=advice.get("adviceEn", ""),
-        source=source,
-        acceptedHandCount=payload.handCount,
-        piiRemoved=True,
-    )
+    sanitized: dict[str, Any],
+    response_payload: PlayFeedbackResponse,
+) -> None:
     session_key = _build_feedback_session_key(payload)
     result = PlayFeedbackResult(
         user_id=getattr(current_user, "id", None),
@@ -168,7 +148,7 @@ def request_play_feedback(
         variant_scope=payload.variantScope,
         tournament_id=_extract_tournament_id(payload),
         hand_count=payload.handCount,
-        source=source,
+        source=response_payload.source,
         pii_removed=True,
         payload=sanitized,
         response=response_payload.model_dump(exclude_none=True),
@@ -186,6 +166,38 @@ def request_play_feedback(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Failed to store play feedback result.",
         ) from exc
+
+
+@router.post("/play-feedback", response_model=PlayFeedbackResponse)
+async def request_play_feedback(
+    payload: PlayFeedbackPayload,
+    current_user: User = Depends(get_current_user),  # noqa: B008
+    db: Session = Depends(get_db),  # noqa: B008
+) -> PlayFeedbackResponse:
+    """Return ChatGPT-style feedback for a 30+ hand cash or tournament session."""
+
+    _enforce_feedback_rate_limit(current_user)
+    if payload.handCount < payload.minHands:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least minHands completed hands are required for play feedback.",
+        )
+
+    sanitized = _scrub_pii(payload.model_dump())
+    advice = await get_play_feedback_advice_async(sanitized)
+    source = "fallback"
+    if advice.get("adviceJa") and advice.get("adviceEn"):
+        fallback_prefix = "セッション解析は受け付けました。"
+        source = "fallback" if advice["adviceJa"].startswith(fallback_prefix) else "openai"
+    response_payload = PlayFeedbackResponse(
+        adviceJa=advice.get("adviceJa", ""),
+        adviceEn=advice.get("adviceEn", ""),
+        source=source,
+        acceptedHandCount=payload.handCount,
+        piiRemoved=True,
+    )
+    # The session is synchronous; keep the commit off the event loop.
+    await run_in_threadpool(_store_feedback_result, db, current_user, payload, sanitized, response_payload)
     return response_payload
 
 
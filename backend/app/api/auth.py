@@ -4,13 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 
+from ..core.auth_cache import revoke_token
 from ..core.security import (
     create_access_token,
     get_password_hash,
     verify_password,
 )
 from ..core.db import get_db
-from ..dependencies.auth import get_current_user
+from ..dependencies.auth import get_current_user, oauth2_scheme
 from ..models import User
 from ..schemas.user import UserPublic
 
@@ -80,5 +81,9 @@ def read_current_user(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-def logout(_: User = Depends(get_current_user)):
+def logout(
+    _: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
+):
+    revoke_token(token.strip())
     return {"ok": True}
@@ -9,6 +9,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
+from ..core.pagination import before_clause, format_before_cursor, parse_before_cursor
+from ..crud.badugi_actions import bulk_insert_actions
+from ..crud.badugi_stats import apply_action_rows
 from ..dependencies.auth import get_current_user
 from ..models import BadugiHandAction, User
 
@@ -47,7 +50,7 @@ class BadugiActionEntry(BaseModel):
     phase: str = "BET"
     round: int = Field(0, ge=0)
     action: str
-    action_type: Optional[str] = None
+    action_type: Optional[str] = Field(None, validate_default=True)
     paid: float = Field(0, ge=0)
     to_call: Optional[float] = Field(None, ge=0)
     is_forced: bool = False
@@ -70,6 +73,8 @@ class BadugiActionEntry(BaseModel):
 
 class BadugiActionBatchRequest(BaseModel):
     actions: List[BadugiActionEntry]
+    # Skip rows whose (hand_id, player_id, seq) is already stored so retries are safe.
+    idempotent: bool = False
 
 
 class BadugiActionBatchResponse(BaseModel):
@@ -91,57 +96,61 @@ def save_action_batch(
     if any(not action.hand_id for action in actions):
         raise HTTPException(status_code=400, detail="hand_id_required")
 
-    entries = []
-    for idx, action in enumerate(actions):
-        seq = action.seq if action.seq is not None else idx
-        entries.append(
-            BadugiHandAction(
-                hand_id=action.hand_id,
-                player_id=action.player_id or "unknown",
-                seat_index=action.seat_index,
-                phase=action.phase,
-                round=action.round,
-                action=action.action,
-                action_type=normalize_action_type(action.action_type or action.action),
-                paid=max(0, action.paid or 0),
-                to_call=action.to_call,
-                is_forced=bool(action.is_forced),
-                stack_before=action.stack_before,
-                stack_after=action.stack_after,
-                bet_before=action.bet_before,
-                bet_after=action.bet_after,
-                seq=seq,
-                ts=action.ts or datetime.utcnow(),
-                metadata_json=action.metadata,
-            )
-        )
+    now = datetime.utcnow()
+    rows = [
+        {
+            "hand_id": action.hand_id,
+            "player_id": action.player_id or "unknown",
+            "seat_index": action.seat_index,
+            "phase": action.phase,
+            "round": action.round,
+            "action": action.action,
+            "action_type": action.action_type,
+            "paid": action.paid,
+            "to_call": action.to_call,
+            "is_forced": action.is_forced,
+            "stack_before": action.stack_before,
+            "stack_after": action.stack_after,
+            "bet_before": action.bet_before,
+            "bet_after": action.bet_after,
+            "seq": action.seq if action.seq is not None else idx,
+            "ts": action.ts or now,
+            "metadata": action.metadata,
+        }
+        for idx, action in enumerate(actions)
+    ]
     try:
-        db.add_all(entries)
+        inserted = bulk_insert_actions(db, rows, idempotent=payload.idempotent)
+        apply_action_rows(db, inserted)
         db.commit()
     except SQLAlchemyError:
         db.rollback()
         raise HTTPException(status_code=503, detail="db_unreachable")
 
-    return BadugiActionBatchResponse(inserted=len(entries))
+    return BadugiActionBatchResponse(inserted=len(inserted))
 
 
 @router.get("/badugi/actions/recent")
 def list_recent_actions(
     player_id: Optional[str] = None,
     limit: int = 200,
+    before: Optional[str] = None,
     _: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     if not player_id:
         raise HTTPException(status_code=400, detail="player_id_required")
     limit = max(1, min(limit, 500))
+    cursor = parse_before_cursor(before)
     try:
         stmt = (
             select(BadugiHandAction)
             .where(BadugiHandAction.player_id == player_id)
-            .order_by(desc(BadugiHandAction.ts))
+            .order_by(desc(BadugiHandAction.ts), desc(BadugiHandAction.id))
             .limit(limit)
         )
+        if cursor:
+            stmt = stmt.where(before_clause(BadugiHandAction.ts, BadugiHandAction.id, cursor))
         actions = db.execute(stmt).scalars().all()
     except SQLAlchemyError:
         raise HTTPException(status_code=503, detail="db_unreachable")
@@ -149,6 +158,7 @@ def list_recent_actions(
     return {
         "items": [
             {
+                "id": action.id,
                 "hand_id": action.hand_id,
                 "player_id": action.player_id,
                 "seat_index": action.seat_index,
@@ -168,5 +178,8 @@ def list_recent_actions(
                 "metadata": action.metadata_json,
             }
             for action in actions
-        ]
+        ],
+        "next_before": (
+            format_before_cursor(actions[-1].ts, actions[-1].id) if len(actions) == limit else None
+        ),
     }
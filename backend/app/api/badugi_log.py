@@ -10,6 +10,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
 from ..core import db
+from ..core.config import get_settings
+from ..core.pagination import before_clause, format_before_cursor, parse_before_cursor
+from ..core.write_behind import WriteBehindQueue
 from ..models import HandAction, HandLog, HandResult
 
 MAX_RECENT_LOGS = 10
@@ -62,44 +65,111 @@ def _reset_recent_logs() -> None:
     _recent_logs.clear()
 
 
+def _build_hand_log(payload: BadugiHandLogCreate) -> HandLog:
+    log = HandLog(
+        hand_id=payload.hand_id,
+        table_id=payload.table_id,
+        tournament_id=payload.tournament_id,
+        level=payload.level,
+        created_at=payload.created_at,
+        metadata_json=payload.metadata,
+    )
+    for action in payload.actions:
+        log.actions.append(
+            HandAction(
+                seat_index=action.seat_index,
+                player_id=action.player_id,
+                action=action.action,
+                amount=action.amount,
+                round=action.round,
+                phase=action.phase,
+            ),
+        )
+    for result in payload.results:
+        log.results.append(
+            HandResult(
+                seat_index=result.seat_index,
+                player_id=result.player_id,
+                final_stack=result.final_stack,
+                hand_label=result.hand_label,
+                is_winner=result.is_winner,
+                pot_share=result.pot_share,
+            ),
+        )
+    return log
+
+
+def _persist_hand_log_batch(records: List[Dict[str, Any]]) -> None:
+    """Write queued hand logs in one transaction, skipping hand_ids already stored.
+
+    Skipping makes spool replays after a crash (and duplicate submissions) safe.
+    """
+
+    payloads = [BadugiHandLogCreate.model_validate(record) for record in records]
+    session = db.SessionLocal()
+    try:
+        existing = set(
+            session.execute(
+                select(HandLog.hand_id).where(HandLog.hand_id.in_({p.hand_id for p in payloads}))
+            ).scalars()
+        )
+        logs = []
+        for payload in payloads:
+            if payload.hand_id in existing:
+                continue
+            existing.add(payload.hand_id)
+            logs.append(_build_hand_log(payload))
+        session.add_all(logs)
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+# Opt-in write-behind ingestion (HAND_LOG_WRITE_BEHIND); None keeps the synchronous path.
+_hand_log_writer: Optional[WriteBehindQueue] = None
+
+
+def start_hand_log_writer() -> None:
+    global _hand_log_writer
+    settings = get_settings()
+    if not settings.hand_log_write_behind or _hand_log_writer is not None:
+        return
+    _hand_log_writer = WriteBehindQueue(
+        _persist_hand_log_batch,
+        max_queue_size=settings.hand_log_queue_size,
+        batch_size=settings.hand_log_batch_size,
+        flush_interval=settings.hand_log_flush_interval,
+        spool_path=settings.hand_log_spool_path,
+        name="hand-log-writer",
+    )
+    _hand_log_writer.start()
+
+
+def stop_hand_log_writer() -> None:
+    global _hand_log_writer
+    if _hand_log_writer is not None:
+        _hand_log_writer.stop()
+        _hand_log_writer = None
+
+
 @router.post("/badugi/hands", response_model=BadugiHandLogResponse)
 def create_hand_log(payload: BadugiHandLogCreate) -> BadugiHandLogResponse:
+    writer = _hand_log_writer
+    if writer is not None:
+        if not writer.enqueue(payload.model_dump(mode="json")):
+            raise HTTPException(status_code=503, detail="ingest_queue_full")
+        _recent_logs.append(payload)
+        return BadugiHandLogResponse(hand_id=payload.hand_id, accepted=True, warnings=["queued"])
+
     try:
         session = db.SessionLocal()
     except SQLAlchemyError:
         raise HTTPException(status_code=503, detail="db_unreachable")
     try:
-        log = HandLog(
-            hand_id=payload.hand_id,
-            table_id=payload.table_id,
-            tournament_id=payload.tournament_id,
-            level=payload.level,
-            created_at=payload.created_at,
-            metadata_json=payload.metadata,
-        )
-        for action in payload.actions:
-            log.actions.append(
-                HandAction(
-                    seat_index=action.seat_index,
-                    player_id=action.player_id,
-                    action=action.action,
-                    amount=action.amount,
-                    round=action.round,
-                    phase=action.phase,
-                ),
-            )
-        for result in payload.results:
-            log.results.append(
-                HandResult(
-                    seat_index=result.seat_index,
-                    player_id=result.player_id,
-                    final_stack=result.final_stack,
-                    hand_label=result.hand_label,
-                    is_winner=result.is_winner,
-                    pot_share=result.pot_share,
-                ),
-            )
-        session.add(log)
+        session.add(_build_hand_log(payload))
         session.commit()
         _recent_logs.append(payload)
         return BadugiHandLogResponse(hand_id=payload.hand_id, accepted=True)
@@ -110,38 +180,65 @@ def create_hand_log(payload: BadugiHandLogCreate) -> BadugiHandLogResponse:
         session.close()
 
 
+@router.get("/badugi/hands/ingest/metrics")
+def get_hand_log_ingest_metrics():
+    writer = _hand_log_writer
+    if writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **writer.metrics()}
+
+
+def _page(logs: List[HandLog], limit: int) -> Dict[str, Any]:
+    return {
+        "items": [log.to_dict(include_children=True) for log in logs],
+        "next_before": (
+            format_before_cursor(logs[-1].created_at, logs[-1].id) if len(logs) == limit else None
+        ),
+    }
+
+
 @router.get("/badugi/hands/recent")
-def list_recent_hand_logs(limit: int = 10):
+def list_recent_hand_logs(limit: int = 10, before: Optional[str] = None):
+    cursor = parse_before_cursor(before)
+    limit = max(1, min(limit, MAX_RECENT_LOGS))
     session = db.SessionLocal()
     try:
         stmt = (
             select(HandLog)
-            .order_by(desc(HandLog.created_at))
-            .limit(max(1, min(limit, MAX_RECENT_LOGS)))
+            .order_by(desc(HandLog.created_at), desc(HandLog.id))
+            .limit(limit)
         )
+        if cursor:
+            stmt = stmt.where(before_clause(HandLog.created_at, HandLog.id, cursor))
         logs = session.execute(stmt).scalars().all()
-        if logs:
-            return {"items": [log.to_dict(include_children=True) for log in logs]}
-        return {"items": list(_recent_logs)}
+        if logs or cursor:
+            return _page(logs, limit)
+        return {"items": list(_recent_logs), "next_before": None}
     except SQLAlchemyError:
-        return {"items": list(_recent_logs)}
+        if cursor:
+            raise HTTPException(status_code=503, detail="db_unreachable")
+        return {"items": list(_recent_logs), "next_before": None}
     finally:
         session.close()
 
 
 @router.get("/badugi/hands/by-table/{table_id}")
-def get_hands_by_table(table_id: str, limit: int = 5):
+def get_hands_by_table(table_id: str, limit: int = 5, before: Optional[str] = None):
+    cursor = parse_before_cursor(before)
+    limit = max(1, min(limit, 20))
     session = db.SessionLocal()
     try:
         stmt = (
             select(HandLog)
             .options(selectinload(HandLog.actions), selectinload(HandLog.results))
             .where(HandLog.table_id == table_id)
-            .order_by(desc(HandLog.created_at))
-            .limit(max(1, min(limit, 20)))
+            .order_by(desc(HandLog.created_at), desc(HandLog.id))
+            .limit(limit)
         )
+        if cursor:
+            stmt = stmt.where(before_clause(HandLog.created_at, HandLog.id, cursor))
         logs = session.execute(stmt).scalars().all()
-        return {"items": [log.to_dict(include_children=True) for log in logs]}
+        return _page(logs, limit)
     except SQLAlchemyError:
         raise HTTPException(status_code=503, detail="db_unreachable")
     finally:
@@ -1,14 +1,20 @@
 """Badugi RL decision endpoint.
 
-Frontend ONNX is the primary inference path. This backend endpoint is a
-comparison/future-extension path and intentionally uses the same schema v1
-vector plus deterministic safe fallback semantics.
+Frontend ONNX is the primary inference path. This backend endpoint serves
+clients that offload inference: when `RL_DECISION_MODEL_ID` is configured it
+scores the schema v1 vector with the registry model through the decision
+batcher in `core.rl_inference`, and otherwise (or on inference failure) falls
+back to the deterministic safe policy. The shipped Badugi models take a rank-1
+input, so the batcher queues requests but still evaluates them one row at a
+time (see `core.rl_inference`).
 """
+import logging
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+from ..core.rl_inference import BADUGI_ACTION_INDEX, get_decision_batcher, get_decision_policy
 from ..dependencies.auth import get_current_user
 from ..models import User
 
@@ -64,6 +70,7 @@ class BadugiRLResponse(BaseModel):
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 def _deterministic_safe_policy(valid_actions: List[str]) -> BadugiRLResponse:
@@ -86,11 +93,34 @@ def _deterministic_safe_policy(valid_actions: List[str]) -> BadugiRLResponse:
     )
 
 
+def _onnx_policy(valid_actions: List[str], q_values: List[float], model_id: str) -> BadugiRLResponse:
+    scores = {action: float(q_values[BADUGI_ACTION_INDEX.index(action)]) for action in valid_actions}
+    chosen = max(valid_actions, key=lambda action: scores[action])
+    return BadugiRLResponse(
+        action=chosen,
+        policy_scores=scores,
+        source="onnx",
+        schema_version=SCHEMA_VERSION,
+        vector_size=STATE_VECTOR_SIZE,
+        fallback_order=FALLBACK_ORDER,
+        debug={"strategy": "backend_onnx", "model_id": model_id},
+    )
+
+
 @router.post("/badugi/rl/decision", response_model=BadugiRLResponse)
-def badugi_rl_decision(
+async def badugi_rl_decision(
     request: BadugiRLRequest,
     _: User = Depends(get_current_user),
 ) -> BadugiRLResponse:
     if not request.valid_actions:
         raise HTTPException(status_code=422, detail="valid_actions must not be empty.")
-    return _deterministic_safe_policy(request.valid_actions)
+    batcher = get_decision_batcher()
+    policy = get_decision_policy()
+    if batcher is None or policy is None:
+        return _deterministic_safe_policy(request.valid_actions)
+    try:
+        q_values = await batcher.submit(request.state_vector)
+    except Exception:  # noqa: BLE001 - degrade to the safe policy
+        logger.exception("Badugi RL inference failed; using deterministic-safe fallback")
+        return _deterministic_safe_policy(request.valid_actions)
+    return _onnx_policy(request.valid_actions, list(q_values), policy.model_id)
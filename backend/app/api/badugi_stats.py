@@ -1,14 +1,14 @@
 """Badugi HUD stats endpoints."""
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import desc, func, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
+from ..crud.badugi_stats import get_player_stats, get_window_totals
 from ..dependencies.auth import get_current_user
-from ..models import BadugiHandAction, User
+from ..models import User
 
 router = APIRouter()
 
@@ -25,88 +25,32 @@ def get_badugi_stats(
     limit_hands = max(1, min(limit_hands, 2000))
 
     try:
-        stmt = (
-            select(BadugiHandAction)
-            .where(
-                BadugiHandAction.player_id == player_id,
-                BadugiHandAction.phase == "BET",
-            )
-            .order_by(desc(BadugiHandAction.ts))
-        )
-        actions = db.execute(stmt).scalars().all()
+        # Read-only: players with no aggregate row (the migration backfilled
+        # existing ones) simply have empty totals.
+        totals = get_player_stats(db, player_id)
+        hands, vpip, pfr, aggro_paid, call_paid = get_window_totals(db, player_id, limit_hands)
     except SQLAlchemyError:
         raise HTTPException(status_code=503, detail="db_unreachable")
 
-    window_actions: List[BadugiHandAction] = []
-    seen_hands = set()
-    for action in actions:
-        hand_id = action.hand_id
-        if hand_id not in seen_hands and len(seen_hands) >= limit_hands:
-            break
-        seen_hands.add(hand_id)
-        window_actions.append(action)
-
-    hand_ids = list(seen_hands)
-    if not hand_ids:
-        return {
-            "player_id": player_id,
-            "hands": 0,
-            "vpip": 0,
-            "pfr": 0,
-            "vpipRate": 0.0,
-            "pfrRate": 0.0,
-            "af": 0.0,
-            "window": {"limit_hands": limit_hands, "distinct_hands": 0},
-        }
-
-    try:
-        count_stmt = select(func.count(func.distinct(BadugiHandAction.hand_id))).where(
-            BadugiHandAction.player_id == player_id,
-            BadugiHandAction.hand_id.in_(hand_ids),
-        )
-        hands = db.execute(count_stmt).scalar_one() or 0
-    except SQLAlchemyError:
-        raise HTTPException(status_code=503, detail="db_unreachable")
-
-    vpip_hands = set()
-    pfr_hands = set()
-    aggro_paid = 0.0
-    call_paid = 0.0
-    for action in window_actions:
-        if action.round != 0:
-            continue
-        if action.is_forced:
-            continue
-        if action.paid <= 0:
-            continue
-        action_type = (action.action_type or "").lower()
-        if action_type in {"call", "bet", "raise"}:
-            vpip_hands.add(action.hand_id)
-        if action_type in {"bet", "raise"}:
-            pfr_hands.add(action.hand_id)
-
-    for action in window_actions:
-        if action.is_forced or action.paid <= 0:
-            continue
-        action_type = (action.action_type or "").lower()
-        if action_type in {"bet", "raise"}:
-            aggro_paid += float(action.paid or 0)
-        if action_type == "call":
-            call_paid += float(action.paid or 0)
+    payload = {
+        "player_id": player_id,
+        **_hud_payload(hands, vpip, pfr, aggro_paid, call_paid),
+        "window": {"limit_hands": limit_hands, "distinct_hands": hands},
+    }
+    payload["lifetime"] = (
+        _hud_payload(totals.hands, totals.vpip_hands, totals.pfr_hands, totals.aggro_paid, totals.call_paid)
+        if totals is not None
+        else _hud_payload(0, 0, 0, 0.0, 0.0)
+    )
+    return payload
 
-    vpip = len(vpip_hands)
-    pfr = len(pfr_hands)
-    vpip_rate = vpip / hands if hands else 0.0
-    pfr_rate = pfr / hands if hands else 0.0
-    af = aggro_paid if call_paid == 0 else aggro_paid / call_paid
 
+def _hud_payload(hands: int, vpip: int, pfr: int, aggro_paid: float, call_paid: float) -> Dict[str, float]:
     return {
-        "player_id": player_id,
         "hands": hands,
         "vpip": vpip,
         "pfr": pfr,
-        "vpipRate": vpip_rate,
-        "pfrRate": pfr_rate,
-        "af": af,
-        "window": {"limit_hands": limit_hands, "distinct_hands": hands},
+        "vpipRate": vpip / hands if hands else 0.0,
+        "pfrRate": pfr / hands if hands else 0.0,
+        "af": aggro_paid if call_paid == 0 else aggro_paid / call_paid,
     }
@@ -2,62 +2,82 @@
 
 This complements the structured Badugi log endpoint. The generic endpoint keeps
 full canonical hand records available for mixed-game history while the per-game
-DB schema is still evolving.
+DB schema is still evolving. Records live in `generic_hand_histories` (one row
+per handId), so every uvicorn worker sees the same history; hot single-hand
+reads are served from a small per-process LRU.
 """
-from collections import OrderedDict
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
-MAX_HISTORY_HANDS = 500
+from ..core.db import get_db
+from ..core.pagination import format_before_cursor, parse_before_cursor
+from ..core.ttl_cache import TTLCache
+from ..crud import hand_history as history_store
+
+# Other workers may update a hand; the TTL bounds how long this worker can
+# serve its previous copy.
+HAND_CACHE_SIZE = 256
+HAND_CACHE_TTL_SECONDS = 5.0
 
 
 class GenericHandHistoryCreate(BaseModel):
-    handId: str = Field(..., min_length=1)
-    winner: Optional[str] = None
-    variantId: Optional[str] = None
+    # Lengths match the generic_hand_histories columns.
+    handId: str = Field(..., min_length=1, max_length=128)
+    winner: Optional[str] = Field(None, max_length=255)
+    variantId: Optional[str] = Field(None, max_length=64)
     data: Dict[str, Any] = Field(default_factory=dict)
 
 
 router = APIRouter()
-_history_hands: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
-
-
-def _reset_generic_history() -> None:
-    """Used by tests to clear the in-memory generic history buffer."""
-
-    _history_hands.clear()
-
-
-def _upsert_hand(record: GenericHandHistoryCreate) -> Dict[str, Any]:
-    item = record.model_dump()
-    item["updatedAt"] = datetime.now(tz=timezone.utc).isoformat()
-    if record.handId in _history_hands:
-        _history_hands.pop(record.handId)
-    _history_hands[record.handId] = item
-    while len(_history_hands) > MAX_HISTORY_HANDS:
-        _history_hands.popitem(last=False)
-    return item
+_hand_cache: TTLCache[Dict[str, Any]] = TTLCache(HAND_CACHE_SIZE, ttl=HAND_CACHE_TTL_SECONDS)
 
 
 @router.post("/history/hand")
-def post_hand_history(record: GenericHandHistoryCreate):
-    item = _upsert_hand(record)
+def post_hand_history(record: GenericHandHistoryCreate, db: Session = Depends(get_db)):
+    try:
+        row = history_store.upsert_hand_history(db, record.model_dump())
+        item = history_store.history_to_dict(row)
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(status_code=503, detail="db_unreachable")
+    _hand_cache.set(item["handId"], item)
     return {"stored": True, "handId": item["handId"]}
 
 
 @router.get("/history/hand")
-def list_hand_history(limit: int = 50):
+def list_hand_history(
+    limit: int = 50,
+    variant_id: Optional[str] = None,
+    before: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     safe_limit = max(1, min(limit, 200))
-    items: List[Dict[str, Any]] = list(reversed(_history_hands.values()))[:safe_limit]
-    return {"items": items}
+    cursor = parse_before_cursor(before)
+    try:
+        rows = history_store.list_hand_history(db, limit=safe_limit, variant_id=variant_id, cursor=cursor)
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="db_unreachable")
+    next_before = None
+    if len(rows) == safe_limit:
+        next_before = format_before_cursor(rows[-1].updated_at, rows[-1].id)
+    return {"items": [history_store.history_to_dict(row) for row in rows], "next_before": next_before}
 
 
 @router.get("/history/hand/{hand_id}")
-def get_hand_history(hand_id: str):
-    item = _history_hands.get(hand_id)
-    if not item:
+def get_hand_history(hand_id: str, db: Session = Depends(get_db)):
+    item = _hand_cache.get(hand_id)
+    if item is not None:
+        return item
+    try:
+        row = history_store.get_hand_history(db, hand_id)
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="db_unreachable")
+    if row is None:
         raise HTTPException(status_code=404, detail="hand_not_found")
+    item = history_store.history_to_dict(row)
+    _hand_cache.set(hand_id, item)
     return item
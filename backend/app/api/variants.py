@@ -1,10 +1,13 @@
 """Read-only VariantDefinition endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
-from ..crud.variant import get_variant_by_key, list_variants
+from ..crud.variant import get_variant_by_key, variant_catalogue_cache
 from ..models import Variant
 from ..schemas.variant import VariantDetailRead
 
@@ -44,13 +47,36 @@ def _variant_to_detail(variant: Variant) -> VariantDetailRead:
     )
 
 
+_CATALOGUE_ADAPTER = TypeAdapter(List[VariantDetailRead])
+
+
+def _serialise_catalogue(variants: List[Variant]) -> bytes:
+    return _CATALOGUE_ADAPTER.dump_json([_variant_to_detail(variant) for variant in variants])
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/variants", response_model=list[VariantDetailRead])
-def get_variants(db: Session = Depends(get_db)):
+def get_variants(
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+):
     try:
-        variants = list_variants(db)
+        catalogue = variant_catalogue_cache.get(db, _serialise_catalogue)
     except SQLAlchemyError:
-        return []
-    return [_variant_to_detail(variant) for variant in variants]
+        # Keep serving the last good catalogue while the DB is unreachable.
+        catalogue = variant_catalogue_cache.peek()
+        if catalogue is None:
+            return []
+    headers = {"ETag": catalogue.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, catalogue.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalogue.body, media_type="application/json", headers=headers)
 
 
 @router.get("/variants/{variant_key}", response_model=VariantDetailRead)
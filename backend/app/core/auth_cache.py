@@ -0,0 +1,117 @@
+"""Process-local caches for the authentication dependency.
+
+`get_current_user` runs on nearly every request. Decoded JWT payloads are
+cached by token hash until the token's `exp`, and resolved users are cached by
+`sub` for `AUTH_USER_CACHE_TTL` seconds, so a steady stream of requests from
+the same client neither re-verifies the signature nor queries `users`.
+
+Both caches live in this process only. `invalidate_user` runs automatically
+when a `User` row is updated or deleted through the ORM; `revoke_token` is the
+hook for logout or admin revocation. With several workers, another process may
+keep serving a cached user for up to the TTL.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+from ..models import User
+from .config import get_settings
+from .security import decode_access_token
+from .ttl_cache import TTLCache
+
+_settings = get_settings()
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(_settings.auth_cache_size)
+user_cache: TTLCache[User] = TTLCache(_settings.auth_cache_size, ttl=_settings.auth_user_cache_ttl)
+
+# Revocations are kept until the token would have expired anyway. This is not
+# LRU-bounded: evicting a revocation would silently re-enable the token.
+_revoked: Dict[str, float] = {}
+_revoked_lock = threading.Lock()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf8")).hexdigest()
+
+
+def _seconds_until(exp: Any) -> Optional[float]:
+    try:
+        return float(exp) - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_revoked(key: str) -> bool:
+    with _revoked_lock:
+        deadline = _revoked.get(key)
+        if deadline is None:
+            return False
+        if deadline <= time.time():
+            del _revoked[key]
+            return False
+        return True
+
+
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """Decode `token`, reusing the verified payload until it expires.
+
+    Raises ValueError for invalid, expired or revoked tokens.
+    """
+
+    key = _token_key(token)
+    if _is_revoked(key):
+        raise ValueError("Revoked token")
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    payload = decode_access_token(token)
+    remaining = _seconds_until(payload.get("exp"))
+    if remaining is not None:
+        token_cache.set(key, payload, ttl=remaining)
+    return payload
+
+
+def revoke_token(token: str) -> None:
+    """Reject `token` in this process until its `exp`."""
+
+    key = _token_key(token)
+    token_cache.pop(key)
+    try:
+        exp = float(decode_access_token(token).get("exp"))
+    except (TypeError, ValueError):
+        return
+    now = time.time()
+    with _revoked_lock:
+        for stale in [k for k, deadline in _revoked.items() if deadline <= now]:
+            del _revoked[stale]
+        _revoked[key] = exp
+
+
+def get_cached_user(user_id: int) -> Optional[User]:
+    return user_cache.get(user_id)
+
+
+def cache_user(user: User) -> None:
+    user_cache.set(user.id, user)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+
+def clear_auth_caches() -> None:
+    token_cache.clear()
+    user_cache.clear()
+    with _revoked_lock:
+        _revoked.clear()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(_mapper, _connection, target: User) -> None:
+    if target.id is not None:
+        invalidate_user(target.id)
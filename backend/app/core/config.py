@@ -36,6 +36,30 @@ class Settings(BaseSettings):
 
     secret_key: str | None = Field(None, validation_alias="SECRET_KEY")
 
+    # ---------- Hand-log write-behind ingestion (opt-in) ----------
+    hand_log_write_behind: bool = Field(False, validation_alias="HAND_LOG_WRITE_BEHIND")
+    hand_log_queue_size: int = Field(2000, validation_alias="HAND_LOG_QUEUE_SIZE")
+    hand_log_batch_size: int = Field(100, validation_alias="HAND_LOG_BATCH_SIZE")
+    hand_log_flush_interval: float = Field(0.5, validation_alias="HAND_LOG_FLUSH_INTERVAL")
+    hand_log_spool_path: str | None = Field(None, validation_alias="HAND_LOG_SPOOL_PATH")
+
+    # ---------- Authentication caches ----------
+    auth_user_cache_ttl: float = Field(60.0, validation_alias="AUTH_USER_CACHE_TTL")
+    auth_cache_size: int = Field(10000, validation_alias="AUTH_CACHE_SIZE")
+
+    # ---------- Server-side RL decisions (opt-in, needs the rl extra) ----------
+    rl_decision_model_id: str | None = Field(None, validation_alias="RL_DECISION_MODEL_ID")
+    rl_model_registry_path: str | None = Field(None, validation_alias="RL_MODEL_REGISTRY_PATH")
+    rl_models_root: str | None = Field(None, validation_alias="RL_MODELS_ROOT")
+    rl_batch_window_ms: float = Field(2.0, validation_alias="RL_BATCH_WINDOW_MS")
+    rl_max_batch_size: int = Field(64, validation_alias="RL_MAX_BATCH_SIZE")
+    rl_intra_op_threads: int = Field(1, validation_alias="RL_INTRA_OP_THREADS")
+    rl_registry_watch_interval: float = Field(5.0, validation_alias="RL_REGISTRY_WATCH_INTERVAL")
+    rl_model_memory_cap_mb: float = Field(256.0, validation_alias="RL_MODEL_MEMORY_CAP_MB")
+
+    # ---------- Variants catalogue cache ----------
+    variant_cache_ttl: float = Field(30.0, validation_alias="VARIANT_CACHE_TTL")
+
     model_config = SettingsConfigDict(  # [tournament-feedback]
         env_file=ENV_PATH,
         env_file_encoding="utf-8",
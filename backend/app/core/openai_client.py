@@ -1,18 +1,29 @@
 """Thin OpenAI client for tournament feedback."""  # [tournament-feedback]
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
+import threading
 import time
 import urllib.error
 import urllib.request
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .ttl_cache import TTLCache
+
+try:  # pooled async transport; falls back to urllib in a worker thread
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
 
 # [tournament-feedback] Constants for OpenAI generation endpoints.
 OPENAI_CHAT_API_URL = "https://api.openai.com/v1/chat/completions"  # [tournament-feedback]
 OPENAI_RESPONSES_API_URL = "https://api.openai.com/v1/responses"
 DEFAULT_MODEL = "gpt-5.2"
+RETRYABLE_STATUS = {429, 502, 503, 504}
 DEFAULT_API_MODE = "responses"
 FALLBACK_ADVICE = {  # [tournament-feedback]
     "adviceJa": "解析中にエラーが発生しました。もう一度プレイしてみましょう。",  # [tournament-feedback]
@@ -58,6 +69,23 @@ def _request_timeout(default: int) -> int:
         return default
 
 
+def _env_number(name: str, default: float, minimum: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return max(minimum, float(raw))
+    except ValueError:
+        return default
+
+
+def _api_url(api_mode: str) -> str:
+    base_url = (os.getenv("MGX_OPENAI_BASE_URL") or "").strip().rstrip("/")
+    if api_mode == "chat":
+        return f"{base_url}/chat/completions" if base_url else OPENAI_CHAT_API_URL
+    return f"{base_url}/responses" if base_url else OPENAI_RESPONSES_API_URL
+
+
 def _max_output_tokens() -> int:
     raw = os.getenv("MGX_OPENAI_MAX_OUTPUT_TOKENS")
     if not raw:
@@ -413,23 +441,23 @@ def _responses_payload_from_chat_payload(chat_payload: Dict[str, Any]) -> Dict[s
     return payload
 
 
-def _call_openai(request_payload: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+def _wire_request(request_payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
     api_mode = _api_mode()
-    if api_mode == "chat":
-        url = OPENAI_CHAT_API_URL
-        wire_payload = request_payload
-    else:
-        url = OPENAI_RESPONSES_API_URL
-        wire_payload = _responses_payload_from_chat_payload(request_payload)
+    wire_payload = request_payload if api_mode == "chat" else _responses_payload_from_chat_payload(request_payload)
+    headers = {
+        "Authorization": f"Bearer {os.getenv('MGX_OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')}",
+        "Content-Type": "application/json",
+    }
+    return _api_url(api_mode), wire_payload, headers
+
 
+def _call_openai(request_payload: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+    url, wire_payload, headers = _wire_request(request_payload)
     request = urllib.request.Request(
         url,
         data=json.dumps(wire_payload).encode("utf-8"),
         method="POST",
-        headers={
-            "Authorization": f"Bearer {os.getenv('MGX_OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')}",
-            "Content-Type": "application/json",
-        },
+        headers=headers,
     )
     last_error: Exception | None = None
     for attempt in range(3):
@@ -439,7 +467,7 @@ def _call_openai(request_payload: Dict[str, Any], timeout: int) -> Dict[str, Any
                 return json.loads(raw_body)
         except urllib.error.HTTPError as exc:
             last_error = exc
-            if exc.code not in {429, 502, 503, 504} or attempt == 2:
+            if exc.code not in RETRYABLE_STATUS or attempt == 2:
                 raise
             time.sleep(0.5 * (attempt + 1))
         except urllib.error.URLError as exc:
@@ -452,42 +480,237 @@ def _call_openai(request_payload: Dict[str, Any], timeout: int) -> Dict[str, Any
     return {}
 
 
+# ---- pooled async transport -------------------------------------------------
 
-def get_chatgpt_advice(worst_spot: Dict[str, Any]) -> Dict[str, str]:
-    """Call OpenAI API and return structured advice."""  # [tournament-feedback]
+_async_client: Optional["httpx.AsyncClient"] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_async_client() -> Optional["httpx.AsyncClient"]:
+    """Return the shared keep-alive client for the running event loop."""
+
+    global _async_client, _async_client_loop
+    if httpx is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(_env_number("MGX_OPENAI_MAX_CONNECTIONS", 20, 1)),
+                max_keepalive_connections=int(_env_number("MGX_OPENAI_MAX_CONNECTIONS", 20, 1)),
+            ),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_openai_client() -> None:
+    global _async_client, _async_client_loop
+    if _async_client is not None and _async_client_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def _call_openai_async(request_payload: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+    client = _get_async_client()
+    if client is None:
+        return await asyncio.to_thread(_call_openai, request_payload, timeout)
+    url, wire_payload, headers = _wire_request(request_payload)
+    body = json.dumps(wire_payload).encode("utf-8")
+    for attempt in range(3):
+        try:
+            response = await client.post(url, content=body, headers=headers, timeout=timeout)
+        except httpx.TransportError:
+            if attempt == 2:
+                raise
+            await asyncio.sleep(0.5 * (attempt + 1))
+            continue
+        if response.status_code in RETRYABLE_STATUS and attempt < 2:
+            await asyncio.sleep(0.5 * (attempt + 1))
+            continue
+        response.raise_for_status()
+        return json.loads(response.content.decode("utf-8"))
+    return {}
+
+
+# ---- response cache + single flight -----------------------------------------
+#
+# Identical requests (same scrubbed payload, prompt, model and API mode) are
+# answered from an in-process TTL cache, and concurrent identical requests
+# share one upstream call. Fallback advice is never cached.
+
+_advice_cache: TTLCache[Dict[str, str]] = TTLCache(
+    int(_env_number("MGX_OPENAI_CACHE_SIZE", 512, 1)),
+    ttl=_env_number("MGX_OPENAI_CACHE_TTL_SECONDS", 3600, 0),
+)
+
+
+def _cache_key(request_payload: Dict[str, Any]) -> str:
+    material = json.dumps(
+        {"mode": _api_mode(), "request": request_payload},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
-    api_key = os.getenv("MGX_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        logger.warning("MGX_OPENAI_API_KEY/OPENAI_API_KEY is not set; returning fallback advice.")
-        return FALLBACK_ADVICE
 
+def clear_advice_cache() -> None:
+    _advice_cache.clear()
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, str]] = None
+        self.error: Optional[BaseException] = None
+
+
+_inflight_lock = threading.Lock()
+_inflight: Dict[str, _InFlight] = {}
+_inflight_async: Dict[str, "asyncio.Task[Dict[str, str]]"] = {}
+
+
+def _single_flight(key: str, fetch: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _InFlight()
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+    try:
+        call.result = fetch()
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+    return call.result
+
+
+async def _single_flight_async(key: str, fetch: Callable[[], Any]) -> Dict[str, str]:
+    loop = asyncio.get_running_loop()
+    task = _inflight_async.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = _inflight_async[key] = loop.create_task(fetch())
+
+        def _forget(done: "asyncio.Task[Dict[str, str]]") -> None:
+            if _inflight_async.get(key) is done:
+                del _inflight_async[key]
+
+        task.add_done_callback(_forget)
+    # shield: one caller disconnecting must not cancel the shared upstream call.
+    return await asyncio.shield(task)
+
+
+def _finish_advice(key: str, parsed_body: Dict[str, Any], fallback: Dict[str, str]) -> Dict[str, str]:
+    parsed = _parse_response(parsed_body)
+    if parsed == FALLBACK_ADVICE:
+        return fallback
+    _advice_cache.set(key, parsed)
+    return parsed
+
+
+def _fetch_advice(key: str, request_payload: Dict[str, Any], timeout: int, fallback: Dict[str, str], label: str):
     try:
-        parsed_body = _call_openai(_build_prompt(worst_spot or {}), timeout=_request_timeout(30))
-        return _parse_response(parsed_body)
+        return _finish_advice(key, _call_openai(request_payload, timeout=timeout), fallback)
     except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, json.JSONDecodeError) as exc:
-        logger.warning("OpenAI request failed: %s", exc)
+        logger.warning("%s failed: %s", label, exc)
+    except Exception:  # pragma: no cover
+        logger.exception("Unexpected error during %s.", label)
+    return fallback
+
+
+async def _fetch_advice_async(
+    key: str,
+    request_payload: Dict[str, Any],
+    timeout: int,
+    fallback: Dict[str, str],
+    label: str,
+) -> Dict[str, str]:
+    async_errors = (httpx.HTTPError,) if httpx is not None else ()
+    try:
+        return _finish_advice(key, await _call_openai_async(request_payload, timeout=timeout), fallback)
+    except (urllib.error.URLError, TimeoutError, json.JSONDecodeError, *async_errors) as exc:
+        logger.warning("%s failed: %s", label, exc)
     except Exception:  # pragma: no cover
-        logger.exception("Unexpected error during OpenAI request.")
-    return FALLBACK_ADVICE
+        logger.exception("Unexpected error during %s.", label)
+    return fallback
+
+
+def _advice_request(kind: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int, Dict[str, str], str]:
+    if kind == "play_feedback":
+        return (
+            _build_play_feedback_prompt(data or {}),
+            _request_timeout(60),
+            FALLBACK_PLAY_FEEDBACK,
+            "OpenAI play feedback request",
+        )
+    return _build_prompt(data or {}), _request_timeout(30), FALLBACK_ADVICE, "OpenAI request"
+
+
+def _cached_advice(kind: str, data: Dict[str, Any]) -> Dict[str, str]:
+    request_payload, timeout, fallback, label = _advice_request(kind, data)
+    key = _cache_key(request_payload)
+    cached = _advice_cache.get(key)
+    if cached is not None:
+        return cached
+    return _single_flight(key, lambda: _fetch_advice(key, request_payload, timeout, fallback, label))
+
+
+async def _cached_advice_async(kind: str, data: Dict[str, Any]) -> Dict[str, str]:
+    request_payload, timeout, fallback, label = _advice_request(kind, data)
+    key = _cache_key(request_payload)
+    cached = _advice_cache.get(key)
+    if cached is not None:
+        return cached
+    return await _single_flight_async(
+        key, lambda: _fetch_advice_async(key, request_payload, timeout, fallback, label)
+    )
+
+
+def _has_api_key() -> bool:
+    return bool(os.getenv("MGX_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY"))
+
+
+def get_chatgpt_advice(worst_spot: Dict[str, Any]) -> Dict[str, str]:
+    """Call OpenAI API and return structured advice."""  # [tournament-feedback]
+
+    if not _has_api_key():
+        logger.warning("MGX_OPENAI_API_KEY/OPENAI_API_KEY is not set; returning fallback advice.")
+        return FALLBACK_ADVICE
+    return _cached_advice("advice", worst_spot)
 
 
 def get_play_feedback_advice(session_payload: Dict[str, Any]) -> Dict[str, str]:
     """Call OpenAI API for session-level feedback and return structured advice."""
 
-    api_key = os.getenv("MGX_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not _has_api_key():
         logger.warning("MGX_OPENAI_API_KEY/OPENAI_API_KEY is not set; returning fallback play feedback.")
         return FALLBACK_PLAY_FEEDBACK
+    return _cached_advice("play_feedback", session_payload)
 
-    try:
-        parsed_body = _call_openai(
-            _build_play_feedback_prompt(session_payload or {}),
-            timeout=_request_timeout(60),
-        )
-        parsed = _parse_response(parsed_body)
-        return parsed if parsed != FALLBACK_ADVICE else FALLBACK_PLAY_FEEDBACK
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, json.JSONDecodeError) as exc:
-        logger.warning("OpenAI play feedback request failed: %s", exc)
-    except Exception:  # pragma: no cover
-        logger.exception("Unexpected error during OpenAI play feedback request.")
-    return FALLBACK_PLAY_FEEDBACK
+
+async def get_chatgpt_advice_async(worst_spot: Dict[str, Any]) -> Dict[str, str]:
+    """`get_chatgpt_advice` over the pooled async client."""
+
+    if not _has_api_key():
+        logger.warning("MGX_OPENAI_API_KEY/OPENAI_API_KEY is not set; returning fallback advice.")
+        return FALLBACK_ADVICE
+    return await _cached_advice_async("advice", worst_spot)
+
+
+async def get_play_feedback_advice_async(session_payload: Dict[str, Any]) -> Dict[str, str]:
+    """`get_play_feedback_advice` over the pooled async client."""
+
+    if not _has_api_key():
+        logger.warning("MGX_OPENAI_API_KEY/OPENAI_API_KEY is not set; returning fallback play feedback.")
+        return FALLBACK_PLAY_FEEDBACK
+    return await _cached_advice_async("play_feedback", session_payload)
@@ -0,0 +1,33 @@
+"""Keyset (cursor) pagination helpers for newest-first feeds."""
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def parse_before_cursor(before: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Parse `?before=<iso-ts>,<id>`; None when absent, 400 when malformed."""
+
+    if not before:
+        return None
+    ts_text, sep, id_text = before.rpartition(",")
+    if not sep:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    try:
+        return datetime.fromisoformat(ts_text.strip()), int(id_text)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+
+
+def format_before_cursor(ts: Optional[datetime], row_id: int) -> Optional[str]:
+    if ts is None:
+        return None
+    return f"{ts.isoformat()},{row_id}"
+
+
+def before_clause(ts_column, id_column, cursor: Tuple[datetime, int]):
+    """Rows strictly older than the cursor in `(ts DESC, id DESC)` order."""
+
+    ts, row_id = cursor
+    return or_(ts_column < ts, and_(ts_column == ts, id_column < row_id))
@@ -0,0 +1,270 @@
+"""Server-side ONNX inference for `/badugi/rl/decision`.
+
+The model named by `RL_DECISION_MODEL_ID` is loaded at startup through the
+`badugi_model_registry.ModelRegistry` (checksum-validated, warmed,
+hot-swapped when `src/config/ai/modelRegistry.json` or the model file
+changes). Requests do not call the session directly: `DecisionBatcher`
+collects concurrent decisions for up to `RL_BATCH_WINDOW_MS` (or
+`RL_MAX_BATCH_SIZE` vectors) and hands them to a dedicated inference thread,
+so the event loop never blocks.
+
+Only models exported with a dynamic batch axis (rank-2 input) evaluate a
+batch in one `session.run`. The shipped frontend models, including the Badugi
+DQNs, take a single rank-1 vector, so `ModelHandle.run_batch` still runs them
+row by row: the batcher then only serialises requests onto the inference
+thread and amortises the asyncio/thread hand-off, not the ONNX call itself.
+A warning is logged at startup in that case.
+
+onnxruntime/numpy and the shared registry are optional
+(`pip install -e ../packages/model-registry -e .[rl]`). When they are
+missing, no model id is configured or the model fails to load, the endpoint
+keeps answering with the deterministic-safe fallback.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+try:  # optional dependency
+    import numpy as np
+
+    from badugi_model_registry import DEFAULT_MODELS_ROOT, DEFAULT_REGISTRY_PATH, ModelRegistry
+except ImportError:  # pragma: no cover - exercised only without the rl extra
+    np = None
+    ModelRegistry = None
+    DEFAULT_REGISTRY_PATH = PROJECT_ROOT / "src" / "config" / "ai" / "modelRegistry.json"
+    DEFAULT_MODELS_ROOT = PROJECT_ROOT / "public"
+
+# Same action order as BADUGI_RL_ACTIONS in src/rl/badugiObservationSchema.js.
+BADUGI_ACTION_INDEX = ["fold", "check", "call", "bet", "raise", "all_in"]
+
+
+def apply_feature_set(vectors: "np.ndarray", feature_set: Optional[str]) -> "np.ndarray":
+    """Zero the observation slots a model was not trained on (mirrors the frontend)."""
+
+    if feature_set not in ("badugi-observation-v1-ev", "badugi-observation-v1-ev-range"):
+        vectors[:, 48:56] = 0.0
+    if feature_set != "badugi-observation-v1-ev-range":
+        vectors[:, 58:61] = 0.0
+    return vectors
+
+
+class OnnxPolicy:
+    """Badugi feature-set handling on top of a registry model.
+
+    The handle is fetched from the registry on every batch, so a hot-swapped
+    session is picked up by the next batch without restarting the batcher.
+    """
+
+    def __init__(self, registry: "ModelRegistry", model_id: str):
+        self.registry = registry
+        self.model_id = model_id
+        registry.get(model_id)
+
+    @property
+    def batched_input(self) -> bool:
+        return self.registry.get(self.model_id).batched_input
+
+    def run_batch(self, vectors: "np.ndarray") -> "np.ndarray":
+        handle = self.registry.get(self.model_id)
+        vectors = apply_feature_set(np.array(vectors, dtype=np.float32, copy=True), handle.entry.get("featureSet"))
+        return handle.run_batch(vectors)
+
+
+def load_registry() -> "ModelRegistry":
+    """Build the process-wide registry from settings."""
+
+    if ModelRegistry is None:
+        raise RuntimeError("onnxruntime is not installed")
+    settings = get_settings()
+    return ModelRegistry(
+        Path(settings.rl_model_registry_path or DEFAULT_REGISTRY_PATH),
+        Path(settings.rl_models_root or DEFAULT_MODELS_ROOT),
+        intra_op_threads=settings.rl_intra_op_threads,
+        memory_cap_bytes=int(settings.rl_model_memory_cap_mb * 1024 * 1024),
+    )
+
+
+class DecisionBatcher:
+    """Coalesce concurrent `submit` calls into batched `run_batch` calls."""
+
+    def __init__(
+        self,
+        run_batch: Callable[["np.ndarray"], "np.ndarray"],
+        *,
+        max_batch_size: int = 64,
+        window_ms: float = 2.0,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self._queue: Optional["asyncio.Queue[Tuple[Sequence[float], asyncio.Future]]"] = None
+        self._task: Optional[asyncio.Task] = None
+        # Items taken off the queue but not yet answered (collecting or running).
+        self._inflight: List[Tuple[Sequence[float], asyncio.Future]] = []
+        # One inference thread: batches are serialised, and while one runs the
+        # next batch fills up in the queue.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rl-inference")
+        self._batches = 0
+        self._decisions = 0
+        self._max_batch = 0
+        self._total_infer_ms = 0.0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the batch loop and fail every pending or in-flight waiter.
+
+        `submit` raises once the queue is gone, so callers fall back instead of
+        awaiting a future nothing will complete.
+        """
+
+        if self._task is None:
+            return
+        queue, self._queue = self._queue, None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        futures = [future for _vector, future in self._inflight]
+        self._inflight = []
+        while queue is not None and not queue.empty():
+            futures.append(queue.get_nowait()[1])
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("batcher stopped"))
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, vector: Sequence[float]) -> "np.ndarray":
+        """Return the model output row for `vector`."""
+
+        if self._queue is None:
+            raise RuntimeError("DecisionBatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((vector, future))
+        return await future
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "decisions": self._decisions,
+            "maxBatch": self._max_batch,
+            "avgBatch": self._decisions / self._batches if self._batches else 0.0,
+            "avgInferMs": self._total_infer_ms / self._batches if self._batches else 0.0,
+        }
+
+    async def _collect(self, queue: "asyncio.Queue") -> List[Tuple[Sequence[float], asyncio.Future]]:
+        batch = self._inflight = []
+        batch.append(await queue.get())
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                while len(batch) < self.max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            vectors = np.asarray([vector for vector, _future in batch], dtype=np.float32)
+            started = time.perf_counter()
+            try:
+                outputs = await loop.run_in_executor(self._executor, self.run_batch, vectors)
+            except Exception as exc:  # noqa: BLE001 - surface to every waiter
+                for _vector, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                self._inflight = []
+                continue
+            self._total_infer_ms += (time.perf_counter() - started) * 1000.0
+            self._batches += 1
+            self._decisions += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+            for (_vector, future), row in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(row)
+            self._inflight = []
+
+
+_registry: Optional["ModelRegistry"] = None
+_policy: Optional[OnnxPolicy] = None
+_batcher: Optional[DecisionBatcher] = None
+
+
+def get_model_registry() -> Optional["ModelRegistry"]:
+    return _registry
+
+
+def get_decision_batcher() -> Optional[DecisionBatcher]:
+    return _batcher
+
+
+def get_decision_policy() -> Optional[OnnxPolicy]:
+    return _policy
+
+
+async def start_rl_inference() -> None:
+    """Load the configured decision model and start the micro-batcher."""
+
+    global _registry, _policy, _batcher
+    settings = get_settings()
+    if not settings.rl_decision_model_id or _batcher is not None:
+        return
+    try:
+        _registry = load_registry()
+        _policy = OnnxPolicy(_registry, settings.rl_decision_model_id)
+    except Exception:  # noqa: BLE001 - keep serving the deterministic fallback
+        logger.exception("RL decision model %s failed to load", settings.rl_decision_model_id)
+        _registry = None
+        _policy = None
+        return
+    if settings.rl_registry_watch_interval > 0:
+        _registry.start_watching(settings.rl_registry_watch_interval)
+    _batcher = DecisionBatcher(
+        _policy.run_batch,
+        max_batch_size=settings.rl_max_batch_size,
+        window_ms=settings.rl_batch_window_ms,
+    )
+    await _batcher.start()
+    logger.info("RL decision model %s loaded", _policy.model_id)
+    if not _policy.batched_input:
+        logger.warning(
+            "RL decision model %s takes a rank-1 input; batched decisions run one session call per row. "
+            "Re-export it with a dynamic batch axis to evaluate a batch in one call.",
+            _policy.model_id,
+        )
+
+
+async def stop_rl_inference() -> None:
+    global _registry, _policy, _batcher
+    if _batcher is not None:
+        await _batcher.stop()
+    if _registry is not None:
+        _registry.stop_watching()
+    _registry = None
+    _batcher = None
+    _policy = None
@@ -0,0 +1,82 @@
+"""Dialect-specific conflict handling for Core inserts.
+
+Postgres and SQLite get `INSERT ... ON CONFLICT`, MySQL/MariaDB get
+`INSERT IGNORE` / `ON DUPLICATE KEY UPDATE`. On other dialects the helpers
+return None / False so callers can fall back to a portable (racier) path.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+ON_CONFLICT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+DUPLICATE_KEY_DIALECTS = {"mysql", "mariadb"}
+
+
+def dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def supports_upsert(db: Session) -> bool:
+    name = dialect_name(db)
+    return name in ON_CONFLICT_DIALECTS or name in DUPLICATE_KEY_DIALECTS
+
+
+def _touch(table: Table) -> Dict[str, Any]:
+    # Conflict updates skip Column.onupdate, so bump updated_at explicitly.
+    return {"updated_at": func.now()} if "updated_at" in table.c else {}
+
+
+def insert_ignore(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    index_where=None,
+) -> Optional[int]:
+    """Insert `rows`, skipping ones that hit the unique key; returns rows inserted."""
+
+    name = dialect_name(db)
+    if name in ON_CONFLICT_DIALECTS:
+        stmt = ON_CONFLICT_DIALECTS[name](table).values(rows).on_conflict_do_nothing(
+            index_elements=list(index_elements), index_where=index_where
+        )
+    elif name in DUPLICATE_KEY_DIALECTS:
+        stmt = mysql.insert(table).values(rows).prefix_with("IGNORE")
+    else:
+        return None
+    return db.execute(stmt).rowcount
+
+
+def insert_or_increment(
+    db: Session,
+    table: Table,
+    row: Dict[str, Any],
+    index_elements: Sequence[str],
+    increment: Sequence[str],
+) -> bool:
+    """Insert `row`, or add its `increment` columns to the existing row.
+
+    The addition happens in SQL (`col = col + excluded.col`), so concurrent
+    writers never overwrite each other's totals. False on unsupported dialects.
+    """
+
+    name = dialect_name(db)
+    if name in ON_CONFLICT_DIALECTS:
+        stmt = ON_CONFLICT_DIALECTS[name](table).values(row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={**{column: table.c[column] + stmt.excluded[column] for column in increment}, **_touch(table)},
+        )
+    elif name in DUPLICATE_KEY_DIALECTS:
+        stmt = mysql.insert(table).values(row)
+        stmt = stmt.on_duplicate_key_update(
+            {**{column: table.c[column] + stmt.inserted[column] for column in increment}, **_touch(table)}
+        )
+    else:
+        return False
+    db.execute(stmt)
+    return True
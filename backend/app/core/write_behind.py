@@ -0,0 +1,404 @@
+"""Bounded write-behind queue with a durable, segmented JSONL spool.
+
+Request handlers call `enqueue` with a JSON-serialisable record and return
+immediately; a single background thread drains the queue in batches of at most
+`batch_size` records (or whatever arrived within `flush_interval` seconds) and
+hands each batch to `persist_batch`, which is expected to write it in one
+transaction. A batch that keeps failing for `max_attempts` tries is split and
+its records are persisted one by one; a record that still fails is appended to
+the dead-letter file instead of blocking the queue. While the database is down
+the queue fills and `enqueue` starts returning False (callers map that to 503).
+
+Every accepted record is appended to the current spool segment before it is
+queued. Segments rotate at `segment_bytes` and are deleted as soon as all of
+their records are persisted, so the spool stays bounded under steady traffic.
+Segments still present at startup are replayed, so `persist_batch` must
+tolerate records that were already written before a crash.
+
+Each process claims its own spool slot (`spool.jsonl`, `spool.1.jsonl`, ...)
+with an exclusive file lock, so workers sharing one configured path never touch
+each other's records, and a restarted worker picks up a slot left by a dead one.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:  # POSIX only; without it the spool path must not be shared between processes
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PersistBatch = Callable[[List[Dict[str, Any]]], None]
+
+SPOOL_SEGMENT_BYTES = 4 * 1024 * 1024
+MAX_SPOOL_SLOTS = 64
+
+
+class _SpoolSegment:
+    def __init__(self, path: Path, handle=None, outstanding: int = 0, size: int = 0):
+        self.path = path
+        self.handle = handle
+        self.outstanding = outstanding
+        self.size = size
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+_Item = Tuple[Optional[_SpoolSegment], Dict[str, Any]]
+
+
+class WriteBehindQueue:
+    """Coalesce queued records into bounded batches on a worker thread."""
+
+    def __init__(
+        self,
+        persist_batch: PersistBatch,
+        *,
+        max_queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        spool_path: Optional[str] = None,
+        retry_delay: float = 1.0,
+        max_attempts: int = 3,
+        dead_letter_path: Optional[str] = None,
+        spool_fsync: bool = True,
+        segment_bytes: int = SPOOL_SEGMENT_BYTES,
+        name: str = "write-behind",
+    ):
+        self.persist_batch = persist_batch
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.max_attempts = max(1, int(max_attempts))
+        self.spool_base = Path(spool_path) if spool_path else None
+        self.spool_path: Optional[Path] = None
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self.spool_fsync = spool_fsync
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.name = name
+
+        self._queue: "queue.Queue[_Item]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Spool state has its own lock so producers never wait on the queue
+        # bookkeeping, and fsync runs outside both.
+        self._spool_lock = threading.Lock()
+        self._slot_lock = None
+        self._segment: Optional[_SpoolSegment] = None
+        self._segments: List[_SpoolSegment] = []
+        self._next_segment = 1
+
+        self._enqueued = 0
+        self._rejected = 0
+        self._persisted = 0
+        self._batches = 0
+        self._failures = 0
+        self._dead_lettered = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if self.spool_base and self.spool_path is None:
+            self._claim_spool_slot()
+            self._replay_spool()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain what is queued, then stop the worker and release the spool slot."""
+
+        self.wait_idle(timeout)
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        with self._spool_lock:
+            for segment in self._segments:
+                segment.close()
+            if self._slot_lock is not None:
+                self._slot_lock.close()
+                self._slot_lock = None
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Block until every accepted record has been persisted or dead-lettered."""
+
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    # ---- producer side ---------------------------------------------------
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        """Accept a record for persistence; False when the queue is full."""
+
+        with self._lock:
+            if self._pending >= self.max_queue_size:
+                self._rejected += 1
+                return False
+            # Reserve the slot now; the record is queued once it is spooled.
+            self._pending += 1
+            self._enqueued += 1
+        try:
+            segment = self._append_spool(record)
+        except OSError:
+            with self._idle:
+                self._pending -= 1
+                self._enqueued -= 1
+                self._rejected += 1
+                self._idle.notify_all()
+            logger.exception("%s: spool write failed", self.name)
+            return False
+        self._queue.put_nowait((segment, record))
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._spool_lock:
+            spool_bytes = sum(segment.size for segment in self._segments)
+            spool_segments = len(self._segments)
+        with self._lock:
+            return {
+                "queueDepth": self._queue.qsize(),
+                "pending": self._pending,
+                "maxQueueSize": self.max_queue_size,
+                "batchSize": self.batch_size,
+                "flushIntervalSeconds": self.flush_interval,
+                "enqueued": self._enqueued,
+                "rejected": self._rejected,
+                "persisted": self._persisted,
+                "batches": self._batches,
+                "failures": self._failures,
+                "deadLettered": self._dead_lettered,
+                "lastFlushMs": self._last_flush_ms,
+                "maxFlushMs": self._max_flush_ms,
+                "avgFlushMs": self._total_flush_ms / self._batches if self._batches else 0.0,
+                "spoolPath": str(self.spool_path) if self.spool_path else None,
+                "spoolBytes": spool_bytes,
+                "spoolSegments": spool_segments,
+                "running": bool(self._thread and self._thread.is_alive()),
+            }
+
+    # ---- worker side -----------------------------------------------------
+
+    def _collect_batch(self) -> List[_Item]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _attempt(self, records: List[Dict[str, Any]]) -> Optional[Exception]:
+        """Try `records` up to `max_attempts` times; returns the last error, or None."""
+
+        error: Optional[Exception] = None
+        for attempt in range(self.max_attempts):
+            if attempt and self._stop.wait(self.retry_delay):
+                break
+            try:
+                self.persist_batch(records)
+                return None
+            except Exception as exc:  # noqa: BLE001 - retried, then split or dead-lettered
+                error = exc
+                logger.warning("%s: batch of %d failed (attempt %d): %s", self.name, len(records), attempt + 1, exc)
+                with self._lock:
+                    self._failures += 1
+        return error or RuntimeError("stopped before the batch was persisted")
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            error = self._attempt([record for _, record in batch])
+            if error is None:
+                self._complete(batch, (time.perf_counter() - started) * 1000.0)
+                continue
+            # Split the batch so one bad record cannot wedge the writer.
+            for item in batch:
+                if self._stop.is_set():
+                    # Shutting down with the database still failing: the
+                    # spool keeps the remaining records for the next start.
+                    return
+                started = time.perf_counter()
+                error = self._attempt([item[1]])
+                if error is not None:
+                    if self._stop.is_set():
+                        return
+                    self._dead_letter(item[1], error)
+                self._complete([item], (time.perf_counter() - started) * 1000.0, persisted=error is None)
+
+    def _complete(self, items: List[_Item], elapsed_ms: float, persisted: bool = True) -> None:
+        self._release_spool(items)
+        with self._idle:
+            self._pending -= len(items)
+            if persisted:
+                self._persisted += len(items)
+                self._batches += 1
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+            else:
+                self._dead_lettered += len(items)
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _dead_letter(self, record: Dict[str, Any], error: Exception) -> None:
+        logger.error("%s: dead-lettering record after %d attempts: %s", self.name, self.max_attempts, error)
+        path = self.dead_letter_path or (self.spool_path.with_name(self.spool_path.name + ".dead") if self.spool_path else None)
+        if path is None:
+            return
+        entry = {"record": record, "error": repr(error), "failedAt": datetime.now(timezone.utc).isoformat()}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf8") as handle:
+                handle.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+        except OSError:
+            logger.exception("%s: could not write dead-letter record", self.name)
+
+    # ---- spool -----------------------------------------------------------
+
+    def _slot_path(self, index: int) -> Path:
+        base = self.spool_base
+        if index == 0:
+            return base
+        return base.with_name(f"{base.stem}.{index}{base.suffix}")
+
+    def _claim_spool_slot(self) -> None:
+        self.spool_base.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            self.spool_path = self.spool_base
+            return
+        for index in range(MAX_SPOOL_SLOTS):
+            path = self._slot_path(index)
+            handle = open(path.with_name(path.name + ".lock"), "a")
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                continue
+            self._slot_lock = handle
+            self.spool_path = path
+            return
+        raise RuntimeError(f"{self.name}: all {MAX_SPOOL_SLOTS} spool slots for {self.spool_base} are in use")
+
+    def _segment_files(self) -> List[Path]:
+        path = self.spool_path
+        found = []
+        if path.exists():
+            found.append((0, path))  # a single-file spool from before segmenting
+        for candidate in path.parent.glob(path.name + ".*"):
+            suffix = candidate.name[len(path.name) + 1:]
+            if suffix.isdigit():
+                found.append((int(suffix), candidate))
+        return [candidate for _, candidate in sorted(found)]
+
+    def _append_spool(self, record: Dict[str, Any]) -> Optional[_SpoolSegment]:
+        if not self.spool_path:
+            return None
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._spool_lock:
+            segment = self._segment
+            if segment is None or segment.size >= self.segment_bytes:
+                path = self.spool_path.with_name(f"{self.spool_path.name}.{self._next_segment:06d}")
+                self._next_segment += 1
+                segment = _SpoolSegment(path, path.open("a", encoding="utf8"))
+                self._segment = segment
+                self._segments.append(segment)
+            segment.handle.write(line)
+            segment.handle.flush()
+            segment.size += len(line)
+            # Held open until this record is persisted, so fsync below is safe.
+            segment.outstanding += 1
+            fileno = segment.handle.fileno()
+        if self.spool_fsync:
+            os.fsync(fileno)
+        return segment
+
+    def _release_spool(self, items: List[_Item]) -> None:
+        with self._spool_lock:
+            for segment, _ in items:
+                if segment is not None:
+                    segment.outstanding -= 1
+            for segment in list(self._segments):
+                if segment.outstanding:
+                    continue
+                if segment is self._segment:
+                    # Fully persisted and still being appended to: empty it in place.
+                    segment.handle.seek(0)
+                    segment.handle.truncate()
+                    segment.size = 0
+                    continue
+                segment.close()
+                try:
+                    segment.path.unlink()
+                except FileNotFoundError:
+                    pass
+                self._segments.remove(segment)
+
+    def _replay_spool(self) -> None:
+        replayed = 0
+        for path in self._segment_files():
+            records = []
+            for line in path.read_text(encoding="utf8").splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; the client saw no ack.
+                    logger.warning("%s: skipping unreadable spool line", self.name)
+            suffix = path.name[len(self.spool_path.name) + 1:]
+            if suffix.isdigit():
+                self._next_segment = max(self._next_segment, int(suffix) + 1)
+            if not records:
+                path.unlink()
+                continue
+            segment = _SpoolSegment(path, outstanding=len(records), size=path.stat().st_size)
+            self._segments.append(segment)
+            # Replayed records bypass the size bound; they were accepted before the crash.
+            with self._lock:
+                self._pending += len(records)
+            for record in records:
+                self._queue.put_nowait((segment, record))
+            replayed += len(records)
+        if replayed:
+            logger.info("%s: replaying %d spooled records", self.name, replayed)
@@ -0,0 +1,108 @@
+"""Bulk persistence for Badugi ActionLog rows."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from ..core.upsert import ON_CONFLICT_DIALECTS, dialect_name
+from ..models import BadugiHandAction
+
+# Bound parameters per statement stay well below MySQL/Postgres limits
+# (20 columns x 500 rows).
+MULTI_ROW_CHUNK = 500
+MULTI_ROW_DIALECTS = {"mysql", "mariadb", "postgresql"}
+IDEMPOTENT_KEY = ("hand_id", "player_id", "seq")
+
+
+def _key(row: Dict[str, Any]) -> tuple:
+    return (row["hand_id"], row["player_id"], row["seq"])
+
+
+def _insert_on_conflict(db: Session, rows: Sequence[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """Insert through the partial unique key, skipping duplicates atomically.
+
+    Returns the rows actually written, or None on dialects without
+    `ON CONFLICT` (and therefore without the partial index).
+    """
+
+    name = dialect_name(db)
+    if name not in ON_CONFLICT_DIALECTS:
+        return None
+    table = BadugiHandAction.__table__
+    written: List[Dict[str, Any]] = []
+    for start in range(0, len(rows), MULTI_ROW_CHUNK):
+        chunk = rows[start : start + MULTI_ROW_CHUNK]
+        stmt = (
+            ON_CONFLICT_DIALECTS[name](table)
+            .values(list(chunk))
+            .on_conflict_do_nothing(index_elements=list(IDEMPOTENT_KEY), index_where=text("is_idempotent"))
+            .returning(*(table.c[column] for column in IDEMPOTENT_KEY))
+        )
+        inserted = {tuple(row) for row in db.execute(stmt)}
+        for row in chunk:
+            # Repeats inside the batch: only the first occurrence was inserted.
+            if _key(row) in inserted:
+                inserted.discard(_key(row))
+                written.append(row)
+    return written
+
+
+def _existing_keys(db: Session, rows: Sequence[Dict[str, Any]]) -> set:
+    keys = {_key(row) for row in rows}
+    hand_ids = {hand_id for hand_id, _player_id, _seq in keys}
+    stmt = select(
+        BadugiHandAction.hand_id,
+        BadugiHandAction.player_id,
+        BadugiHandAction.seq,
+    ).where(
+        BadugiHandAction.hand_id.in_(hand_ids),
+        tuple_(BadugiHandAction.hand_id, BadugiHandAction.player_id, BadugiHandAction.seq).in_(keys),
+    )
+    return {tuple(row) for row in db.execute(stmt)}
+
+
+def bulk_insert_actions(
+    db: Session,
+    rows: Sequence[Dict[str, Any]],
+    *,
+    idempotent: bool = False,
+) -> List[Dict[str, Any]]:
+    """Insert action rows with Core statements and return the rows written.
+
+    Rows are keyed by `badugi_action_logs` column names. MySQL and Postgres
+    receive chunked multi-row `INSERT ... VALUES` statements; other dialects
+    use a single `executemany`. With `idempotent=True`, rows whose
+    `(hand_id, player_id, seq)` was already stored by an idempotent batch (or
+    repeats inside the batch) are skipped, so a client retry of the same batch
+    writes nothing new. Postgres/SQLite enforce this with a partial unique
+    index and `ON CONFLICT DO NOTHING`; MySQL falls back to check-then-insert.
+    The caller owns the transaction.
+    """
+
+    if idempotent and rows:
+        rows = [dict(row, is_idempotent=True) for row in rows]
+        written = _insert_on_conflict(db, rows)
+        if written is not None:
+            return written
+        # No partial index here: two concurrent retries may both pass the check.
+        seen = _existing_keys(db, rows)
+        fresh = []
+        for row in rows:
+            key = _key(row)
+            if key in seen:
+                continue
+            seen.add(key)
+            fresh.append(row)
+        rows = fresh
+    if not rows:
+        return []
+
+    table = BadugiHandAction.__table__
+    if db.get_bind().dialect.name in MULTI_ROW_DIALECTS:
+        for start in range(0, len(rows), MULTI_ROW_CHUNK):
+            db.execute(insert(table).values(list(rows[start : start + MULTI_ROW_CHUNK])))
+    else:
+        db.execute(insert(table), list(rows))
+    return list(rows)
@@ -0,0 +1,278 @@
+"""Incremental Badugi HUD aggregates.
+
+`/badugi/actions/batch` folds each written BET-phase action into one
+`BadugiHandSummary` row per (player, hand) and the player's lifetime
+`BadugiPlayerStats` counters, so `/badugi/stats` reads a bounded window of
+summary rows instead of scanning the player's full action history.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, desc, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core.upsert import insert_ignore, insert_or_increment, supports_upsert
+from ..models import BadugiHandAction, BadugiHandSummary, BadugiPlayerStats
+
+VPIP_ACTION_TYPES = ("call", "bet", "raise")
+AGGRESSIVE_ACTION_TYPES = ("bet", "raise")
+
+
+@dataclass
+class _HandDelta:
+    first_ts: datetime
+    last_ts: datetime
+    vpip: int = 0
+    pfr: int = 0
+    aggro_paid: float = 0.0
+    call_paid: float = 0.0
+
+
+def _hand_deltas(rows: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, str], _HandDelta]:
+    deltas: Dict[Tuple[str, str], _HandDelta] = {}
+    for row in rows:
+        if row.get("phase") != "BET":
+            continue
+        ts = row.get("ts") or datetime.utcnow()
+        key = (row["player_id"], row["hand_id"])
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = _HandDelta(first_ts=ts, last_ts=ts)
+        else:
+            delta.first_ts = min(delta.first_ts, ts)
+            delta.last_ts = max(delta.last_ts, ts)
+        paid = float(row.get("paid") or 0)
+        if row.get("is_forced") or paid <= 0:
+            continue
+        action_type = (row.get("action_type") or "").lower()
+        if (row.get("round") or 0) == 0:
+            if action_type in VPIP_ACTION_TYPES:
+                delta.vpip = 1
+            if action_type in AGGRESSIVE_ACTION_TYPES:
+                delta.pfr = 1
+        if action_type in AGGRESSIVE_ACTION_TYPES:
+            delta.aggro_paid += paid
+        elif action_type == "call":
+            delta.call_paid += paid
+    return deltas
+
+
+def _first_summary_row(
+    db: Session, player_id: str, hand_id: str, delta: _HandDelta, portable: bool
+) -> bool:
+    """Create the (player, hand) summary if it is missing; True when this call created it."""
+
+    row = {
+        "player_id": player_id,
+        "hand_id": hand_id,
+        "vpip": 0,
+        "pfr": 0,
+        "aggro_paid": 0.0,
+        "call_paid": 0.0,
+        "first_ts": delta.first_ts,
+        "last_ts": delta.last_ts,
+    }
+    if not portable:
+        return insert_ignore(db, BadugiHandSummary.__table__, [row], ["player_id", "hand_id"]) == 1
+    exists = db.execute(
+        select(BadugiHandSummary.id).where(
+            BadugiHandSummary.player_id == player_id, BadugiHandSummary.hand_id == hand_id
+        )
+    ).first()
+    if exists:
+        return False
+    db.execute(insert(BadugiHandSummary.__table__).values(row))
+    return True
+
+
+def _flip(db: Session, player_id: str, hand_id: str, column) -> bool:
+    """Set a 0/1 summary flag; True only for the writer that changed it."""
+
+    result = db.execute(
+        update(BadugiHandSummary)
+        .where(
+            BadugiHandSummary.player_id == player_id,
+            BadugiHandSummary.hand_id == hand_id,
+            column == 0,
+        )
+        .values({column: 1})
+    )
+    return result.rowcount == 1
+
+
+def _increment_player(db: Session, player_id: str, totals: Dict[str, Any], portable: bool) -> None:
+    row = {"player_id": player_id, **totals}
+    table = BadugiPlayerStats.__table__
+    if not portable and insert_or_increment(db, table, row, ["player_id"], list(totals)):
+        return
+    result = db.execute(
+        update(BadugiPlayerStats)
+        .where(BadugiPlayerStats.player_id == player_id)
+        .values({column: getattr(BadugiPlayerStats, column) + value for column, value in totals.items()})
+    )
+    if result.rowcount == 0:
+        db.execute(insert(table).values(row))
+
+
+def apply_action_rows(db: Session, rows: Iterable[Mapping[str, Any]]) -> None:
+    """Fold freshly inserted action rows into hand summaries and player totals.
+
+    Runs inside the caller's transaction. Every change is an SQL-side
+    increment or a conditional flag update, and first rows are created with a
+    dialect upsert, so concurrent batches for the same player or hand add up
+    instead of overwriting each other. Only dialects without upserts fall back
+    to check-then-insert.
+    """
+
+    deltas = _hand_deltas(rows)
+    if not deltas:
+        return
+    portable = not supports_upsert(db)
+    per_player: Dict[str, Dict[str, Any]] = {}
+    for (player_id, hand_id), delta in deltas.items():
+        totals = per_player.setdefault(
+            player_id,
+            {"hands": 0, "vpip_hands": 0, "pfr_hands": 0, "aggro_paid": 0.0, "call_paid": 0.0},
+        )
+        if _first_summary_row(db, player_id, hand_id, delta, portable):
+            totals["hands"] += 1
+        if delta.vpip and _flip(db, player_id, hand_id, BadugiHandSummary.vpip):
+            totals["vpip_hands"] += 1
+        if delta.pfr and _flip(db, player_id, hand_id, BadugiHandSummary.pfr):
+            totals["pfr_hands"] += 1
+        db.execute(
+            update(BadugiHandSummary)
+            .where(BadugiHandSummary.player_id == player_id, BadugiHandSummary.hand_id == hand_id)
+            .values(
+                aggro_paid=BadugiHandSummary.aggro_paid + delta.aggro_paid,
+                call_paid=BadugiHandSummary.call_paid + delta.call_paid,
+                first_ts=case(
+                    (BadugiHandSummary.first_ts > delta.first_ts, delta.first_ts),
+                    else_=BadugiHandSummary.first_ts,
+                ),
+                last_ts=case(
+                    (BadugiHandSummary.last_ts < delta.last_ts, delta.last_ts),
+                    else_=BadugiHandSummary.last_ts,
+                ),
+            )
+        )
+        totals["aggro_paid"] += delta.aggro_paid
+        totals["call_paid"] += delta.call_paid
+    for player_id, totals in per_player.items():
+        _increment_player(db, player_id, totals, portable)
+
+
+def rebuild_player_stats(db: Session, player_id: str) -> BadugiPlayerStats:
+    """Recompute one player's summaries and totals from the raw action log.
+
+    A maintenance repair for aggregates that drifted from the log (for example
+    after rows were deleted by hand); the read path never calls it.
+    """
+
+    counted = and_(
+        BadugiHandAction.is_forced.is_(False),
+        BadugiHandAction.paid > 0,
+    )
+    preflop = and_(counted, BadugiHandAction.round == 0)
+    per_hand = (
+        select(
+            BadugiHandAction.player_id,
+            BadugiHandAction.hand_id,
+            func.max(case((and_(preflop, BadugiHandAction.action_type.in_(VPIP_ACTION_TYPES)), 1), else_=0)),
+            func.max(
+                case((and_(preflop, BadugiHandAction.action_type.in_(AGGRESSIVE_ACTION_TYPES)), 1), else_=0)
+            ),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (and_(counted, BadugiHandAction.action_type.in_(AGGRESSIVE_ACTION_TYPES)), BadugiHandAction.paid),
+                        else_=0,
+                    )
+                ),
+                0,
+            ),
+            func.coalesce(
+                func.sum(
+                    case((and_(counted, BadugiHandAction.action_type == "call"), BadugiHandAction.paid), else_=0)
+                ),
+                0,
+            ),
+            func.min(BadugiHandAction.ts),
+            func.max(BadugiHandAction.ts),
+        )
+        .where(BadugiHandAction.player_id == player_id, BadugiHandAction.phase == "BET")
+        .group_by(BadugiHandAction.player_id, BadugiHandAction.hand_id)
+    )
+    db.execute(delete(BadugiHandSummary).where(BadugiHandSummary.player_id == player_id))
+    db.execute(delete(BadugiPlayerStats).where(BadugiPlayerStats.player_id == player_id))
+    db.execute(
+        insert(BadugiHandSummary).from_select(
+            [
+                "player_id",
+                "hand_id",
+                "vpip",
+                "pfr",
+                "aggro_paid",
+                "call_paid",
+                "first_ts",
+                "last_ts",
+            ],
+            per_hand,
+        )
+    )
+    hands, vpip_hands, pfr_hands, aggro_paid, call_paid = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(BadugiHandSummary.vpip), 0),
+            func.coalesce(func.sum(BadugiHandSummary.pfr), 0),
+            func.coalesce(func.sum(BadugiHandSummary.aggro_paid), 0),
+            func.coalesce(func.sum(BadugiHandSummary.call_paid), 0),
+        ).where(BadugiHandSummary.player_id == player_id)
+    ).one()
+    stats = BadugiPlayerStats(
+        player_id=player_id,
+        hands=int(hands),
+        vpip_hands=int(vpip_hands),
+        pfr_hands=int(pfr_hands),
+        aggro_paid=float(aggro_paid),
+        call_paid=float(call_paid),
+    )
+    db.add(stats)
+    db.flush()
+    return stats
+
+
+def get_player_stats(db: Session, player_id: str) -> Optional[BadugiPlayerStats]:
+    """Return the lifetime aggregate row for a player, if one exists."""
+
+    return db.get(BadugiPlayerStats, player_id)
+
+
+def get_window_totals(db: Session, player_id: str, limit_hands: int) -> Tuple[int, int, int, float, float]:
+    """Sum the latest `limit_hands` hand summaries in one indexed query."""
+
+    window = (
+        select(
+            BadugiHandSummary.vpip,
+            BadugiHandSummary.pfr,
+            BadugiHandSummary.aggro_paid,
+            BadugiHandSummary.call_paid,
+        )
+        .where(BadugiHandSummary.player_id == player_id)
+        .order_by(desc(BadugiHandSummary.last_ts), desc(BadugiHandSummary.id))
+        .limit(limit_hands)
+        .subquery()
+    )
+    hands, vpip, pfr, aggro_paid, call_paid = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(window.c.vpip), 0),
+            func.coalesce(func.sum(window.c.pfr), 0),
+            func.coalesce(func.sum(window.c.aggro_paid), 0),
+            func.coalesce(func.sum(window.c.call_paid), 0),
+        )
+    ).one()
+    return int(hands), int(vpip), int(pfr), float(aggro_paid), float(call_paid)
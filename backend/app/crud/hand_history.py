@@ -0,0 +1,78 @@
+"""Persistence for generic hand history records."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import desc, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.pagination import before_clause
+from ..models import GenericHandHistory
+
+
+def history_to_dict(row: GenericHandHistory) -> Dict[str, Any]:
+    return {
+        "handId": row.hand_id,
+        "winner": row.winner,
+        "variantId": row.variant_id,
+        "data": row.data or {},
+        "updatedAt": row.updated_at.replace(tzinfo=timezone.utc).isoformat(),
+    }
+
+
+def _apply(row: GenericHandHistory, record: Dict[str, Any], updated_at: datetime) -> None:
+    row.winner = record.get("winner")
+    row.variant_id = record.get("variantId")
+    row.data = record.get("data") or {}
+    row.updated_at = updated_at
+
+
+def upsert_hand_history(db: Session, record: Dict[str, Any]) -> GenericHandHistory:
+    """Insert or replace the record for `record["handId"]` and commit.
+
+    Two workers racing on a new hand_id both try to insert; the loser hits the
+    unique constraint and retries as an update.
+    """
+
+    updated_at = datetime.utcnow()
+    for _attempt in range(2):
+        row = db.execute(
+            select(GenericHandHistory).where(GenericHandHistory.hand_id == record["handId"])
+        ).scalar_one_or_none()
+        if row is None:
+            row = GenericHandHistory(hand_id=record["handId"])
+            db.add(row)
+        _apply(row, record, updated_at)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            continue
+        return row
+    raise IntegrityError("generic hand history upsert kept conflicting", None, None)
+
+
+def list_hand_history(
+    db: Session,
+    *,
+    limit: int,
+    variant_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+) -> List[GenericHandHistory]:
+    """Newest-first page, optionally filtered by variant and keyset cursor."""
+
+    stmt = select(GenericHandHistory)
+    if variant_id:
+        stmt = stmt.where(GenericHandHistory.variant_id == variant_id)
+    if cursor is not None:
+        stmt = stmt.where(before_clause(GenericHandHistory.updated_at, GenericHandHistory.id, cursor))
+    stmt = stmt.order_by(desc(GenericHandHistory.updated_at), desc(GenericHandHistory.id)).limit(limit)
+    return list(db.execute(stmt).scalars())
+
+
+def get_hand_history(db: Session, hand_id: str) -> Optional[GenericHandHistory]:
+    return db.execute(
+        select(GenericHandHistory).where(GenericHandHistory.hand_id == hand_id)
+    ).scalar_one_or_none()
@@ -1,18 +1,29 @@
 """CRUD helpers for VariantDefinition persistence."""
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session, selectinload
 
+from ..core.config import get_settings
+
 from ..models import (
     Variant,
     VariantBettingStructure,
     VariantEvaluator,
     VariantModifier,
     VariantRule,
+    variant_modifier_links,
 )
 
+# Session.info flag: this transaction changed variant definitions.
+_CATALOGUE_DIRTY = "variant_catalogue_dirty"
+
 
 def _variant_options():
     return (
@@ -35,6 +46,105 @@ def list_variants(db: Session) -> List[Variant]:
     )
 
 
+def catalogue_version(db: Session) -> str:
+    """Cheap fingerprint of the active catalogue for cache revalidation.
+
+    Any upsert bumps `updated_at` on the variant, its rule or a modifier row,
+    toggling `is_active` changes the count, and re-linking modifiers changes
+    the link count/checksum, so the fingerprint moves with the data.
+    """
+
+    count, variant_ts = db.execute(
+        select(func.count(Variant.id), func.max(Variant.updated_at)).where(Variant.is_active.is_(True))
+    ).one()
+    rule_ts = db.execute(select(func.max(VariantRule.updated_at))).scalar()
+    modifier_ts = db.execute(select(func.max(VariantModifier.updated_at))).scalar()
+    links = variant_modifier_links.c
+    link_count, link_sum = db.execute(
+        select(func.count(), func.coalesce(func.sum(links.variant_id * 1000003 + links.modifier_id), 0))
+    ).one()
+    return f"{count}:{variant_ts}:{rule_ts}:{modifier_ts}:{link_count}:{link_sum}"
+
+
+@dataclass(frozen=True)
+class CachedCatalogue:
+    version: str
+    etag: str
+    body: bytes
+
+
+class VariantCatalogueCache:
+    """In-process copy of the serialised `/variants` payload.
+
+    Within `ttl_seconds` of the last check the cached body is served without
+    touching the database. After that one aggregate query compares the
+    catalogue version and the selectinload query plus serialisation only rerun
+    when it changed. The ETag hashes the body, so it only changes when the
+    payload does. `invalidate()` drops the entry immediately; sessions that ran
+    `upsert_variant` call it once they commit, so writes from this process are
+    visible on the next request. It also bumps a generation counter: a rebuild
+    that started before the invalidation is returned to its caller but not
+    stored, so it cannot replace the dropped entry with pre-commit rows.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entry: Optional[CachedCatalogue] = None
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entry = None
+            self._checked_at = 0.0
+            self._generation += 1
+
+    def peek(self) -> Optional[CachedCatalogue]:
+        return self._entry
+
+    def get(self, db: Session, build: Callable[[List[Variant]], bytes]) -> CachedCatalogue:
+        """Return the cached catalogue, rebuilding it with `build` when stale."""
+
+        with self._lock:
+            entry = self._entry
+            generation = self._generation
+            if entry is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+                return entry
+        version = catalogue_version(db)
+        if entry is None or entry.version != version:
+            body = build(list_variants(db))
+            digest = hashlib.sha1(body).hexdigest()[:16]
+            entry = CachedCatalogue(version=version, etag=f'"variants-{digest}"', body=body)
+        with self._lock:
+            if self._generation == generation:
+                self._entry = entry
+                self._checked_at = time.monotonic()
+        return entry
+
+
+variant_catalogue_cache = VariantCatalogueCache(get_settings().variant_cache_ttl)
+
+
+def invalidate_variant_catalogue() -> None:
+    """Drop the cached `/variants` payload after variant definitions change."""
+
+    variant_catalogue_cache.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Invalidating before the commit would let a concurrent request re-cache
+    # the old rows; wait until the change is visible.
+    if session.info.pop(_CATALOGUE_DIRTY, False):
+        invalidate_variant_catalogue()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_CATALOGUE_DIRTY, None)
+
+
 def get_variant_by_key(db: Session, variant_key: str) -> Optional[Variant]:
     """Return one active variant by public key."""
 
@@ -107,7 +217,10 @@ def _get_or_create_modifiers(db: Session, modifier_keys: Iterable[str]) -> List[
 
 
 def upsert_variant(db: Session, data: Dict[str, Any]) -> Variant:
-    """Insert or update a variant and its rule/master rows without committing."""
+    """Insert or update a variant and its rule/master rows without committing.
+
+    The `/variants` cache is dropped when the caller's session commits.
+    """
 
     evaluator = _get_or_create_evaluator(db, data)
     betting_structure = _get_or_create_betting_structure(db, data)
@@ -147,4 +260,5 @@ def upsert_variant(db: Session, data: Dict[str, Any]) -> Variant:
     variant.rule.special_rules = data.get("special_rules")
 
     variant.modifiers = _get_or_create_modifiers(db, data.get("modifiers", []))
+    db.info[_CATALOGUE_DIRTY] = True
     return variant
@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
-from ..core.security import decode_access_token
+from ..core.auth_cache import cache_user, decode_token_cached, get_cached_user
 from ..models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -21,7 +21,7 @@ def get_current_user(
             detail="Missing authentication credentials",
         )
     try:
-        payload = decode_access_token(token)
+        payload = decode_token_cached(token)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,10 +33,16 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
+    user = get_cached_user(int(user_id))
+    if user is not None:
+        return user
     user = db.query(User).filter(User.id == int(user_id)).one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    # Detach so the cached instance is not expired by this request's commit.
+    db.expunge(user)
+    cache_user(user)
     return user
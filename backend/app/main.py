@@ -8,6 +8,7 @@ from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from .api.badugi_log import router as badugi_log_router
+from .api.badugi_log import start_hand_log_writer, stop_hand_log_writer
 from .api.badugi_actions import router as badugi_actions_router
 from .api.badugi_rl import router as badugi_rl_router
 from .api.badugi_stats import router as badugi_stats_router
@@ -20,6 +21,8 @@ from .api.auth import router as auth_router
 from .api.variants import router as variants_router
 from .core.config import get_settings
 from .core.db import engine
+from .core.openai_client import close_openai_client
+from .core.rl_inference import start_rl_inference, stop_rl_inference
 
 
 settings = get_settings()
@@ -93,6 +96,11 @@ def _assert_migrations_up_to_date() -> None:
 
 app = FastAPI(title="Badugi Multi-Game Backend", version="0.1.0")
 app.add_event_handler("startup", bootstrap_schema)
+app.add_event_handler("startup", start_hand_log_writer)
+app.add_event_handler("shutdown", stop_hand_log_writer)
+app.add_event_handler("startup", start_rl_inference)
+app.add_event_handler("shutdown", stop_rl_inference)
+app.add_event_handler("shutdown", close_openai_client)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,8 +11,10 @@ class Base(DeclarativeBase):
 from .user import User  # noqa: E402  (import after Base definition)
 from .hand_log import HandAction, HandLog, HandResult  # noqa: E402
 from .badugi_action_log import BadugiHandAction  # noqa: E402
+from .badugi_player_stats import BadugiHandSummary, BadugiPlayerStats  # noqa: E402
 from .tournament_snapshot import TournamentSnapshot  # noqa: E402
 from .play_feedback import PlayFeedbackResult  # noqa: E402
+from .generic_hand_history import GenericHandHistory  # noqa: E402
 from .variant import (  # noqa: E402
     Variant,
     VariantBettingStructure,
@@ -29,8 +31,11 @@ __all__ = (
     "HandAction",
     "HandResult",
     "BadugiHandAction",
+    "BadugiHandSummary",
+    "BadugiPlayerStats",
     "TournamentSnapshot",
     "PlayFeedbackResult",
+    "GenericHandHistory",
     "Variant",
     "VariantRule",
     "VariantModifier",
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy import BigInteger, Integer, Boolean, DateTime, Float, JSON, String, func
+from sqlalchemy import BigInteger, Integer, Boolean, DateTime, Float, Index, JSON, String, false, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from . import Base
@@ -12,6 +12,23 @@ class BadugiHandAction(Base):
     """Single ActionLog entry persisted from the frontend."""
 
     __tablename__ = "badugi_action_logs"
+    __table_args__ = (
+        # Access paths: recent actions per player and BET-phase HUD scans, newest first.
+        Index("ix_badugi_action_logs_player_ts", "player_id", "ts"),
+        Index("ix_badugi_action_logs_player_phase_ts", "player_id", "phase", "ts"),
+        # Idempotent batches dedupe on this key with INSERT ... ON CONFLICT DO NOTHING.
+        # Partial so rows written without `idempotent` (and legacy rows) may repeat;
+        # MySQL has no partial indexes and keeps the check-then-insert path.
+        Index(
+            "uq_badugi_action_logs_idempotent_key",
+            "hand_id",
+            "player_id",
+            "seq",
+            unique=True,
+            postgresql_where=text("is_idempotent"),
+            sqlite_where=text("is_idempotent"),
+        ).ddl_if(dialect=("postgresql", "sqlite")),
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger().with_variant(Integer, "sqlite"),
@@ -33,6 +50,7 @@ class BadugiHandAction(Base):
     bet_before: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     bet_after: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     seq: Mapped[int] = mapped_column(default=0)
+    is_idempotent: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
     ts: Mapped[datetime] = mapped_column(
         DateTime(),
         nullable=False,
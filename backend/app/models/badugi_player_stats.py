@@ -0,0 +1,51 @@
+"""Incremental Badugi HUD aggregates maintained on ActionLog writes."""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+
+
+class BadugiHandSummary(Base):
+    """Per-player, per-hand HUD flags folded from BET-phase actions."""
+
+    __tablename__ = "badugi_hand_summaries"
+    __table_args__ = (
+        UniqueConstraint("player_id", "hand_id", name="uq_badugi_hand_summaries_player_hand"),
+        Index("ix_badugi_hand_summaries_player_last_ts", "player_id", "last_ts"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    player_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    hand_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    vpip: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    pfr: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    aggro_paid: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    call_paid: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    first_ts: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+    last_ts: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+
+
+class BadugiPlayerStats(Base):
+    """Lifetime VPIP/PFR/AF numerators and denominators for one player."""
+
+    __tablename__ = "badugi_player_stats"
+
+    player_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    hands: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    vpip_hands: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    pfr_hands: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    aggro_paid: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    call_paid: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
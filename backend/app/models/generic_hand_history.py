@@ -0,0 +1,30 @@
+"""Generic (mixed-game) hand history records."""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+
+
+class GenericHandHistory(Base):
+    """Canonical hand record synced by `/history/hand`, one row per hand_id."""
+
+    __tablename__ = "generic_hand_histories"
+    __table_args__ = (
+        # Newest-first listing, overall and per variant, paged by (updated_at, id).
+        Index("ix_generic_hand_histories_updated_at", "updated_at", "id"),
+        Index("ix_generic_hand_histories_variant_updated_at", "variant_id", "updated_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    hand_id: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
+    variant_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    winner: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    data: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, JSON, String, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, JSON, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from . import Base
@@ -12,6 +12,10 @@ class HandLog(Base):
     """Represents a single Badugi hand log."""
 
     __tablename__ = "badugi_hand_logs"
+    __table_args__ = (
+        Index("ix_badugi_hand_logs_created_at", "created_at"),
+        Index("ix_badugi_hand_logs_table_created_at", "table_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger().with_variant(Integer, "sqlite"),
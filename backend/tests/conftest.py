@@ -4,3 +4,16 @@ import os
 os.environ.setdefault("BACKEND_ENV", "test")
 os.environ.setdefault("BACKEND_DB_DRIVER", "sqlite")
 os.environ.setdefault("BACKEND_DB_NAME", ":memory:")
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_openai_advice_cache():
+    # Cached advice would otherwise leak between tests that reuse a payload.
+    from app.core.openai_client import clear_advice_cache
+
+    clear_advice_cache()
+    yield
+    clear_advice_cache()
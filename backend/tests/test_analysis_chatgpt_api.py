@@ -135,11 +135,11 @@ def test_advice_endpoint_returns_payload(monkeypatch):
     captured = {}
 
     # [tournament-feedback] Stub the OpenAI client to avoid real calls.
-    def fake_get_chatgpt_advice(worst_spot):
+    async def fake_get_chatgpt_advice(worst_spot):
         captured["worst_spot"] = worst_spot
         return {"adviceJa": "テスト助言", "adviceEn": "Test"}  # [tournament-feedback]
 
-    monkeypatch.setattr("app.api.analysis_chatgpt.get_chatgpt_advice", fake_get_chatgpt_advice)
+    monkeypatch.setattr("app.api.analysis_chatgpt.get_chatgpt_advice_async", fake_get_chatgpt_advice)
 
     app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")  # [tournament-feedback]
     try:
@@ -167,12 +167,12 @@ def test_play_feedback_endpoint_returns_sanitized_payload(monkeypatch):
     captured = {}
     clear_feedback_results()
 
-    def fake_get_play_feedback_advice(session_payload):
+    async def fake_get_play_feedback_advice(session_payload):
         captured["session_payload"] = session_payload
         return {"adviceJa": "セッション助言", "adviceEn": "Session advice"}
 
     monkeypatch.setattr(
-        "app.api.analysis_chatgpt.get_play_feedback_advice",
+        "app.api.analysis_chatgpt.get_play_feedback_advice_async",
         fake_get_play_feedback_advice,
     )
     analysis_chatgpt._feedback_rate_limit.clear()
@@ -238,9 +238,12 @@ def test_play_feedback_endpoint_requires_minimum_hands(monkeypatch):
 
 
 def test_play_feedback_endpoint_rate_limits(monkeypatch):
+    async def fake_get_play_feedback_advice(session_payload):
+        return {"adviceJa": "ok", "adviceEn": "ok"}
+
     monkeypatch.setattr(
-        "app.api.analysis_chatgpt.get_play_feedback_advice",
-        lambda session_payload: {"adviceJa": "ok", "adviceEn": "ok"},
+        "app.api.analysis_chatgpt.get_play_feedback_advice_async",
+        fake_get_play_feedback_advice,
     )
     analysis_chatgpt._feedback_rate_limit.clear()
     clear_feedback_results()
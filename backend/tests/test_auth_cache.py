@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import close_all_sessions, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import auth_cache, db
+from app.core.security import create_access_token
+from app.main import app
+from app.models import Base, User
+
+client = TestClient(app)
+
+
+def setup_sqlite(monkeypatch):
+    engine = create_engine(
+        "sqlite+pysqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionTesting = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", SessionTesting)
+    monkeypatch.delitem(app.dependency_overrides, db.get_db, raising=False)
+    auth_cache.clear_auth_caches()
+    return engine, SessionTesting
+
+
+def teardown_sqlite(engine):
+    auth_cache.clear_auth_caches()
+    close_all_sessions()
+    engine.dispose()
+
+
+def login(session_factory, email="cache@example.com"):
+    session = session_factory()
+    try:
+        user = User(email=email, name=email, hashed_password="unused")
+        session.add(user)
+        session.commit()
+        token = create_access_token({"sub": str(user.id)})
+    finally:
+        session.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_current_user_is_cached_and_invalidated_on_update(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    try:
+        headers = login(SessionTesting)
+        decodes = []
+        original_decode = auth_cache.decode_access_token
+        monkeypatch.setattr(
+            auth_cache,
+            "decode_access_token",
+            lambda token: decodes.append(token) or original_decode(token),
+        )
+        user_queries = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_user_queries(_conn, _cursor, statement, *_args):
+            if "FROM users" in statement:
+                user_queries.append(statement)
+
+        assert client.get("/api/auth/me", headers=headers).json()["username"] == "cache@example.com"
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        assert len(decodes) == 1
+        assert len(user_queries) == 1
+
+        session = SessionTesting()
+        try:
+            user = session.query(User).filter(User.email == "cache@example.com").one()
+            user.name = "Renamed"
+            session.commit()
+        finally:
+            session.close()
+
+        assert client.get("/api/auth/me", headers=headers).json()["username"] == "Renamed"
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_logout_revokes_token(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    try:
+        headers = login(SessionTesting)
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        assert client.post("/api/auth/logout", headers=headers).json() == {"ok": True}
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+    finally:
+        teardown_sqlite(engine)
@@ -1,14 +1,16 @@
 from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import close_all_sessions, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core import db
+from app.crud import badugi_actions
+from app.crud.badugi_actions import bulk_insert_actions
 from app.dependencies.auth import get_current_user
 from app.main import app
-from app.models import Base
+from app.models import BadugiHandAction, Base
 
 client = TestClient(app)
 
@@ -28,6 +30,8 @@ def setup_sqlite(monkeypatch):
     SessionTesting = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     monkeypatch.setattr(db, "engine", engine)
     monkeypatch.setattr(db, "SessionLocal", SessionTesting)
+    # Other modules install a module-level get_db override; batches must hit this engine.
+    monkeypatch.delitem(app.dependency_overrides, db.get_db, raising=False)
     return engine, SessionTesting
 
 
@@ -84,6 +88,100 @@ def test_actions_batch_insert_and_recent(monkeypatch):
         teardown_sqlite(engine, SessionTesting)
 
 
+def test_actions_batch_idempotent_retry_skips_stored_rows(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")
+    try:
+        actions = [
+            {"hand_id": "hand-9", "player_id": "hero", "action": "Bet 20", "paid": 20, "seq": 0},
+            {"hand_id": "hand-9", "player_id": "hero", "action": "Call", "paid": 20, "seq": 1},
+        ]
+        first = client.post(
+            "/api/badugi/actions/batch",
+            json={"actions": actions, "idempotent": True},
+            headers=auth_headers(),
+        )
+        retry = client.post(
+            "/api/badugi/actions/batch",
+            json={
+                "actions": actions + [{"hand_id": "hand-9", "player_id": "hero", "action": "Fold", "seq": 2}],
+                "idempotent": True,
+            },
+            headers=auth_headers(),
+        )
+        assert first.json()["inserted"] == 2
+        assert retry.json()["inserted"] == 1
+
+        session = SessionTesting()
+        rows = session.query(BadugiHandAction).order_by(BadugiHandAction.seq).all()
+        assert [row.action_type for row in rows] == ["bet", "call", "fold"]
+        session.close()
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        teardown_sqlite(engine, SessionTesting)
+
+
+def test_bulk_insert_idempotent_uses_partial_unique_key(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    try:
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("badugi_action_logs")}
+        assert indexes["uq_badugi_action_logs_idempotent_key"]["unique"]
+
+        row = {"hand_id": "hand-7", "player_id": "hero", "phase": "BET", "action": "Call",
+               "action_type": "call", "paid": 10, "seq": 3}
+        session = SessionTesting()
+        # Non-idempotent writes may repeat a key; they are outside the partial index.
+        assert len(bulk_insert_actions(session, [row, dict(row)])) == 2
+        written = bulk_insert_actions(session, [row, dict(row), dict(row, seq=4)], idempotent=True)
+        assert [item["seq"] for item in written] == [3, 4]
+        assert bulk_insert_actions(session, [row], idempotent=True) == []
+
+        # Dialects without ON CONFLICT keep the check-then-insert path.
+        monkeypatch.setattr(badugi_actions, "ON_CONFLICT_DIALECTS", {})
+        assert bulk_insert_actions(session, [row, dict(row, seq=5)], idempotent=True)[0]["seq"] == 5
+        session.commit()
+        assert session.query(BadugiHandAction).count() == 5
+        session.close()
+    finally:
+        teardown_sqlite(engine, SessionTesting)
+
+
+def test_actions_recent_keyset_pagination(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")
+    try:
+        same_ts = "2026-01-01T12:00:00"
+        actions = [
+            {"hand_id": f"hand-{index}", "player_id": "hero", "action": "Call", "paid": 10, "ts": same_ts}
+            for index in range(5)
+        ]
+        client.post("/api/badugi/actions/batch", json={"actions": actions}, headers=auth_headers())
+
+        seen = []
+        before = None
+        for _ in range(3):
+            params = {"player_id": "hero", "limit": 2}
+            if before:
+                params["before"] = before
+            page = client.get("/api/badugi/actions/recent", params=params, headers=auth_headers()).json()
+            seen.extend(item["hand_id"] for item in page["items"])
+            before = page["next_before"]
+            if not before:
+                break
+
+        assert seen == ["hand-4", "hand-3", "hand-2", "hand-1", "hand-0"]
+        assert before is None
+        invalid = client.get(
+            "/api/badugi/actions/recent",
+            params={"player_id": "hero", "before": "not-a-cursor"},
+            headers=auth_headers(),
+        )
+        assert invalid.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        teardown_sqlite(engine, SessionTesting)
+
+
 def test_actions_recent_requires_player_id(monkeypatch):
     engine, SessionTesting = setup_sqlite(monkeypatch)
     app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")
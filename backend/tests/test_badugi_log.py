@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import close_all_sessions, sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -84,3 +84,72 @@ def test_invalid_payload_missing_hand_id_returns_422():
     payload.pop("hand_id")
     response = client.post("/api/badugi/hands", json=payload)
     assert response.status_code == 422
+
+
+def test_write_behind_mode_enqueues_and_bulk_persists(sqlite_db, monkeypatch, tmp_path):
+    from app.api import badugi_log
+    from app.core.write_behind import WriteBehindQueue
+    from app.models import HandLog
+
+    _reset_recent_logs()
+    spool = tmp_path / "hand_logs.spool"
+    writer = WriteBehindQueue(
+        badugi_log._persist_hand_log_batch,
+        batch_size=10,
+        flush_interval=0.05,
+        spool_path=str(spool),
+        spool_fsync=False,
+    )
+    monkeypatch.setattr(badugi_log, "_hand_log_writer", writer)
+    writer.start()
+    try:
+        for hand_id in ("wb-1", "wb-2", "wb-1"):
+            response = client.post("/api/badugi/hands", json=_sample_hand_payload(hand_id))
+            assert response.status_code == 200
+            assert response.json()["warnings"] == ["queued"]
+        assert writer.wait_idle(5.0)
+
+        session = db.SessionLocal()
+        assert sorted(session.execute(select(HandLog.hand_id)).scalars()) == ["wb-1", "wb-2"]
+        session.close()
+        metrics = client.get("/api/badugi/hands/ingest/metrics").json()
+        assert metrics["enabled"] is True
+        assert metrics["persisted"] == 3
+        assert metrics["queueDepth"] == 0
+        assert metrics["spoolBytes"] == 0
+    finally:
+        writer.stop()
+
+
+def test_write_behind_mode_returns_503_when_queue_is_full(monkeypatch):
+    from app.api import badugi_log
+    from app.core.write_behind import WriteBehindQueue
+
+    writer = WriteBehindQueue(lambda batch: None, max_queue_size=1)
+    monkeypatch.setattr(badugi_log, "_hand_log_writer", writer)
+
+    first = client.post("/api/badugi/hands", json=_sample_hand_payload("full-1"))
+    second = client.post("/api/badugi/hands", json=_sample_hand_payload("full-2"))
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.json()["detail"] == "ingest_queue_full"
+    assert writer.metrics()["rejected"] == 1
+
+
+def test_hands_by_table_keyset_pagination(sqlite_db):
+    for index in range(3):
+        payload = _sample_hand_payload(f"table-hand-{index}")
+        payload["table_id"] = "table-7"
+        payload["created_at"] = f"2026-01-01T12:00:0{index}+00:00"
+        assert client.post("/api/badugi/hands", json=payload).status_code == 200
+
+    first = client.get("/api/badugi/hands/by-table/table-7", params={"limit": 2}).json()
+    second = client.get(
+        "/api/badugi/hands/by-table/table-7",
+        params={"limit": 2, "before": first["next_before"]},
+    ).json()
+
+    assert [item["hand_id"] for item in first["items"]] == ["table-hand-2", "table-hand-1"]
+    assert [item["hand_id"] for item in second["items"]] == ["table-hand-0"]
+    assert second["next_before"] is None
@@ -66,3 +66,91 @@ def test_badugi_rl_decision_requires_non_empty_actions():
     }
     response = client.post("/api/badugi/rl/decision", json=payload)
     assert response.status_code == 422
+
+
+def test_badugi_rl_decision_uses_registry_onnx_model(monkeypatch):
+    pytest.importorskip("onnxruntime")
+    from app.core import rl_inference
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "rl_decision_model_id", "model-badugi-standard-dqn-v3")
+    with TestClient(app) as live_client:
+        policy = rl_inference.get_decision_policy()
+        assert policy is not None and policy.model_id == "model-badugi-standard-dqn-v3"
+        payload = {"state_vector": VALID_VECTOR, "valid_actions": ["call", "fold", "raise"]}
+        response = live_client.post("/api/badugi/rl/decision", json=payload)
+    assert rl_inference.get_decision_batcher() is None
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "onnx"
+    assert data["debug"]["model_id"] == "model-badugi-standard-dqn-v3"
+    assert set(data["policy_scores"]) == {"call", "fold", "raise"}
+    assert data["action"] == max(data["policy_scores"], key=data["policy_scores"].get)
+
+
+def test_decision_batcher_coalesces_concurrent_requests():
+    np = pytest.importorskip("numpy")
+    import asyncio
+
+    from app.core.rl_inference import DecisionBatcher
+
+    batch_sizes = []
+
+    def run_batch(vectors):
+        batch_sizes.append(len(vectors))
+        return np.asarray(vectors)[:, :6] * 2
+
+    async def scenario():
+        batcher = DecisionBatcher(run_batch, max_batch_size=8, window_ms=20)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit([float(index)] * 96) for index in range(5))
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+    assert batch_sizes == [5]
+    assert [float(row[0]) for row in results] == [0.0, 2.0, 4.0, 6.0, 8.0]
+
+
+def test_decision_batcher_stop_falls_back_for_in_flight_requests(monkeypatch):
+    np = pytest.importorskip("numpy")
+    import asyncio
+    import threading
+
+    from app.api import badugi_rl
+    from app.core.rl_inference import DecisionBatcher
+    from app.api.badugi_rl import BadugiRLRequest
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def run_batch(vectors):
+        started.set()
+        release.wait(5)
+        return np.zeros((len(vectors), 6), dtype=np.float32)
+
+    async def scenario():
+        batcher = DecisionBatcher(run_batch, max_batch_size=1, window_ms=0)
+        monkeypatch.setattr(badugi_rl, "get_decision_batcher", lambda: batcher)
+        monkeypatch.setattr(badugi_rl, "get_decision_policy", lambda: SimpleNamespace(model_id="stub"))
+        await batcher.start()
+        request = BadugiRLRequest(state_vector=VALID_VECTOR, valid_actions=["call", "fold"])
+        # The first request is running on the inference thread, the second is queued.
+        waiters = [asyncio.create_task(badugi_rl.badugi_rl_decision(request, None)) for _ in range(2)]
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        try:
+            await batcher.stop()
+            responses = await asyncio.wait_for(asyncio.gather(*waiters), 1)
+            with pytest.raises(RuntimeError):
+                await batcher.submit(VALID_VECTOR)
+        finally:
+            release.set()
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert [response.source for response in responses] == ["deterministic-safe", "deterministic-safe"]
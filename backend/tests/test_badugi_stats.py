@@ -7,9 +7,10 @@ from sqlalchemy.orm import close_all_sessions, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core import db
+from app.crud.badugi_stats import rebuild_player_stats
 from app.dependencies.auth import get_current_user
 from app.main import app
-from app.models import BadugiHandAction, Base
+from app.models import BadugiHandAction, BadugiHandSummary, BadugiPlayerStats, Base
 
 client = TestClient(app)
 
@@ -29,6 +30,8 @@ def setup_sqlite(monkeypatch):
     SessionTesting = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     monkeypatch.setattr(db, "engine", engine)
     monkeypatch.setattr(db, "SessionLocal", SessionTesting)
+    # Other modules install a module-level get_db override; stats must read this engine.
+    monkeypatch.delitem(app.dependency_overrides, db.get_db, raising=False)
     return engine, SessionTesting
 
 
@@ -96,6 +99,9 @@ def test_badugi_stats_computation(monkeypatch):
             ]
         )
         session.commit()
+        # Rows written before the aggregate tables existed are folded in by the migration's backfill.
+        rebuild_player_stats(session, "hero")
+        session.commit()
         session.close()
 
         response = client.get(
@@ -125,3 +131,77 @@ def test_badugi_stats_requires_player_id(monkeypatch):
     finally:
         app.dependency_overrides.pop(get_current_user, None)
         teardown_sqlite(engine, SessionTesting)
+
+
+def test_badugi_stats_for_unknown_player_is_read_only(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")
+    try:
+        response = client.get("/api/badugi/stats", params={"player_id": "nobody"}, headers=auth_headers())
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["hands"] == 0
+        assert payload["lifetime"]["hands"] == 0
+        session = SessionTesting()
+        assert session.query(BadugiPlayerStats).count() == 0
+        session.close()
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        teardown_sqlite(engine, SessionTesting)
+
+
+def test_badugi_stats_maintained_incrementally_by_action_batches(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, name="demo")
+    try:
+        base_ts = datetime(2026, 1, 1, 12, 0, 0)
+
+        def action(hand_id, label, paid, seconds, **extra):
+            return {
+                "hand_id": hand_id,
+                "player_id": "hero",
+                "phase": "BET",
+                "round": 0,
+                "action": label,
+                "paid": paid,
+                "ts": (base_ts + timedelta(seconds=seconds)).isoformat(),
+                **extra,
+            }
+
+        batches = [
+            [action("h1", "Small Blind", 5, 0, is_forced=True), action("h1", "Call", 10, 1)],
+            [action("h1", "Raise", 20, 2), action("h2", "Fold", 0, 3)],
+            [action("h3", "Bet", 30, 4)],
+        ]
+        for batch in batches:
+            response = client.post(
+                "/api/badugi/actions/batch",
+                json={"actions": batch},
+                headers=auth_headers(),
+            )
+            assert response.status_code == 200
+
+        session = SessionTesting()
+        assert session.query(BadugiHandSummary).count() == 3
+        totals = session.get(BadugiPlayerStats, "hero")
+        assert (totals.hands, totals.vpip_hands, totals.pfr_hands) == (3, 2, 2)
+        assert (totals.aggro_paid, totals.call_paid) == (50, 10)
+        session.close()
+
+        response = client.get(
+            "/api/badugi/stats",
+            params={"player_id": "hero", "limit_hands": 2},
+            headers=auth_headers(),
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["hands"] == 2
+        assert payload["vpip"] == 1
+        assert payload["pfr"] == 1
+        assert payload["af"] == 30
+        assert payload["lifetime"]["hands"] == 3
+        assert payload["lifetime"]["vpipRate"] == 2 / 3
+        assert payload["lifetime"]["af"] == 5
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        teardown_sqlite(engine, SessionTesting)
@@ -1,46 +1,135 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import close_all_sessions, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from app.api.history import _reset_generic_history
+from app.api import history as history_api
+from app.core import db
 from app.main import app
+from app.models import Base
 
 client = TestClient(app)
 
 
-def test_post_and_get_generic_hand_history():
-    _reset_generic_history()
-    payload = {
-        "handId": "mixed-hand-1",
-        "winner": "Hero",
-        "variantId": "D01",
-        "data": {
+def setup_sqlite(monkeypatch):
+    engine = create_engine(
+        "sqlite+pysqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionTesting = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", SessionTesting)
+    monkeypatch.delitem(app.dependency_overrides, db.get_db, raising=False)
+    # Each test gets a fresh database; drop hands cached by earlier tests.
+    history_api._hand_cache.clear()
+    return engine
+
+
+def teardown_sqlite(engine):
+    close_all_sessions()
+    engine.dispose()
+
+
+def test_post_and_get_generic_hand_history(monkeypatch):
+    engine = setup_sqlite(monkeypatch)
+    try:
+        payload = {
             "handId": "mixed-hand-1",
+            "winner": "Hero",
             "variantId": "D01",
-            "seats": [{"seat": 0, "name": "Hero"}],
-        },
-    }
-
-    response = client.post("/api/history/hand", json=payload)
-    assert response.status_code == 200
-    assert response.json() == {"stored": True, "handId": "mixed-hand-1"}
-
-    get_response = client.get("/api/history/hand/mixed-hand-1")
-    assert get_response.status_code == 200
-    data = get_response.json()
-    assert data["variantId"] == "D01"
-    assert data["data"]["seats"][0]["name"] == "Hero"
-
-
-def test_generic_hand_history_upserts_by_hand_id():
-    _reset_generic_history()
-    first = {"handId": "same-hand", "winner": "Hero", "variantId": "badugi", "data": {}}
-    second = {"handId": "same-hand", "winner": "Villain", "variantId": "D02", "data": {}}
-
-    assert client.post("/api/history/hand", json=first).status_code == 200
-    assert client.post("/api/history/hand", json=second).status_code == 200
-
-    response = client.get("/api/history/hand")
-    assert response.status_code == 200
-    items = response.json()["items"]
-    assert len(items) == 1
-    assert items[0]["winner"] == "Villain"
-    assert items[0]["variantId"] == "D02"
+            "data": {
+                "handId": "mixed-hand-1",
+                "variantId": "D01",
+                "seats": [{"seat": 0, "name": "Hero"}],
+            },
+        }
+
+        response = client.post("/api/history/hand", json=payload)
+        assert response.status_code == 200
+        assert response.json() == {"stored": True, "handId": "mixed-hand-1"}
+
+        get_response = client.get("/api/history/hand/mixed-hand-1")
+        assert get_response.status_code == 200
+        data = get_response.json()
+        assert data["variantId"] == "D01"
+        assert data["data"]["seats"][0]["name"] == "Hero"
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_generic_hand_history_upserts_by_hand_id(monkeypatch):
+    engine = setup_sqlite(monkeypatch)
+    try:
+        first = {"handId": "same-hand", "winner": "Hero", "variantId": "badugi", "data": {}}
+        second = {"handId": "same-hand", "winner": "Villain", "variantId": "D02", "data": {}}
+
+        assert client.post("/api/history/hand", json=first).status_code == 200
+        assert client.post("/api/history/hand", json=second).status_code == 200
+
+        response = client.get("/api/history/hand")
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert len(items) == 1
+        assert items[0]["winner"] == "Villain"
+        assert items[0]["variantId"] == "D02"
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_generic_hand_history_keyset_pagination_and_variant_filter(monkeypatch):
+    engine = setup_sqlite(monkeypatch)
+    try:
+        for index in range(5):
+            variant = "D01" if index % 2 == 0 else "badugi"
+            record = {"handId": f"hand-{index}", "variantId": variant, "data": {"index": index}}
+            assert client.post("/api/history/hand", json=record).status_code == 200
+
+        first_page = client.get("/api/history/hand", params={"limit": 2}).json()
+        assert [item["handId"] for item in first_page["items"]] == ["hand-4", "hand-3"]
+        assert first_page["next_before"]
+
+        second_page = client.get(
+            "/api/history/hand", params={"limit": 2, "before": first_page["next_before"]}
+        ).json()
+        assert [item["handId"] for item in second_page["items"]] == ["hand-2", "hand-1"]
+
+        filtered = client.get("/api/history/hand", params={"variant_id": "D01"}).json()
+        assert [item["handId"] for item in filtered["items"]] == ["hand-4", "hand-2", "hand-0"]
+        assert filtered["next_before"] is None
+
+        assert client.get("/api/history/hand", params={"before": "garbage"}).status_code == 400
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_generic_hand_history_lookup_uses_cache_and_404s(monkeypatch):
+    engine = setup_sqlite(monkeypatch)
+    try:
+        assert client.get("/api/history/hand/missing").status_code == 404
+
+        record = {"handId": "cached-hand", "winner": "Hero", "data": {}}
+        assert client.post("/api/history/hand", json=record).status_code == 200
+        assert history_api._hand_cache.get("cached-hand")["winner"] == "Hero"
+
+        def fail_lookup(*_args, **_kwargs):
+            raise AssertionError("cached hand should not hit the database")
+
+        monkeypatch.setattr(history_api.history_store, "get_hand_history", fail_lookup)
+        assert client.get("/api/history/hand/cached-hand").json()["winner"] == "Hero"
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_generic_hand_history_rejects_values_longer_than_columns(monkeypatch):
+    engine = setup_sqlite(monkeypatch)
+    try:
+        for field, length in (("handId", 129), ("variantId", 65), ("winner", 256)):
+            record = {"handId": "long-hand", "data": {}, field: "x" * length}
+            response = client.post("/api/history/hand", json=record)
+            assert response.status_code == 422, field
+        assert client.get("/api/history/hand").json()["items"] == []
+    finally:
+        teardown_sqlite(engine)
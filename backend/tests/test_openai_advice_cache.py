@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import openai_client
+
+
+class StubOpenAI:
+    """Local stand-in for the Responses API that counts upstream calls."""
+
+    def __init__(self, delay=0.2):
+        self.calls = []
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.calls.append(body)
+                time.sleep(delay)
+                if stub.status != 200:
+                    self.send_response(stub.status)
+                    self.end_headers()
+                    return
+                text = json.dumps({"adviceJa": f"助言{len(stub.calls)}", "adviceEn": f"advice {len(stub.calls)}"})
+                payload = json.dumps({"output_text": text}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_openai(monkeypatch):
+    with StubOpenAI() as stub:
+        monkeypatch.setenv("MGX_OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("MGX_OPENAI_API_MODE", "responses")
+        monkeypatch.setenv("MGX_OPENAI_BASE_URL", stub.base_url)
+        yield stub
+
+
+def session_payload(net_chips=240):
+    return {"mode": "cash", "handCount": 30, "summary": {"hands": 30, "netChips": net_chips}}
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(stub_openai):
+    async def scenario():
+        try:
+            return await asyncio.gather(
+                *(openai_client.get_play_feedback_advice_async(session_payload()) for _ in range(5))
+            )
+        finally:
+            await openai_client.close_openai_client()
+
+    results = asyncio.run(scenario())
+
+    assert len(stub_openai.calls) == 1
+    assert all(result == {"adviceJa": "助言1", "adviceEn": "advice 1"} for result in results)
+
+    # Cached for the sync path too; a different payload goes upstream again.
+    assert openai_client.get_play_feedback_advice(session_payload())["adviceEn"] == "advice 1"
+    assert len(stub_openai.calls) == 1
+    assert openai_client.get_play_feedback_advice(session_payload(net_chips=-40))["adviceEn"] == "advice 2"
+    assert len(stub_openai.calls) == 2
+
+
+def test_upstream_failures_fall_back_without_caching(stub_openai):
+    stub_openai.status = 500
+
+    async def scenario():
+        try:
+            return await openai_client.get_chatgpt_advice_async({"handId": "hand-1"})
+        finally:
+            await openai_client.close_openai_client()
+
+    assert asyncio.run(scenario()) == openai_client.FALLBACK_ADVICE
+
+    stub_openai.status = 200
+    assert openai_client.get_chatgpt_advice({"handId": "hand-1"})["adviceEn"] == f"advice {len(stub_openai.calls)}"
@@ -4,7 +4,8 @@ from sqlalchemy.orm import close_all_sessions, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core import db
-from app.db.seeds.variants import seed_variants
+from app.crud.variant import VariantCatalogueCache, upsert_variant, variant_catalogue_cache
+from app.db.seeds.variants import INITIAL_VARIANTS, seed_variants
 from app.main import app
 from app.models import Base
 
@@ -22,6 +23,7 @@ def setup_sqlite(monkeypatch):
     SessionTesting = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     monkeypatch.setattr(db, "engine", engine)
     monkeypatch.setattr(db, "SessionLocal", SessionTesting)
+    monkeypatch.delitem(app.dependency_overrides, db.get_db, raising=False)
     session = SessionTesting()
     try:
         seed_variants(session)
@@ -87,3 +89,83 @@ def test_seed_variants_is_idempotent(monkeypatch):
         assert len(keys) == 5
     finally:
         teardown_sqlite(engine)
+
+
+def test_variants_catalogue_etag_and_invalidation(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    try:
+        first = client.get("/api/variants")
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+
+        cached = client.get("/api/variants", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+
+        session = SessionTesting()
+        try:
+            data = dict(INITIAL_VARIANTS[0], name="Renamed Variant")
+            upsert_variant(session, data)
+            session.flush()
+            # Not committed yet: the cached payload stays valid.
+            assert variant_catalogue_cache.peek() is not None
+            session.commit()
+        finally:
+            session.close()
+        assert variant_catalogue_cache.peek() is None
+
+        refreshed = client.get("/api/variants", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+        names = {variant["variant_key"]: variant["name"] for variant in refreshed.json()}
+        assert names[INITIAL_VARIANTS[0]["variant_key"]] == "Renamed Variant"
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_variants_catalogue_fingerprint_tracks_modifier_links(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    try:
+        etag = client.get("/api/variants").headers["etag"]
+
+        session = SessionTesting()
+        try:
+            variant = upsert_variant(session, dict(INITIAL_VARIANTS[-1]))
+            session.rollback()
+            assert variant_catalogue_cache.peek() is not None
+            # Re-link modifiers outside upsert_variant: only the fingerprint sees it.
+            variant = session.get(type(variant), variant.id)
+            variant.modifiers = variant.modifiers[:-1]
+            session.commit()
+        finally:
+            session.close()
+        assert variant_catalogue_cache.peek() is not None
+
+        monkeypatch.setattr(variant_catalogue_cache, "_checked_at", 0.0)
+        refreshed = client.get("/api/variants", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+    finally:
+        teardown_sqlite(engine)
+
+
+def test_variants_catalogue_rebuild_racing_an_invalidation_is_not_stored(monkeypatch):
+    engine, SessionTesting = setup_sqlite(monkeypatch)
+    cache = VariantCatalogueCache(ttl_seconds=60)
+
+    def build_while_a_commit_lands(variants):
+        # An after_commit invalidation between the version query and the store.
+        cache.invalidate()
+        return b"[]"
+
+    session = SessionTesting()
+    try:
+        entry = cache.get(session, build_while_a_commit_lands)
+        assert entry.body == b"[]"
+        assert cache.peek() is None
+
+        assert cache.get(session, lambda variants: b"[1]").body == b"[1]"
+        assert cache.peek() is not None
+    finally:
+        session.close()
+        teardown_sqlite(engine)
@@ -0,0 +1,119 @@
+import json
+import threading
+
+from app.core.write_behind import WriteBehindQueue
+
+
+def test_write_behind_coalesces_records_into_bounded_batches():
+    batches = []
+    writer = WriteBehindQueue(batches.append, batch_size=3, flush_interval=0.2)
+    for index in range(7):
+        assert writer.enqueue({"index": index})
+    writer.start()
+    try:
+        assert writer.wait_idle(5.0)
+    finally:
+        writer.stop()
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [record["index"] for batch in batches for record in batch] == list(range(7))
+    assert writer.metrics()["batches"] == 3
+
+
+def test_write_behind_retries_failed_batches_and_replays_spool(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    spool.write_text(json.dumps({"index": "crashed"}) + "\n", encoding="utf8")
+    persisted = []
+    failures = {"left": 1}
+    done = threading.Event()
+
+    def persist(batch):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RuntimeError("db down")
+        persisted.extend(batch)
+        done.set()
+
+    writer = WriteBehindQueue(persist, flush_interval=0.0, retry_delay=0.01, spool_path=str(spool), spool_fsync=False)
+    writer.start()
+    try:
+        assert writer.wait_idle(5.0)
+    finally:
+        writer.stop()
+
+    assert persisted == [{"index": "crashed"}]
+    assert writer.metrics()["failures"] == 1
+    # The replayed spool is removed once everything in it is persisted.
+    assert not spool.exists()
+
+
+def test_write_behind_dead_letters_a_poison_record_and_keeps_going(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    persisted = []
+
+    def persist(batch):
+        if any(record["index"] == "poison" for record in batch):
+            raise ValueError("cannot store poison")
+        persisted.extend(record["index"] for record in batch)
+
+    writer = WriteBehindQueue(
+        persist, batch_size=10, flush_interval=0.2, retry_delay=0.0, max_attempts=2,
+        spool_path=str(spool), spool_fsync=False,
+    )
+    for index in (1, "poison", 2):
+        assert writer.enqueue({"index": index})
+    writer.start()
+    try:
+        assert writer.wait_idle(5.0)
+        assert writer.enqueue({"index": 3})
+        assert writer.wait_idle(5.0)
+    finally:
+        writer.stop()
+
+    assert persisted == [1, 2, 3]
+    metrics = writer.metrics()
+    assert metrics["deadLettered"] == 1 and metrics["persisted"] == 3
+    dead = [json.loads(line) for line in (tmp_path / "spool.jsonl.dead").read_text(encoding="utf8").splitlines()]
+    assert [entry["record"] for entry in dead] == [{"index": "poison"}]
+
+
+def test_write_behind_spool_is_compacted_while_traffic_continues(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    release = threading.Event()
+    persisted = []
+
+    def persist(batch):
+        release.wait(5.0)
+        persisted.extend(batch)
+
+    writer = WriteBehindQueue(
+        persist, batch_size=5, flush_interval=0.0, spool_path=str(spool), spool_fsync=False, segment_bytes=64,
+    )
+    writer.start()
+    try:
+        for index in range(40):
+            assert writer.enqueue({"index": index})
+        assert writer.metrics()["spoolSegments"] > 1
+        release.set()
+        assert writer.wait_idle(5.0)
+        metrics = writer.metrics()
+    finally:
+        writer.stop()
+
+    assert len(persisted) == 40
+    # Only the (empty) current segment is left once the backlog is persisted.
+    assert metrics["spoolBytes"] == 0 and metrics["spoolSegments"] <= 1
+
+
+def test_write_behind_workers_sharing_a_spool_path_use_separate_slots(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    first = WriteBehindQueue(lambda batch: None, spool_path=str(spool), spool_fsync=False)
+    second = WriteBehindQueue(lambda batch: None, spool_path=str(spool), spool_fsync=False)
+    first.start()
+    second.start()
+    try:
+        assert first.metrics()["spoolPath"] == str(spool)
+        assert second.metrics()["spoolPath"] == str(tmp_path / "spool.1.jsonl")
+    finally:
+        first.stop()
+        second.stop()
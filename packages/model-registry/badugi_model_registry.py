@@ -0,0 +1,327 @@
+"""Load ONNX models listed in `src/config/ai/modelRegistry.json`.
+
+`ModelRegistry` is the Python counterpart of `src/ai/modelRouter.js`: it reads
+the registry the export scripts maintain, verifies each model's
+`checksumSha256` before creating a session, and keeps one warmed
+`onnxruntime.InferenceSession` per model id. Every session gets the same
+`intra_op_threads` / `inter_op_threads` settings.
+
+`refresh()` (or the background thread started by `start_watching`) notices
+when the registry file or a loaded model file changes, builds and warms the
+replacement session first and then swaps it in under the lock, so callers
+never observe a half-loaded model. A failed reload keeps the previous session.
+Loaded models are evicted least-recently-used once their total ONNX file size
+exceeds `memory_cap_bytes`.
+
+This module only depends on numpy/onnxruntime and ships as the
+`badugi-model-registry` package (`pip install -e packages/model-registry`), so
+the backend decision endpoint and the offline evaluators in `src/rl` import the
+same module. The default paths assume an editable install from the repository
+checkout; deployments set `RL_MODEL_REGISTRY_PATH` / `RL_MODELS_ROOT`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_REGISTRY_PATH = PROJECT_ROOT / "src/config/ai/modelRegistry.json"
+DEFAULT_MODELS_ROOT = PROJECT_ROOT / "public"
+DEFAULT_MEMORY_CAP_BYTES = 256 * 1024 * 1024
+
+
+class RegistryError(ValueError):
+    """Raised for unknown model ids, missing files and checksum mismatches."""
+
+
+def sha256_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class ModelHandle:
+    """A warmed session plus the registry entry it was built from."""
+
+    model_id: str
+    entry: Dict[str, Any]
+    path: Path
+    checksum: str
+    size_bytes: int
+    session: Any
+    file_stamp: Optional[Tuple[int, int]]
+    loaded_at: float = field(default_factory=time.time)
+
+    @property
+    def input_name(self) -> str:
+        return self.session.get_inputs()[0].name
+
+    @property
+    def output_name(self) -> str:
+        return self.session.get_outputs()[0].name
+
+    @property
+    def batched_input(self) -> bool:
+        return len(self.session.get_inputs()[0].shape) == 2
+
+    def run(self, vector: np.ndarray) -> np.ndarray:
+        """Evaluate one observation vector."""
+
+        return np.asarray(
+            self.session.run([self.output_name], {self.input_name: np.asarray(vector, dtype=np.float32)})[0]
+        )
+
+    def run_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """Evaluate an `(N, input)` batch.
+
+        The exported frontend models take a single rank-1 vector; those are run
+        row by row, rank-2 models in one call.
+        """
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.batched_input:
+            return np.asarray(self.session.run([self.output_name], {self.input_name: vectors})[0])
+        return np.stack([self.run(row) for row in vectors])
+
+
+class ModelRegistry:
+    """Checksum-validated, hot-swappable ONNX session cache keyed by model id."""
+
+    def __init__(
+        self,
+        registry_path: Path = DEFAULT_REGISTRY_PATH,
+        models_root: Path = DEFAULT_MODELS_ROOT,
+        *,
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1,
+        memory_cap_bytes: int = DEFAULT_MEMORY_CAP_BYTES,
+        require_checksum: bool = False,
+    ):
+        if ort is None:
+            raise RuntimeError(
+                "Missing dependency: onnxruntime. Install RL deps first: "
+                "pip install -e .[rl] (backend) or pip install -r src/rl/requirements.txt"
+            )
+        self.registry_path = Path(registry_path)
+        self.models_root = Path(models_root)
+        self.intra_op_threads = max(1, int(intra_op_threads))
+        self.inter_op_threads = max(1, int(inter_op_threads))
+        self.memory_cap_bytes = int(memory_cap_bytes)
+        self.require_checksum = require_checksum
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._registry_stamp: Optional[Tuple[int, int]] = None
+        self._handles: "OrderedDict[str, ModelHandle]" = OrderedDict()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._loads = 0
+        self._swaps = 0
+        self._evictions = 0
+        self._reload_failures = 0
+        self._reload_registry()
+
+    # ---- registry ----------------------------------------------------------
+
+    def _reload_registry(self) -> bool:
+        stamp = _file_stamp(self.registry_path)
+        if stamp is None:
+            raise RegistryError(f"Model registry not found: {self.registry_path}")
+        if stamp == self._registry_stamp:
+            return False
+        entries = json.loads(self.registry_path.read_text(encoding="utf8"))
+        with self._lock:
+            self._entries = {entry["id"]: entry for entry in entries if entry.get("id")}
+            self._registry_stamp = stamp
+        return True
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._entries)
+
+    def entry(self, model_id: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(model_id)
+        if entry is None:
+            raise RegistryError(f"Model id not found in registry: {model_id}")
+        return entry
+
+    # ---- sessions ----------------------------------------------------------
+
+    def _session_options(self):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        return options
+
+    def _build_handle(self, entry: Dict[str, Any]) -> ModelHandle:
+        model_id = entry["id"]
+        path = self.models_root / entry["onnx"]
+        if not path.exists():
+            raise RegistryError(f"ONNX model not found for {model_id}: {path}")
+        data = path.read_bytes()
+        checksum = hashlib.sha256(data).hexdigest()
+        expected = entry.get("checksumSha256")
+        if expected and checksum != expected:
+            raise RegistryError(f"Checksum mismatch for {model_id}: expected {expected}, got {checksum}")
+        if not expected and self.require_checksum:
+            raise RegistryError(f"Registry entry {model_id} has no checksumSha256")
+        session = ort.InferenceSession(data, sess_options=self._session_options(), providers=["CPUExecutionProvider"])
+        handle = ModelHandle(
+            model_id=model_id,
+            entry=dict(entry),
+            path=path,
+            checksum=checksum,
+            size_bytes=len(data),
+            session=session,
+            file_stamp=_file_stamp(path),
+        )
+        # Warm-up run so the first real call does not pay allocator setup.
+        width = int((entry.get("inputShape") or [session.get_inputs()[0].shape[-1]])[-1])
+        handle.run_batch(np.zeros((1, width), dtype=np.float32))
+        return handle
+
+    def get(self, model_id: str) -> ModelHandle:
+        """Return the warmed handle for `model_id`, loading it on first use."""
+
+        with self._lock:
+            handle = self._handles.get(model_id)
+            if handle is not None:
+                self._handles.move_to_end(model_id)
+                return handle
+        handle = self._build_handle(self.entry(model_id))
+        with self._lock:
+            existing = self._handles.get(model_id)
+            if existing is not None:
+                # Another thread loaded it first; keep theirs.
+                self._handles.move_to_end(model_id)
+                return existing
+            self._handles[model_id] = handle
+            self._loads += 1
+            self._evict_over_cap(keep=model_id)
+        return handle
+
+    def preload(self, model_ids: List[str]) -> None:
+        for model_id in model_ids:
+            self.get(model_id)
+
+    def evict(self, model_id: str) -> bool:
+        with self._lock:
+            return self._handles.pop(model_id, None) is not None
+
+    def _evict_over_cap(self, keep: str) -> None:
+        while self.memory_bytes() > self.memory_cap_bytes and len(self._handles) > 1:
+            oldest = next(iter(self._handles))
+            if oldest == keep:
+                break
+            self._handles.pop(oldest)
+            self._evictions += 1
+            logger.info("Evicted model %s (memory cap %d bytes)", oldest, self.memory_cap_bytes)
+
+    def loaded_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._handles)
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(handle.size_bytes for handle in self._handles.values())
+
+    # ---- hot swap ----------------------------------------------------------
+
+    def _is_stale(self, handle: ModelHandle, entry: Optional[Dict[str, Any]]) -> bool:
+        if entry is None:
+            return True
+        if entry.get("onnx") != handle.entry.get("onnx"):
+            return True
+        if entry.get("checksumSha256") != handle.entry.get("checksumSha256"):
+            return True
+        return _file_stamp(self.models_root / entry["onnx"]) != handle.file_stamp
+
+    def refresh(self) -> List[str]:
+        """Reload the registry and hot-swap changed models; return swapped ids."""
+
+        self._reload_registry()
+        with self._lock:
+            candidates = [
+                (model_id, handle, self._entries.get(model_id)) for model_id, handle in self._handles.items()
+            ]
+        swapped = []
+        for model_id, handle, entry in candidates:
+            if not self._is_stale(handle, entry):
+                continue
+            if entry is None:
+                self.evict(model_id)
+                swapped.append(model_id)
+                continue
+            try:
+                replacement = self._build_handle(entry)
+            except Exception:  # noqa: BLE001 - keep serving the previous session
+                logger.exception("Reload of model %s failed; keeping the loaded session", model_id)
+                with self._lock:
+                    self._reload_failures += 1
+                continue
+            with self._lock:
+                if model_id in self._handles:
+                    self._handles[model_id] = replacement
+                    self._swaps += 1
+                    swapped.append(model_id)
+        return swapped
+
+    def start_watching(self, interval: float = 5.0) -> None:
+        """Poll for registry/model changes on a daemon thread."""
+
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:  # noqa: BLE001 - e.g. registry mid-rewrite
+                    logger.exception("Model registry refresh failed")
+
+        self._watcher = threading.Thread(target=watch, name="model-registry-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher:
+            self._watcher.join(timeout=5.0)
+        self._watcher = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": list(self._handles),
+                "memoryBytes": sum(handle.size_bytes for handle in self._handles.values()),
+                "memoryCapBytes": self.memory_cap_bytes,
+                "loads": self._loads,
+                "swaps": self._swaps,
+                "evictions": self._evictions,
+                "reloadFailures": self._reload_failures,
+            }
@@ -1,3 +1,8 @@
+import random
+
+import numpy as np
+import pytest
+
 from rl.env.board_betting_env import (
     BOARD_ACTIONS,
     BoardBettingEnv,
@@ -5,6 +10,9 @@ from rl.env.board_betting_env import (
     BoardScenario,
     board_teacher_action,
 )
+from rl.env.board_long_horizon_vec_env import BoardLongHorizonVecEnv
+from rl.training.contextual_bandit import build_bandit_datasets
+from rl.training.train_board_dqn import BoardTrainConfig, apply_board_fixture, board_fixture_specs, train_board_dqn
 
 
 def test_board_bootstrap_env_is_one_step_with_16_features():
@@ -95,3 +103,111 @@ def test_board_teacher_folds_poor_plo8_no_low_start_but_raises_scoop_start():
 
     assert BOARD_ACTIONS[board_teacher_action(poor_no_low)] == "fold"
     assert BOARD_ACTIONS[board_teacher_action(scoop_candidate)] == "raise"
+
+
+def test_board_action_rewards_match_one_step_reward_for_every_action():
+    env = BoardBettingEnv(family="flh", tier="standard", seed=5)
+    for _ in range(20):
+        env.reset()
+        rewards = env.action_rewards()
+        teacher = board_teacher_action(env.scenario)
+        assert rewards.shape == (len(BOARD_ACTIONS),)
+        assert int(rewards.argmax()) == teacher
+        for action in range(len(BOARD_ACTIONS)):
+            _obs, reward, _terminated, _truncated, _info = env.step(action)
+            assert reward == pytest.approx(rewards[action])
+
+
+def test_board_bandit_training_writes_checkpoint_summary(tmp_path):
+    summary = train_board_dqn(
+        BoardTrainConfig(
+            family="nlh",
+            tier="standard",
+            bandit=True,
+            bandit_pool_size=256,
+            bandit_batch_size=64,
+            bandit_updates=20,
+            fixture_replay_copies=2,
+            output_dir=str(tmp_path),
+            log_interval=0,
+        )
+    )
+    assert summary["trainingMode"] == "bandit"
+    assert summary["banditUpdates"] == 20
+    assert summary["banditSamples"] == 20 * summary["banditBatchSize"]
+    assert "episodes" not in summary
+    assert summary["datasetSize"] == 256 + 2 * len(board_fixture_specs("nlh"))
+    assert (tmp_path / "nlh_standard_board_dqn_latest.pt").exists()
+
+
+def test_board_bandit_datasets_are_reproducible_under_seed():
+    def draw():
+        scenarios, fixtures = build_bandit_datasets(
+            BoardBettingEnv(family="nlh", tier="standard", seed=11),
+            pool_size=64,
+            fixture_specs=board_fixture_specs("nlh"),
+            apply_fixture=apply_board_fixture,
+            fixture_copies=2,
+            seed=11,
+        )
+        return scenarios.sample(16), fixtures.sample(8)
+
+    (first_pool, first_fixtures), (second_pool, second_fixtures) = draw(), draw()
+    np.testing.assert_array_equal(first_pool["obs"], second_pool["obs"])
+    np.testing.assert_array_equal(first_fixtures["obs"], second_fixtures["obs"])
+
+
+@pytest.mark.parametrize("family", ["nlh", "plo8"])
+def test_board_long_horizon_vec_env_matches_scalar_envs_under_seed(family):
+    num_envs = 4
+    vec_env = BoardLongHorizonVecEnv(num_envs, family=family, tier="standard", seed=21, max_steps_per_episode=5)
+    envs = [
+        BoardLongHorizonEnv(family=family, tier="standard", seed=21 + index, max_steps_per_episode=5)
+        for index in range(num_envs)
+    ]
+    vec_obs, _ = vec_env.reset()
+    scalar_obs = [env.reset()[0] for env in envs]
+    np.testing.assert_array_equal(vec_obs, np.stack(scalar_obs))
+
+    picker = random.Random(3)
+    seen_reset = False
+    for _ in range(80):
+        teacher = vec_env.teacher_actions()
+        assert teacher.tolist() == [board_teacher_action(env.scenario) for env in envs]
+        actions = [picker.choice([int(teacher[index]), picker.randrange(len(BOARD_ACTIONS))]) for index in range(num_envs)]
+        vec_obs, vec_rewards, vec_terminated, vec_truncated, infos = vec_env.step(actions)
+        assert not vec_truncated.any()
+        for index, env in enumerate(envs):
+            obs, reward, terminated, _truncated, info = env.step(actions[index])
+            assert reward == vec_rewards[index]
+            assert terminated == vec_terminated[index]
+            assert info["terminal"] == infos["terminal"][index]
+            if terminated:
+                seen_reset = True
+                np.testing.assert_array_equal(obs, infos["final_observation"][index])
+                obs, _ = env.reset()
+            np.testing.assert_array_equal(obs, vec_obs[index])
+    assert seen_reset is True
+
+
+def test_board_long_horizon_training_runs_with_batched_envs(tmp_path):
+    summary = train_board_dqn(
+        BoardTrainConfig(
+            family="plo",
+            tier="standard",
+            long_horizon=True,
+            num_envs=8,
+            total_episodes=24,
+            max_steps_per_episode=4,
+            warmup_steps=1,
+            batch_size=8,
+            teacher_warmup_episodes=8,
+            imitation_pretrain_steps=2,
+            fixture_replay_copies=1,
+            output_dir=str(tmp_path),
+            log_interval=0,
+        )
+    )
+    assert summary["num_envs"] == 8
+    assert summary["long_horizon"] is True
+    assert (tmp_path / "plo_standard_board_dqn_latest.pt").exists()
@@ -1,10 +1,13 @@
+import tempfile
 import unittest
+from pathlib import Path
 
 import numpy as np
 import torch
 
-from rl.agents.dqn_agent import DQNAgent, DQNHyperParams
+from rl.agents.dqn_agent import CpuLearnerConfig, DQNAgent, DQNHyperParams, cpu_thread_budget
 from rl.training.evaluate_badugi_onnx import apply_badugi_feature_set
+from rl.training.export_badugi_dqn_onnx import export_checkpoint
 
 
 class DQNImitationTest(unittest.TestCase):
@@ -65,6 +68,63 @@ class DQNImitationTest(unittest.TestCase):
         self.assertLess(loss, first_loss)
         self.assertGreaterEqual(satisfied, 0.9)
 
+    def test_bandit_update_regresses_all_action_values(self):
+        torch.manual_seed(13)
+        agent = DQNAgent(
+            obs_dim=4,
+            n_actions=3,
+            hidden_dim=16,
+            hyperparams=DQNHyperParams(lr=0.05, batch_size=8),
+        )
+        batch = {
+            "obs": np.tile(np.array([0.0, 0.0, 1.0, 0.0], dtype=np.float32), (8, 1)),
+            "action_rewards": np.tile(np.array([-0.5, 1.0, -1.4], dtype=np.float32), (8, 1)),
+            "action_masks": np.tile(np.array([1.0, 1.0, 0.0], dtype=np.float32), (8, 1)),
+        }
+
+        first_loss, _accuracy = agent.bandit_update(batch)
+        for _ in range(60):
+            loss, accuracy = agent.bandit_update(batch)
+
+        self.assertLess(loss, first_loss)
+        self.assertEqual(accuracy, 1.0)
+        with torch.no_grad():
+            q_values = agent.q_network(torch.as_tensor(batch["obs"][:1])).numpy()[0]
+        np.testing.assert_allclose(q_values, batch["action_rewards"][0], atol=0.1)
+
+    def test_gradient_accumulation_matches_full_batch_update(self):
+        rng = np.random.default_rng(5)
+        batch = {
+            "obs": rng.standard_normal((12, 4)).astype(np.float32),
+            "actions": rng.integers(0, 3, size=12).astype(np.int64),
+            "rewards": rng.standard_normal(12).astype(np.float32),
+            "next_obs": rng.standard_normal((12, 4)).astype(np.float32),
+            "dones": np.zeros(12, dtype=np.float32),
+            "next_action_masks": np.ones((12, 3), dtype=bool),
+        }
+        agents = []
+        for accum_steps in (1, 3):
+            torch.manual_seed(3)
+            agent = DQNAgent(
+                obs_dim=4,
+                n_actions=3,
+                hidden_dim=16,
+                hyperparams=DQNHyperParams(lr=0.01, batch_size=12),
+                learner=CpuLearnerConfig(grad_accum_steps=accum_steps),
+            )
+            loss, mean_q = agent.update(batch)
+            agents.append((agent, loss, mean_q))
+
+        (full, full_loss, full_q), (accum, accum_loss, accum_q) = agents
+        self.assertAlmostEqual(full_loss, accum_loss, places=5)
+        self.assertAlmostEqual(full_q, accum_q, places=5)
+        for full_param, accum_param in zip(full.q_network.parameters(), accum.q_network.parameters()):
+            torch.testing.assert_close(full_param, accum_param, atol=1e-6, rtol=1e-5)
+
+    def test_cpu_thread_budget_reserves_actor_cores(self):
+        self.assertEqual(cpu_thread_budget(actor_processes=3, threads_per_actor=2, cpu_count=16), 10)
+        self.assertEqual(cpu_thread_budget(actor_processes=8, cpu_count=4), 1)
+
     def test_badugi_feature_set_masks_newer_slots_for_older_models(self):
         obs = np.ones(96, dtype=np.float32)
 
@@ -79,5 +139,34 @@ class DQNImitationTest(unittest.TestCase):
         self.assertTrue(np.all(ev_range[58:61] == 1))
 
 
+    def test_dueling_checkpoint_exports_to_the_frontend_onnx_interface(self):
+        import onnxruntime as ort
+
+        torch.manual_seed(17)
+        agent = DQNAgent(obs_dim=96, n_actions=6, hidden_dim=32, hyperparams=DQNHyperParams(dueling=True))
+        obs = np.random.default_rng(17).standard_normal((4, 96)).astype(np.float32)
+        with torch.no_grad():
+            expected = agent.q_network(torch.as_tensor(obs)).numpy()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint, output = Path(tmp) / "dueling.pt", Path(tmp) / "dueling.onnx"
+            agent.save(str(checkpoint))
+            export_checkpoint(
+                checkpoint=checkpoint,
+                output=output,
+                registry=Path(tmp) / "registry.json",
+                model_id="model-dueling-test",
+                update_registry=False,
+                device="cpu",
+            )
+            session = ort.InferenceSession(str(output), providers=["CPUExecutionProvider"])
+
+        [model_input], [model_output] = session.get_inputs(), session.get_outputs()
+        self.assertEqual(list(model_input.shape), [96])
+        self.assertEqual(list(model_output.shape), [6])
+        for row, q_values in zip(obs, expected):
+            np.testing.assert_allclose(session.run(None, {model_input.name: row})[0], q_values, rtol=1e-5, atol=1e-5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+import json
+
+from rl.training.benchmark_env_throughput import ENV_FACTORIES, compare_to_baseline, main
+
+
+def test_env_throughput_benchmark_writes_baseline_and_compares(tmp_path):
+    report_path = tmp_path / "report.json"
+    baseline_path = tmp_path / "baseline.json"
+    common = [
+        "--steps", "40",
+        "--resets", "10",
+        "--memory-envs", "2",
+        "--function-calls", "5",
+        "--report", str(report_path),
+        "--baseline", str(baseline_path),
+        "--json",
+    ]
+
+    main(common + ["--write-baseline"])
+    baseline = json.loads(baseline_path.read_text(encoding="utf8"))
+    assert set(baseline["envs"]) == set(ENV_FACTORIES)
+    assert all(row["stepsPerSecond"] > 0 for row in baseline["envs"].values())
+    assert "board_teacher_action" in baseline["functions"]
+
+    report = main(common + ["--report-only", "--tolerance", "1000"])
+    assert report["baseline"] == str(baseline_path)
+    assert report["passed"] is True
+
+
+def test_compare_to_baseline_flags_slowdowns_and_memory_growth():
+    baseline = {
+        "envs": {"BoardBettingEnv": {"stepsPerSecond": 1000.0, "bytesPerEnv": 1000}},
+        "functions": {"board_teacher_action": {"callsPerSecond": 1000.0}},
+    }
+    report = {
+        "envs": {"BoardBettingEnv": {"stepsPerSecond": 900.0, "bytesPerEnv": 1500}},
+        "functions": {"board_teacher_action": {"callsPerSecond": 500.0}},
+    }
+
+    regressions = compare_to_baseline(report, baseline, tolerance=0.2)
+
+    assert {(row["name"], row["metric"]) for row in regressions} == {
+        ("BoardBettingEnv", "bytesPerEnv"),
+        ("board_teacher_action", "callsPerSecond"),
+    }
@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from badugi_model_registry import ModelRegistry, RegistryError, sha256_file  # noqa: E402
+
+PUBLIC_MODELS = Path(__file__).resolve().parents[3] / "public" / "models"
+MODEL_FILES = ["badugi_beginner_dqn_v1.onnx", "badugi_standard_dqn_v1.onnx", "badugi_pro_v1.onnx"]
+
+
+def make_registry(tmp_path: Path) -> Path:
+    models = tmp_path / "models"
+    models.mkdir()
+    entries = []
+    for index, name in enumerate(MODEL_FILES):
+        shutil.copy(PUBLIC_MODELS / name, models / name)
+        entries.append(
+            {
+                "id": f"model-{index}",
+                "onnx": f"models/{name}",
+                "checksumSha256": sha256_file(models / name),
+                "inputShape": [96],
+                "outputShape": [6],
+            }
+        )
+    registry_path = tmp_path / "modelRegistry.json"
+    registry_path.write_text(json.dumps(entries, indent=2), encoding="utf8")
+    return registry_path
+
+
+def rewrite_registry(registry_path: Path, update) -> None:
+    entries = json.loads(registry_path.read_text(encoding="utf8"))
+    update(entries)
+    registry_path.write_text(json.dumps(entries, indent=2), encoding="utf8")
+    # Make the change visible even on coarse mtime filesystems.
+    stat = registry_path.stat()
+    os.utime(registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_registry_loads_warm_sessions_and_runs_batches(tmp_path):
+    registry = ModelRegistry(make_registry(tmp_path), tmp_path)
+    handle = registry.get("model-0")
+    assert registry.get("model-0") is handle
+
+    outputs = handle.run_batch(np.zeros((3, 96), dtype=np.float32))
+    assert outputs.shape == (3, 6)
+    np.testing.assert_allclose(outputs[0], handle.run(np.zeros(96, dtype=np.float32)), rtol=1e-6)
+    with pytest.raises(RegistryError):
+        registry.get("missing")
+
+
+def test_registry_rejects_checksum_mismatch(tmp_path):
+    registry_path = make_registry(tmp_path)
+    rewrite_registry(registry_path, lambda entries: entries[0].update(checksumSha256="0" * 64))
+    registry = ModelRegistry(registry_path, tmp_path)
+    with pytest.raises(RegistryError, match="Checksum mismatch"):
+        registry.get("model-0")
+
+
+def test_registry_evicts_least_recently_used_under_memory_cap(tmp_path):
+    registry_path = make_registry(tmp_path)
+    sizes = [(tmp_path / "models" / name).stat().st_size for name in MODEL_FILES]
+    registry = ModelRegistry(registry_path, tmp_path, memory_cap_bytes=sizes[0] + sizes[1] + sizes[2] - 1)
+
+    registry.get("model-0")
+    registry.get("model-1")
+    registry.get("model-0")
+    registry.get("model-2")
+
+    assert registry.loaded_ids() == ["model-0", "model-2"]
+    assert registry.metrics()["evictions"] == 1
+
+
+def test_registry_hot_swaps_changed_model(tmp_path):
+    registry_path = make_registry(tmp_path)
+    registry = ModelRegistry(registry_path, tmp_path)
+    before = registry.get("model-0")
+    assert registry.refresh() == []
+
+    def point_at_pro(entries):
+        entries[0]["onnx"] = "models/badugi_pro_v1.onnx"
+        entries[0]["checksumSha256"] = entries[2]["checksumSha256"]
+
+    rewrite_registry(registry_path, point_at_pro)
+    assert registry.refresh() == ["model-0"]
+    after = registry.get("model-0")
+    assert after is not before
+    assert after.path.name == "badugi_pro_v1.onnx"
+
+    # A broken update keeps serving the last good session.
+    rewrite_registry(registry_path, lambda entries: entries[0].update(checksumSha256="f" * 64))
+    assert registry.refresh() == []
+    assert registry.get("model-0") is after
+    assert registry.metrics()["reloadFailures"] == 1
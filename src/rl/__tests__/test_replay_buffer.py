@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import torch
+
+from rl.agents.dqn_agent import DQNAgent, DQNHyperParams
+from rl.utils.replay_buffer import ReplayBuffer
+
+
+def _obs(value: float) -> np.ndarray:
+    return np.full(2, value, dtype=np.float32)
+
+
+def test_n_step_replay_discounts_window_and_flushes_terminal_tail():
+    buffer = ReplayBuffer(capacity=16, n_step=3, gamma=0.5)
+    for step, reward in enumerate((1.0, 2.0, 4.0, 8.0)):
+        buffer.add(_obs(step), step, reward, _obs(step + 1), done=step == 3)
+
+    stored = sorted(buffer.storage, key=lambda item: item.action)
+    assert [item.n_steps for item in stored] == [3, 3, 2, 1]
+    assert [item.reward for item in stored] == pytest.approx([3.0, 6.0, 8.0, 8.0])
+    assert [float(item.next_obs[0]) for item in stored] == [3.0, 4.0, 4.0, 4.0]
+    assert [item.done for item in stored] == [False, True, True, True]
+
+
+def test_n_step_replay_flush_keeps_truncated_episode_bootstrapped():
+    buffer = ReplayBuffer(capacity=16, n_step=4, gamma=1.0)
+    buffer.add(_obs(0), 0, 1.0, _obs(1), done=False)
+    buffer.add(_obs(1), 1, 1.0, _obs(2), done=False)
+    assert len(buffer) == 0
+
+    buffer.flush()
+    batch = buffer.sample(2)
+    order = np.argsort(batch["actions"])
+    np.testing.assert_allclose(batch["rewards"][order], [2.0, 1.0])
+    np.testing.assert_allclose(batch["n_steps"][order], [2.0, 1.0])
+    np.testing.assert_allclose(batch["dones"], [0.0, 0.0])
+
+
+def test_update_bootstraps_with_gamma_to_the_n_steps():
+    torch.manual_seed(0)
+    agent = DQNAgent(
+        obs_dim=2,
+        n_actions=2,
+        hidden_dim=8,
+        hyperparams=DQNHyperParams(gamma=0.5, lr=0.0, double_dqn=False, dueling=True),
+    )
+    next_obs = np.ones((1, 2), dtype=np.float32)
+    with torch.no_grad():
+        next_max = float(agent.target_network(torch.as_tensor(next_obs)).max())
+        current = float(agent.q_network(torch.zeros(1, 2))[0, 0])
+    batch = {
+        "obs": np.zeros((1, 2), dtype=np.float32),
+        "actions": np.zeros(1, dtype=np.int64),
+        "rewards": np.ones(1, dtype=np.float32),
+        "next_obs": next_obs,
+        "dones": np.zeros(1, dtype=np.float32),
+        "n_steps": np.full(1, 3.0, dtype=np.float32),
+    }
+
+    loss, _mean_q = agent.update(batch)
+
+    assert loss == pytest.approx((1.0 + 0.125 * next_max - current) ** 2, rel=1e-4)
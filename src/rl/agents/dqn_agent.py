@@ -1,3 +1,5 @@
+import contextlib
+import os
 import random
 from dataclasses import dataclass
 from typing import Tuple
@@ -10,20 +12,40 @@ import torch.nn.functional as F
 
 
 class QNetwork(nn.Module):
-    """Simple MLP for DQN."""
+    """Simple MLP for DQN.
 
-    def __init__(self, obs_dim: int, n_actions: int, hidden_dim: int = 256):
+    With `dueling=True` the two hidden layers feed separate state-value and
+    advantage heads combined as `V + A - mean(A)`; the module still maps
+    `(..., obs_dim)` to `(..., n_actions)` so ONNX export is unchanged.
+    """
+
+    def __init__(self, obs_dim: int, n_actions: int, hidden_dim: int = 256, dueling: bool = False):
         super().__init__()
-        self.net = nn.Sequential(
-            nn.Linear(obs_dim, hidden_dim),
-            nn.ReLU(),
-            nn.Linear(hidden_dim, hidden_dim),
-            nn.ReLU(),
-            nn.Linear(hidden_dim, n_actions),
-        )
+        self.dueling = dueling
+        if dueling:
+            self.net = nn.Sequential(
+                nn.Linear(obs_dim, hidden_dim),
+                nn.ReLU(),
+                nn.Linear(hidden_dim, hidden_dim),
+                nn.ReLU(),
+            )
+            self.value_head = nn.Linear(hidden_dim, 1)
+            self.advantage_head = nn.Linear(hidden_dim, n_actions)
+        else:
+            self.net = nn.Sequential(
+                nn.Linear(obs_dim, hidden_dim),
+                nn.ReLU(),
+                nn.Linear(hidden_dim, hidden_dim),
+                nn.ReLU(),
+                nn.Linear(hidden_dim, n_actions),
+            )
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        return self.net(x)
+        if not self.dueling:
+            return self.net(x)
+        hidden = self.net(x)
+        advantage = self.advantage_head(hidden)
+        return self.value_head(hidden) + advantage - advantage.mean(dim=-1, keepdim=True)
 
 
 @dataclass
@@ -32,6 +54,74 @@ class DQNHyperParams:
     lr: float = 1e-3
     batch_size: int = 64
     tau: float = 1e-2  # soft update coefficient
+    n_step: int = 1  # replay windows store gamma ** n_steps per sample
+    double_dqn: bool = True  # online argmax, target value; False uses target max
+    dueling: bool = False
+
+
+@dataclass
+class CpuLearnerConfig:
+    """CPU learner tuning for `DQNAgent.update`.
+
+    `num_threads=0` budgets intra-op threads from the host core count minus the
+    cores reserved for actor processes (`actor_processes * threads_per_actor`).
+    `grad_accum_steps` splits each sampled batch into equal chunks and applies a
+    single optimizer step, so large fused batches fit in cache. `bf16` enables
+    bfloat16 autocast for forward passes when the CPU supports it; losses and
+    optimizer state stay float32. `compile` wraps the online network with
+    `torch.compile` for training forwards only.
+    """
+
+    num_threads: int = 0
+    interop_threads: int = 0
+    actor_processes: int = 0
+    threads_per_actor: int = 1
+    grad_accum_steps: int = 1
+    bf16: bool = False
+    compile: bool = False
+
+
+def cpu_thread_budget(
+    actor_processes: int = 0,
+    threads_per_actor: int = 1,
+    cpu_count: int | None = None,
+) -> int:
+    """Return learner threads left after reserving cores for actor processes."""
+    total = cpu_count or os.cpu_count() or 1
+    reserved = max(0, actor_processes) * max(1, threads_per_actor)
+    return max(1, total - reserved)
+
+
+def configure_cpu_threads(learner: CpuLearnerConfig) -> int:
+    """Apply the learner thread budget to torch and return the intra-op count."""
+    threads = learner.num_threads or cpu_thread_budget(
+        learner.actor_processes, learner.threads_per_actor
+    )
+    torch.set_num_threads(threads)
+    if learner.interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(learner.interop_threads)
+        except RuntimeError:
+            # Inter-op threads can only be set before the first parallel op.
+            pass
+    return threads
+
+
+_CPU_BF16_SUPPORTED: bool | None = None
+
+
+def cpu_bf16_supported() -> bool:
+    """Probe once whether CPU bfloat16 autocast runs a Linear forward."""
+    global _CPU_BF16_SUPPORTED
+    if _CPU_BF16_SUPPORTED is None:
+        try:
+            layer = nn.Linear(4, 4)
+            with torch.autocast("cpu", dtype=torch.bfloat16):
+                out = layer(torch.zeros(2, 4))
+            _CPU_BF16_SUPPORTED = out.dtype == torch.bfloat16
+        except Exception:
+            _CPU_BF16_SUPPORTED = False
+    return _CPU_BF16_SUPPORTED
 
 
 class DQNAgent:
@@ -42,15 +132,18 @@ class DQNAgent:
         device: torch.device | str = "cpu",
         hidden_dim: int = 256,
         hyperparams: DQNHyperParams | None = None,
+        learner: CpuLearnerConfig | None = None,
     ):
         self.device = torch.device(device)
         self.obs_dim = obs_dim
         self.n_actions = n_actions
 
         self.hyper = hyperparams or DQNHyperParams()
+        self.learner = learner or CpuLearnerConfig()
 
-        self.q_network = QNetwork(obs_dim, n_actions, hidden_dim).to(self.device)
-        self.target_network = QNetwork(obs_dim, n_actions, hidden_dim).to(self.device)
+        dueling = bool(self.hyper.dueling)
+        self.q_network = QNetwork(obs_dim, n_actions, hidden_dim, dueling=dueling).to(self.device)
+        self.target_network = QNetwork(obs_dim, n_actions, hidden_dim, dueling=dueling).to(self.device)
         self.target_network.load_state_dict(self.q_network.state_dict())
         self.target_network.eval()
 
@@ -59,6 +152,18 @@ class DQNAgent:
 
         self.train_steps = 0
 
+        self.use_bf16 = (
+            self.learner.bf16 and self.device.type == "cpu" and cpu_bf16_supported()
+        )
+        self._train_q_network = self.q_network
+        if self.learner.compile and hasattr(torch, "compile"):
+            self._train_q_network = torch.compile(self.q_network)
+
+    def _autocast(self):
+        if self.use_bf16:
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
     @torch.no_grad()
     def act(self, obs: np.ndarray, epsilon: float, action_mask: np.ndarray | None = None) -> int:
         """Epsilon-greedy action selection."""
@@ -84,6 +189,29 @@ class DQNAgent:
         action = int(torch.argmax(q_values, dim=1).item())
         return action
 
+    @torch.no_grad()
+    def act_batch(
+        self, obs: np.ndarray, epsilon: float, action_masks: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Epsilon-greedy actions for a `(N, obs_dim)` batch in one forward pass."""
+        obs_t = torch.as_tensor(obs, dtype=torch.float32, device=self.device)
+        q_values = self.q_network(obs_t)
+        if action_masks is not None:
+            mask_t = torch.as_tensor(action_masks, dtype=torch.bool, device=self.device)
+            q_values = q_values.masked_fill(~mask_t, -1e9)
+        actions = torch.argmax(q_values, dim=1).cpu().numpy().astype(np.int64)
+        for index in range(len(actions)):
+            if random.random() >= epsilon:
+                continue
+            legal_actions = None
+            if action_masks is not None:
+                legal_actions = np.flatnonzero(np.asarray(action_masks[index]) > 0)
+            if legal_actions is not None and len(legal_actions) > 0:
+                actions[index] = int(random.choice(legal_actions))
+            else:
+                actions[index] = random.randrange(self.n_actions)
+        return actions
+
     def _soft_update_target(self):
         """Soft update of target network."""
         tau = self.hyper.tau
@@ -98,6 +226,9 @@ class DQNAgent:
         """Perform one gradient step given a batch from replay buffer.
 
         batch: dict with keys 'obs', 'actions', 'rewards', 'next_obs', 'dones'
+        and optional 'next_action_masks' and 'n_steps' (n-step replay windows).
+        With `learner.grad_accum_steps > 1` the batch is split into chunks whose
+        gradients are accumulated before the single optimizer step.
         Returns:
             loss_value, mean_q_value
         """
@@ -114,39 +245,58 @@ class DQNAgent:
         dones = torch.as_tensor(
             batch["dones"], dtype=torch.float32, device=self.device
         ).unsqueeze(-1)
+        discounts = torch.full_like(rewards, self.hyper.gamma)
+        if "n_steps" in batch:
+            n_steps = torch.as_tensor(
+                batch["n_steps"], dtype=torch.float32, device=self.device
+            ).unsqueeze(-1)
+            discounts = discounts.pow(n_steps)
+        next_masks = None
+        if "next_action_masks" in batch:
+            next_masks = torch.as_tensor(
+                batch["next_action_masks"], dtype=torch.bool, device=self.device
+            )
 
-        # Current Q estimates
-        q_values = self.q_network(obs).gather(1, actions)
-
-        with torch.no_grad():
-            # Double DQN style: action from online net, value from target net
-            next_q_online = self.q_network(next_obs)
-            if "next_action_masks" in batch:
-                next_masks = torch.as_tensor(
-                    batch["next_action_masks"], dtype=torch.bool, device=self.device
-                )
-                next_q_online = next_q_online.masked_fill(~next_masks, -1e9)
-            next_actions = torch.argmax(next_q_online, dim=1, keepdim=True)
-            next_q_target_all = self.target_network(next_obs)
-            if "next_action_masks" in batch:
+        with torch.no_grad(), self._autocast():
+            next_q_target_all = self.target_network(next_obs).float()
+            if next_masks is not None:
                 next_q_target_all = next_q_target_all.masked_fill(~next_masks, -1e9)
+            if self.hyper.double_dqn:
+                # Double DQN: action from online net, value from target net
+                next_q_online = self._train_q_network(next_obs).float()
+                if next_masks is not None:
+                    next_q_online = next_q_online.masked_fill(~next_masks, -1e9)
+                next_actions = torch.argmax(next_q_online, dim=1, keepdim=True)
+            else:
+                next_actions = torch.argmax(next_q_target_all, dim=1, keepdim=True)
             next_q_target = next_q_target_all.gather(1, next_actions)
-            target_q = rewards + self.hyper.gamma * (1.0 - dones) * next_q_target
-
-        loss = self.loss_fn(q_values, target_q)
+            target_q = rewards + discounts * (1.0 - dones) * next_q_target
 
+        batch_len = obs.shape[0]
+        chunks = max(1, min(int(self.learner.grad_accum_steps), batch_len))
+        chunk_size = (batch_len + chunks - 1) // chunks
         self.optimizer.zero_grad()
-        loss.backward()
+        total_loss = 0.0
+        q_sum = 0.0
+        for start in range(0, batch_len, chunk_size):
+            end = min(batch_len, start + chunk_size)
+            with self._autocast():
+                # Current Q estimates
+                q_values = self._train_q_network(obs[start:end]).float().gather(
+                    1, actions[start:end]
+                )
+            chunk_loss = self.loss_fn(q_values, target_q[start:end])
+            # Weight by chunk share so the accumulated gradient equals the full-batch mean.
+            (chunk_loss * ((end - start) / batch_len)).backward()
+            total_loss += float(chunk_loss.item()) * (end - start)
+            q_sum += float(q_values.detach().sum().item())
         nn.utils.clip_grad_norm_(self.q_network.parameters(), max_norm=5.0)
         self.optimizer.step()
 
         self._soft_update_target()
         self.train_steps += 1
 
-        with torch.no_grad():
-            mean_q = q_values.mean().item()
-
-        return float(loss.item()), float(mean_q)
+        return total_loss / batch_len, q_sum / batch_len
 
     def imitation_update(self, batch, loss_weight: float = 1.0) -> Tuple[float, float]:
         """Supervised behavior-cloning step over expert state/action pairs."""
@@ -169,6 +319,46 @@ class DQNAgent:
 
         return float(loss.item()), float(accuracy)
 
+    def bandit_update(self, batch, loss_weight: float = 1.0) -> Tuple[float, float]:
+        """Regress every action's Q-value onto its closed-form one-step reward.
+
+        batch: dict with keys 'obs', 'action_rewards' and optional 'action_masks'
+        Returns:
+            loss_value, greedy_accuracy (legal argmax Q == legal argmax reward)
+        """
+        obs = torch.as_tensor(batch["obs"], dtype=torch.float32, device=self.device)
+        action_rewards = torch.as_tensor(
+            batch["action_rewards"], dtype=torch.float32, device=self.device
+        )
+
+        q_values = self.q_network(obs)
+        loss = self.loss_fn(q_values, action_rewards) * float(loss_weight)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        nn.utils.clip_grad_norm_(self.q_network.parameters(), max_norm=5.0)
+        self.optimizer.step()
+        self._soft_update_target()
+        self.train_steps += 1
+
+        with torch.no_grad():
+            masked_q = q_values
+            masked_rewards = action_rewards
+            if "action_masks" in batch:
+                masks = torch.as_tensor(
+                    batch["action_masks"], dtype=torch.bool, device=self.device
+                )
+                masked_q = q_values.masked_fill(~masks, -1e9)
+                masked_rewards = action_rewards.masked_fill(~masks, -1e9)
+            accuracy = (
+                (torch.argmax(masked_q, dim=1) == torch.argmax(masked_rewards, dim=1))
+                .float()
+                .mean()
+                .item()
+            )
+
+        return float(loss.item()), float(accuracy)
+
     def action_margin_update(
         self,
         batch,
@@ -215,7 +405,12 @@ class DQNAgent:
         torch.save(payload, path)
 
     @classmethod
-    def load(cls, path: str, device: torch.device | str = "cpu") -> "DQNAgent":
+    def load(
+        cls,
+        path: str,
+        device: torch.device | str = "cpu",
+        learner: CpuLearnerConfig | None = None,
+    ) -> "DQNAgent":
         try:
             payload = torch.load(path, map_location=device)
         except Exception:
@@ -230,6 +425,7 @@ class DQNAgent:
             device=device,
             hidden_dim=int(payload.get("hidden_dim", 256)),
             hyperparams=hyper,
+            learner=learner,
         )
         agent.q_network.load_state_dict(payload["q_network"])
         agent.target_network.load_state_dict(payload["target_network"])
@@ -14,6 +14,7 @@ BOARD_ACTIONS = ["fold", "check", "call", "bet", "raise", "all_in"]
 BOARD_VARIANTS = ("nlh", "flh", "plo", "plo8")
 BOARD_TIERS = ("beginner", "standard")
 POSITION_BUCKETS = ("UTG", "MP", "CO", "BTN", "SB", "BB")
+NLH_BET_UNITS = [0.08, 0.14, 0.22]
 POSITION_OPEN_FLOORS = {
     "nlh": {"UTG": 0.74, "MP": 0.68, "CO": 0.60, "BTN": 0.50, "SB": 0.56, "BB": 0.30},
     "flh": {"UTG": 0.68, "MP": 0.62, "CO": 0.55, "BTN": 0.48, "SB": 0.52, "BB": 0.28},
@@ -79,12 +80,33 @@ class BoardBettingEnv(gym.Env):
         self.scenario = self._sample_scenario()
         return self._observation(), {}
 
+    def sample_scenario(self) -> BoardScenario:
+        """Draw a new one-step scenario into `self.scenario` without gym's `reset()` bookkeeping."""
+        self.scenario = self._sample_scenario()
+        return self.scenario
+
+    def observation(self):
+        """Observation vector for the current scenario."""
+        return self._observation()
+
     def step(self, action: int):
         action = int(action)
         teacher = board_teacher_action(self.scenario)
         reward = self._reward_for_action(action, teacher)
         return self._observation(), float(reward), True, False, {"teacherAction": teacher}
 
+    def action_rewards(self, teacher: int | None = None):
+        """Closed-form one-step reward for every action in the current scenario.
+
+        `step(action)` returns `action_rewards()[action]`, so contextual-bandit
+        training can supervise all six outputs from a single sampled scenario.
+        """
+        teacher = board_teacher_action(self.scenario) if teacher is None else int(teacher)
+        return np.array(
+            [self._reward_for_action(action, teacher) for action in range(len(BOARD_ACTIONS))],
+            dtype=np.float32,
+        )
+
     def legal_action_mask(self):
         mask = np.zeros(len(BOARD_ACTIONS), dtype=np.float32)
         if self.scenario.to_call > 0:
@@ -104,16 +126,19 @@ class BoardBettingEnv(gym.Env):
         return mask
 
     def _sample_scenario(self) -> BoardScenario:
-        strength = self.random.betavariate(2.0, 2.2)
-        draw_potential = self.random.betavariate(1.6, 2.4)
-        position = self.random.random()
-        street_progress = self.random.choice([0.0, 0.33, 0.66, 1.0])
-        active_opponents = self.random.choice([1, 1, 2, 3, 4])
-        to_call = self.random.choice([0.0, 0.05, 0.1, 0.2, 0.35])
-        bet_size = self.random.choice([0.04, 0.08, 0.16, 0.25])
-        pot_size = self.random.uniform(0.05, 0.6)
-        raise_count = self.random.choice([0, 0, 1, 2, 3])
-        stack_ratio = self.random.uniform(0.08, 1.0)
+        (
+            strength,
+            draw_potential,
+            position,
+            street_progress,
+            active_opponents,
+            to_call,
+            bet_size,
+            pot_size,
+            raise_count,
+            stack_ratio,
+            last_aggression,
+        ) = _draw_scenario_inputs(self.random)
         hi_lo = 1.0 if self.family == "plo8" else 0.0
         equity = _estimate_equity(
             strength=strength,
@@ -143,7 +168,7 @@ class BoardBettingEnv(gym.Env):
             raise_count=raise_count,
             active_opponents=active_opponents,
             stack_ratio=stack_ratio,
-            last_aggression=self.random.random(),
+            last_aggression=last_aggression,
             range_score=range_score,
         )
 
@@ -261,12 +286,7 @@ class BoardLongHorizonEnv(BoardBettingEnv):
         return scenario
 
     def _sample_to_call(self):
-        pressure = self.random.random()
-        if pressure < 0.45:
-            return 0.0
-        if self.family == "flh":
-            return 0.04 if self.street_index < 2 else 0.08
-        return self.random.choice([0.04, 0.08, 0.14, 0.22])
+        return _draw_to_call(self.random, self.family, self.street_index)
 
     def _contribution_for(self, action_name: str):
         if action_name in {"check", "fold"}:
@@ -279,7 +299,7 @@ class BoardLongHorizonEnv(BoardBettingEnv):
         if self.family in {"plo", "plo8"}:
             unit = min(max(0.05, self.pot), 0.35)
         if self.family == "nlh":
-            unit = self.random.choice([0.08, 0.14, 0.22])
+            unit = self.random.choice(NLH_BET_UNITS)
         return min(self.hero_stack, max(unit, self.scenario.to_call + unit))
 
     def _ev_shaping(self, action_name: str):
@@ -305,16 +325,20 @@ class BoardLongHorizonEnv(BoardBettingEnv):
         return expected_pot - investment_penalty
 
     def _advance_scenario(self, action_name: str):
-        aggression_boost = 0.04 if action_name in {"bet", "raise"} else 0.0
-        draw_realization = self.scenario.draw_potential * self.random.uniform(0.02, 0.12)
+        aggressive = action_name in {"bet", "raise"}
+        realization, draw_decay, to_call, raise_count, last_aggression = _draw_advance_inputs(
+            self.random, self.family, self.street_index, aggressive
+        )
+        aggression_boost = 0.04 if aggressive else 0.0
+        draw_realization = self.scenario.draw_potential * realization
         self.scenario.strength = float(np.clip(self.scenario.strength + draw_realization + aggression_boost, 0.02, 0.98))
-        self.scenario.draw_potential = float(np.clip(self.scenario.draw_potential * self.random.uniform(0.55, 0.9), 0.0, 1.0))
+        self.scenario.draw_potential = float(np.clip(self.scenario.draw_potential * draw_decay, 0.0, 1.0))
         self.scenario.street_progress = self.street_index / 3.0
         self.scenario.pot_size = self.pot
         self.scenario.stack_ratio = self.hero_stack
-        self.scenario.to_call = self._sample_to_call()
-        self.scenario.raise_count = 0 if self.scenario.to_call == 0 else self.random.choice([0, 1, 2])
-        self.scenario.last_aggression = 1.0 if action_name in {"bet", "raise"} else self.random.random()
+        self.scenario.to_call = to_call
+        self.scenario.raise_count = raise_count
+        self.scenario.last_aggression = last_aggression
         self.scenario.equity = _estimate_equity(
             strength=self.scenario.strength,
             draw_potential=self.scenario.draw_potential,
@@ -331,6 +355,57 @@ class BoardLongHorizonEnv(BoardBettingEnv):
         )
 
 
+def _draw_scenario_inputs(rng: random.Random):
+    """Raw random draws behind `BoardBettingEnv._sample_scenario`, in draw order.
+
+    Shared with the batched long-horizon env so both consume each env's
+    `random.Random` identically and produce the same trajectories under a seed.
+    """
+    strength = rng.betavariate(2.0, 2.2)
+    draw_potential = rng.betavariate(1.6, 2.4)
+    position = rng.random()
+    street_progress = rng.choice([0.0, 0.33, 0.66, 1.0])
+    active_opponents = rng.choice([1, 1, 2, 3, 4])
+    to_call = rng.choice([0.0, 0.05, 0.1, 0.2, 0.35])
+    bet_size = rng.choice([0.04, 0.08, 0.16, 0.25])
+    pot_size = rng.uniform(0.05, 0.6)
+    raise_count = rng.choice([0, 0, 1, 2, 3])
+    stack_ratio = rng.uniform(0.08, 1.0)
+    last_aggression = rng.random()
+    return (
+        strength,
+        draw_potential,
+        position,
+        street_progress,
+        active_opponents,
+        to_call,
+        bet_size,
+        pot_size,
+        raise_count,
+        stack_ratio,
+        last_aggression,
+    )
+
+
+def _draw_to_call(rng: random.Random, family: str, street_index: int):
+    pressure = rng.random()
+    if pressure < 0.45:
+        return 0.0
+    if family == "flh":
+        return 0.04 if street_index < 2 else 0.08
+    return rng.choice([0.04, 0.08, 0.14, 0.22])
+
+
+def _draw_advance_inputs(rng: random.Random, family: str, street_index: int, aggressive: bool):
+    """Random draws behind `BoardLongHorizonEnv._advance_scenario`, in draw order."""
+    realization = rng.uniform(0.02, 0.12)
+    draw_decay = rng.uniform(0.55, 0.9)
+    to_call = _draw_to_call(rng, family, street_index)
+    raise_count = 0 if to_call == 0 else rng.choice([0, 1, 2])
+    last_aggression = 1.0 if aggressive else rng.random()
+    return realization, draw_decay, to_call, raise_count, last_aggression
+
+
 def _estimate_equity(*, strength: float, draw_potential: float, street_progress: float, active_opponents: int, hi_lo: float):
     draw_weight = max(0.05, 0.4 * (1.0 - street_progress))
     multiway_penalty = max(0.55, 1.0 - active_opponents * 0.09)
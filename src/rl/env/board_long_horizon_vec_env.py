@@ -0,0 +1,390 @@
+"""Struct-of-arrays batched version of `BoardLongHorizonEnv`.
+
+`BoardLongHorizonVecEnv` advances N long-horizon board scenarios per call with
+auto-reset. Scenario fields live in per-field numpy arrays so the teacher,
+action mask, reward, EV shaping, showdown and observation math runs once per
+batch instead of once per env. Only the random draws stay per env: every
+sub-env owns its own `random.Random` and consumes it in exactly the same order
+as the scalar env, so env `i` of `BoardLongHorizonVecEnv(seed=s)` reproduces the
+trajectory of `BoardLongHorizonEnv(seed=s + i)` step for step.
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+from gymnasium import spaces
+
+from rl.env.board_betting_env import (
+    BOARD_ACTIONS,
+    BOARD_TIERS,
+    BOARD_VARIANTS,
+    NLH_BET_UNITS,
+    POSITION_BUCKETS,
+    POSITION_OPEN_FLOORS,
+    _draw_advance_inputs,
+    _draw_scenario_inputs,
+    _draw_to_call,
+)
+
+
+FOLD, CHECK, CALL, BET, RAISE, ALL_IN = range(len(BOARD_ACTIONS))
+POSITION_BUCKET_EDGES = np.array([0.14, 0.32, 0.52, 0.74, 0.88])
+LATE_CREDIT_BY_BUCKET = np.array([-0.05, -0.02, 0.03, 0.09, -0.01, 0.04])
+
+
+class BoardLongHorizonVecEnv:
+    """N independent `BoardLongHorizonEnv` copies stepped as one batch.
+
+    `step(actions)` returns batched `(obs, rewards, terminated, truncated,
+    infos)`. Finished envs are reset in the same call; their last observation
+    is reported in `infos["final_observation"]` (flagged by
+    `infos["_final_observation"]`) and the returned row is the first
+    observation of the next episode.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        family: str = "nlh",
+        tier: str = "beginner",
+        seed: int | None = None,
+        max_steps_per_episode: int = 12,
+    ):
+        if family not in BOARD_VARIANTS:
+            raise ValueError(f"Unsupported board family: {family}")
+        if tier not in BOARD_TIERS:
+            raise ValueError(f"Unsupported board tier: {tier}")
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        self.num_envs = int(num_envs)
+        self.family = family
+        self.tier = tier
+        self.max_steps_per_episode = int(max_steps_per_episode)
+        self.single_observation_space = spaces.Box(low=0.0, high=1.5, shape=(16,), dtype=np.float32)
+        self.single_action_space = spaces.Discrete(len(BOARD_ACTIONS))
+        self.observation_space = spaces.Box(low=0.0, high=1.5, shape=(self.num_envs, 16), dtype=np.float32)
+        self.action_space = spaces.MultiDiscrete(np.full(self.num_envs, len(BOARD_ACTIONS)))
+        self.randoms = [random.Random(None if seed is None else seed + index) for index in range(self.num_envs)]
+
+        n = self.num_envs
+        self.strength = np.zeros(n)
+        self.equity = np.zeros(n)
+        self.draw_potential = np.zeros(n)
+        self.position = np.zeros(n)
+        self.street_progress = np.zeros(n)
+        self.to_call = np.zeros(n)
+        self.bet_size = np.zeros(n)
+        self.pot_size = np.zeros(n)
+        self.raise_count = np.zeros(n, dtype=np.int64)
+        self.active_opponents = np.ones(n, dtype=np.int64)
+        self.stack_ratio = np.zeros(n)
+        self.last_aggression = np.zeros(n)
+        self.range_score = np.zeros(n)
+        self.hero_stack = np.zeros(n)
+        self.pot = np.zeros(n)
+        self.street_index = np.zeros(n, dtype=np.int64)
+        self.step_count = np.zeros(n, dtype=np.int64)
+        self.folded = np.zeros(n, dtype=bool)
+
+        # The scalar env samples (and discards) one scenario at construction.
+        for rng in self.randoms:
+            _draw_scenario_inputs(rng)
+
+    def reset(self, *, seed: int | None = None, options=None):
+        for index, rng in enumerate(self.randoms):
+            if seed is not None:
+                rng.seed(seed + index)
+            self._reset_env(index, reseeded=seed is not None)
+        self._refresh_estimates(np.arange(self.num_envs))
+        return self._observations(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        teacher = self.teacher_actions()
+        mask = self.legal_action_mask()
+        in_range = (actions >= 0) & (actions < len(BOARD_ACTIONS))
+        safe_actions = np.where(in_range, actions, CHECK)
+        legal = in_range & (mask[np.arange(self.num_envs), safe_actions] > 0)
+        rewards = self._reward_for_actions(safe_actions, teacher, mask)
+
+        contribution = self._contributions(safe_actions, legal)
+        self.hero_stack = np.where(legal, np.maximum(0.0, self.hero_stack - contribution), self.hero_stack)
+        self.pot = np.where(legal, self.pot + contribution, self.pot)
+
+        fold = legal & (safe_actions == FOLD)
+        self.folded |= fold
+        rewards = np.where(fold, rewards - self._fold_ev_penalty(), rewards)
+
+        playing = legal & ~fold
+        rewards = np.where(playing, rewards + self._ev_shaping(safe_actions), rewards)
+        self.step_count = np.where(playing, self.step_count + 1, self.step_count)
+        self.street_index = np.where(playing, np.minimum(3, self.street_index + 1), self.street_index)
+        showdown = playing & (
+            (self.step_count >= self.max_steps_per_episode) | (self.street_index >= 4) | (self.hero_stack <= 0.0)
+        )
+        rewards = np.where(showdown, rewards + self._showdown_reward(), rewards)
+        rewards = np.where(legal, rewards, -1.5)
+
+        terminated = ~legal | fold | showdown
+        terminal = np.full(self.num_envs, None, dtype=object)
+        terminal[~legal] = "illegal"
+        terminal[fold] = "fold"
+        terminal[showdown] = "showdown"
+
+        advancing = np.flatnonzero(playing & ~showdown)
+        if len(advancing):
+            self._advance_scenarios(advancing, safe_actions[advancing])
+
+        final_observation = self._observations()
+        done_indices = np.flatnonzero(terminated)
+        for index in done_indices:
+            self._reset_env(int(index), reseeded=False)
+        if len(done_indices):
+            self._refresh_estimates(done_indices)
+
+        infos = {
+            "teacherAction": teacher,
+            "terminal": terminal,
+            "final_observation": np.where(terminated[:, None], final_observation, 0.0).astype(np.float32),
+            "_final_observation": terminated.copy(),
+        }
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        return self._observations(), rewards.astype(np.float64), terminated, truncated, infos
+
+    def legal_action_mask(self):
+        mask = np.zeros((self.num_envs, len(BOARD_ACTIONS)), dtype=np.float32)
+        facing = self.to_call > 0
+        can_raise = (self.raise_count < 4) & (self.stack_ratio > 0.08)
+        mask[:, FOLD] = facing
+        mask[:, CALL] = facing
+        mask[:, CHECK] = ~facing
+        mask[:, BET] = ~facing
+        mask[:, RAISE] = can_raise
+        mask[:, ALL_IN] = np.where(
+            facing,
+            (self.stack_ratio < 0.18) | (self.equity > 0.8),
+            (self.stack_ratio < 0.16) & (self.equity > 0.55),
+        )
+        return mask
+
+    def teacher_actions(self):
+        """Vectorised `board_teacher_action` over the current scenarios."""
+        standard = self.tier == "standard"
+        pot_limit = self.family in {"plo", "plo8"}
+        hi_lo = self.family == "plo8"
+        equity = self.equity
+        pot_odds = self._pot_odds()
+        late_position = self.position > 0.62
+        multiway = self.active_opponents >= 3
+        preflop = self.street_progress <= 0.01
+        bucket = self._position_bucket_index()
+        range_score = np.where(self.range_score != 0, self.range_score, self._range_score_estimate())
+
+        value_threshold = np.full(self.num_envs, 0.63 if standard else 0.72)
+        continue_threshold = np.maximum(0.24 if standard else 0.31, pot_odds + np.where(multiway, 0.03, -0.02))
+        semi_bluff_threshold = 0.48 if standard else 0.58
+        open_floor = self._open_floors()[bucket] + (0.04 if not standard else 0.0)
+        preflop_continue = np.maximum(0.18, open_floor - np.where(bucket == POSITION_BUCKETS.index("BB"), 0.18, 0.08))
+        preflop_value = np.maximum(value_threshold, open_floor + (0.14 if pot_limit else 0.1))
+        continue_threshold = np.where(preflop, preflop_continue, continue_threshold)
+        value_threshold = np.where(preflop, preflop_value, value_threshold)
+
+        thin_value_spot = late_position & (self.strength >= 0.62) & (equity >= (0.58 if standard else 0.66))
+        isolation_spot = (
+            multiway
+            & late_position
+            & (equity >= (0.64 if standard else 0.72))
+            & ((self.draw_potential >= 0.22) if pot_limit else (self.strength >= 0.68))
+        )
+        scoop_pressure_spot = hi_lo & (equity >= (0.68 if standard else 0.75)) & (self.draw_potential >= 0.45)
+
+        facing_action = np.select(
+            [
+                preflop & (range_score < continue_threshold),
+                ((equity >= value_threshold) | (range_score >= value_threshold) | isolation_spot | scoop_pressure_spot)
+                & (self.raise_count < 4),
+                (equity >= continue_threshold)
+                | (range_score >= continue_threshold)
+                | (late_position & (self.draw_potential >= semi_bluff_threshold)),
+            ],
+            [FOLD, RAISE, CALL],
+            default=FOLD,
+        )
+        open_action = np.select(
+            [
+                preflop & (range_score < open_floor),
+                preflop,
+                (equity >= value_threshold) | (range_score >= value_threshold) | thin_value_spot,
+                standard & late_position & (self.draw_potential >= semi_bluff_threshold) & (self.last_aggression < 0.55),
+            ],
+            [CHECK, BET, BET, BET],
+            default=CHECK,
+        )
+        return np.where(self.to_call > 0, facing_action, open_action).astype(np.int64)
+
+    def _reset_env(self, index: int, *, reseeded: bool):
+        rng = self.randoms[index]
+        if not reseeded:
+            # BoardBettingEnv.reset samples a scenario that the long-horizon
+            # reset immediately replaces; an explicit seed reseeds in between.
+            _draw_scenario_inputs(rng)
+        self.step_count[index] = 0
+        self.hero_stack[index] = rng.uniform(0.7, 1.2)
+        self.pot[index] = rng.uniform(0.04, 0.12)
+        self.street_index[index] = 0
+        self.folded[index] = False
+        (
+            strength,
+            draw_potential,
+            position,
+            _street_progress,
+            active_opponents,
+            _to_call,
+            bet_size,
+            _pot_size,
+            raise_count,
+            _stack_ratio,
+            last_aggression,
+        ) = _draw_scenario_inputs(rng)
+        self.strength[index] = strength
+        self.draw_potential[index] = draw_potential
+        self.position[index] = position
+        self.active_opponents[index] = active_opponents
+        self.bet_size[index] = bet_size
+        self.raise_count[index] = raise_count
+        self.last_aggression[index] = last_aggression
+        self.street_progress[index] = 0 / 3.0
+        self.pot_size[index] = self.pot[index]
+        self.stack_ratio[index] = self.hero_stack[index]
+        self.to_call[index] = _draw_to_call(rng, self.family, 0)
+
+    def _advance_scenarios(self, indices: np.ndarray, actions: np.ndarray):
+        aggressive = (actions == BET) | (actions == RAISE)
+        draws = [
+            _draw_advance_inputs(self.randoms[index], self.family, int(self.street_index[index]), bool(is_aggressive))
+            for index, is_aggressive in zip(indices.tolist(), aggressive.tolist())
+        ]
+        realization, draw_decay, to_call, raise_count, last_aggression = (np.array(column) for column in zip(*draws))
+        aggression_boost = np.where(aggressive, 0.04, 0.0)
+        draw_realization = self.draw_potential[indices] * realization
+        self.strength[indices] = np.clip(self.strength[indices] + draw_realization + aggression_boost, 0.02, 0.98)
+        self.draw_potential[indices] = np.clip(self.draw_potential[indices] * draw_decay, 0.0, 1.0)
+        self.street_progress[indices] = self.street_index[indices] / 3.0
+        self.pot_size[indices] = self.pot[indices]
+        self.stack_ratio[indices] = self.hero_stack[indices]
+        self.to_call[indices] = to_call
+        self.raise_count[indices] = raise_count
+        self.last_aggression[indices] = last_aggression
+        self._refresh_estimates(indices)
+
+    def _refresh_estimates(self, indices: np.ndarray):
+        draw_weight = np.maximum(0.05, 0.4 * (1.0 - self.street_progress[indices]))
+        multiway_penalty = np.maximum(0.55, 1.0 - self.active_opponents[indices] * 0.09)
+        split_bonus = 0.08 if self.family == "plo8" else 0.0
+        self.equity[indices] = np.clip(
+            (self.strength[indices] * 0.72 + self.draw_potential[indices] * draw_weight + split_bonus) * multiway_penalty,
+            0.0,
+            1.0,
+        )
+        self.range_score[indices] = self._range_score_estimate()[indices]
+
+    def _range_score_estimate(self):
+        late_credit = LATE_CREDIT_BY_BUCKET[self._position_bucket_index()]
+        pot_limit = self.family in {"plo", "plo8"}
+        multiway_penalty = np.maximum(0, self.active_opponents - 1) * (0.035 if pot_limit else 0.02)
+        if pot_limit:
+            nut_potential = self.draw_potential * (0.62 if self.family == "plo" else 0.5)
+            made_component = self.strength * (0.42 if self.family == "plo" else 0.34)
+            scoop_bonus = np.where(
+                (self.family == "plo8") & (self.draw_potential >= 0.48) & (self.strength >= 0.42), 0.12, 0.0
+            )
+            return np.clip(made_component + nut_potential + scoop_bonus + late_credit - multiway_penalty, 0.0, 1.0)
+        suited_connector_proxy = self.draw_potential * 0.22
+        made_component = self.strength * (0.66 if self.family == "nlh" else 0.58)
+        return np.clip(made_component + suited_connector_proxy + late_credit - multiway_penalty, 0.0, 1.0)
+
+    def _position_bucket_index(self):
+        return np.digitize(self.position, POSITION_BUCKET_EDGES)
+
+    def _open_floors(self):
+        floors = POSITION_OPEN_FLOORS[self.family]
+        return np.array([floors[bucket] for bucket in POSITION_BUCKETS])
+
+    def _pot_odds(self):
+        return np.where(self.to_call > 0, self.to_call / np.maximum(0.01, self.pot_size + self.to_call), 0.0)
+
+    def _reward_for_actions(self, actions: np.ndarray, teacher: np.ndarray, mask: np.ndarray):
+        legal = mask[np.arange(self.num_envs), actions] > 0
+        pot_odds = self._pot_odds()
+        passive = (actions == CALL) | (actions == CHECK)
+        aggressive = (actions == BET) | (actions == RAISE)
+        teacher_passive = (teacher == CALL) | (teacher == CHECK)
+        teacher_aggressive = (teacher == BET) | (teacher == RAISE)
+        reward = np.full(self.num_envs, -0.35)
+        reward = np.where(passive & teacher_aggressive & (self.equity > 0.55), -0.1, reward)
+        reward = np.where(aggressive & teacher_passive & (self.equity > 0.62), -0.05, reward)
+        reward = np.where((actions == FOLD) & (self.equity > np.maximum(0.35, pot_odds)), reward - 0.55, reward)
+        reward = np.where(((actions == RAISE) | (actions == ALL_IN)) & (self.equity < 0.38), reward - 0.55, reward)
+        if self.family == "flh":
+            reward = np.where(actions == ALL_IN, reward - 0.4, reward)
+        reward = np.where(actions == teacher, 1.0, reward)
+        return np.where(legal, reward, -1.4)
+
+    def _contributions(self, actions: np.ndarray, legal: np.ndarray):
+        unit = np.where((self.family == "flh") & (self.street_index < 2), 0.04, 0.08)
+        if self.family in {"plo", "plo8"}:
+            unit = np.minimum(np.maximum(0.05, self.pot), 0.35)
+        sizing = legal & ((actions == BET) | (actions == RAISE))
+        if self.family == "nlh":
+            unit = unit.copy()
+            for index in np.flatnonzero(sizing):
+                unit[index] = self.randoms[index].choice(NLH_BET_UNITS)
+        sized = np.minimum(self.hero_stack, np.maximum(unit, self.to_call + unit))
+        contribution = np.zeros(self.num_envs)
+        contribution = np.where(actions == CALL, np.minimum(self.hero_stack, self.to_call), contribution)
+        contribution = np.where(actions == ALL_IN, self.hero_stack, contribution)
+        return np.where(sizing, sized, contribution)
+
+    def _ev_shaping(self, actions: np.ndarray):
+        equity_edge = self.equity - self._pot_odds()
+        aggressive = 0.35 * equity_edge + np.where(self.position > 0.65, 0.1, 0.0)
+        shaping = np.zeros(self.num_envs)
+        shaping = np.where((actions == BET) | (actions == RAISE), aggressive, shaping)
+        shaping = np.where(actions == CALL, 0.22 * equity_edge, shaping)
+        return np.where(actions == CHECK, np.where(self.equity < 0.55, 0.05, -0.04), shaping)
+
+    def _fold_ev_penalty(self):
+        return np.where(self.equity > np.maximum(0.36, self._pot_odds() + 0.04), 0.45, -0.08)
+
+    def _showdown_reward(self):
+        pressure = 0.04 * np.maximum(0, self.active_opponents - 1)
+        win_probability = np.clip(self.equity - pressure, 0.02, 0.95)
+        expected_pot = self.pot * win_probability
+        investment_penalty = np.maximum(0.0, 1.0 - self.hero_stack) * 0.35
+        return expected_pot - investment_penalty
+
+    def _observations(self):
+        no_limit = 1.0 if self.family == "nlh" else 0.0
+        return np.stack(
+            [
+                self.to_call,
+                self.bet_size,
+                self.pot_size,
+                self.strength,
+                self.equity,
+                self.draw_potential,
+                self.position,
+                self.street_progress,
+                self._pot_odds(),
+                self.raise_count / 4.0,
+                np.full(self.num_envs, 1.0 if self.family == "plo8" else 0.0),
+                np.full(self.num_envs, 1.0 if self.family in {"plo", "plo8"} else 0.0),
+                np.full(self.num_envs, 1.0 if self.family == "flh" else 0.0),
+                np.minimum(1.0, self.active_opponents / 5.0),
+                self.stack_ratio,
+                np.full(self.num_envs, no_limit),
+            ],
+            axis=1,
+        ).astype(np.float32)
@@ -62,12 +62,29 @@ class StudBettingEnv(gym.Env):
         self.scenario = self._sample_scenario()
         return self._observation(), {}
 
+    def sample_scenario(self) -> StudScenario:
+        """Draw a new scenario into `self.scenario` without gym's `reset()` bookkeeping."""
+        self.scenario = self._sample_scenario()
+        return self.scenario
+
+    def observation(self):
+        """Observation vector for the current scenario."""
+        return self._observation()
+
     def step(self, action: int):
         action = int(action)
         teacher = stud_teacher_action(self.scenario)
         reward = self._reward_for_action(action, teacher)
         return self._observation(), float(reward), True, False, {"teacherAction": teacher}
 
+    def action_rewards(self, teacher: int | None = None):
+        """Closed-form one-step reward for every action in the current scenario."""
+        teacher = stud_teacher_action(self.scenario) if teacher is None else int(teacher)
+        return np.array(
+            [self._reward_for_action(action, teacher) for action in range(len(STUD_ACTIONS))],
+            dtype=np.float32,
+        )
+
     def legal_action_mask(self):
         mask = np.zeros(len(STUD_ACTIONS), dtype=np.float32)
         if self.scenario.to_call > 0:
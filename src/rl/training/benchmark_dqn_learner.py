@@ -0,0 +1,165 @@
+"""Throughput benchmark for the CPU DQN learner.
+
+Times `DQNAgent.update` on synthetic Badugi-shaped batches (96 features, six
+actions) for the stock configuration and for a tuned `CpuLearnerConfig`, and
+reports updates/second and samples/second for both. Samples/second is the fair
+comparison when the tuned run uses a larger fused batch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from rl.agents.dqn_agent import (
+    CpuLearnerConfig,
+    DQNAgent,
+    DQNHyperParams,
+    configure_cpu_threads,
+    cpu_bf16_supported,
+)
+
+
+def synthetic_batch(rng: np.random.Generator, batch_size: int, obs_dim: int, n_actions: int):
+    masks = rng.random((batch_size, n_actions)) < 0.7
+    masks[:, 0] = True
+    return {
+        "obs": rng.standard_normal((batch_size, obs_dim)).astype(np.float32),
+        "actions": rng.integers(0, n_actions, size=batch_size).astype(np.int64),
+        "rewards": rng.standard_normal(batch_size).astype(np.float32),
+        "next_obs": rng.standard_normal((batch_size, obs_dim)).astype(np.float32),
+        "dones": (rng.random(batch_size) < 0.1).astype(np.float32),
+        "next_action_masks": masks,
+    }
+
+
+def time_updates(
+    learner: CpuLearnerConfig,
+    *,
+    batch_size: int,
+    updates: int,
+    warmup_updates: int,
+    obs_dim: int,
+    n_actions: int,
+    hidden_dim: int,
+    seed: int,
+):
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    threads = configure_cpu_threads(learner)
+    agent = DQNAgent(
+        obs_dim=obs_dim,
+        n_actions=n_actions,
+        device="cpu",
+        hidden_dim=hidden_dim,
+        hyperparams=DQNHyperParams(lr=1e-4, batch_size=batch_size),
+        learner=learner,
+    )
+    batches = [synthetic_batch(rng, batch_size, obs_dim, n_actions) for _ in range(8)]
+    for index in range(warmup_updates):
+        agent.update(batches[index % len(batches)])
+    started = time.perf_counter()
+    loss = 0.0
+    for index in range(updates):
+        loss, _mean_q = agent.update(batches[index % len(batches)])
+    elapsed = max(1e-9, time.perf_counter() - started)
+    return {
+        "batchSize": int(batch_size),
+        "threads": int(threads),
+        "gradAccumSteps": int(learner.grad_accum_steps),
+        "bf16": bool(agent.use_bf16),
+        "compile": bool(learner.compile),
+        "updates": int(updates),
+        "seconds": float(elapsed),
+        "updatesPerSecond": float(updates / elapsed),
+        "samplesPerSecond": float(updates * batch_size / elapsed),
+        "finalLoss": float(loss),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark DQNAgent.update throughput on CPU.")
+    parser.add_argument("--obs-dim", type=int, default=96)
+    parser.add_argument("--n-actions", type=int, default=6)
+    parser.add_argument("--hidden-dim", type=int, default=256)
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--warmup-updates", type=int, default=20)
+    parser.add_argument("--baseline-batch-size", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--grad-accum-steps", type=int, default=1)
+    parser.add_argument("--learner-threads", type=int, default=0)
+    parser.add_argument("--actor-processes", type=int, default=0)
+    parser.add_argument("--bf16", action="store_true")
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", default=None)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    default_threads = torch.get_num_threads()
+    common = {
+        "updates": args.updates,
+        "warmup_updates": args.warmup_updates,
+        "obs_dim": args.obs_dim,
+        "n_actions": args.n_actions,
+        "hidden_dim": args.hidden_dim,
+        "seed": args.seed,
+    }
+    baseline = time_updates(
+        CpuLearnerConfig(num_threads=default_threads),
+        batch_size=args.baseline_batch_size,
+        **common,
+    )
+    tuned = time_updates(
+        CpuLearnerConfig(
+            num_threads=args.learner_threads,
+            actor_processes=args.actor_processes,
+            grad_accum_steps=args.grad_accum_steps,
+            bf16=args.bf16,
+            compile=args.compile,
+        ),
+        batch_size=args.batch_size,
+        **common,
+    )
+    report = {
+        "obsDim": args.obs_dim,
+        "nActions": args.n_actions,
+        "hiddenDim": args.hidden_dim,
+        "cpuBf16Supported": cpu_bf16_supported(),
+        "baseline": baseline,
+        "tuned": tuned,
+        "samplesPerSecondSpeedup": tuned["samplesPerSecond"] / baseline["samplesPerSecond"],
+    }
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name in ("baseline", "tuned"):
+        row = report[name]
+        print(
+            f"[Learner {name:8s}] batch={row['batchSize']:5d} threads={row['threads']:2d} "
+            f"accum={row['gradAccumSteps']} bf16={row['bf16']} compile={row['compile']} "
+            f"updates/s={row['updatesPerSecond']:9.1f} samples/s={row['samplesPerSecond']:10.0f}"
+        )
+    print(f"samples/s speedup: {report['samplesPerSecondSpeedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
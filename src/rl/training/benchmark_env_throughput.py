@@ -0,0 +1,281 @@
+"""Raw-speed benchmark for the RL training environments.
+
+Play-quality benchmarks live in `benchmark_*_human_practice.py`; this one only
+measures hot-path cost so regressions are caught before merge. For each env it
+reports steps/s under a random legal policy (auto-resetting on episode end),
+resets/s, and traced allocation per live env. Evaluators, teachers and
+observation builders are timed in isolation as µs/call.
+
+Results can be written as a baseline and later runs compared against it; a
+throughput drop (or memory growth) beyond `--tolerance` fails the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from rl.env.badugi_env import BadugiEnv, build_deck as build_badugi_deck, evaluate_badugi
+from rl.env.board_betting_env import (
+    BoardBettingEnv,
+    BoardLongHorizonEnv,
+    board_teacher_action,
+    make_board_observation,
+)
+from rl.env.draw_lowball_env import (
+    DrawLowballEnv,
+    build_deck as build_draw_deck,
+    draw_teacher_action,
+    evaluate_lowball,
+)
+from rl.env.stud_betting_env import StudBettingEnv, make_stud_observation, stud_teacher_action
+from rl.training.badugi_starting_ranges import teacher_action as badugi_teacher_action
+
+
+DEFAULT_REPORT = PROJECT_ROOT / "rl/evaluations/env_throughput_benchmark.json"
+DEFAULT_BASELINE = PROJECT_ROOT / "rl/evaluations/env_throughput_baseline.json"
+
+ENV_FACTORIES: dict[str, Callable[[int], Any]] = {
+    "BadugiEnv": lambda seed: BadugiEnv(),
+    "DrawLowballEnv": lambda seed: DrawLowballEnv(seed=seed),
+    "BoardBettingEnv": lambda seed: BoardBettingEnv(family="nlh", tier="standard", seed=seed),
+    "BoardLongHorizonEnv": lambda seed: BoardLongHorizonEnv(family="nlh", tier="standard", seed=seed),
+    "StudBettingEnv": lambda seed: StudBettingEnv(family="stud", tier="standard", seed=seed),
+}
+
+# Higher is better for these keys; memory keys are lower-is-better.
+THROUGHPUT_KEYS = ("stepsPerSecond", "resetsPerSecond", "callsPerSecond")
+MEMORY_KEYS = ("bytesPerEnv",)
+
+
+def _random_legal_action(env, rng: random.Random) -> int:
+    legal = np.flatnonzero(env.legal_action_mask() > 0)
+    if len(legal) == 0:
+        return rng.randrange(env.action_space.n)
+    return int(legal[rng.randrange(len(legal))])
+
+
+def benchmark_env(name: str, *, steps: int, resets: int, memory_envs: int, seed: int) -> dict:
+    random.seed(seed)
+    np.random.seed(seed)
+    rng = random.Random(seed)
+    env = ENV_FACTORIES[name](seed)
+    env.reset(seed=seed)
+    episodes = 0
+    started = time.perf_counter()
+    for _ in range(steps):
+        _obs, _reward, terminated, truncated, _info = env.step(_random_legal_action(env, rng))
+        if terminated or truncated:
+            episodes += 1
+            env.reset()
+    step_seconds = max(1e-9, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    reset_seconds = max(1e-9, time.perf_counter() - started)
+    env.close()
+
+    gc.collect()
+    tracemalloc.start()
+    baseline_bytes, _peak = tracemalloc.get_traced_memory()
+    envs = [ENV_FACTORIES[name](seed + index) for index in range(memory_envs)]
+    for item in envs:
+        item.reset()
+    current_bytes, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del envs
+
+    return {
+        "steps": int(steps),
+        "episodes": int(episodes),
+        "stepsPerSecond": float(steps / step_seconds),
+        "resets": int(resets),
+        "resetsPerSecond": float(resets / reset_seconds),
+        "bytesPerEnv": int((current_bytes - baseline_bytes) / max(1, memory_envs)),
+    }
+
+
+def _function_cases(seed: int) -> dict[str, Callable[[], Any]]:
+    rng = random.Random(seed)
+    random.seed(seed)
+    badugi_env = BadugiEnv()
+    badugi_env.reset()
+    badugi_deck = build_badugi_deck()
+    badugi_hands = [rng.sample(badugi_deck, 4) for _ in range(256)]
+    draw_env = DrawLowballEnv(seed=seed)
+    draw_deck = build_draw_deck()
+    draw_hands = [rng.sample(draw_deck, 5) for _ in range(256)]
+    board_env = BoardBettingEnv(family="nlh", tier="standard", seed=seed)
+    board_scenarios = [board_env.sample_scenario() for _ in range(256)]
+    stud_env = StudBettingEnv(family="stud", tier="standard", seed=seed)
+    stud_scenarios = [stud_env.sample_scenario() for _ in range(256)]
+
+    def cycle(items: list, fn: Callable[[Any], Any]) -> Callable[[], Any]:
+        state = {"index": 0}
+
+        def call():
+            index = state["index"]
+            state["index"] = (index + 1) % len(items)
+            return fn(items[index])
+
+        return call
+
+    return {
+        "evaluate_badugi": cycle(badugi_hands, evaluate_badugi),
+        "badugi_teacher_action": lambda: badugi_teacher_action(badugi_env),
+        "evaluate_lowball": cycle(draw_hands, lambda hand: evaluate_lowball(hand, "low-27")),
+        "draw_teacher_action": lambda: draw_teacher_action(draw_env),
+        "board_sample_scenario": board_env.sample_scenario,
+        "make_board_observation": cycle(board_scenarios, make_board_observation),
+        "board_teacher_action": cycle(board_scenarios, board_teacher_action),
+        "stud_sample_scenario": stud_env.sample_scenario,
+        "make_stud_observation": cycle(stud_scenarios, make_stud_observation),
+        "stud_teacher_action": cycle(stud_scenarios, stud_teacher_action),
+    }
+
+
+def benchmark_functions(*, calls: int, seed: int) -> dict:
+    results = {}
+    for name, fn in _function_cases(seed).items():
+        for _ in range(min(calls, 50)):
+            fn()
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        seconds = max(1e-9, time.perf_counter() - started)
+        results[name] = {
+            "calls": int(calls),
+            "microsecondsPerCall": float(seconds * 1e6 / calls),
+            "callsPerSecond": float(calls / seconds),
+        }
+    return results
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Return one row per metric that regressed by more than `tolerance`."""
+    regressions = []
+    for section in ("envs", "functions"):
+        for name, current in report.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous:
+                continue
+            for key in THROUGHPUT_KEYS + MEMORY_KEYS:
+                if key not in current or not previous.get(key):
+                    continue
+                ratio = float(current[key]) / float(previous[key])
+                regressed = ratio < 1.0 - tolerance if key in THROUGHPUT_KEYS else ratio > 1.0 + tolerance
+                if regressed:
+                    regressions.append(
+                        {
+                            "section": section,
+                            "name": name,
+                            "metric": key,
+                            "baseline": previous[key],
+                            "current": current[key],
+                            "ratio": ratio,
+                        }
+                    )
+    return regressions
+
+
+def build_report(args) -> dict:
+    env_names = [item.strip() for item in args.envs.split(",") if item.strip()]
+    unknown = sorted(set(env_names) - set(ENV_FACTORIES))
+    if unknown:
+        raise ValueError(f"Unknown env(s): {', '.join(unknown)}")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "envs": {
+            name: benchmark_env(
+                name,
+                steps=args.steps,
+                resets=args.resets,
+                memory_envs=args.memory_envs,
+                seed=args.seed,
+            )
+            for name in env_names
+        },
+        "functions": benchmark_functions(calls=args.function_calls, seed=args.seed) if args.function_calls > 0 else {},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RL environment step/reset throughput and hot functions.")
+    parser.add_argument("--envs", default=",".join(ENV_FACTORIES))
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--resets", type=int, default=5_000)
+    parser.add_argument("--memory-envs", type=int, default=32)
+    parser.add_argument("--function-calls", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", default=str(DEFAULT_REPORT))
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--write-baseline", action="store_true", help="Store this run as the comparison baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--report-only", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = build_report(args)
+    baseline_path = Path(args.baseline)
+    regressions: list[dict] = []
+    if baseline_path.exists() and not args.write_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf8"))
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        report["baseline"] = str(baseline_path)
+    report["tolerance"] = args.tolerance
+    report["regressions"] = regressions
+    report["passed"] = not regressions
+
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf8")
+    if args.write_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf8")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, row in report["envs"].items():
+            print(
+                f"[ENV SPEED] {name:20s} steps/s={row['stepsPerSecond']:10.0f} "
+                f"resets/s={row['resetsPerSecond']:10.0f} bytes/env={row['bytesPerEnv']:8d}"
+            )
+        for name, row in report["functions"].items():
+            print(f"[FN SPEED]  {name:24s} {row['microsecondsPerCall']:9.2f} us/call")
+        for row in regressions:
+            print(
+                f"[REGRESSION] {row['section']}.{row['name']}.{row['metric']} "
+                f"baseline={row['baseline']:.1f} current={row['current']:.1f} ratio={row['ratio']:.2f}"
+            )
+        print(f"report: {report_path}")
+        if args.write_baseline:
+            print(f"baseline: {baseline_path}")
+    if regressions and not args.report_only:
+        raise SystemExit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
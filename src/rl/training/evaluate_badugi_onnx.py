@@ -24,6 +24,7 @@ if str(SRC_ROOT) not in sys.path:
     sys.path.insert(0, str(SRC_ROOT))
 
 from rl.env.badugi_env import BadugiEnv
+from badugi_model_registry import DEFAULT_REGISTRY_PATH, ModelRegistry
 
 DEFAULT_MODEL = PROJECT_ROOT / "public/models/badugi_worldmaster_v1.onnx"
 
@@ -71,13 +72,15 @@ def evaluate_model(
     opponent_profile: str = "balanced",
     table_size: int = 2,
     feature_set: str = "badugi-observation-v1-ev-range",
+    session: ort.InferenceSession | None = None,
 ) -> dict:
-    if not model.exists():
-        raise FileNotFoundError(f"ONNX model not found: {model}")
+    if session is None:
+        if not model.exists():
+            raise FileNotFoundError(f"ONNX model not found: {model}")
+        session = ort.InferenceSession(str(model), providers=["CPUExecutionProvider"])
 
     random.seed(seed)
     np.random.seed(seed)
-    session = ort.InferenceSession(str(model), providers=["CPUExecutionProvider"])
     input_shape = [dim if isinstance(dim, int) else None for dim in session.get_inputs()[0].shape]
     output_shape = [dim if isinstance(dim, int) else None for dim in session.get_outputs()[0].shape]
 
@@ -188,6 +191,12 @@ def evaluate_model(
 def parse_args():
     parser = argparse.ArgumentParser(description="Evaluate a Badugi ONNX policy.")
     parser.add_argument("--model", default=str(DEFAULT_MODEL))
+    parser.add_argument(
+        "--model-id",
+        default=None,
+        help="Load this registry model (checksum-verified) instead of --model; its featureSet is used.",
+    )
+    parser.add_argument("--registry", default=str(DEFAULT_REGISTRY_PATH))
     parser.add_argument("--episodes", type=int, default=500)
     parser.add_argument("--max-steps", type=int, default=200)
     parser.add_argument("--epsilon", type=float, default=0.0)
@@ -196,7 +205,7 @@ def parse_args():
     parser.add_argument("--table-size", type=int, default=2)
     parser.add_argument(
         "--feature-set",
-        default="badugi-observation-v1-ev-range",
+        default=None,
         choices=["badugi-observation-v1", "badugi-observation-v1-ev", "badugi-observation-v1-ev-range"],
     )
     parser.add_argument("--json", action="store_true")
@@ -205,15 +214,23 @@ def parse_args():
 
 def main():
     args = parse_args()
+    model = Path(args.model)
+    feature_set = args.feature_set
+    session = None
+    if args.model_id:
+        handle = ModelRegistry(Path(args.registry)).get(args.model_id)
+        model, session = handle.path, handle.session
+        feature_set = feature_set or handle.entry.get("featureSet") or "badugi-observation-v1"
     result = evaluate_model(
-        model=Path(args.model),
+        model=model,
         episodes=args.episodes,
         max_steps=args.max_steps,
         epsilon=args.epsilon,
         seed=args.seed,
         opponent_profile=args.opponent_profile,
         table_size=args.table_size,
-        feature_set=args.feature_set,
+        feature_set=feature_set or "badugi-observation-v1-ev-range",
+        session=session,
     )
     if args.json:
         print(json.dumps(result, indent=2))
@@ -57,6 +57,7 @@ def export_checkpoint(
     model_id: str,
     update_registry: bool,
     device: str,
+    dynamic_batch: bool = False,
 ):
     if not checkpoint.exists():
         raise FileNotFoundError(f"Checkpoint not found: {checkpoint}")
@@ -68,13 +69,22 @@ def export_checkpoint(
         raise ValueError(f"Expected n_actions {OUTPUT_SIZE}, got {agent.n_actions}")
 
     agent.q_network.eval()
-    dummy = torch.zeros(INPUT_SIZE, dtype=torch.float32, device=agent.device)
+    # The frontend adapter feeds one rank-1 vector. `dynamic_batch` exports a
+    # `(batch, 96)` input instead, which the backend DecisionBatcher can run in
+    # one session call; register such a file under its own model id.
+    if dynamic_batch:
+        dummy = torch.zeros((1, INPUT_SIZE), dtype=torch.float32, device=agent.device)
+        dynamic_axes = {"input": {0: "batch"}, "output": {0: "batch"}}
+    else:
+        dummy = torch.zeros(INPUT_SIZE, dtype=torch.float32, device=agent.device)
+        dynamic_axes = None
     torch.onnx.export(
         agent.q_network,
         dummy,
         str(output),
         input_names=["input"],
         output_names=["output"],
+        dynamic_axes=dynamic_axes,
         opset_version=18,
         # Keep production assets browser-friendly: one .onnx file under
         # public/models instead of a model file plus external .onnx.data.
@@ -99,6 +109,11 @@ def parse_args():
     parser.add_argument("--model-id", default=DEFAULT_MODEL_ID)
     parser.add_argument("--device", default="cpu")
     parser.add_argument("--no-update-registry", action="store_true")
+    parser.add_argument(
+        "--dynamic-batch",
+        action="store_true",
+        help="export a (batch, 96) input for backend batched inference (not loadable by the frontend adapter)",
+    )
     parser.add_argument("--json", action="store_true")
     return parser.parse_args()
 
@@ -112,6 +127,7 @@ def main():
         model_id=args.model_id,
         update_registry=not args.no_update_registry,
         device=args.device,
+        dynamic_batch=args.dynamic_batch,
     )
     if args.json:
         print(json.dumps(result, indent=2))
@@ -25,6 +25,8 @@ from rl.env.board_betting_env import (
     BoardLongHorizonEnv,
     board_teacher_action,
 )
+from rl.env.board_long_horizon_vec_env import BoardLongHorizonVecEnv
+from rl.training.contextual_bandit import train_contextual_bandit
 from rl.utils.replay_buffer import ReplayBuffer
 
 
@@ -53,6 +55,14 @@ class BoardTrainConfig:
     log_interval: int = 500
     fixture_replay_copies: int = 120
     resume_checkpoint: str | None = None
+    bandit: bool = False
+    bandit_pool_size: int = 16_000
+    bandit_batch_size: int = 512
+    bandit_updates: int = 800
+    bandit_learning_rate: float = 1e-3
+    bandit_fixture_ratio: float = 0.25
+    seed: int | None = None
+    num_envs: int = 1
 
 
 def linear_epsilon_decay(episode: int, start_eps: float, end_eps: float, decay_episodes: int) -> float:
@@ -61,34 +71,44 @@ def linear_epsilon_decay(episode: int, start_eps: float, end_eps: float, decay_e
     return start_eps + (episode / float(decay_episodes)) * (end_eps - start_eps)
 
 
+def board_fixture_specs(family: str):
+    return [
+        # Base gate: value open / strong continue / weak fold.
+        {"strength": 0.85, "equity": 0.82, "draw": 0.15, "to_call": 0.0, "position": 0.7, "expected": 3},
+        {"strength": 0.78, "equity": 0.74, "draw": 0.1, "to_call": 0.12, "position": 0.5, "expected": 4},
+        {"strength": 0.45, "equity": 0.42, "draw": 0.72, "to_call": 0.08, "position": 0.85, "expected": 2},
+        {"strength": 0.2, "equity": 0.18, "draw": 0.1, "to_call": 0.2, "position": 0.2, "expected": 0},
+        {"strength": 0.38, "equity": 0.34, "draw": 0.35, "to_call": 0.0, "position": 0.4, "expected": 1},
+        # Advanced gate: thin value, bluff discipline, isolation, side-pot control.
+        {"strength": 0.66, "equity": 0.61, "draw": 0.05, "to_call": 0.0, "position": 0.9, "expected": 3},
+        {"strength": 0.22, "equity": 0.24, "draw": 0.1, "to_call": 0.0, "position": 0.35, "expected": 1},
+        {"strength": 0.72, "equity": 0.68, "draw": 0.28 if family in {"plo", "plo8"} else 0.12, "to_call": 0.08, "position": 0.72, "expected": 4 if family != "flh" else 2, "active_opponents": 3},
+        {"strength": 0.34, "equity": 0.31, "draw": 0.16, "to_call": 0.2, "position": 0.5, "expected": 2},
+        {"strength": 0.64 if family == "plo8" else 0.58, "equity": 0.72 if family == "plo8" else 0.52, "draw": 0.62 if family == "plo8" else 0.22, "to_call": 0.1, "position": 0.7, "expected": 4 if family == "plo8" else 2},
+    ]
+
+
+def apply_board_fixture(env: BoardBettingEnv, fixture) -> int:
+    """Reset `env` onto a fixture scenario and return its (legal) expected action."""
+    env.reset()
+    env.scenario.strength = fixture["strength"]
+    env.scenario.equity = fixture["equity"]
+    env.scenario.draw_potential = fixture["draw"]
+    env.scenario.to_call = fixture["to_call"]
+    env.scenario.position = fixture["position"]
+    env.scenario.active_opponents = fixture.get("active_opponents", env.scenario.active_opponents)
+    env.scenario.raise_count = 0
+    action = fixture["expected"]
+    if env.legal_action_mask()[action] <= 0:
+        action = board_teacher_action(env.scenario)
+    return action
+
+
 def add_board_fixture_examples(env: BoardBettingEnv, replay: ReplayBuffer, expert: ReplayBuffer, copies: int):
     for _ in range(max(0, copies)):
-        for fixture in [
-            # Base gate: value open / strong continue / weak fold.
-            {"strength": 0.85, "equity": 0.82, "draw": 0.15, "to_call": 0.0, "position": 0.7, "expected": 3},
-            {"strength": 0.78, "equity": 0.74, "draw": 0.1, "to_call": 0.12, "position": 0.5, "expected": 4},
-            {"strength": 0.45, "equity": 0.42, "draw": 0.72, "to_call": 0.08, "position": 0.85, "expected": 2},
-            {"strength": 0.2, "equity": 0.18, "draw": 0.1, "to_call": 0.2, "position": 0.2, "expected": 0},
-            {"strength": 0.38, "equity": 0.34, "draw": 0.35, "to_call": 0.0, "position": 0.4, "expected": 1},
-            # Advanced gate: thin value, bluff discipline, isolation, side-pot control.
-            {"strength": 0.66, "equity": 0.61, "draw": 0.05, "to_call": 0.0, "position": 0.9, "expected": 3},
-            {"strength": 0.22, "equity": 0.24, "draw": 0.1, "to_call": 0.0, "position": 0.35, "expected": 1},
-            {"strength": 0.72, "equity": 0.68, "draw": 0.28 if env.family in {"plo", "plo8"} else 0.12, "to_call": 0.08, "position": 0.72, "expected": 4 if env.family != "flh" else 2, "active_opponents": 3},
-            {"strength": 0.34, "equity": 0.31, "draw": 0.16, "to_call": 0.2, "position": 0.5, "expected": 2},
-            {"strength": 0.64 if env.family == "plo8" else 0.58, "equity": 0.72 if env.family == "plo8" else 0.52, "draw": 0.62 if env.family == "plo8" else 0.22, "to_call": 0.1, "position": 0.7, "expected": 4 if env.family == "plo8" else 2},
-        ]:
-            env.reset()
-            env.scenario.strength = fixture["strength"]
-            env.scenario.equity = fixture["equity"]
-            env.scenario.draw_potential = fixture["draw"]
-            env.scenario.to_call = fixture["to_call"]
-            env.scenario.position = fixture["position"]
-            env.scenario.active_opponents = fixture.get("active_opponents", env.scenario.active_opponents)
-            env.scenario.raise_count = 0
+        for fixture in board_fixture_specs(env.family):
+            action = apply_board_fixture(env, fixture)
             obs = env._observation()
-            action = fixture["expected"]
-            if env.legal_action_mask()[action] <= 0:
-                action = board_teacher_action(env.scenario)
             replay.add(obs, action, 0.35, obs, False, next_action_mask=env.legal_action_mask())
             expert.add(obs, action, 0.35, obs, False, next_action_mask=env.legal_action_mask())
 
@@ -99,7 +119,9 @@ def train_board_dqn(cfg: BoardTrainConfig | None = None, device: str | torch.dev
     output_dir.mkdir(parents=True, exist_ok=True)
 
     env_class = BoardLongHorizonEnv if cfg.long_horizon else BoardBettingEnv
-    env = env_class(family=cfg.family, tier=cfg.tier, max_steps_per_episode=cfg.max_steps_per_episode) if cfg.long_horizon else env_class(family=cfg.family, tier=cfg.tier)
+    if cfg.seed is not None:
+        torch.manual_seed(cfg.seed)
+    env = env_class(family=cfg.family, tier=cfg.tier, max_steps_per_episode=cfg.max_steps_per_episode, seed=cfg.seed) if cfg.long_horizon else env_class(family=cfg.family, tier=cfg.tier, seed=cfg.seed)
     obs, _ = env.reset()
     obs_dim = int(np.prod(env.observation_space.shape))
     n_actions = env.action_space.n
@@ -118,6 +140,34 @@ def train_board_dqn(cfg: BoardTrainConfig | None = None, device: str | torch.dev
             hidden_dim=cfg.hidden_dim,
             hyperparams=DQNHyperParams(gamma=0.95 if not cfg.long_horizon else 0.985, lr=cfg.learning_rate, batch_size=cfg.batch_size, tau=8e-3),
         )
+    if cfg.bandit:
+        if cfg.long_horizon:
+            raise ValueError("Contextual-bandit training only supports the one-step board env")
+        bandit_summary = train_contextual_bandit(
+            agent,
+            env,
+            pool_size=cfg.bandit_pool_size,
+            fixture_specs=board_fixture_specs(cfg.family),
+            apply_fixture=apply_board_fixture,
+            fixture_copies=cfg.fixture_replay_copies,
+            updates=cfg.bandit_updates,
+            batch_size=cfg.bandit_batch_size,
+            fixture_ratio=cfg.bandit_fixture_ratio,
+            learning_rate=cfg.bandit_learning_rate,
+            seed=cfg.seed,
+            log_prefix=f"Board {cfg.family}/{cfg.tier}",
+            log_interval=cfg.log_interval,
+        )
+        print(
+            f"[Board bandit] family={cfg.family} tier={cfg.tier} "
+            f"dataset={bandit_summary['datasetSize']} greedy_acc={bandit_summary['banditGreedyAccuracy']:.3f} "
+            f"seconds={bandit_summary['trainSeconds']:.1f}"
+        )
+        return save_board_outputs(agent, cfg, output_dir, obs_dim, n_actions, bandit_summary)
+
+    if cfg.long_horizon and cfg.num_envs > 1:
+        return train_board_long_horizon_vec(agent, env, cfg, output_dir, obs_dim, n_actions)
+
     replay = ReplayBuffer(capacity=cfg.buffer_capacity)
     expert = ReplayBuffer(capacity=cfg.buffer_capacity)
 
@@ -183,15 +233,150 @@ def train_board_dqn(cfg: BoardTrainConfig | None = None, device: str | torch.dev
             agent.save(str(checkpoint))
             print(f"Saved model to {checkpoint}")
 
+    return save_board_outputs(
+        agent,
+        cfg,
+        output_dir,
+        obs_dim,
+        n_actions,
+        {"avg_reward_last_100": float(sum(rewards[-100:]) / max(1, len(rewards[-100:])))},
+    )
+
+
+def add_vec_transitions(buffers, obs, actions, rewards, next_obs, dones, next_action_masks):
+    for index in range(len(actions)):
+        for buffer in buffers:
+            buffer.add(
+                obs[index],
+                actions[index],
+                rewards[index],
+                next_obs[index],
+                dones[index],
+                next_action_mask=next_action_masks[index],
+            )
+
+
+def train_board_long_horizon_vec(
+    agent: DQNAgent,
+    fixture_env: BoardLongHorizonEnv,
+    cfg: BoardTrainConfig,
+    output_dir: Path,
+    obs_dim: int,
+    n_actions: int,
+):
+    """Long-horizon DQN loop over `cfg.num_envs` batched envs.
+
+    Same teacher warmup, fixture replay, imitation mix and update-to-sample
+    ratio as the scalar loop, but actions come from one batched forward pass
+    and the env advances every scenario per call.
+    """
+    vec_env = BoardLongHorizonVecEnv(
+        cfg.num_envs,
+        family=cfg.family,
+        tier=cfg.tier,
+        max_steps_per_episode=cfg.max_steps_per_episode,
+    )
+    replay = ReplayBuffer(capacity=cfg.buffer_capacity)
+    expert = ReplayBuffer(capacity=cfg.buffer_capacity)
+
+    obs, _ = vec_env.reset()
+    completed = 0
+    while completed < cfg.teacher_warmup_episodes:
+        actions = vec_env.teacher_actions()
+        next_obs, rewards, terminated, truncated, infos = vec_env.step(actions)
+        dones = terminated | truncated
+        stored_next_obs = np.where(infos["_final_observation"][:, None], infos["final_observation"], next_obs)
+        add_vec_transitions((replay, expert), obs, actions, rewards, stored_next_obs, dones, vec_env.legal_action_mask())
+        completed += int(dones.sum())
+        obs = next_obs
+    add_board_fixture_examples(fixture_env, replay, expert, cfg.fixture_replay_copies)
+
+    imitation_loss = 0.0
+    imitation_accuracy = 0.0
+    for _ in range(max(0, cfg.imitation_pretrain_steps)):
+        imitation_loss, imitation_accuracy = agent.imitation_update(
+            expert.sample(cfg.batch_size),
+            loss_weight=cfg.imitation_loss_weight,
+        )
+    print(
+        f"[Board teacher] family={cfg.family} tier={cfg.tier} num_envs={cfg.num_envs} "
+        f"expert={len(expert)} bc_loss={imitation_loss:.5f} bc_acc={imitation_accuracy:.3f}"
+    )
+
+    rewards_per_episode = []
+    episode_rewards = np.zeros(cfg.num_envs)
+    loss = 0.0
+    mean_q = 0.0
+    pending_updates = 0.0
+    next_log = cfg.log_interval
+    next_save = cfg.save_interval
+    obs, _ = vec_env.reset()
+    while len(rewards_per_episode) < cfg.total_episodes:
+        episode = len(rewards_per_episode) + 1
+        epsilon = linear_epsilon_decay(episode, cfg.epsilon_start, cfg.epsilon_end, cfg.epsilon_decay_episodes)
+        actions = agent.act_batch(obs, epsilon, action_masks=vec_env.legal_action_mask())
+        next_obs, rewards, terminated, truncated, infos = vec_env.step(actions)
+        dones = terminated | truncated
+        stored_next_obs = np.where(infos["_final_observation"][:, None], infos["final_observation"], next_obs)
+        add_vec_transitions((replay,), obs, actions, rewards, stored_next_obs, dones, vec_env.legal_action_mask())
+        episode_rewards += rewards
+        for index in np.flatnonzero(dones):
+            rewards_per_episode.append(float(episode_rewards[index]))
+            episode_rewards[index] = 0.0
+        obs = next_obs
+
+        if episode >= cfg.warmup_steps and len(replay) >= cfg.batch_size:
+            pending_updates += cfg.num_envs / max(1, cfg.train_every_steps)
+        while pending_updates >= 1.0:
+            pending_updates -= 1.0
+            loss, mean_q = agent.update(replay.sample(cfg.batch_size))
+            expert_batch_size = int(round(cfg.batch_size * cfg.expert_replay_ratio))
+            if expert_batch_size > 0:
+                imitation_loss, imitation_accuracy = agent.imitation_update(
+                    expert.sample(expert_batch_size),
+                    loss_weight=cfg.imitation_loss_weight,
+                )
+
+        completed = len(rewards_per_episode)
+        if cfg.log_interval > 0 and completed >= next_log:
+            next_log += cfg.log_interval
+            recent = rewards_per_episode[-cfg.log_interval :]
+            print(
+                f"[Board {cfg.family}/{cfg.tier} {completed:5d}] "
+                f"avg_reward={sum(recent) / len(recent):7.3f} epsilon={epsilon:5.3f} "
+                f"loss={loss:8.5f} mean_q={mean_q:7.3f} bc_acc={imitation_accuracy:5.3f}"
+            )
+        if cfg.save_interval > 0 and completed >= next_save:
+            next_save += cfg.save_interval
+            checkpoint = output_dir / f"{cfg.family}_{cfg.tier}_board_dqn_{completed:06d}_{time.strftime('%Y%m%d-%H%M%S')}.pt"
+            agent.save(str(checkpoint))
+            print(f"Saved model to {checkpoint}")
+
+    return save_board_outputs(
+        agent,
+        cfg,
+        output_dir,
+        obs_dim,
+        n_actions,
+        {
+            "num_envs": int(cfg.num_envs),
+            "avg_reward_last_100": float(sum(rewards_per_episode[-100:]) / max(1, len(rewards_per_episode[-100:]))),
+        },
+    )
+
+
+def save_board_outputs(agent: DQNAgent, cfg: BoardTrainConfig, output_dir: Path, obs_dim: int, n_actions: int, stats):
     latest = output_dir / f"{cfg.family}_{cfg.tier}_board_dqn_latest.pt"
     agent.save(str(latest))
     summary = {
         "family": cfg.family,
         "tier": cfg.tier,
-        "episodes": int(cfg.total_episodes),
+        # Bandit runs take no env episodes; their stats carry banditUpdates/banditSamples.
+        **({} if cfg.bandit else {"episodes": int(cfg.total_episodes)}),
         "long_horizon": bool(cfg.long_horizon),
         "max_steps_per_episode": int(cfg.max_steps_per_episode),
-        "avg_reward_last_100": float(sum(rewards[-100:]) / max(1, len(rewards[-100:]))),
+        "trainingMode": "bandit" if cfg.bandit else "dqn",
+        **stats,
         "checkpoint": str(latest),
         "obs_dim": int(obs_dim),
         "n_actions": int(n_actions),
@@ -210,6 +395,12 @@ def parse_args():
     parser.add_argument("--episodes", type=int, default=BoardTrainConfig.total_episodes)
     parser.add_argument("--max-steps", type=int, default=BoardTrainConfig.max_steps_per_episode)
     parser.add_argument("--long-horizon", action="store_true")
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=BoardTrainConfig.num_envs,
+        help="Batched BoardLongHorizonVecEnv width for --long-horizon runs.",
+    )
     parser.add_argument("--warmup-steps", type=int, default=BoardTrainConfig.warmup_steps)
     parser.add_argument("--batch-size", type=int, default=BoardTrainConfig.batch_size)
     parser.add_argument("--teacher-warmup-episodes", type=int, default=BoardTrainConfig.teacher_warmup_episodes)
@@ -220,6 +411,13 @@ def parse_args():
     parser.add_argument("--save-interval", type=int, default=BoardTrainConfig.save_interval)
     parser.add_argument("--log-interval", type=int, default=BoardTrainConfig.log_interval)
     parser.add_argument("--resume-checkpoint", default=None)
+    parser.add_argument("--bandit", action="store_true", help="Train the one-step env as a contextual bandit.")
+    parser.add_argument("--bandit-pool-size", type=int, default=BoardTrainConfig.bandit_pool_size)
+    parser.add_argument("--bandit-batch-size", type=int, default=BoardTrainConfig.bandit_batch_size)
+    parser.add_argument("--bandit-updates", type=int, default=BoardTrainConfig.bandit_updates)
+    parser.add_argument("--bandit-learning-rate", type=float, default=BoardTrainConfig.bandit_learning_rate)
+    parser.add_argument("--bandit-fixture-ratio", type=float, default=BoardTrainConfig.bandit_fixture_ratio)
+    parser.add_argument("--seed", type=int, default=None, help="Seed the env, network init and bandit minibatches.")
     parser.add_argument("--device", default=None)
     return parser.parse_args()
 
@@ -233,6 +431,7 @@ if __name__ == "__main__":
         total_episodes=args.episodes,
         max_steps_per_episode=args.max_steps,
         long_horizon=args.long_horizon,
+        num_envs=args.num_envs,
         warmup_steps=args.warmup_steps,
         batch_size=args.batch_size,
         teacher_warmup_episodes=args.teacher_warmup_episodes,
@@ -243,6 +442,13 @@ if __name__ == "__main__":
         save_interval=args.save_interval,
         log_interval=args.log_interval,
         resume_checkpoint=args.resume_checkpoint,
+        bandit=args.bandit,
+        bandit_pool_size=args.bandit_pool_size,
+        bandit_batch_size=args.bandit_batch_size,
+        bandit_updates=args.bandit_updates,
+        bandit_learning_rate=args.bandit_learning_rate,
+        bandit_fixture_ratio=args.bandit_fixture_ratio,
+        seed=args.seed,
     )
     print(f"Using device: {device}")
     train_board_dqn(cfg=cfg, device=device)
@@ -14,7 +14,7 @@ SRC_ROOT = PROJECT_ROOT / "src"
 if str(SRC_ROOT) not in sys.path:
     sys.path.insert(0, str(SRC_ROOT))
 
-from rl.agents.dqn_agent import DQNAgent, DQNHyperParams
+from rl.agents.dqn_agent import CpuLearnerConfig, DQNAgent, DQNHyperParams, configure_cpu_threads
 from rl.utils.replay_buffer import ReplayBuffer
 from rl.env.badugi_env import BadugiEnv
 from rl.training.badugi_starting_ranges import teacher_action
@@ -51,6 +51,24 @@ class TrainConfig:
     resume_checkpoint: str | None = None
     dataset_validation_summary: str | None = None
     require_clean_dataset: bool = False
+    learner_threads: int = 0
+    actor_processes: int = 0
+    grad_accum_steps: int = 1
+    bf16: bool = False
+    compile_q_network: bool = False
+    n_step: int = 1
+    double_dqn: bool = True
+    dueling: bool = False
+
+
+def learner_config(cfg: TrainConfig) -> CpuLearnerConfig:
+    return CpuLearnerConfig(
+        num_threads=cfg.learner_threads,
+        actor_processes=cfg.actor_processes,
+        grad_accum_steps=cfg.grad_accum_steps,
+        bf16=cfg.bf16,
+        compile=cfg.compile_q_network,
+    )
 
 
 def linear_epsilon_decay(
@@ -139,15 +157,31 @@ def train_dqn(cfg: TrainConfig | None = None, device: str | torch.device = "cpu"
         lr=cfg.learning_rate,
         batch_size=cfg.batch_size,
         tau=5e-3,
+        n_step=max(1, cfg.n_step),
+        double_dqn=cfg.double_dqn,
+        dueling=cfg.dueling,
     )
+    learner = learner_config(cfg)
+    if torch.device(device).type == "cpu" and (cfg.learner_threads > 0 or cfg.actor_processes > 0):
+        threads = configure_cpu_threads(learner)
+        print(
+            f"[Learner] threads={threads} actor_processes={cfg.actor_processes} "
+            f"grad_accum_steps={cfg.grad_accum_steps} bf16={cfg.bf16} compile={cfg.compile_q_network}"
+        )
     if cfg.resume_checkpoint:
-        agent = DQNAgent.load(cfg.resume_checkpoint, device=device)
+        agent = DQNAgent.load(cfg.resume_checkpoint, device=device, learner=learner)
         if agent.obs_dim != obs_dim or agent.n_actions != n_actions:
             raise ValueError(
                 "--resume-checkpoint shape does not match environment: "
                 f"checkpoint=({agent.obs_dim},{agent.n_actions}) "
                 f"env=({obs_dim},{n_actions})"
             )
+        if bool(agent.hyper.dueling) != cfg.dueling:
+            raise ValueError(
+                f"--dueling={cfg.dueling} does not match checkpoint dueling={agent.hyper.dueling}"
+            )
+        agent.hyper.n_step = hyper.n_step
+        agent.hyper.double_dqn = hyper.double_dqn
         print(f"[Resume] checkpoint={cfg.resume_checkpoint}")
     else:
         agent = DQNAgent(
@@ -156,8 +190,9 @@ def train_dqn(cfg: TrainConfig | None = None, device: str | torch.device = "cpu"
             device=device,
             hidden_dim=cfg.hidden_dim,
             hyperparams=hyper,
+            learner=learner,
         )
-    replay_buffer = ReplayBuffer(capacity=cfg.buffer_capacity)
+    replay_buffer = ReplayBuffer(capacity=cfg.buffer_capacity, n_step=hyper.n_step, gamma=hyper.gamma)
     expert_buffer = ReplayBuffer(capacity=cfg.buffer_capacity)
     profitable_continue_buffer = ReplayBuffer(capacity=cfg.buffer_capacity)
     first_in_value_bet_buffer = ReplayBuffer(capacity=cfg.buffer_capacity)
@@ -215,6 +250,7 @@ def train_dqn(cfg: TrainConfig | None = None, device: str | torch.device = "cpu"
                 total_reward += float(reward)
                 if done:
                     break
+            replay_buffer.flush()
             teacher_rewards.append(total_reward)
         print(
             "[Teacher warmup] "
@@ -333,6 +369,7 @@ def train_dqn(cfg: TrainConfig | None = None, device: str | torch.device = "cpu"
             if done:
                 break
 
+        replay_buffer.flush()
         episode_rewards.append(episode_reward)
 
         if cfg.log_interval > 0 and episode % cfg.log_interval == 0:
@@ -384,6 +421,13 @@ def train_dqn(cfg: TrainConfig | None = None, device: str | torch.device = "cpu"
         "resume_checkpoint": cfg.resume_checkpoint,
         "dataset_validation_summary": cfg.dataset_validation_summary,
         "require_clean_dataset": cfg.require_clean_dataset,
+        "learner_threads": torch.get_num_threads(),
+        "grad_accum_steps": cfg.grad_accum_steps,
+        "bf16": agent.use_bf16,
+        "compile_q_network": cfg.compile_q_network,
+        "n_step": hyper.n_step,
+        "double_dqn": cfg.double_dqn,
+        "dueling": cfg.dueling,
         "avg_reward_last_100": (
             sum(episode_rewards[-100:]) / max(1, len(episode_rewards[-100:]))
             if episode_rewards
@@ -461,6 +505,33 @@ def parse_args():
         action="store_true",
         help="Refuse training unless --dataset-validation-summary reports zero invalid transitions.",
     )
+    parser.add_argument(
+        "--learner-threads",
+        type=int,
+        default=TrainConfig.learner_threads,
+        help="torch intra-op threads for CPU updates; 0 budgets cores left after --actor-processes.",
+    )
+    parser.add_argument(
+        "--actor-processes",
+        type=int,
+        default=TrainConfig.actor_processes,
+        help="Cores reserved for concurrently running actor/evaluation processes.",
+    )
+    parser.add_argument("--grad-accum-steps", type=int, default=TrainConfig.grad_accum_steps)
+    parser.add_argument("--bf16", action="store_true", help="Use bfloat16 autocast on CPUs that support it.")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the online Q network for updates.")
+    parser.add_argument(
+        "--n-step",
+        type=int,
+        default=TrainConfig.n_step,
+        help="Store n-step discounted returns in replay so showdown rewards reach earlier streets faster.",
+    )
+    parser.add_argument(
+        "--no-double-dqn",
+        action="store_true",
+        help="Bootstrap from the target network max instead of the online argmax.",
+    )
+    parser.add_argument("--dueling", action="store_true", help="Use a dueling value/advantage Q head.")
     parser.add_argument("--device", default=None)
     return parser.parse_args()
 
@@ -535,6 +606,14 @@ if __name__ == "__main__":
         resume_checkpoint=args.resume_checkpoint,
         dataset_validation_summary=args.dataset_validation_summary,
         require_clean_dataset=args.require_clean_dataset,
+        learner_threads=args.learner_threads,
+        actor_processes=args.actor_processes,
+        grad_accum_steps=args.grad_accum_steps,
+        bf16=args.bf16,
+        compile_q_network=args.compile,
+        n_step=args.n_step,
+        double_dqn=not args.no_double_dqn,
+        dueling=args.dueling,
     )
     print(f"Using device: {device}")
     train_dqn(cfg=cfg, device=device)
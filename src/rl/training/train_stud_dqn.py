@@ -24,6 +24,7 @@ from rl.env.stud_betting_env import (
     StudBettingEnv,
     stud_teacher_action,
 )
+from rl.training.contextual_bandit import train_contextual_bandit
 from rl.utils.replay_buffer import ReplayBuffer
 
 
@@ -50,6 +51,13 @@ class StudTrainConfig:
     log_interval: int = 500
     fixture_replay_copies: int = 100
     resume_checkpoint: str | None = None
+    bandit: bool = False
+    bandit_pool_size: int = 16_000
+    bandit_batch_size: int = 512
+    bandit_updates: int = 800
+    bandit_learning_rate: float = 1e-3
+    bandit_fixture_ratio: float = 0.25
+    seed: int | None = None
 
 
 def linear_epsilon_decay(episode: int, start_eps: float, end_eps: float, decay_episodes: int) -> float:
@@ -58,35 +66,45 @@ def linear_epsilon_decay(episode: int, start_eps: float, end_eps: float, decay_e
     return start_eps + (episode / float(decay_episodes)) * (end_eps - start_eps)
 
 
+def stud_fixture_specs():
+    return [
+        # Strong made hands value bet and raise.
+        {"made": 0.9, "draw": 0.18, "low": 0.15, "high": 0.9, "to_call": 0.0, "street": 0.75, "expected": 3},
+        {"made": 0.82, "draw": 0.16, "low": 0.2, "high": 0.82, "to_call": 0.12, "street": 0.75, "expected": 4},
+        # Weak hands facing pressure fold.
+        {"made": 0.18, "draw": 0.08, "low": 0.2, "high": 0.18, "to_call": 0.22, "street": 0.5, "expected": 0},
+        # Pot-odds continue with medium equity.
+        {"made": 0.46, "draw": 0.55, "low": 0.45, "high": 0.46, "to_call": 0.06, "street": 0.25, "expected": 2},
+        # Razz low strength should continue/value bet.
+        {"made": 0.76, "draw": 0.42, "low": 0.86, "high": 0.2, "to_call": 0.0, "street": 0.5, "expected": 3},
+        {"made": 0.72, "draw": 0.36, "low": 0.82, "high": 0.2, "to_call": 0.12, "street": 0.75, "expected": 4},
+        # Stud8 scoop-capable hands play aggressively; one-way weak hands control.
+        {"made": 0.78, "draw": 0.48, "low": 0.75, "high": 0.62, "to_call": 0.0, "street": 0.5, "expected": 3},
+        {"made": 0.42, "draw": 0.2, "low": 0.28, "high": 0.42, "to_call": 0.18, "street": 0.75, "expected": 0},
+    ]
+
+
+def apply_stud_fixture(env: StudBettingEnv, fixture) -> int:
+    """Reset `env` onto a fixture scenario and return its (legal) expected action."""
+    env.reset()
+    env.scenario.made_strength = fixture["made"]
+    env.scenario.draw_equity = fixture["draw"]
+    env.scenario.low_potential = fixture["low"]
+    env.scenario.high_potential = fixture["high"]
+    env.scenario.to_call = fixture["to_call"]
+    env.scenario.street_progress = fixture["street"]
+    env.scenario.raise_count = 0
+    action = fixture["expected"]
+    if env.legal_action_mask()[action] <= 0:
+        action = stud_teacher_action(env.scenario)
+    return action
+
+
 def add_stud_fixture_examples(env: StudBettingEnv, replay: ReplayBuffer, expert: ReplayBuffer, copies: int):
     for _ in range(max(0, copies)):
-        for fixture in [
-            # Strong made hands value bet and raise.
-            {"made": 0.9, "draw": 0.18, "low": 0.15, "high": 0.9, "to_call": 0.0, "street": 0.75, "expected": 3},
-            {"made": 0.82, "draw": 0.16, "low": 0.2, "high": 0.82, "to_call": 0.12, "street": 0.75, "expected": 4},
-            # Weak hands facing pressure fold.
-            {"made": 0.18, "draw": 0.08, "low": 0.2, "high": 0.18, "to_call": 0.22, "street": 0.5, "expected": 0},
-            # Pot-odds continue with medium equity.
-            {"made": 0.46, "draw": 0.55, "low": 0.45, "high": 0.46, "to_call": 0.06, "street": 0.25, "expected": 2},
-            # Razz low strength should continue/value bet.
-            {"made": 0.76, "draw": 0.42, "low": 0.86, "high": 0.2, "to_call": 0.0, "street": 0.5, "expected": 3},
-            {"made": 0.72, "draw": 0.36, "low": 0.82, "high": 0.2, "to_call": 0.12, "street": 0.75, "expected": 4},
-            # Stud8 scoop-capable hands play aggressively; one-way weak hands control.
-            {"made": 0.78, "draw": 0.48, "low": 0.75, "high": 0.62, "to_call": 0.0, "street": 0.5, "expected": 3},
-            {"made": 0.42, "draw": 0.2, "low": 0.28, "high": 0.42, "to_call": 0.18, "street": 0.75, "expected": 0},
-        ]:
-            env.reset()
-            env.scenario.made_strength = fixture["made"]
-            env.scenario.draw_equity = fixture["draw"]
-            env.scenario.low_potential = fixture["low"]
-            env.scenario.high_potential = fixture["high"]
-            env.scenario.to_call = fixture["to_call"]
-            env.scenario.street_progress = fixture["street"]
-            env.scenario.raise_count = 0
+        for fixture in stud_fixture_specs():
+            action = apply_stud_fixture(env, fixture)
             obs = env._observation()
-            action = fixture["expected"]
-            if env.legal_action_mask()[action] <= 0:
-                action = stud_teacher_action(env.scenario)
             replay.add(obs, action, 0.4, obs, False, next_action_mask=env.legal_action_mask())
             expert.add(obs, action, 0.4, obs, False, next_action_mask=env.legal_action_mask())
 
@@ -96,7 +114,9 @@ def train_stud_dqn(cfg: StudTrainConfig | None = None, device: str | torch.devic
     output_dir = Path(cfg.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    env = StudBettingEnv(family=cfg.family, tier=cfg.tier)
+    if cfg.seed is not None:
+        torch.manual_seed(cfg.seed)
+    env = StudBettingEnv(family=cfg.family, tier=cfg.tier, seed=cfg.seed)
     obs, _ = env.reset()
     obs_dim = int(np.prod(env.observation_space.shape))
     n_actions = env.action_space.n
@@ -115,6 +135,29 @@ def train_stud_dqn(cfg: StudTrainConfig | None = None, device: str | torch.devic
             hidden_dim=cfg.hidden_dim,
             hyperparams=DQNHyperParams(gamma=0.92, lr=cfg.learning_rate, batch_size=cfg.batch_size, tau=8e-3),
         )
+    if cfg.bandit:
+        bandit_summary = train_contextual_bandit(
+            agent,
+            env,
+            pool_size=cfg.bandit_pool_size,
+            fixture_specs=stud_fixture_specs(),
+            apply_fixture=apply_stud_fixture,
+            fixture_copies=cfg.fixture_replay_copies,
+            updates=cfg.bandit_updates,
+            batch_size=cfg.bandit_batch_size,
+            fixture_ratio=cfg.bandit_fixture_ratio,
+            learning_rate=cfg.bandit_learning_rate,
+            seed=cfg.seed,
+            log_prefix=f"Stud {cfg.family}/{cfg.tier}",
+            log_interval=cfg.log_interval,
+        )
+        print(
+            f"[Stud bandit] family={cfg.family} tier={cfg.tier} "
+            f"dataset={bandit_summary['datasetSize']} greedy_acc={bandit_summary['banditGreedyAccuracy']:.3f} "
+            f"seconds={bandit_summary['trainSeconds']:.1f}"
+        )
+        return save_stud_outputs(agent, cfg, output_dir, obs_dim, n_actions, bandit_summary)
+
     replay = ReplayBuffer(capacity=cfg.buffer_capacity)
     expert = ReplayBuffer(capacity=cfg.buffer_capacity)
 
@@ -170,13 +213,26 @@ def train_stud_dqn(cfg: StudTrainConfig | None = None, device: str | torch.devic
             agent.save(str(checkpoint))
             print(f"Saved model to {checkpoint}")
 
+    return save_stud_outputs(
+        agent,
+        cfg,
+        output_dir,
+        obs_dim,
+        n_actions,
+        {"avg_reward_last_100": float(sum(rewards[-100:]) / max(1, len(rewards[-100:])))},
+    )
+
+
+def save_stud_outputs(agent: DQNAgent, cfg: StudTrainConfig, output_dir: Path, obs_dim: int, n_actions: int, stats):
     latest = output_dir / f"{cfg.family}_{cfg.tier}_stud_dqn_latest.pt"
     agent.save(str(latest))
     summary = {
         "family": cfg.family,
         "tier": cfg.tier,
-        "episodes": int(cfg.total_episodes),
-        "avg_reward_last_100": float(sum(rewards[-100:]) / max(1, len(rewards[-100:]))),
+        # Bandit runs take no env episodes; their stats carry banditUpdates/banditSamples.
+        **({} if cfg.bandit else {"episodes": int(cfg.total_episodes)}),
+        "trainingMode": "bandit" if cfg.bandit else "dqn",
+        **stats,
         "checkpoint": str(latest),
         "obs_dim": int(obs_dim),
         "n_actions": int(n_actions),
@@ -204,6 +260,13 @@ def parse_args():
     parser.add_argument("--save-interval", type=int, default=StudTrainConfig.save_interval)
     parser.add_argument("--log-interval", type=int, default=StudTrainConfig.log_interval)
     parser.add_argument("--resume-checkpoint", default=None)
+    parser.add_argument("--bandit", action="store_true", help="Train the one-step env as a contextual bandit.")
+    parser.add_argument("--bandit-pool-size", type=int, default=StudTrainConfig.bandit_pool_size)
+    parser.add_argument("--bandit-batch-size", type=int, default=StudTrainConfig.bandit_batch_size)
+    parser.add_argument("--bandit-updates", type=int, default=StudTrainConfig.bandit_updates)
+    parser.add_argument("--bandit-learning-rate", type=float, default=StudTrainConfig.bandit_learning_rate)
+    parser.add_argument("--bandit-fixture-ratio", type=float, default=StudTrainConfig.bandit_fixture_ratio)
+    parser.add_argument("--seed", type=int, default=None, help="Seed the env, network init and bandit minibatches.")
     parser.add_argument("--device", default=None)
     return parser.parse_args()
 
@@ -225,6 +288,13 @@ if __name__ == "__main__":
         save_interval=args.save_interval,
         log_interval=args.log_interval,
         resume_checkpoint=args.resume_checkpoint,
+        bandit=args.bandit,
+        bandit_pool_size=args.bandit_pool_size,
+        bandit_batch_size=args.bandit_batch_size,
+        bandit_updates=args.bandit_updates,
+        bandit_learning_rate=args.bandit_learning_rate,
+        bandit_fixture_ratio=args.bandit_fixture_ratio,
+        seed=args.seed,
     )
     print(f"Using device: {device}")
     train_stud_dqn(cfg=cfg, device=device)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+
+class BanditDataset:
+    """Fixed-size pool of (observation, per-action reward) rows.
+
+    One-step betting environments terminate after a single decision, so every
+    sampled scenario can carry the reward of all actions at once. Rows are kept
+    as preallocated arrays so minibatches are a single fancy-index per field.
+    """
+
+    def __init__(self, capacity: int, obs_dim: int, n_actions: int, seed: int | None = None):
+        self.capacity = int(capacity)
+        self.obs = np.zeros((self.capacity, obs_dim), dtype=np.float32)
+        self.action_rewards = np.zeros((self.capacity, n_actions), dtype=np.float32)
+        self.action_masks = np.zeros((self.capacity, n_actions), dtype=np.float32)
+        self.size = 0
+        self.next_idx = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, obs, action_rewards, action_mask):
+        self.obs[self.next_idx] = obs
+        self.action_rewards[self.next_idx] = action_rewards
+        self.action_masks[self.next_idx] = action_mask
+        self.next_idx = (self.next_idx + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_from_env(self, env, teacher: int | None = None):
+        self.add(env.observation(), env.action_rewards(teacher=teacher), env.legal_action_mask())
+
+    def sample(self, batch_size: int, replace: bool = False) -> Dict[str, np.ndarray]:
+        assert replace or self.size >= batch_size, "Not enough samples in dataset"
+        if replace:
+            indices = self.rng.integers(0, self.size, size=batch_size)
+        else:
+            indices = self.rng.choice(self.size, size=batch_size, replace=False)
+        return {
+            "obs": self.obs[indices],
+            "action_rewards": self.action_rewards[indices],
+            "action_masks": self.action_masks[indices],
+        }
+
+
+def concat_bandit_batches(*batches: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {key: np.concatenate([batch[key] for batch in batches], axis=0) for key in batches[0]}
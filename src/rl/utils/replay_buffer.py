@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import random
+from collections import deque
 from dataclasses import dataclass
 from typing import Dict, List
 
@@ -15,13 +16,27 @@ class Transition:
     next_obs: np.ndarray
     done: bool
     next_action_mask: np.ndarray | None = None
+    n_steps: int = 1
 
 
 class ReplayBuffer:
-    def __init__(self, capacity: int, seed: int | None = None):
+    """Uniform replay with optional n-step returns.
+
+    With `n_step > 1`, `add` holds the last n transitions of the current
+    episode and stores each one as soon as its n-step window is complete:
+    reward becomes the discounted sum over the window, `next_obs`/`done`/mask
+    come from the window's last step, and `n_steps` records the window length
+    so the learner bootstraps with `gamma ** n_steps`. Terminal steps flush the
+    window early; call `flush()` when an episode is cut off without `done`.
+    """
+
+    def __init__(self, capacity: int, seed: int | None = None, n_step: int = 1, gamma: float = 0.99):
         self.capacity = int(capacity)
         self.storage: List[Transition] = []
         self.next_idx = 0
+        self.n_step = max(1, int(n_step))
+        self.gamma = float(gamma)
+        self._pending: deque[Transition] = deque()
         if seed is not None:
             random.seed(seed)
             np.random.seed(seed)
@@ -42,6 +57,38 @@ class ReplayBuffer:
                 else None
             ),
         )
+        if self.n_step == 1:
+            self._store(transition)
+            return
+        self._pending.append(transition)
+        if transition.done:
+            self.flush()
+        elif len(self._pending) >= self.n_step:
+            self._store(self._pop_n_step())
+
+    def flush(self):
+        """Store every pending n-step window, e.g. at a truncated episode end."""
+        while self._pending:
+            self._store(self._pop_n_step())
+
+    def _pop_n_step(self) -> Transition:
+        first = self._pending[0]
+        last = self._pending[-1]
+        reward = 0.0
+        for offset, step in enumerate(self._pending):
+            reward += (self.gamma ** offset) * step.reward
+        self._pending.popleft()
+        return Transition(
+            obs=first.obs,
+            action=first.action,
+            reward=reward,
+            next_obs=last.next_obs,
+            done=last.done,
+            next_action_mask=last.next_action_mask,
+            n_steps=len(self._pending) + 1,
+        )
+
+    def _store(self, transition: Transition):
         if self.next_idx >= len(self.storage):
             self.storage.append(transition)
         else:
@@ -65,6 +112,9 @@ class ReplayBuffer:
         dones = np.array(
             [self.storage[i].done for i in indices], dtype=np.float32
         )
+        n_steps = np.array(
+            [self.storage[i].n_steps for i in indices], dtype=np.float32
+        )
         if any(self.storage[i].next_action_mask is not None for i in indices):
             mask_shape = next(
                 self.storage[i].next_action_mask.shape
@@ -89,6 +139,7 @@ class ReplayBuffer:
             "rewards": rewards,
             "next_obs": next_obs,
             "dones": dones,
+            "n_steps": n_steps,
         }
         if next_action_masks is not None:
             batch["next_action_masks"] = next_action_masks
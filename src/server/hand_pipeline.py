@@ -0,0 +1,161 @@
+"""Off-the-hot-path bookkeeping for finished P2P hands.
+
+`P2PSyncController._finalize_hand` broadcasts the showdown and then only
+publishes a finished-hand event here. A single worker task drains the queue
+in batches of up to `HAND_BATCH_SIZE` events (or whatever arrived within
+`HAND_FLUSH_SECONDS`), applies history and rating updates to the in-memory
+store, and hands the batch to a durable `HandSink` on a worker thread. When the
+loop shuts down the worker flushes whatever is still queued.
+
+Set `P2P_HAND_SINK_PATH` to append every finished hand to a JSONL file;
+without it the in-memory ring buffers are the only record.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from server.storage import InMemoryStore
+
+logger = logging.getLogger(__name__)
+
+HAND_QUEUE_SIZE = 1024
+HAND_BATCH_SIZE = 64
+HAND_FLUSH_SECONDS = 0.05
+
+
+class HandSink:
+  """Durable destination for finished hands. The default keeps nothing."""
+
+  def write_batch(self, hands: List[Dict[str, Any]]) -> None:
+    return None
+
+
+class JsonlHandSink(HandSink):
+  def __init__(self, path: str):
+    self.path = Path(path)
+
+  def write_batch(self, hands: List[Dict[str, Any]]) -> None:
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    with self.path.open("a", encoding="utf8") as handle:
+      handle.write("".join(json.dumps(hand, ensure_ascii=False, separators=(",", ":")) + "\n" for hand in hands))
+
+
+def sink_from_env() -> HandSink:
+  path = os.environ.get("P2P_HAND_SINK_PATH")
+  return JsonlHandSink(path) if path else HandSink()
+
+
+class HandPipeline:
+  def __init__(
+    self,
+    store: InMemoryStore,
+    sink: Optional[HandSink] = None,
+    *,
+    max_queue_size: int = HAND_QUEUE_SIZE,
+    batch_size: int = HAND_BATCH_SIZE,
+    flush_interval: float = HAND_FLUSH_SECONDS,
+  ):
+    self.store = store
+    self.sink = sink or HandSink()
+    self.max_queue_size = max_queue_size
+    self.batch_size = max(1, batch_size)
+    self.flush_interval = flush_interval
+    self._queue: Optional[asyncio.Queue] = None
+    self._task: Optional[asyncio.Task] = None
+    self._pending: List[Dict[str, Any]] = []
+    self.published = 0
+    self.processed = 0
+    self.batches = 0
+    self.backpressure = 0
+    self.sink_failures = 0
+
+  async def publish(self, hand: Dict[str, Any]) -> None:
+    """Queue a finished hand; only waits when the queue is full."""
+
+    if self._task is None or self._task.done():
+      self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+      self._task = asyncio.create_task(self._run())
+    self.published += 1
+    try:
+      self._queue.put_nowait(hand)
+    except asyncio.QueueFull:
+      self.backpressure += 1
+      await self._queue.put(hand)
+
+  async def drain(self) -> None:
+    """Wait until everything published so far has been applied."""
+
+    if self._queue is not None:
+      await self._queue.join()
+
+  def metrics(self) -> Dict[str, Any]:
+    return {
+      "queued": self._queue.qsize() if self._queue else 0,
+      "published": self.published,
+      "processed": self.processed,
+      "batches": self.batches,
+      "backpressure": self.backpressure,
+      "sinkFailures": self.sink_failures,
+    }
+
+  async def _collect(self) -> None:
+    # Events are kept on self._pending (not a local) so a cancelled wait
+    # cannot lose the ones already taken off the queue.
+    self._pending.append(await self._queue.get())
+    deadline = time.monotonic() + self.flush_interval
+    while len(self._pending) < self.batch_size:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        break
+      try:
+        self._pending.append(await asyncio.wait_for(self._queue.get(), remaining))
+      except asyncio.TimeoutError:
+        break
+
+  def _apply(self, batch: List[Dict[str, Any]]) -> None:
+    for hand in batch:
+      self.store.record_finished_hand(hand)
+    self.processed += len(batch)
+    self.batches += 1
+
+  def _write(self, batch: List[Dict[str, Any]]) -> None:
+    try:
+      self.sink.write_batch(batch)
+    except Exception:  # noqa: BLE001 - the in-memory record is already updated
+      self.sink_failures += 1
+      logger.exception("Hand sink failed for %d hands", len(batch))
+
+  def _done(self, count: int) -> None:
+    for _ in range(count):
+      self._queue.task_done()
+
+  async def _run(self) -> None:
+    self._pending = []
+    writing = 0
+    try:
+      while True:
+        await self._collect()
+        batch, self._pending = self._pending, []
+        self._apply(batch)
+        writing = len(batch)
+        await asyncio.to_thread(self._write, batch)
+        writing = 0
+        self._done(len(batch))
+    except asyncio.CancelledError:
+      # Loop shutdown. A batch being written finishes on its thread; apply and
+      # write everything not yet taken so no finished hand is dropped.
+      self._done(writing)
+      while not self._queue.empty():
+        self._pending.append(self._queue.get_nowait())
+      if self._pending:
+        self._apply(self._pending)
+        self._write(self._pending)
+        self._done(len(self._pending))
+        self._pending = []
+      raise
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Seconds between heartbeats sent to each session.
+HEARTBEAT_INTERVAL_SECONDS = 3.0
+# A session that has sent nothing for this long is treated as a dead peer.
+HEARTBEAT_TIMEOUT_SECONDS = 30.0
+# Wheel granularity: sessions are spread over interval / tick slots.
+HEARTBEAT_TICK_SECONDS = 0.5
+
+
+class HeartbeatWheel:
+  """One timer for every session in the process.
+
+  Sessions are hashed into the slots of a timing wheel when they register;
+  each tick visits a single slot, so every session is checked once per
+  interval. Live sessions in the slot are handed to `beat` as one batch and
+  sessions whose `last_seen` is older than `timeout` are passed to `evict`.
+  The tick task runs only while at least one session is registered.
+  """
+
+  def __init__(
+    self,
+    beat: Callable[[List[Any]], None],
+    evict: Callable[[Any], None],
+    *,
+    interval: float = HEARTBEAT_INTERVAL_SECONDS,
+    timeout: float = HEARTBEAT_TIMEOUT_SECONDS,
+    tick: float = HEARTBEAT_TICK_SECONDS,
+  ):
+    self.beat = beat
+    self.evict = evict
+    self.tick = tick
+    self.timeout = timeout
+    self._slots: List[Set[Any]] = [set() for _ in range(max(1, math.ceil(interval / tick)))]
+    self._slot_of: Dict[int, int] = {}
+    self._cursor = 0
+    self._task: Optional[asyncio.Task] = None
+    self.evicted = 0
+    self.beats = 0
+
+  def __len__(self) -> int:
+    return len(self._slot_of)
+
+  def add(self, session: Any) -> None:
+    if id(session) in self._slot_of:
+      return
+    # The slot under the cursor was just visited, so it comes round a full interval from now.
+    slot = self._cursor
+    self._slots[slot].add(session)
+    self._slot_of[id(session)] = slot
+    if self._task is None or self._task.done():
+      self._task = asyncio.create_task(self._run())
+
+  def remove(self, session: Any) -> None:
+    slot = self._slot_of.pop(id(session), None)
+    if slot is not None:
+      self._slots[slot].discard(session)
+
+  def metrics(self) -> Dict[str, Any]:
+    return {
+      "live": len(self._slot_of),
+      "evicted": self.evicted,
+      "heartbeats": self.beats,
+      "running": bool(self._task and not self._task.done()),
+    }
+
+  def run_tick(self, now: Optional[float] = None) -> None:
+    now = time.monotonic() if now is None else now
+    self._cursor = (self._cursor + 1) % len(self._slots)
+    live = []
+    for session in list(self._slots[self._cursor]):
+      if now - session.last_seen > self.timeout:
+        self.remove(session)
+        self.evicted += 1
+        self.evict(session)
+      else:
+        live.append(session)
+    if live:
+      self.beats += len(live)
+      self.beat(live)
+
+  async def _run(self) -> None:
+    while self._slot_of:
+      await asyncio.sleep(self.tick)
+      self.run_tick()
+
+  async def stop(self) -> None:
+    if self._task is None:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
@@ -0,0 +1,369 @@
+"""WebSocket load generator for `/ws/room/{room_id}/play`.
+
+Creates `--rooms` rooms over REST and connects `--bots` bot clients to each.
+Every bot joins, readies up, answers server heartbeats with `heartbeat_ack`,
+sends its own `heartbeat` every `--heartbeat-interval` seconds and, when the
+room's `currentTurnPlayerId` is its own id, acts at `--action-rate` actions
+per second (folding with probability `--fold-rate` so hands keep turning
+over). Action-to-broadcast latency is the time from sending an `action` until
+the acting bot receives the resulting `updated_state` (or error).
+
+By default a local uvicorn running `server.main:app` is started for the run
+and its CPU time and resident memory are sampled from `/proc` (or `psutil`
+when installed). Pass `--url` to target a server that is already running, and
+`--server-pid` to sample it. The report is printed, or written to
+`--output`, as JSON:
+
+  python -m server.loadtest --rooms 20 --bots 4 --duration 30 --output load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import websockets
+
+try:  # optional: /proc is used when psutil is not installed
+  import psutil
+except ImportError:  # pragma: no cover - exercised only with psutil installed
+  psutil = None
+
+SERVER_START_TIMEOUT_SECONDS = 15.0
+RESOURCE_SAMPLE_SECONDS = 0.5
+
+
+@dataclass
+class LoadConfig:
+  base_url: str
+  rooms: int = 10
+  bots: int = 4
+  duration: float = 10.0
+  action_rate: float = 2.0
+  heartbeat_interval: float = 3.0
+  fold_rate: float = 0.2
+  seed: Optional[int] = None
+
+
+@dataclass
+class BotStats:
+  latencies: List[float] = field(default_factory=list)
+  received: int = 0
+  sent: int = 0
+  actions: int = 0
+  errors: int = 0
+  connect_failures: int = 0
+  events: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(samples: Sequence[float], fraction: float) -> Optional[float]:
+  """Nearest-rank percentile; None for an empty sample."""
+
+  if not samples:
+    return None
+  ordered = sorted(samples)
+  rank = max(1, min(len(ordered), math.ceil(fraction * len(ordered))))
+  return ordered[rank - 1]
+
+
+def _ws_url(base_url: str, room_id: str) -> str:
+  return base_url.replace("http", "ws", 1).rstrip("/") + f"/ws/room/{room_id}/play"
+
+
+def _http_json(url: str, payload: Optional[dict] = None) -> dict:
+  data = None if payload is None else json.dumps(payload).encode("utf8")
+  request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+  with urllib.request.urlopen(request, timeout=5) as response:
+    return json.loads(response.read().decode("utf8"))
+
+
+class ResourceSampler:
+  """Samples a process's CPU seconds and resident memory."""
+
+  def __init__(self, pid: Optional[int]):
+    self.pid = pid
+    self.rss_peak = 0
+    self._cpu_start: Optional[float] = None
+    self._wall_start = 0.0
+
+  def _read(self):
+    if self.pid is None:
+      return None
+    try:
+      if psutil is not None:
+        process = psutil.Process(self.pid)
+        cpu = process.cpu_times()
+        return cpu.user + cpu.system, process.memory_info().rss
+      with open(f"/proc/{self.pid}/stat", encoding="ascii") as handle:
+        fields = handle.read().rsplit(")", 1)[1].split()
+      ticks = os.sysconf("SC_CLK_TCK")
+      with open(f"/proc/{self.pid}/statm", encoding="ascii") as handle:
+        rss_pages = int(handle.read().split()[1])
+      return (int(fields[11]) + int(fields[12])) / ticks, rss_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+      return None
+
+  def start(self) -> None:
+    reading = self._read()
+    self._wall_start = time.monotonic()
+    if reading:
+      self._cpu_start, self.rss_peak = reading
+
+  def sample(self) -> None:
+    reading = self._read()
+    if reading:
+      self.rss_peak = max(self.rss_peak, reading[1])
+
+  def report(self) -> Optional[Dict[str, Any]]:
+    reading = self._read()
+    if reading is None or self._cpu_start is None:
+      return None
+    cpu_seconds = reading[0] - self._cpu_start
+    wall = max(time.monotonic() - self._wall_start, 1e-9)
+    return {
+      "pid": self.pid,
+      "cpuSeconds": round(cpu_seconds, 3),
+      "cpuPercent": round(100.0 * cpu_seconds / wall, 1),
+      "rssBytes": reading[1],
+      "rssPeakBytes": max(self.rss_peak, reading[1]),
+    }
+
+
+class Bot:
+  def __init__(self, config: LoadConfig, room_id: str, player_id: str, rng: random.Random):
+    self.config = config
+    self.room_id = room_id
+    self.player_id = player_id
+    self.rng = rng
+    self.stats = BotStats()
+    self.current_turn: Optional[str] = None
+    self._action_sent_at: Optional[float] = None
+    self._turn_changed = asyncio.Event()
+
+  async def run(self, stop: asyncio.Event) -> BotStats:
+    try:
+      async with websockets.connect(_ws_url(self.config.base_url, self.room_id), max_size=None) as ws:
+        await self._send(ws, "join_room", {"playerId": self.player_id, "displayName": self.player_id})
+        await self._send(ws, "reaction", {"playerId": self.player_id, "type": "ready"})
+        tasks = [
+          asyncio.create_task(self._receive(ws)),
+          asyncio.create_task(self._act(ws)),
+          asyncio.create_task(self._heartbeat(ws)),
+        ]
+        await stop.wait()
+        for task in tasks:
+          task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    except (OSError, websockets.WebSocketException):
+      self.stats.connect_failures += 1
+    return self.stats
+
+  async def _send(self, ws, event: str, payload: dict) -> None:
+    await ws.send(json.dumps({"event": event, "payload": payload}))
+    self.stats.sent += 1
+
+  async def _receive(self, ws) -> None:
+    async for raw in ws:
+      self.stats.received += 1
+      if isinstance(raw, bytes):
+        continue
+      message = json.loads(raw)
+      event = message.get("event")
+      payload = message.get("payload") or {}
+      self.stats.events[event] = self.stats.events.get(event, 0) + 1
+      if event == "heartbeat":
+        await self._send(ws, "heartbeat_ack", {})
+        continue
+      if event == "error":
+        self.stats.errors += 1
+      if self._action_sent_at is not None and event in ("updated_state", "error"):
+        self.stats.latencies.append(time.perf_counter() - self._action_sent_at)
+        self._action_sent_at = None
+        self._turn_changed.set()
+      if "currentTurnPlayerId" in payload:
+        self.current_turn = payload["currentTurnPlayerId"]
+        self._turn_changed.set()
+
+  async def _act(self, ws) -> None:
+    interval = 1.0 / self.config.action_rate if self.config.action_rate > 0 else None
+    while interval is not None:
+      await self._turn_changed.wait()
+      self._turn_changed.clear()
+      if self.current_turn != self.player_id or self._action_sent_at is not None:
+        continue
+      await asyncio.sleep(interval)
+      action = "fold" if self.rng.random() < self.config.fold_rate else "call"
+      self._action_sent_at = time.perf_counter()
+      self.stats.actions += 1
+      await self._send(ws, "action", {"playerId": self.player_id, "type": action, "amount": 0})
+
+  async def _heartbeat(self, ws) -> None:
+    while self.config.heartbeat_interval > 0:
+      await asyncio.sleep(self.config.heartbeat_interval)
+      await self._send(ws, "heartbeat", {})
+
+
+async def run_load(config: LoadConfig, sampler: Optional[ResourceSampler] = None) -> Dict[str, Any]:
+  rng = random.Random(config.seed)
+  base = config.base_url.rstrip("/")
+  room_ids = []
+  for index in range(config.rooms):
+    created = await asyncio.to_thread(
+      _http_json,
+      f"{base}/api/rooms/create",
+      {"owner_id": f"load-{index}", "max_players": config.bots, "mode": "ring"},
+    )
+    room_ids.append(created["data"]["roomId"])
+  bots = [
+    Bot(config, room_id, f"bot-{room_index}-{seat}", random.Random(rng.random()))
+    for room_index, room_id in enumerate(room_ids)
+    for seat in range(config.bots)
+  ]
+
+  sampler = sampler or ResourceSampler(None)
+  sampler.start()
+  started = time.monotonic()
+  stop_at = started + config.duration
+  stop = asyncio.Event()
+  runs = asyncio.gather(*(bot.run(stop) for bot in bots))
+  while time.monotonic() < stop_at:
+    await asyncio.sleep(min(RESOURCE_SAMPLE_SECONDS, max(0.0, stop_at - time.monotonic())))
+    sampler.sample()
+  elapsed = time.monotonic() - started
+  # Read the server's own counters while every bot is still connected.
+  try:
+    server_metrics = (await asyncio.to_thread(_http_json, f"{base}/api/rooms/metrics")).get("data")
+  except OSError:
+    server_metrics = None
+  server = sampler.report()
+  stop.set()
+  stats: List[BotStats] = await runs
+
+  latencies = [sample for bot in stats for sample in bot.latencies]
+  events: Dict[str, int] = {}
+  for bot in stats:
+    for event, count in bot.events.items():
+      events[event] = events.get(event, 0) + count
+  received = sum(bot.received for bot in stats)
+  sent = sum(bot.sent for bot in stats)
+
+  def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 3)
+
+  return {
+    "config": {
+      "url": config.base_url,
+      "rooms": config.rooms,
+      "botsPerRoom": config.bots,
+      "durationSeconds": config.duration,
+      "actionRate": config.action_rate,
+      "heartbeatInterval": config.heartbeat_interval,
+      "foldRate": config.fold_rate,
+    },
+    "elapsedSeconds": round(elapsed, 3),
+    "latencyMs": {
+      "samples": len(latencies),
+      "p50": _ms(percentile(latencies, 0.50)),
+      "p99": _ms(percentile(latencies, 0.99)),
+      "max": _ms(max(latencies) if latencies else None),
+    },
+    "messages": {
+      "received": received,
+      "sent": sent,
+      "receivedPerSecond": round(received / elapsed, 1),
+      "sentPerSecond": round(sent / elapsed, 1),
+      "byEvent": dict(sorted(events.items())),
+    },
+    "actions": sum(bot.actions for bot in stats),
+    "errors": sum(bot.errors for bot in stats),
+    "connectFailures": sum(bot.connect_failures for bot in stats),
+    "server": server,
+    "serverMetrics": server_metrics,
+  }
+
+
+def _free_port(host: str) -> int:
+  with socket.socket() as sock:
+    sock.bind((host, 0))
+    return sock.getsockname()[1]
+
+
+def _start_server(host: str, port: int) -> subprocess.Popen:
+  command = [
+    sys.executable, "-m", "uvicorn", "server.main:app",
+    "--host", host, "--port", str(port), "--log-level", "warning",
+  ]
+  process = subprocess.Popen(command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+  deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+  while time.monotonic() < deadline:
+    if process.poll() is not None:
+      raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+    try:
+      _http_json(f"http://{host}:{port}/api/health")
+      return process
+    except OSError:
+      time.sleep(0.1)
+  process.terminate()
+  raise RuntimeError("uvicorn did not become ready")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Load-test the room WebSocket endpoint and report JSON.")
+  parser.add_argument("--url", help="existing server base URL; a local uvicorn is started when omitted")
+  parser.add_argument("--server-pid", type=int, help="pid to sample for CPU/memory when --url is given")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=0, help="port for the local uvicorn (0 picks a free one)")
+  parser.add_argument("--rooms", type=int, default=10)
+  parser.add_argument("--bots", type=int, default=4, help="bot clients per room")
+  parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic")
+  parser.add_argument("--action-rate", type=float, default=2.0, help="actions per second per bot on its turn")
+  parser.add_argument("--heartbeat-interval", type=float, default=3.0, help="seconds between client heartbeats")
+  parser.add_argument("--fold-rate", type=float, default=0.2, help="probability that an action is a fold")
+  parser.add_argument("--seed", type=int)
+  parser.add_argument("--output", help="write the JSON report here instead of stdout")
+  args = parser.parse_args(argv)
+
+  process = None
+  if args.url:
+    base_url, pid = args.url, args.server_pid
+  else:
+    port = args.port or _free_port(args.host)
+    process = _start_server(args.host, port)
+    base_url, pid = f"http://{args.host}:{port}", process.pid
+  config = LoadConfig(
+    base_url=base_url,
+    rooms=args.rooms,
+    bots=args.bots,
+    duration=args.duration,
+    action_rate=args.action_rate,
+    heartbeat_interval=args.heartbeat_interval,
+    fold_rate=args.fold_rate,
+    seed=args.seed,
+  )
+  try:
+    report = asyncio.run(run_load(config, ResourceSampler(pid)))
+  finally:
+    if process is not None:
+      process.terminate()
+      process.wait(timeout=10)
+  text = json.dumps(report, indent=2)
+  if args.output:
+    with open(args.output, "w", encoding="utf8") as handle:
+      handle.write(text + "\n")
+  else:
+    print(text)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
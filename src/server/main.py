@@ -11,9 +11,19 @@ from server.routers import (
   rating,
   rooms,
 )
-from server.p2p_sync import websocket_endpoint
+from server.p2p_sync import (
+  start_room_sweeper,
+  start_sharding,
+  stop_room_sweeper,
+  stop_sharding,
+  websocket_endpoint,
+)
 
 app = FastAPI(title="Badugi App API", version="0.1.0", docs_url="/api/docs")
+app.add_event_handler("startup", start_sharding)
+app.add_event_handler("startup", start_room_sweeper)
+app.add_event_handler("shutdown", stop_sharding)
+app.add_event_handler("shutdown", stop_room_sweeper)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
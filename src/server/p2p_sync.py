@@ -1,78 +1,456 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import random
+import os
 import time
 import uuid
+import zlib
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
 
 from fastapi import WebSocket, WebSocketDisconnect
 
-from server.room_manager import Participant, RoomState, room_manager
-from server.security import create_card_key, encrypt_card
+from server.heartbeat import (
+  HEARTBEAT_INTERVAL_SECONDS,
+  HEARTBEAT_TICK_SECONDS,
+  HEARTBEAT_TIMEOUT_SECONDS,
+  HeartbeatWheel,
+)
+from server.room_manager import Participant, RoomState, RoomSweeper, SweepReport, room_manager
+from server.security import deal_encryption
+from server.hand_pipeline import HandPipeline, sink_from_env
+from server.sharding import PubSub, ShardMap, pubsub_from_url, room_channel
 from server.storage import db
 
+try:  # optional: several times faster than the stdlib encoder
+  import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+  orjson = None
+
 CARDS = [r + s for r in "A23456789TJQK" for s in "♠♥♦♣"]
 
+# Frames a session may have waiting before it counts as a slow consumer.
+SEND_QUEUE_SIZE = 256
+# Relayed frames waiting for the pub/sub bus before new ones are dropped.
+PUBLISH_QUEUE_SIZE = 1024
+# A single send that takes longer than this marks the socket as stalled.
+SEND_TIMEOUT_SECONDS = 5.0
+# Close code for sessions dropped because they could not keep up (RFC 6455 "try again later").
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code for sessions evicted by the heartbeat wheel (application range, "timeout").
+DEAD_PEER_CLOSE_CODE = 4408
+# Close code after redirecting a player to the shard that owns the room (HTTP 421 "misdirected").
+WRONG_SHARD_CLOSE_CODE = 4421
+# Close code for sessions whose room was removed by the idle-room sweeper (HTTP 410 "gone").
+ROOM_EXPIRED_CLOSE_CODE = 4410
+
+
+# Sessions that negotiate "deflate" receive these events as zlib-compressed
+# binary frames once the JSON text reaches COMPRESSION_MIN_BYTES.
+COMPRESSIBLE_EVENTS = frozenset({"room_state", "history"})
+COMPRESSION_MIN_BYTES = 1024
+SUPPORTED_COMPRESSION = frozenset({"deflate"})
+
+
+def dumps(envelope: dict) -> str:
+  if orjson is not None:
+    return orjson.dumps(envelope, option=orjson.OPT_NON_STR_KEYS).decode("utf8")
+  return json.dumps(envelope, ensure_ascii=False, separators=(",", ":"))
+
+
+class Frame:
+  """A serialised websocket frame, shared by every recipient of a broadcast.
+
+  The deflated form is built on first use, so a room broadcast is compressed
+  at most once however many sessions asked for compression.
+  """
+
+  __slots__ = ("text", "droppable", "compressible", "_deflated")
+
+  def __init__(self, text: str, droppable: bool = False, compressible: bool = False):
+    self.text = text
+    self.droppable = droppable
+    self.compressible = compressible and len(text) >= COMPRESSION_MIN_BYTES
+    self._deflated: Optional[bytes] = None
+
+  def deflated(self) -> bytes:
+    if self._deflated is None:
+      self._deflated = zlib.compress(self.text.encode("utf8"))
+    return self._deflated
+
+
+def _is_compressible_text(text: str) -> bool:
+  return any(text.startswith(f'{{"event":"{event}"') for event in COMPRESSIBLE_EVENTS)
+
 
-@dataclass
+def encode_frame(event: str, payload: dict) -> Frame:
+  return Frame(
+    dumps({"event": event, "payload": payload}),
+    droppable=event == "heartbeat",
+    compressible=event in COMPRESSIBLE_EVENTS,
+  )
+
+
+@dataclass(eq=False)
 class ClientSession:
   websocket: WebSocket
   room_id: str
   player_id: Optional[str] = None
+  compression: Optional[str] = None
   last_seen: float = field(default_factory=time.monotonic)
-  heartbeat_task: Optional[asyncio.Task] = None
+  writer_task: Optional[asyncio.Task] = None
+  outbox: Deque[Frame] = field(default_factory=deque)
+  max_queue_size: int = SEND_QUEUE_SIZE
+  closed: bool = False
+  dropped_frames: int = 0
+  _ready: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False)
+
+  def enqueue(self, frame: Frame) -> bool:
+    """Queue `frame` for the writer; False means the session cannot keep up.
+
+    A full queue first sheds heartbeats (the incoming one, or the oldest queued
+    one); only when nothing droppable is left does it report overflow.
+    """
+
+    if self.closed:
+      return False
+    if len(self.outbox) >= self.max_queue_size:
+      if frame.droppable:
+        self.dropped_frames += 1
+        return True
+      for index, queued in enumerate(self.outbox):
+        if queued.droppable:
+          del self.outbox[index]
+          self.dropped_frames += 1
+          break
+      else:
+        return False
+    self.outbox.append(frame)
+    self._ready.set()
+    return True
+
+  async def next_frame(self) -> Frame:
+    while not self.outbox:
+      self._ready.clear()
+      await self._ready.wait()
+    return self.outbox.popleft()
 
 
 class P2PSyncController:
-  def __init__(self):
+  def __init__(
+    self,
+    max_queue_size: int = SEND_QUEUE_SIZE,
+    send_timeout: float = SEND_TIMEOUT_SECONDS,
+    heartbeat_interval: float = HEARTBEAT_INTERVAL_SECONDS,
+    heartbeat_timeout: float = HEARTBEAT_TIMEOUT_SECONDS,
+    heartbeat_tick: float = HEARTBEAT_TICK_SECONDS,
+    shard_map: Optional[ShardMap] = None,
+    hand_pipeline: Optional[HandPipeline] = None,
+    max_publish_queue: int = PUBLISH_QUEUE_SIZE,
+  ):
     self.rooms: Dict[str, List[ClientSession]] = {}
+    self.hand_pipeline = hand_pipeline or HandPipeline(db)
+    self.shard_map = shard_map
+    self.bus: Optional[PubSub] = None
+    self._relays: Dict[str, object] = {}
+    # Rooms this shard owns -> shards relaying them to local spectators.
+    self._remote_watchers: Dict[str, Set[str]] = {}
+    # Frames for other shards, drained by one publisher task so a stalled
+    # broker never holds up the action handler that broadcast them.
+    self._publish_queue: Deque[Tuple[str, str]] = deque()
+    self._publish_ready = asyncio.Event()
+    self._publisher_task: Optional[asyncio.Task] = None
+    self.max_publish_queue = max_publish_queue
+    self.dropped_publishes = 0
+    self.max_queue_size = max_queue_size
+    self.send_timeout = send_timeout
+    self.heartbeats = HeartbeatWheel(
+      self._send_heartbeats,
+      self._evict_dead_peer,
+      interval=heartbeat_interval,
+      timeout=heartbeat_timeout,
+      tick=heartbeat_tick,
+    )
+    self.sweeper = RoomSweeper(room_manager, self._after_sweep)
+    self.slow_disconnects = 0
+    self.reaped_sessions = 0
 
   async def connect(self, room_id: str, websocket: WebSocket) -> ClientSession:
+    """Accept and register a session; a room this shard owns must still exist.
+
+    A socket for a missing room (e.g. one the sweeper just removed) is closed
+    with `ROOM_EXPIRED_CLOSE_CODE` and returned already `closed`.
+    """
+
     await websocket.accept()
-    session = ClientSession(websocket=websocket, room_id=room_id)
+    session = ClientSession(websocket=websocket, room_id=room_id, max_queue_size=self.max_queue_size)
+    if self.owns(room_id) and room_manager.get_room(room_id) is None:
+      await self._expire_session(session)
+      return session
     self.rooms.setdefault(room_id, []).append(session)
-    session.heartbeat_task = asyncio.create_task(self._heartbeat_watch(session))
+    session.writer_task = asyncio.create_task(self._writer(session))
+    self.heartbeats.add(session)
     return session
 
   async def disconnect(self, session: ClientSession):
-    if session.heartbeat_task:
-      session.heartbeat_task.cancel()
+    self._detach(session)
+
+  def _detach(self, session: ClientSession):
+    """Stop a session's tasks and remove it from its room; safe to call twice."""
+
+    session.closed = True
+    session.outbox.clear()
+    self.heartbeats.remove(session)
+    if session.writer_task and session.writer_task is not asyncio.current_task():
+      session.writer_task.cancel()
     sessions = self.rooms.get(session.room_id, [])
     if session in sessions:
       sessions.remove(session)
+    if not sessions:
+      self.rooms.pop(session.room_id, None)
+      relay = self._relays.pop(session.room_id, None)
+      if relay is not None:
+        asyncio.create_task(self._stop_relay(session.room_id, relay))
+
+  def _reap(self, session: ClientSession):
+    if session.closed:
+      return
+    self.reaped_sessions += 1
+    self._detach(session)
+
+  def _drop_slow_consumer(self, session: ClientSession):
+    self.slow_disconnects += 1
+    self._detach(session)
+    asyncio.create_task(self._close_quietly(session.websocket, SLOW_CONSUMER_CLOSE_CODE))
+
+  def _evict_dead_peer(self, session: ClientSession):
+    self._detach(session)
+    asyncio.create_task(self._close_quietly(session.websocket, DEAD_PEER_CLOSE_CODE))
+
+  async def _after_sweep(self, report: SweepReport):
+    for room_id in report.evicted_rooms:
+      self._remote_watchers.pop(room_id, None)
+      for session in list(self.rooms.get(room_id, ())):
+        self._detach(session)
+        asyncio.create_task(self._close_quietly(session.websocket, ROOM_EXPIRED_CLOSE_CODE))
+    for room_id in report.evicted_participants:
+      room = room_manager.get_room(room_id)
+      if room is None:
+        continue
+      await self._settle_after_departure(room)
+      await self.broadcast_room_state(room_id)
+      await self.broadcast_state(room)
+
+  async def _expire_session(self, session: ClientSession, message: str = "room not found"):
+    """Send `room_missing`, then detach the session and close it with 4410.
+
+    Otherwise a socket for a vanished room keeps answering heartbeats and is
+    never reaped.
+    """
+
+    self._detach(session)
+    frame = encode_frame("error", {"code": "room_missing", "message": message, "recoverable": False})
+    try:
+      await self._send_with_timeout(session.websocket.send_text(frame.text))
+    except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError, OSError):
+      pass
+    await self._close_quietly(session.websocket, ROOM_EXPIRED_CLOSE_CODE)
 
-  async def _heartbeat_watch(self, session: ClientSession):
+  def _send_heartbeats(self, sessions: List[ClientSession]):
+    frame = encode_frame("heartbeat", {"timestamp": time.time(), "pendingActions": 0})
+    for session in sessions:
+      self._deliver(session, frame)
+
+  @staticmethod
+  async def _close_quietly(websocket: WebSocket, code: int):
+    try:
+      await websocket.close(code=code)
+    except (RuntimeError, OSError):
+      pass
+
+  async def _writer(self, session: ClientSession):
     try:
       while True:
-        await asyncio.sleep(3)
-        await self.send_event(
-          session,
-          "heartbeat",
-          {"timestamp": time.time(), "pendingActions": 0},
-        )
+        frame = await session.next_frame()
+        if session.compression and frame.compressible:
+          send = session.websocket.send_bytes(frame.deflated())
+        else:
+          send = session.websocket.send_text(frame.text)
+        await self._send_with_timeout(send)
     except asyncio.CancelledError:
       return
-    except WebSocketDisconnect:
-      return
+    except asyncio.TimeoutError:
+      self._drop_slow_consumer(session)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+      self._reap(session)
+
+  async def _send_with_timeout(self, send):
+    # Not asyncio.wait_for: before Python 3.12 it can swallow a cancellation
+    # that arrives as the send completes, leaving the writer running forever.
+    task = asyncio.ensure_future(send)
+    try:
+      done, _ = await asyncio.wait((task,), timeout=self.send_timeout)
+    except asyncio.CancelledError:
+      task.cancel()
+      raise
+    if not done:
+      task.cancel()
+      raise asyncio.TimeoutError
+    task.result()
+
+  def _deliver(self, session: ClientSession, frame: Frame):
+    if not session.enqueue(frame) and not session.closed:
+      self._drop_slow_consumer(session)
 
   async def send_event(self, session: ClientSession, event: str, payload: dict):
-    try:
-      await session.websocket.send_json({"event": event, "payload": payload})
-    except RuntimeError:
-      pass
+    self._deliver(session, encode_frame(event, payload))
+
+  async def broadcast(self, room_id: str, event: str, payload: dict, exclude: Optional[ClientSession] = None):
+    """Queue one pre-serialised frame for every session in the room.
+
+    Returns once the frame is queued; each session's writer task does the
+    actual send, so a stalled socket never holds up the rest of the room.
+    """
 
-  async def broadcast(self, room_id: str, event: str, payload: dict):
-    sessions = self.rooms.get(room_id, [])
-    for sess in list(sessions):
-      await self.send_event(sess, event, payload)
+    sessions = self.rooms.get(room_id)
+    relayed = self.bus is not None and room_id in self._remote_watchers
+    if not sessions and not relayed:
+      return
+    frame = encode_frame(event, payload)
+    for sess in list(sessions or ()):
+      if sess is not exclude:
+        self._deliver(sess, frame)
+    if relayed:
+      self._queue_publish(room_channel(room_id), frame.text)
+
+  # ---- sharding ----------------------------------------------------------
+
+  def owns(self, room_id: str) -> bool:
+    return self.shard_map is None or self.shard_map.owns(room_id)
+
+  async def attach_bus(self, bus: PubSub):
+    """Relay broadcasts through `bus` and answer other shards' snapshot requests."""
+
+    self.bus = bus
+    if self._publisher_task is None:
+      self._publisher_task = asyncio.create_task(self._publisher())
+    if self.shard_map is not None:
+      await bus.subscribe(f"shard:{self.shard_map.shard_id}", self._on_control)
+
+  async def detach_bus(self):
+    """Stop relaying; frames still waiting for the bus are discarded."""
+
+    if self._publisher_task is not None:
+      self._publisher_task.cancel()
+      try:
+        await self._publisher_task
+      except asyncio.CancelledError:
+        pass
+      self._publisher_task = None
+    self._publish_queue.clear()
+    bus, self.bus = self.bus, None
+    if bus is not None:
+      await bus.close()
+
+  def _queue_publish(self, channel: str, data: str):
+    if len(self._publish_queue) >= self.max_publish_queue:
+      self.dropped_publishes += 1
+      return
+    self._publish_queue.append((channel, data))
+    self._publish_ready.set()
+
+  async def _publisher(self):
+    while True:
+      while not self._publish_queue:
+        self._publish_ready.clear()
+        await self._publish_ready.wait()
+      channel, data = self._publish_queue.popleft()
+      if self.bus is None:
+        continue
+      try:
+        await self.bus.publish(channel, data)
+      except (ConnectionError, OSError):
+        self.dropped_publishes += 1
+
+  async def _on_control(self, data: str):
+    """Track which shards watch our rooms; answer a watch with a snapshot."""
+
+    message = json.loads(data)
+    room_id, shard = message.get("roomId", ""), message.get("shard")
+    if message.get("op") == "unwatch":
+      watchers = self._remote_watchers.get(room_id)
+      if watchers is not None:
+        watchers.discard(shard)
+        if not watchers:
+          self._remote_watchers.pop(room_id, None)
+      return
+    if message.get("op") != "snapshot":
+      return
+    room = room_manager.get_room(room_id)
+    if room is None:
+      return
+    if shard:
+      self._remote_watchers.setdefault(room.id, set()).add(shard)
+    snapshot = {"sequenceId": room.sequence_id, "snapshot": True, **self._state_fields(room), **self._room_fields(room)}
+    # Same queue as the broadcasts, so the snapshot cannot overtake older deltas.
+    self._queue_publish(room_channel(room.id), encode_frame("room_state", snapshot).text)
+
+  async def watch_remote(self, session: ClientSession):
+    """Feed a session on a non-owning shard from the owner's broadcasts."""
+
+    room_id = session.room_id
+    if room_id not in self._relays:
+      async def relay(text: str):
+        frame = Frame(text, compressible=_is_compressible_text(text))
+        for sess in list(self.rooms.get(room_id, ())):
+          self._deliver(sess, frame)
+
+      self._relays[room_id] = relay
+      await self.bus.subscribe(room_channel(room_id), relay)
+    await self._notify_owner(room_id, "snapshot")
+
+  async def _stop_relay(self, room_id: str, relay):
+    await self.bus.unsubscribe(room_channel(room_id), relay)
+    # A spectator may have re-opened the relay while we were unsubscribing.
+    if room_id not in self._relays:
+      await self._notify_owner(room_id, "unwatch")
+
+  async def _notify_owner(self, room_id: str, op: str):
+    owner = self.shard_map.owner(room_id)
+    message = {"op": op, "roomId": room_id, "shard": self.shard_map.shard_id}
+    await self.bus.publish(f"shard:{owner}", json.dumps(message))
+
+  def metrics(self) -> dict:
+    sessions = [sess for room in self.rooms.values() for sess in room]
+    return {
+      "rooms": len(self.rooms),
+      "sessions": len(sessions),
+      "queuedFrames": sum(len(sess.outbox) for sess in sessions),
+      "maxQueueDepth": max((len(sess.outbox) for sess in sessions), default=0),
+      "droppedFrames": sum(sess.dropped_frames for sess in sessions),
+      "slowDisconnects": self.slow_disconnects,
+      "reapedSessions": self.reaped_sessions,
+      "heartbeat": self.heartbeats.metrics(),
+      "shard": self.shard_map.shard_id if self.shard_map else None,
+      "relayedRooms": len(self._relays),
+      "remoteWatchedRooms": len(self._remote_watchers),
+      "queuedPublishes": len(self._publish_queue),
+      "droppedPublishes": self.dropped_publishes,
+      "handPipeline": self.hand_pipeline.metrics(),
+      "roomSweeper": self.sweeper.metrics(),
+    }
 
   async def handle(self, session: ClientSession, message: dict):
     event = message.get("event")
     payload = message.get("payload") or {}
     previous_seen = session.last_seen
     session.last_seen = time.monotonic()
+    if session.player_id:
+      room_manager.touch(session.room_id, session.player_id)
     if event == "join_room":
       await self._handle_join(session, payload)
     elif event == "leave_room":
@@ -81,8 +459,12 @@ class P2PSyncController:
       await self._handle_action(session, payload, time.monotonic() - previous_seen)
     elif event == "reaction":
       await self._handle_reaction(session, payload)
+    elif event == "resync":
+      await self.resync(session, _parse_sequence(payload.get("since")))
     elif event == "heartbeat":
       await self.send_event(session, "heartbeat", {"timestamp": time.time(), "pendingActions": 0})
+    elif event == "heartbeat_ack":
+      pass
     else:
       await self.send_event(
         session,
@@ -94,17 +476,15 @@ class P2PSyncController:
     room_id = session.room_id
     normalized_id = payload.get("playerId") or f"auto-{uuid.uuid4()}"
     session.player_id = normalized_id
+    if payload.get("compression") in SUPPORTED_COMPRESSION:
+      session.compression = payload["compression"]
     try:
       room_manager.join_room(
         room_id,
         request_participant(normalized_id, payload.get("displayName", "Guest"), payload.get("role", "player")),
       )
     except KeyError:
-      await self.send_event(
-        session,
-        "error",
-        {"code": "room_missing", "message": "room not found", "recoverable": False},
-      )
+      await self._expire_session(session)
       return
     except RuntimeError as exc:
       await self.send_event(
@@ -120,16 +500,15 @@ class P2PSyncController:
       await self._start_next_hand(room_id)
 
   async def _handle_leave(self, session: ClientSession, payload: dict):
-    room_manager.leave_room(session.room_id, payload.get("playerId", session.player_id or ""))
+    room = room_manager.leave_room(session.room_id, payload.get("playerId", session.player_id or ""))
+    if room is not None and room_manager.get_room(room.id) is room:
+      await self._settle_after_departure(room)
     await self.broadcast_room_state(session.room_id)
-    room = room_manager.get_room(session.room_id)
-    if room and len(room.players) < 2:
-      room.phase = "waiting"
 
   async def _handle_action(self, session: ClientSession, payload: dict, delta: float):
     room = room_manager.get_room(session.room_id)
     if not room:
-      await self.send_event(session, "error", {"code": "room_missing", "message": "room gone", "recoverable": False})
+      await self._expire_session(session, "room gone")
       return
     player_id = session.player_id or payload.get("playerId")
     action_type = (payload.get("type") or "call").lower()
@@ -141,7 +520,7 @@ class P2PSyncController:
         {"code": "missing_player", "message": "player not registered", "recoverable": False},
       )
       return
-    current_actor = self._current_actor(room)
+    current_actor = room.current_actor
     if current_actor and player_id != current_actor:
       await self.send_event(
         session,
@@ -157,7 +536,8 @@ class P2PSyncController:
     if delta < 0.15:
       room.anti_cheat_warnings.append(f"{player_id} action too fast ({delta:.3f}s)")
     if action_type == "fold":
-      room.folded.add(player_id)
+      # Folding unlinks the seat, which already hands the turn to the next player.
+      room.fold(player_id)
     elif action_type == "draw":
       room.phase = "draw"
     else:
@@ -165,7 +545,8 @@ class P2PSyncController:
       room.bets[player_id] = room.bets.get(player_id, 0) + bet_amount
       room.stacks[player_id] = max(0, room.stacks.get(player_id, 0) - bet_amount)
       room.pot += bet_amount
-    self._advance_turn(room)
+    if action_type != "fold":
+      room.advance_turn()
     room_manager.record_log(
       room.id,
       {
@@ -176,13 +557,13 @@ class P2PSyncController:
       },
     )
     await self.broadcast_state(room)
-    if self._is_showdown(room):
+    if room.is_showdown():
       await self._finalize_hand(room)
 
   async def _handle_reaction(self, session: ClientSession, payload: dict):
     room = room_manager.get_room(session.room_id)
     if not room:
-      await self.send_event(session, "error", {"code": "room_missing", "message": "room gone", "recoverable": False})
+      await self._expire_session(session, "room gone")
       return
     player_id = session.player_id or payload.get("playerId")
     participant = room.players.get(player_id or "")
@@ -214,46 +595,19 @@ class P2PSyncController:
         {"code": "invalid_reaction", "message": f"Unsupported reaction {reaction_type}", "recoverable": True},
       )
 
-  def _advance_turn(self, room):
-    if not room.turn_order:
-      return
-    active = [pid for pid in room.turn_order if pid not in room.folded]
-    if not active:
-      return
-    room.current_turn_index = (room.current_turn_index + 1) % len(active)
-    room.turn_order = active
-
-  def _current_actor(self, room):
-    if not room.turn_order:
-      return None
-    active = [pid for pid in room.turn_order if pid not in room.folded]
-    if not active:
-      return None
-    room.current_turn_index = room.current_turn_index % len(active)
-    return active[room.current_turn_index]
-
-  def _is_showdown(self, room):
-    active = [pid for pid in room.turn_order if pid not in room.folded]
-    return len(active) <= 1
-
-  async def broadcast_state(self, room: RoomState):
-    delta = {
-      "sequenceId": room.bump_sequence(),
+  def _state_fields(self, room: RoomState) -> dict:
+    return {
       "handId": room.hand_id,
       "phase": room.phase,
-      "bets": room.bets,
+      "bets": dict(room.bets),
       "pot": room.pot,
-      "stacks": room.stacks,
+      "stacks": dict(room.stacks),
       "lastAction": room.history[-1] if room.history else {},
-      "currentTurnPlayerId": self._current_actor(room),
+      "currentTurnPlayerId": room.current_actor,
     }
-    await self.broadcast(room.id, "updated_state", delta)
 
-  async def broadcast_room_state(self, room_id: str):
-    room = room_manager.get_room(room_id)
-    if not room:
-      return
-    payload = {
+  def _room_fields(self, room: RoomState) -> dict:
+    return {
       "roomId": room.id,
       "phase": room.phase,
       "players": list(room.players.keys()),
@@ -271,91 +625,182 @@ class P2PSyncController:
         for player in room.players.values()
       ],
       "spectators": list(room.spectators.keys()),
-      "sequenceId": room.sequence_id,
       "handId": room.hand_id,
-      "currentTurnPlayerId": self._current_actor(room),
+      "currentTurnPlayerId": room.current_actor,
       "warnings": room.anti_cheat_warnings[-5:],
     }
-    await self.broadcast(room_id, "room_state", payload)
+
+  async def broadcast_state(self, room: RoomState, exclude: Optional[ClientSession] = None):
+    """Broadcast the betting fields that changed since the last `updated_state`."""
+
+    delta = room.publish("updated_state", self._state_fields(room))
+    if delta is not None:
+      await self.broadcast(room.id, "updated_state", delta, exclude=exclude)
+
+  async def broadcast_room_state(self, room_id: str, exclude: Optional[ClientSession] = None):
+    """Broadcast the roster fields that changed since the last `room_state`."""
+
+    room = room_manager.get_room(room_id)
+    if not room:
+      return
+    delta = room.publish("room_state", self._room_fields(room))
+    if delta is not None:
+      await self.broadcast(room_id, "room_state", delta, exclude=exclude)
+
+  async def send_snapshot(self, session: ClientSession):
+    """Send one session a full `room_state` that also carries the betting fields."""
+
+    room = room_manager.get_room(session.room_id)
+    if not room:
+      return
+    # Publish first so the snapshot and the other sessions agree on the sequence.
+    await self.broadcast_room_state(room.id, exclude=session)
+    await self.broadcast_state(room, exclude=session)
+    snapshot = {**self._state_fields(room), **self._room_fields(room)}
+    await self.send_event(session, "room_state", {"sequenceId": room.sequence_id, "snapshot": True, **snapshot})
+
+  async def resync(self, session: ClientSession, since: Optional[int]):
+    """Replay the deltas after `since`, or fall back to a full snapshot."""
+
+    room = room_manager.get_room(session.room_id)
+    if not room:
+      return
+    deltas = room.deltas_since(since) if since is not None else None
+    if deltas is None:
+      await self.send_snapshot(session)
+      return
+    for entry in deltas:
+      await self.send_event(session, entry["event"], entry["payload"])
 
   async def _send_room_history(self, room_id: str):
     room = room_manager.get_room(room_id)
     if not room:
       return
-    await self.broadcast(room_id, "history", {"events": room.history[-5:]})
+    await self.broadcast(room_id, "history", {"events": room.recent_history(5)})
+
+  async def _settle_after_departure(self, room: RoomState):
+    """Close out a hand that players left (or were swept from) mid-way."""
+
+    if room.phase in ("playing", "draw") and room.is_showdown():
+      await self._finalize_hand(room, start_next=len(room.players) >= 2)
+    if len(room.players) < 2:
+      room.phase = "waiting"
 
-  async def _finalize_hand(self, room):
+  async def _finalize_hand(self, room, start_next: bool = True):
     room.phase = "finishing"
-    winner = next((pid for pid in room.turn_order if pid not in room.folded), None)
+    winner = room.current_actor
     summary = {
       "handId": room.hand_id,
       "winner": winner,
       "pot": room.pot,
       "warnings": room.anti_cheat_warnings[-3:],
     }
-    db.p2p_history.append(summary)
-    db.history["hand"].append(
-      {
-        "handId": room.hand_id,
-        "winner": winner or "none",
-        "pot": room.pot,
-        "players": list(room.players.keys()),
-        "metadata": {"phase": "p2p"},
-        "warnings": summary["warnings"],
-      }
-    )
-    winner_rating = db.ratings.get(winner, {"sr": 1500, "mr": 1500, "gr": 1500})
-    if winner:
-      updated = {
-        "sr": winner_rating["sr"] + 5,
-        "mr": winner_rating["mr"] + 3,
-        "gr": winner_rating["gr"] + 2,
-        "updated_at": db._now(),
-      }
-      db.ratings[winner] = updated
-    for loser in room.players:
-      if loser == winner:
-        continue
-      loser_rating = db.ratings.get(loser, {"sr": 1500, "mr": 1500, "gr": 1500})
-      db.ratings[loser] = {
-        "sr": max(1200, loser_rating["sr"] - 2),
-        "mr": max(1200, loser_rating["mr"] - 1),
-        "gr": max(1200, loser_rating["gr"] - 1),
-        "updated_at": db._now(),
-      }
+    deal_encryption.expire_hand(deal_encryption.key_id(room.id, room.hand_id))
     await self.broadcast(room.id, "showdown", summary)
-    await self._start_next_hand(room.id)
+    # History and ratings are applied by the hand pipeline, off this handler.
+    await self.hand_pipeline.publish(
+      {**summary, "roomId": room.id, "players": list(room.players.keys()), "finishedAt": db._now()}
+    )
+    if start_next:
+      await self._start_next_hand(room.id)
 
   async def _start_next_hand(self, room_id: str):
     room = room_manager.reset_hand(room_id)
     if not room:
       return
-    key_id = f"{room_id}:{room.hand_id}"
-    create_card_key(key_id)
-    tokens = []
-    deals = random.sample(CARDS, len(room.turn_order)) if room.turn_order else []
-    for idx, player_id in enumerate(room.turn_order):
-      card = deals[idx]
-      token = encrypt_card(f"{card}-{idx}", key_id)
-      token["slot"] = f"seat-{idx}"
-      tokens.append({"playerId": player_id, "cardToken": token})
-    await self.broadcast(room_id, "secure_deal", {"handId": room.hand_id, "cards": tokens})
+    key_id = deal_encryption.open_hand(room_id, room.hand_id, room.deal_secret)
+    slots = [f"seat-{idx}" for idx in range(len(room.turn_order))]
+    deals = random.sample(CARDS, len(slots))
+    sealed = deal_encryption.encrypt_deal(key_id, list(zip(slots, deals)))
+    tokens = [
+      {"playerId": player_id, "slot": slot, "cardToken": token}
+      for player_id, slot, token in zip(room.turn_order, slots, sealed)
+    ]
+    await self.broadcast(room_id, "secure_deal", {"handId": room.hand_id, "keyId": key_id, "cards": tokens})
     await self.broadcast_state(room)
 
 
+def _parse_sequence(value) -> Optional[int]:
+  try:
+    return int(value)
+  except (TypeError, ValueError):
+    return None
+
+
 def request_participant(player_id: str, display_name: str, role: str) -> Participant:
   return Participant(id=player_id, display_name=display_name, role=role)
 
 
-controller = P2PSyncController()
+controller = P2PSyncController(shard_map=ShardMap.from_env(), hand_pipeline=HandPipeline(db, sink_from_env()))
+
+
+async def start_sharding():
+  if controller.shard_map is None:
+    return
+  url = os.environ.get("P2P_PUBSUB_URL", "memory://")
+  if len(controller.shard_map.urls) > 1 and urlparse(url).scheme in ("", "memory"):
+    # An in-process bus never reaches the other workers, so their spectators
+    # would silently receive nothing.
+    raise RuntimeError("P2P_SHARDS lists several shards; set P2P_PUBSUB_URL to a unix:// or redis:// bus")
+  bus = pubsub_from_url(url)
+  await bus.start()
+  await controller.attach_bus(bus)
+
+
+async def stop_sharding():
+  await controller.detach_bus()
+
+
+async def start_room_sweeper():
+  controller.sweeper.start()
+
+
+async def stop_room_sweeper():
+  await controller.sweeper.stop()
+
+
+async def _redirect_to_owner(websocket: WebSocket, room_id: str):
+  owner_url = controller.shard_map.owner_url(room_id)
+  await websocket.accept()
+  await websocket.send_json(
+    {
+      "event": "redirect",
+      "payload": {
+        "roomId": room_id,
+        "shardId": controller.shard_map.owner(room_id),
+        "url": owner_url.replace("http", "ws", 1) + f"/ws/room/{room_id}/play",
+      },
+    }
+  )
+  await websocket.close(code=WRONG_SHARD_CLOSE_CODE)
 
 
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
+  relay = not controller.owns(room_id)
+  if relay and (controller.bus is None or websocket.query_params.get("role") != "spectator"):
+    await _redirect_to_owner(websocket, room_id)
+    return
   session = await controller.connect(room_id, websocket)
+  if session.closed:
+    return
   try:
-    await controller.broadcast_room_state(room_id)
+    if relay:
+      await controller.watch_remote(session)
+    else:
+      await controller.resync(session, _parse_sequence(websocket.query_params.get("since")))
     while True:
       message = await websocket.receive_json()
+      if relay and message.get("event") not in ("heartbeat", "heartbeat_ack"):
+        await controller.send_event(
+          session,
+          "error",
+          {"code": "read_only", "message": "spectator connection on a relay shard", "recoverable": True},
+        )
+        continue
       await controller.handle(session, message)
+      if session.closed:
+        break
   except WebSocketDisconnect:
+    pass
+  finally:
     await controller.disconnect(session)
@@ -1,9 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import sys
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from server.security import deal_encryption, new_room_secret
+
+logger = logging.getLogger(__name__)
+
+# Published deltas kept per room for `since=<sequenceId>` resync; a client
+# further behind than this gets a full snapshot instead.
+DELTA_RING_SIZE = 128
+# Action log entries kept per room; older entries fall off the front.
+ROOM_HISTORY_SIZE = 256
+# A participant not heard from for this long is removed from its room.
+PARTICIPANT_TTL_SECONDS = float(os.environ.get("P2P_PARTICIPANT_TTL_SECONDS", "120"))
+# A room with no recorded action for this long is removed with everyone in it.
+ROOM_TTL_SECONDS = float(os.environ.get("P2P_ROOM_TTL_SECONDS", "1800"))
+SWEEP_INTERVAL_SECONDS = 30.0
 
 
 @dataclass
@@ -28,24 +49,177 @@ class RoomState:
   phase: str = "waiting"
   metadata: Dict[str, str] = field(default_factory=dict)
   sequence_id: int = 0
-  history: List[Dict[str, str]] = field(default_factory=list)
+  history: Deque[Dict[str, str]] = field(default_factory=lambda: deque(maxlen=ROOM_HISTORY_SIZE))
   hand_id: str = field(default_factory=lambda: str(uuid.uuid4()))
   last_action_at: float = field(default_factory=time.monotonic)
   stacks: Dict[str, int] = field(default_factory=dict)
   bets: Dict[str, int] = field(default_factory=dict)
   pot: int = 0
+  # Seat order for the hand. Players still in the hand are also linked into a
+  # circular list (`_next_seat`/`_prev_seat`) so turn changes are O(1).
   turn_order: List[str] = field(default_factory=list)
-  current_turn_index: int = 0
+  current_actor: Optional[str] = None
   folded: set = field(default_factory=set)
   anti_cheat_warnings: List[str] = field(default_factory=list)
+  # Per-hand card keys are derived from this; it never leaves the server.
+  deal_secret: bytes = field(default_factory=new_room_secret, repr=False)
+  published_state: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+  state_deltas: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=DELTA_RING_SIZE))
+  _next_seat: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
+  _prev_seat: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
 
   def bump_sequence(self) -> int:
     self.sequence_id += 1
     return self.sequence_id
 
+  # ---- turn tracking -----------------------------------------------------
+
+  @property
+  def active_count(self) -> int:
+    """Players still in the hand (not folded, not left)."""
+
+    return len(self._next_seat)
+
+  def active_players(self) -> List[str]:
+    """Active players in acting order, starting with the current actor."""
+
+    order = []
+    pid = self.current_actor
+    while pid is not None and len(order) < len(self._next_seat):
+      order.append(pid)
+      pid = self._next_seat[pid]
+    return order
+
+  def reset_turns(self, order) -> None:
+    """Seat `order` for a new hand; the first seat acts first."""
+
+    self.turn_order = list(order)
+    self.folded = set()
+    self._next_seat = {}
+    self._prev_seat = {}
+    self.current_actor = None
+    for pid in self.turn_order:
+      self._link_seat(pid)
+
+  def add_seat(self, pid: str) -> None:
+    """Seat a player; mid-hand they act after everyone already due this round."""
+
+    if pid not in self.turn_order:
+      self.turn_order.append(pid)
+    if pid not in self.folded:
+      self._link_seat(pid)
+
+  def remove_seat(self, pid: str) -> None:
+    """Take a leaving player out of the hand; the turn passes on if it was theirs."""
+
+    if pid in self.turn_order:
+      self.turn_order.remove(pid)
+    self.folded.discard(pid)
+    self._unlink_seat(pid)
+
+  def fold(self, pid: str) -> None:
+    """Fold `pid`; when it is their turn, the next active seat becomes the actor."""
+
+    self.folded.add(pid)
+    self._unlink_seat(pid)
+
+  def advance_turn(self) -> Optional[str]:
+    if self.current_actor is not None:
+      self.current_actor = self._next_seat[self.current_actor]
+    return self.current_actor
+
+  def is_showdown(self) -> bool:
+    return self.active_count <= 1
+
+  def _link_seat(self, pid: str) -> None:
+    if pid in self._next_seat:
+      return
+    if self.current_actor is None:
+      self._next_seat[pid] = self._prev_seat[pid] = pid
+      self.current_actor = pid
+      return
+    # Insert just before the current actor, i.e. at the end of the rotation.
+    after = self._prev_seat[self.current_actor]
+    self._next_seat[after] = pid
+    self._prev_seat[pid] = after
+    self._next_seat[pid] = self.current_actor
+    self._prev_seat[self.current_actor] = pid
+
+  def _unlink_seat(self, pid: str) -> None:
+    after = self._next_seat.pop(pid, None)
+    if after is None:
+      return
+    before = self._prev_seat.pop(pid)
+    if after == pid:
+      self.current_actor = None
+      return
+    self._next_seat[before] = after
+    self._prev_seat[after] = before
+    if self.current_actor == pid:
+      self.current_actor = after
+
+  # ---- state deltas ------------------------------------------------------
+
+  def publish(self, event: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Record `fields` as the latest `event` state and return what changed.
+
+    Returns None when nothing changed; otherwise the changed fields under a
+    fresh sequence id, which are also appended to `state_deltas`. `fields`
+    must not share mutable containers with the live room state.
+    """
+
+    previous = self.published_state.get(event, {})
+    changes = {key: value for key, value in fields.items() if key not in previous or previous[key] != value}
+    self.published_state[event] = fields
+    if not changes:
+      return None
+    payload = {"sequenceId": self.bump_sequence(), **changes}
+    self.state_deltas.append({"event": event, "payload": payload})
+    return payload
+
+  def deltas_since(self, sequence_id: int) -> Optional[List[Dict[str, Any]]]:
+    """Deltas after `sequence_id`, or None when the ring no longer covers the gap."""
+
+    if sequence_id == self.sequence_id:
+      return []
+    if sequence_id > self.sequence_id or not self.state_deltas:
+      return None
+    oldest = self.state_deltas[0]["payload"]["sequenceId"]
+    if sequence_id < oldest - 1:
+      return None
+    return [entry for entry in self.state_deltas if entry["payload"]["sequenceId"] > sequence_id]
+
   def mark_action(self):
     self.last_action_at = time.monotonic()
 
+  def recent_history(self, limit: int) -> List[Dict[str, str]]:
+    return list(islice(self.history, max(0, len(self.history) - limit), None))
+
+
+@dataclass
+class SweepReport:
+  evicted_rooms: List[str] = field(default_factory=list)
+  # room id -> participants removed from rooms that are still alive
+  evicted_participants: Dict[str, List[str]] = field(default_factory=dict)
+  bytes_reclaimed: int = 0
+
+
+def _approx_size(obj: Any, seen: Optional[set] = None) -> int:
+  """Rough deep `sys.getsizeof` of rooms, participants and their containers."""
+
+  seen = set() if seen is None else seen
+  if id(obj) in seen:
+    return 0
+  seen.add(id(obj))
+  size = sys.getsizeof(obj)
+  if isinstance(obj, dict):
+    size += sum(_approx_size(key, seen) + _approx_size(value, seen) for key, value in obj.items())
+  elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+    size += sum(_approx_size(item, seen) for item in obj)
+  elif hasattr(obj, "__dict__"):
+    size += _approx_size(vars(obj), seen)
+  return size
+
 
 class InMemoryRoomManager:
   def __init__(self):
@@ -72,6 +246,7 @@ class InMemoryRoomManager:
 
   def remove_room(self, room_id: str):
     self._rooms.pop(room_id, None)
+    deal_encryption.expire_room(room_id)
 
   def join_room(self, room_id: str, participant: Participant):
     room = self.get_room(room_id)
@@ -90,8 +265,7 @@ class InMemoryRoomManager:
     starting_stack = int(room.metadata.get("startingStack") or 1500)
     room.stacks.setdefault(participant.id, starting_stack)
     room.bets.setdefault(participant.id, 0)
-    if participant.id not in room.turn_order:
-      room.turn_order.append(participant.id)
+    room.add_seat(participant.id)
     return room
 
   def leave_room(self, room_id: str, participant_id: str):
@@ -100,8 +274,7 @@ class InMemoryRoomManager:
       return None
     room.players.pop(participant_id, None)
     room.spectators.pop(participant_id, None)
-    room.turn_order = [pid for pid in room.turn_order if pid != participant_id]
-    room.folded.discard(participant_id)
+    room.remove_seat(participant_id)
     if not room.players and not room.spectators:
       self.remove_room(room_id)
     return room
@@ -113,6 +286,45 @@ class InMemoryRoomManager:
     room.spectators[participant.id] = participant
     return room
 
+  def touch(self, room_id: str, participant_id: str) -> None:
+    room = self.get_room(room_id)
+    if room:
+      participant = room.players.get(participant_id) or room.spectators.get(participant_id)
+      if participant:
+        participant.last_seen = time.monotonic()
+
+  def sweep(
+    self,
+    participant_ttl: float = PARTICIPANT_TTL_SECONDS,
+    room_ttl: float = ROOM_TTL_SECONDS,
+    now: Optional[float] = None,
+  ) -> SweepReport:
+    """Remove participants idle past `participant_ttl` and rooms idle past `room_ttl`.
+
+    A room only counts as idle when nobody acted for `room_ttl` and no
+    participant was seen within `participant_ttl`, so a lobby whose players
+    keep answering heartbeats survives. A room is also removed once its last
+    participant is swept, the same as when the last one leaves explicitly.
+    """
+
+    now = time.monotonic() if now is None else now
+    report = SweepReport()
+    for room in list(self._rooms.values()):
+      participants = (*room.players.values(), *room.spectators.values())
+      stale = [participant for participant in participants if now - participant.last_seen > participant_ttl]
+      if len(stale) == len(participants) and (stale or now - room.last_action_at > room_ttl):
+        report.bytes_reclaimed += _approx_size(room)
+        self.remove_room(room.id)
+        report.evicted_rooms.append(room.id)
+        continue
+      if not stale:
+        continue
+      for participant in stale:
+        report.bytes_reclaimed += _approx_size(participant)
+        self.leave_room(room.id, participant.id)
+      report.evicted_participants[room.id] = [participant.id for participant in stale]
+    return report
+
   def record_log(self, room_id: str, entry: Dict[str, str]):
     room = self.get_room(room_id)
     if room:
@@ -126,10 +338,8 @@ class InMemoryRoomManager:
       room.hand_id = str(uuid.uuid4())
       room.pot = 0
       room.bets = {pid: 0 for pid in room.players.keys()}
-      room.turn_order = list(room.players.keys())
-      room.current_turn_index = 0
+      room.reset_turns(room.players.keys())
       room.phase = "playing"
-      room.folded = set()
       room.anti_cheat_warnings.clear()
       for player in room.players.values():
         player.ready = False
@@ -137,4 +347,81 @@ class InMemoryRoomManager:
     return room
 
 
+class RoomSweeper:
+  """Periodically runs `InMemoryRoomManager.sweep` and reports what it freed.
+
+  Rooms whose sockets dropped without `leave_room` would otherwise live for
+  the life of the process. `on_sweep` is awaited with each non-empty report
+  so the caller can close or update the affected sessions.
+  """
+
+  def __init__(
+    self,
+    manager: InMemoryRoomManager,
+    on_sweep: Optional[Callable[[SweepReport], Awaitable[None]]] = None,
+    *,
+    interval: float = SWEEP_INTERVAL_SECONDS,
+    participant_ttl: float = PARTICIPANT_TTL_SECONDS,
+    room_ttl: float = ROOM_TTL_SECONDS,
+  ):
+    self.manager = manager
+    self.on_sweep = on_sweep
+    self.interval = interval
+    self.participant_ttl = participant_ttl
+    self.room_ttl = room_ttl
+    self._task: Optional[asyncio.Task] = None
+    self.sweeps = 0
+    self.rooms_evicted = 0
+    self.participants_evicted = 0
+    self.bytes_reclaimed = 0
+
+  async def run_once(self, now: Optional[float] = None) -> SweepReport:
+    report = self.manager.sweep(self.participant_ttl, self.room_ttl, now)
+    self.sweeps += 1
+    self.rooms_evicted += len(report.evicted_rooms)
+    self.participants_evicted += sum(len(ids) for ids in report.evicted_participants.values())
+    self.bytes_reclaimed += report.bytes_reclaimed
+    if report.evicted_rooms or report.evicted_participants:
+      logger.info(
+        "Swept %d rooms and %d participants (~%d bytes)",
+        len(report.evicted_rooms),
+        sum(len(ids) for ids in report.evicted_participants.values()),
+        report.bytes_reclaimed,
+      )
+      if self.on_sweep is not None:
+        await self.on_sweep(report)
+    return report
+
+  def metrics(self) -> Dict[str, Any]:
+    return {
+      "sweeps": self.sweeps,
+      "roomsEvicted": self.rooms_evicted,
+      "participantsEvicted": self.participants_evicted,
+      "bytesReclaimed": self.bytes_reclaimed,
+      "running": bool(self._task and not self._task.done()),
+    }
+
+  def start(self) -> None:
+    if self._task is None or self._task.done():
+      self._task = asyncio.create_task(self._run())
+
+  async def _run(self) -> None:
+    while True:
+      await asyncio.sleep(self.interval)
+      try:
+        await self.run_once()
+      except Exception:  # noqa: BLE001 - keep sweeping on the next interval
+        logger.exception("Room sweep failed")
+
+  async def stop(self) -> None:
+    if self._task is None:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
+
+
 room_manager = InMemoryRoomManager()
@@ -9,7 +9,7 @@ router = APIRouter()
 
 @router.get("/hand")
 def list_hands():
-  return ok(db.history["hand"][-50:])
+  return ok(db.recent("hand", 50))
 
 
 @router.post("/hand")
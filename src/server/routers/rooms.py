@@ -1,15 +1,31 @@
 from fastapi import APIRouter, HTTPException
 
+from server.p2p_sync import controller
 from server.room_manager import Participant, room_manager
 from server.schemas import RoomCreateRequest, RoomInfoResponse, RoomJoinRequest, RoomLeaveRequest, ok
 
 router = APIRouter()
 
 
+def _require_owner(room_id: str):
+  """Reject requests for rooms that live on another shard (HTTP 421)."""
+
+  if not controller.owns(room_id):
+    raise HTTPException(
+      status_code=421,
+      detail={"code": "wrong_shard", "shardId": controller.shard_map.owner(room_id), "url": controller.shard_map.owner_url(room_id)},
+    )
+
+
 @router.post("/create")
 def create_room(payload: RoomCreateRequest):
+  room_id = controller.shard_map.new_room_id() if controller.shard_map else None
   try:
-    room = room_manager.create_room(max_players=payload.max_players, metadata={"mode": payload.mode, **payload.metadata})
+    room = room_manager.create_room(
+      room_id=room_id,
+      max_players=payload.max_players,
+      metadata={"mode": payload.mode, **payload.metadata},
+    )
   except ValueError as exc:
     raise HTTPException(status_code=400, detail=str(exc))
   return ok(
@@ -24,6 +40,7 @@ def create_room(payload: RoomCreateRequest):
 
 @router.post("/join")
 def join_room(payload: RoomJoinRequest):
+  _require_owner(payload.room_id)
   try:
     participant = Participant(
       id=payload.player_id,
@@ -41,6 +58,7 @@ def join_room(payload: RoomJoinRequest):
 
 @router.post("/leave")
 def leave_room(payload: RoomLeaveRequest):
+  _require_owner(payload.room_id)
   room = room_manager.leave_room(payload.room_id, payload.player_id)
   if room is None:
     raise HTTPException(status_code=404, detail="room not found")
@@ -49,6 +67,7 @@ def leave_room(payload: RoomLeaveRequest):
 
 @router.get("/info/{room_id}")
 def get_room_info(room_id: str):
+  _require_owner(room_id)
   room = room_manager.get_room(room_id)
   if not room:
     raise HTTPException(status_code=404, detail="room not found")
@@ -80,3 +99,8 @@ def list_rooms():
       for r in rooms
     ]
   )
+
+
+@router.get("/metrics")
+def get_sync_metrics():
+  return ok(controller.metrics())
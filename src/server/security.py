@@ -2,52 +2,98 @@ from __future__ import annotations
 
 import base64
 import os
-from typing import Dict
-
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-
-ALGO = algorithms.AES
-TAG_LENGTH = 16
-IV_LENGTH = 12
-
-_key_store: Dict[str, bytes] = {}
-
-
-def create_card_key(key_id: str) -> bytes:
-  key = os.urandom(32)
-  _key_store[key_id] = key
-  return key
-
-
-def encrypt_card(card_id: str, key_id: str):
-  key = _key_store.get(key_id)
-  if key is None:
-    raise KeyError(f"Missing key {key_id}")
-  iv = os.urandom(IV_LENGTH)
-  cipher = Cipher(ALGO(key), modes.GCM(iv), backend=default_backend())
-  encryptor = cipher.encryptor()
-  ciphertext = encryptor.update(card_id.encode("utf8")) + encryptor.finalize()
-  tag = encryptor.tag
-  return {
-    "keyId": key_id,
-    "iv": base64.b64encode(iv).decode("utf8"),
-    "tag": base64.b64encode(tag).decode("utf8"),
-    "ciphertext": base64.b64encode(ciphertext).decode("utf8"),
-  }
-
-
-def decrypt_card(token: dict):
-  key = _key_store.get(token["keyId"])
-  if key is None:
-    raise KeyError(f"Missing key {token['keyId']}")
-  iv = base64.b64decode(token["iv"])
-  tag = base64.b64decode(token["tag"])
-  ciphertext = base64.b64decode(token["ciphertext"])
-  cipher = Cipher(ALGO(key), modes.GCM(iv, tag), backend=default_backend())
-  decryptor = cipher.decryptor()
-  return decryptor.update(ciphertext) + decryptor.finalize()
-
-
-def list_keys():
-  return list(_key_store.keys())
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+KEY_LENGTH = 32
+NONCE_LENGTH = 12
+TOKEN_VERSION = b"\x01"
+
+
+def new_room_secret() -> bytes:
+  return os.urandom(KEY_LENGTH)
+
+
+def _b64encode(data: bytes) -> str:
+  return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+  return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class DealEncryptionService:
+  """AES-GCM card tokens under per-hand keys derived from a room secret.
+
+  `open_hand` derives the hand key with HKDF (info = key id) and keeps one
+  `AESGCM` primitive for it; `encrypt_deal` seals every seat's card with that
+  primitive in one pass. Each token is `base64url(version | nonce | ciphertext
+  | tag)`, with the key id and slot bound as associated data so a token cannot
+  be replayed for another seat or hand. Opening a room's next hand, or
+  `expire_hand`, drops the previous key, so at most one key per live room is
+  held.
+  """
+
+  def __init__(self):
+    self._keys: Dict[str, AESGCM] = {}
+    self._room_keys: Dict[str, str] = {}
+
+  @staticmethod
+  def key_id(room_id: str, hand_id: str) -> str:
+    return f"{room_id}:{hand_id}"
+
+  def open_hand(self, room_id: str, hand_id: str, room_secret: bytes) -> str:
+    key_id = self.key_id(room_id, hand_id)
+    previous = self._room_keys.get(room_id)
+    if previous is not None and previous != key_id:
+      self._keys.pop(previous, None)
+    key = HKDF(algorithm=hashes.SHA256(), length=KEY_LENGTH, salt=None, info=key_id.encode("utf8")).derive(room_secret)
+    self._keys[key_id] = AESGCM(key)
+    self._room_keys[room_id] = key_id
+    return key_id
+
+  def encrypt_deal(self, key_id: str, cards: Sequence[Tuple[str, str]]) -> List[str]:
+    """Encrypt `(slot, card)` pairs; returns one token per pair, in order."""
+
+    aead = self._aead(key_id)
+    nonces = os.urandom(NONCE_LENGTH * len(cards))
+    tokens = []
+    for index, (slot, card) in enumerate(cards):
+      nonce = nonces[index * NONCE_LENGTH:(index + 1) * NONCE_LENGTH]
+      sealed = aead.encrypt(nonce, card.encode("utf8"), f"{key_id}|{slot}".encode("utf8"))
+      tokens.append(_b64encode(TOKEN_VERSION + nonce + sealed))
+    return tokens
+
+  def decrypt_card(self, key_id: str, slot: str, token: str) -> str:
+    """Raises KeyError once the hand has expired and InvalidTag if tampered."""
+
+    data = _b64decode(token)
+    if data[:1] != TOKEN_VERSION:
+      raise ValueError("unsupported card token version")
+    nonce, sealed = data[1:1 + NONCE_LENGTH], data[1 + NONCE_LENGTH:]
+    return self._aead(key_id).decrypt(nonce, sealed, f"{key_id}|{slot}".encode("utf8")).decode("utf8")
+
+  def expire_hand(self, key_id: str) -> bool:
+    room_id = key_id.rsplit(":", 1)[0]
+    if self._room_keys.get(room_id) == key_id:
+      del self._room_keys[room_id]
+    return self._keys.pop(key_id, None) is not None
+
+  def expire_room(self, room_id: str) -> bool:
+    key_id = self._room_keys.pop(room_id, None)
+    return key_id is not None and self._keys.pop(key_id, None) is not None
+
+  def live_keys(self) -> List[str]:
+    return list(self._keys)
+
+  def _aead(self, key_id: str) -> AESGCM:
+    aead: Optional[AESGCM] = self._keys.get(key_id)
+    if aead is None:
+      raise KeyError(f"Missing or expired key {key_id}")
+    return aead
+
+
+deal_encryption = DealEncryptionService()
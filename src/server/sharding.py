@@ -0,0 +1,516 @@
+"""Room sharding across realtime worker processes.
+
+Each worker process owns the rooms whose ids hash to it on a consistent-hash
+ring, so one process never needs another's `RoomState`. Configure a shard set
+with environment variables (all workers get the same `P2P_SHARDS`):
+
+  P2P_SHARD_ID=shard-0
+  P2P_SHARDS=shard-0=http://127.0.0.1:8001,shard-1=http://127.0.0.1:8002
+  P2P_PUBSUB_URL=unix:///tmp/badugi-p2p.sock   # or memory://, redis://host:6379/0
+
+Rooms created on a worker get an id that hashes to that worker, so a plain
+load balancer spreads new rooms evenly. Players connecting to a worker that
+does not own the room receive a `redirect` event with the owner's URL.
+Spectators may stay on any worker: a worker with spectators for a foreign room
+subscribes to `room:<id>` and tells the owner on its `shard:<id>` control
+channel; the owner publishes that room's broadcasts while at least one worker
+is watching, and the watchers relay them to their local sessions, so fan-out
+to large audiences scales with the number of workers. Several shards need a
+cross-process bus (`unix://` or `redis://`); `memory://` only works when every
+controller shares one process.
+
+`python -m server.sharding serve --shards 4` starts a local broker plus one
+uvicorn process per shard. Without `P2P_SHARDS` nothing here is active and the
+server behaves as a single process.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+try:  # optional: only needed for redis:// bus URLs
+  import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - exercised only with redis installed
+  aioredis = None
+
+Handler = Callable[[str], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+# Virtual nodes per shard; more points give a more even split of rooms.
+RING_REPLICAS = 128
+DEFAULT_SOCKET_PATH = "/tmp/badugi-p2p.sock"
+# Largest line the Unix-socket bus accepts (a relayed frame plus its envelope).
+MAX_LINE_BYTES = 4 * 1024 * 1024
+# How long a bus write may wait for a full socket buffer before the peer is dropped.
+BUS_DRAIN_TIMEOUT_SECONDS = 2.0
+BUS_RECONNECT_DELAY_SECONDS = 0.1
+BUS_MAX_RECONNECT_DELAY_SECONDS = 2.0
+
+
+def _hash(key: str) -> int:
+  return int.from_bytes(hashlib.blake2b(key.encode("utf8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+  """Consistent hash ring: adding or removing a node only moves ~1/N of the keys."""
+
+  def __init__(self, nodes: List[str] = (), replicas: int = RING_REPLICAS):
+    self.replicas = replicas
+    self._points: List[Tuple[int, str]] = []
+    for node in nodes:
+      self.add(node)
+
+  @property
+  def nodes(self) -> List[str]:
+    return sorted({node for _point, node in self._points})
+
+  def add(self, node: str) -> None:
+    for replica in range(self.replicas):
+      bisect.insort(self._points, (_hash(f"{node}#{replica}"), node))
+
+  def remove(self, node: str) -> None:
+    self._points = [point for point in self._points if point[1] != node]
+
+  def node_for(self, key: str) -> str:
+    if not self._points:
+      raise LookupError("hash ring is empty")
+    index = bisect.bisect(self._points, (_hash(key), "")) % len(self._points)
+    return self._points[index][1]
+
+
+class ShardMap:
+  """This worker's view of the shard set."""
+
+  def __init__(self, shard_id: str, urls: Dict[str, str]):
+    self.shard_id = shard_id
+    self.urls = dict(urls)
+    self.ring = HashRing(list(self.urls))
+
+  @classmethod
+  def from_env(cls) -> Optional["ShardMap"]:
+    spec = os.environ.get("P2P_SHARDS", "").strip()
+    if not spec:
+      return None
+    urls = {}
+    for item in spec.split(","):
+      name, _, url = item.strip().partition("=")
+      if name:
+        urls[name] = url
+    shard_id = os.environ.get("P2P_SHARD_ID") or next(iter(urls))
+    if shard_id not in urls:
+      raise ValueError(f"P2P_SHARD_ID {shard_id!r} is not listed in P2P_SHARDS")
+    return cls(shard_id, urls)
+
+  def owner(self, room_id: str) -> str:
+    return self.ring.node_for(room_id)
+
+  def owns(self, room_id: str) -> bool:
+    return self.owner(room_id) == self.shard_id
+
+  def owner_url(self, room_id: str) -> str:
+    return self.urls[self.owner(room_id)]
+
+  def new_room_id(self) -> str:
+    """A fresh room id that hashes to this shard."""
+
+    while True:
+      room_id = f"room-{uuid.uuid4()}"
+      if self.owns(room_id):
+        return room_id
+
+
+# ---- pub/sub -------------------------------------------------------------
+
+
+class PubSub:
+  """Minimal channel bus used to relay room broadcasts between workers."""
+
+  async def start(self) -> None:
+    return None
+
+  async def publish(self, channel: str, data: str) -> None:
+    raise NotImplementedError
+
+  async def subscribe(self, channel: str, handler: Handler) -> None:
+    raise NotImplementedError
+
+  async def unsubscribe(self, channel: str, handler: Handler) -> None:
+    raise NotImplementedError
+
+  async def close(self) -> None:
+    return None
+
+
+class _HandlerTable:
+  def __init__(self):
+    self.handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+  def add(self, channel: str, handler: Handler) -> bool:
+    """Register `handler`; True when this is the channel's first handler."""
+
+    first = not self.handlers.get(channel)
+    self.handlers[channel].append(handler)
+    return first
+
+  def discard(self, channel: str, handler: Handler) -> bool:
+    """Drop `handler`; True when the channel has no handlers left."""
+
+    handlers = self.handlers.get(channel, [])
+    if handler in handlers:
+      handlers.remove(handler)
+    if handlers:
+      return False
+    self.handlers.pop(channel, None)
+    return True
+
+  async def dispatch(self, channel: str, data: str) -> None:
+    # One failing handler must not starve the others or kill the bus reader.
+    for handler in list(self.handlers.get(channel, ())):
+      try:
+        await handler(data)
+      except Exception:
+        logger.exception("pub/sub handler for %s failed", channel)
+
+
+async def _drain(writer: asyncio.StreamWriter, timeout: float = BUS_DRAIN_TIMEOUT_SECONDS) -> bool:
+  """Wait for `writer`'s buffer to flush; False if it stays full past `timeout`."""
+
+  task = asyncio.ensure_future(writer.drain())
+  try:
+    done, _ = await asyncio.wait((task,), timeout=timeout)
+  except asyncio.CancelledError:
+    task.cancel()
+    raise
+  if not done:
+    task.cancel()
+    return False
+  try:
+    task.result()
+  except (ConnectionError, RuntimeError):
+    return False
+  return True
+
+
+def _encode_publish(channel: str, data: str) -> bytes:
+  # The payload follows the JSON header verbatim so relayed frames are not
+  # escaped and re-encoded; compact JSON never contains a raw tab or newline.
+  if "\n" in data:
+    raise ValueError("bus payloads must be a single line")
+  header = json.dumps({"op": "pub", "channel": channel}, separators=(",", ":"))
+  return f"{header}\t{data}\n".encode("utf8")
+
+
+def _decode_line(line: bytes) -> Tuple[dict, Optional[str]]:
+  header, tab, data = line.rstrip(b"\n").partition(b"\t")
+  message = json.loads(header)
+  if tab:
+    return message, data.decode("utf8")
+  return message, message.get("data")
+
+
+class InProcessPubSub(PubSub):
+  """Bus for controllers living in one process (tests, single-host dev)."""
+
+  def __init__(self):
+    self._table = _HandlerTable()
+
+  async def publish(self, channel: str, data: str) -> None:
+    await self._table.dispatch(channel, data)
+
+  async def subscribe(self, channel: str, handler: Handler) -> None:
+    self._table.add(channel, handler)
+
+  async def unsubscribe(self, channel: str, handler: Handler) -> None:
+    self._table.discard(channel, handler)
+
+
+class UnixSocketBroker:
+  """Fan-out broker for `UnixSocketPubSub` clients on one host.
+
+  Clients send newline-delimited lines: `{"op": "sub"|"unsub", "channel": ...}`
+  or `{"op": "pub", "channel": ...}<TAB><data>`; the broker forwards each
+  publish line unchanged to every other client subscribed to the channel and
+  drops a subscriber whose socket stays full for `BUS_DRAIN_TIMEOUT_SECONDS`.
+  """
+
+  def __init__(self, path: str = DEFAULT_SOCKET_PATH):
+    self.path = path
+    self._server: Optional[asyncio.base_events.Server] = None
+    self._subscribers: Dict[str, Set[asyncio.StreamWriter]] = defaultdict(set)
+
+  async def start(self) -> None:
+    if os.path.exists(self.path):
+      os.unlink(self.path)
+    self._server = await asyncio.start_unix_server(self._serve, path=self.path, limit=MAX_LINE_BYTES)
+
+  async def stop(self) -> None:
+    if self._server is not None:
+      self._server.close()
+      await self._server.wait_closed()
+      self._server = None
+    if os.path.exists(self.path):
+      os.unlink(self.path)
+
+  async def serve_forever(self) -> None:
+    await self.start()
+    async with self._server:
+      await self._server.serve_forever()
+
+  async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    channels: Set[str] = set()
+    try:
+      while True:
+        line = await reader.readline()
+        if not line:
+          break
+        message = json.loads(line.partition(b"\t")[0])
+        channel = message.get("channel", "")
+        op = message.get("op")
+        if op == "sub":
+          channels.add(channel)
+          self._subscribers[channel].add(writer)
+        elif op == "unsub":
+          channels.discard(channel)
+          self._subscribers[channel].discard(writer)
+        elif op == "pub":
+          await self._forward(channel, line, writer)
+    except (ConnectionError, ValueError):
+      pass
+    finally:
+      self._forget(writer)
+      writer.close()
+
+  async def _forward(self, channel: str, line: bytes, sender: asyncio.StreamWriter) -> None:
+    subscribers = [subscriber for subscriber in self._subscribers.get(channel, ()) if subscriber is not sender]
+    for subscriber in subscribers:
+      subscriber.write(line)
+    for subscriber in subscribers:
+      if not await _drain(subscriber):
+        logger.warning("dropping stalled pub/sub subscriber")
+        self._forget(subscriber)
+        subscriber.close()
+
+  def _forget(self, writer: asyncio.StreamWriter) -> None:
+    for subscribers in self._subscribers.values():
+      subscribers.discard(writer)
+
+
+class UnixSocketPubSub(PubSub):
+  """Client for `UnixSocketBroker`.
+
+  The client reconnects (with backoff) when the broker goes away and
+  re-subscribes every channel it still has handlers for. Publishes made while
+  disconnected are dropped and counted in `dropped_messages`.
+  """
+
+  def __init__(self, path: str = DEFAULT_SOCKET_PATH):
+    self.path = path
+    self._table = _HandlerTable()
+    self._writer: Optional[asyncio.StreamWriter] = None
+    self._reader_task: Optional[asyncio.Task] = None
+    self.reconnects = 0
+    self.dropped_messages = 0
+
+  async def start(self, attempts: int = 50) -> None:
+    # Workers may come up before the broker has bound its socket.
+    for attempt in range(attempts):
+      try:
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE_BYTES)
+        break
+      except (FileNotFoundError, ConnectionRefusedError):
+        if attempt == attempts - 1:
+          raise
+        await asyncio.sleep(BUS_RECONNECT_DELAY_SECONDS)
+    self._reader_task = asyncio.create_task(self._run(reader))
+
+  async def _send(self, line: bytes) -> None:
+    writer = self._writer
+    if writer is None or writer.is_closing():
+      self.dropped_messages += 1
+      return
+    writer.write(line)
+    if not await _drain(writer):
+      # A broker that cannot keep up is treated like a lost connection.
+      logger.warning("pub/sub broker stalled; reconnecting")
+      writer.close()
+
+  @staticmethod
+  def _control(op: str, channel: str) -> bytes:
+    return json.dumps({"op": op, "channel": channel}, separators=(",", ":")).encode("utf8") + b"\n"
+
+  async def publish(self, channel: str, data: str) -> None:
+    await self._send(_encode_publish(channel, data))
+    # Local subscribers get it too; the broker only forwards to other clients.
+    await self._table.dispatch(channel, data)
+
+  async def subscribe(self, channel: str, handler: Handler) -> None:
+    if self._table.add(channel, handler):
+      await self._send(self._control("sub", channel))
+
+  async def unsubscribe(self, channel: str, handler: Handler) -> None:
+    if self._table.discard(channel, handler):
+      await self._send(self._control("unsub", channel))
+
+  async def _run(self, reader: asyncio.StreamReader) -> None:
+    while True:
+      await self._read(reader)
+      if self._writer is not None:
+        self._writer.close()
+      self._writer = None
+      reader = await self._reconnect()
+
+  async def _read(self, reader: asyncio.StreamReader) -> None:
+    while True:
+      try:
+        line = await reader.readline()
+      except (ConnectionError, ValueError):
+        return
+      if not line:
+        return
+      try:
+        message, data = _decode_line(line)
+      except ValueError:
+        logger.warning("skipping malformed pub/sub line")
+        continue
+      await self._table.dispatch(message.get("channel", ""), data)
+
+  async def _reconnect(self) -> asyncio.StreamReader:
+    delay = BUS_RECONNECT_DELAY_SECONDS
+    while True:
+      await asyncio.sleep(delay)
+      try:
+        reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE_BYTES)
+      except (FileNotFoundError, ConnectionError):
+        delay = min(delay * 2, BUS_MAX_RECONNECT_DELAY_SECONDS)
+        continue
+      self._writer = writer
+      self.reconnects += 1
+      for channel in list(self._table.handlers):
+        await self._send(self._control("sub", channel))
+      return reader
+
+  async def close(self) -> None:
+    if self._reader_task:
+      self._reader_task.cancel()
+    if self._writer:
+      self._writer.close()
+      self._writer = None
+
+
+class RedisPubSub(PubSub):
+  """Adapter for a Redis (or protocol-compatible) server; needs `redis>=4.2`."""
+
+  def __init__(self, url: str):
+    if aioredis is None:
+      raise RuntimeError("redis:// pub/sub needs the redis package: pip install redis")
+    self.url = url
+    self._table = _HandlerTable()
+    self._client = None
+    self._pubsub = None
+    self._reader_task: Optional[asyncio.Task] = None
+
+  async def start(self) -> None:
+    self._client = aioredis.from_url(self.url, decode_responses=True)
+    self._pubsub = self._client.pubsub()
+
+  async def publish(self, channel: str, data: str) -> None:
+    await self._client.publish(channel, data)
+
+  async def subscribe(self, channel: str, handler: Handler) -> None:
+    if self._table.add(channel, handler):
+      await self._pubsub.subscribe(channel)
+      if self._reader_task is None:
+        self._reader_task = asyncio.create_task(self._read())
+
+  async def unsubscribe(self, channel: str, handler: Handler) -> None:
+    if self._table.discard(channel, handler):
+      await self._pubsub.unsubscribe(channel)
+
+  async def _read(self) -> None:
+    async for message in self._pubsub.listen():
+      if message.get("type") == "message":
+        await self._table.dispatch(message["channel"], message["data"])
+
+  async def close(self) -> None:
+    if self._reader_task:
+      self._reader_task.cancel()
+    if self._pubsub is not None:
+      await self._pubsub.close()
+    if self._client is not None:
+      await self._client.close()
+
+
+def pubsub_from_url(url: str) -> PubSub:
+  parsed = urlparse(url)
+  if parsed.scheme in ("", "memory"):
+    return InProcessPubSub()
+  if parsed.scheme == "unix":
+    return UnixSocketPubSub(parsed.path or DEFAULT_SOCKET_PATH)
+  if parsed.scheme in ("redis", "rediss"):
+    return RedisPubSub(url)
+  raise ValueError(f"Unsupported pub/sub URL {url!r}")
+
+
+def room_channel(room_id: str) -> str:
+  return f"room:{room_id}"
+
+
+# ---- local launcher ------------------------------------------------------
+
+
+def _serve(args) -> int:
+  names = [f"shard-{index}" for index in range(args.shards)]
+  urls = {name: f"http://{args.host}:{args.base_port + index}" for index, name in enumerate(names)}
+  shards_env = ",".join(f"{name}={url}" for name, url in urls.items())
+  processes = [subprocess.Popen([sys.executable, "-m", "server.sharding", "broker", "--path", args.socket])]
+  for index, name in enumerate(names):
+    env = dict(
+      os.environ,
+      P2P_SHARD_ID=name,
+      P2P_SHARDS=shards_env,
+      P2P_PUBSUB_URL=f"unix://{args.socket}",
+    )
+    command = [
+      sys.executable, "-m", "uvicorn", "server.main:app",
+      "--host", args.host, "--port", str(args.base_port + index),
+    ]
+    processes.append(subprocess.Popen(command, env=env))
+  try:
+    return max(process.wait() for process in processes)
+  except KeyboardInterrupt:
+    for process in processes:
+      process.terminate()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Run the realtime server as several room shards.")
+  commands = parser.add_subparsers(dest="command", required=True)
+  broker = commands.add_parser("broker", help="run the Unix-socket pub/sub broker")
+  broker.add_argument("--path", default=DEFAULT_SOCKET_PATH)
+  serve = commands.add_parser("serve", help="start a broker plus one uvicorn process per shard")
+  serve.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+  serve.add_argument("--host", default="127.0.0.1")
+  serve.add_argument("--base-port", type=int, default=8001)
+  serve.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+  args = parser.parse_args(argv)
+  if args.command == "broker":
+    asyncio.run(UnixSocketBroker(args.path).serve_forever())
+    return 0
+  return _serve(args)
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, List, Optional
+
+# History kinds are ring buffers: the newest HISTORY_RETENTION records are kept
+# in memory, anything older lives only in the durable hand sink (if configured).
+HISTORY_RETENTION = 1000
+DEFAULT_RATING = {"sr": 1500, "mr": 1500, "gr": 1500}
 
 
 class InMemoryStore:
@@ -24,19 +30,60 @@ class InMemoryStore:
     self.ratings: Dict[str, Dict[str, Any]] = {
       "demo": {"sr": 1500, "mr": 1500, "gr": 1500, "updated_at": self._now()}
     }
-    self.history: Dict[str, List[Dict[str, Any]]] = {
-      "hand": [],
-      "tournament": [],
-      "mixed": [],
+    self.history: Dict[str, Deque[Dict[str, Any]]] = {
+      "hand": deque(maxlen=HISTORY_RETENTION),
+      "tournament": deque(maxlen=HISTORY_RETENTION),
+      "mixed": deque(maxlen=HISTORY_RETENTION),
     }
     self.snapshots: Dict[str, Dict[str, Any]] = {}
     self.rl_buffer: List[Dict[str, Any]] = []
-    self.p2p_history: List[Dict[str, Any]] = []
+    self.p2p_history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_RETENTION)
     self.ai_models: Dict[str, Dict[str, Any]] = {
       "badugi_v2": {"version": "badugi_v2", "tier": "iron", "size": "12MB"},
       "generic_v1": {"version": "generic_v1", "tier": "standard", "size": "8MB"},
     }
 
+  def recent(self, kind: str, limit: int = 50) -> List[Dict[str, Any]]:
+    records = self.history[kind]
+    return [records[index] for index in range(max(0, len(records) - limit), len(records))]
+
+  def record_finished_hand(self, hand: Dict[str, Any]) -> None:
+    """Store a finished P2P hand and apply its rating changes."""
+
+    winner: Optional[str] = hand.get("winner")
+    self.p2p_history.append(
+      {"handId": hand["handId"], "winner": winner, "pot": hand["pot"], "warnings": hand["warnings"]}
+    )
+    self.history["hand"].append(
+      {
+        "handId": hand["handId"],
+        "winner": winner or "none",
+        "pot": hand["pot"],
+        "players": hand["players"],
+        "metadata": {"phase": "p2p"},
+        "warnings": hand["warnings"],
+      }
+    )
+    now = self._now()
+    if winner:
+      rating = self.ratings.get(winner, DEFAULT_RATING)
+      self.ratings[winner] = {
+        "sr": rating["sr"] + 5,
+        "mr": rating["mr"] + 3,
+        "gr": rating["gr"] + 2,
+        "updated_at": now,
+      }
+    for loser in hand["players"]:
+      if loser == winner:
+        continue
+      rating = self.ratings.get(loser, DEFAULT_RATING)
+      self.ratings[loser] = {
+        "sr": max(1200, rating["sr"] - 2),
+        "mr": max(1200, rating["mr"] - 1),
+        "gr": max(1200, rating["gr"] - 1),
+        "updated_at": now,
+      }
+
   @staticmethod
   def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
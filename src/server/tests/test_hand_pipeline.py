@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+import time
+
+from server.hand_pipeline import HandPipeline, HandSink, JsonlHandSink
+from server.storage import HISTORY_RETENTION, InMemoryStore
+
+
+class RecordingSink(HandSink):
+  def __init__(self, delay=0.0, fail=False):
+    self.batches = []
+    self.delay = delay
+    self.fail = fail
+    self.thread_names = set()
+
+  def write_batch(self, hands):
+    self.thread_names.add(threading.current_thread().name)
+    time.sleep(self.delay)
+    if self.fail:
+      raise OSError("disk full")
+    self.batches.append([hand["handId"] for hand in hands])
+
+
+def _hand(index, winner="hero"):
+  return {"handId": f"hand-{index}", "winner": winner, "pot": 40, "warnings": [], "players": ["hero", "villain"]}
+
+
+def test_pipeline_batches_history_ratings_and_sink_writes():
+  store, sink = InMemoryStore(), RecordingSink()
+
+  async def scenario():
+    pipeline = HandPipeline(store, sink, flush_interval=0.05)
+    for index in range(5):
+      await pipeline.publish(_hand(index))
+    await pipeline.drain()
+    return pipeline.metrics()
+
+  metrics = asyncio.run(scenario())
+  assert sink.batches == [[f"hand-{index}" for index in range(5)]]
+  assert threading.main_thread().name not in sink.thread_names
+  assert [record["handId"] for record in store.recent("hand", 2)] == ["hand-3", "hand-4"]
+  assert store.ratings["hero"]["sr"] == 1525
+  assert store.ratings["villain"]["sr"] == 1490
+  assert metrics["processed"] == 5 and metrics["batches"] == 1
+
+
+def test_publish_does_not_wait_for_a_slow_sink_and_flushes_on_shutdown():
+  store, sink = InMemoryStore(), RecordingSink(delay=0.2)
+
+  async def scenario():
+    pipeline = HandPipeline(store, sink, flush_interval=0.0)
+    started = time.perf_counter()
+    await pipeline.publish(_hand(0))
+    await asyncio.sleep(0.01)  # the first batch is now being written
+    await pipeline.publish(_hand(1))
+    return time.perf_counter() - started
+
+  elapsed = asyncio.run(scenario())
+  assert elapsed < 0.1
+  # hand-1 was still queued when the loop closed; the worker flushed it on the way out.
+  assert [record["handId"] for record in store.p2p_history] == ["hand-0", "hand-1"]
+  assert sink.batches[-1] == ["hand-1"]
+
+
+def test_sink_failures_are_counted_and_history_is_bounded(tmp_path):
+  store = InMemoryStore()
+
+  async def scenario():
+    pipeline = HandPipeline(store, RecordingSink(fail=True))
+    await pipeline.publish(_hand(0))
+    await pipeline.drain()
+    return pipeline.metrics()
+
+  assert asyncio.run(scenario())["sinkFailures"] == 1
+  assert store.p2p_history[0]["handId"] == "hand-0"
+
+  for index in range(HISTORY_RETENTION + 10):
+    store.record_finished_hand(_hand(index, winner=None))
+  assert len(store.history["hand"]) == HISTORY_RETENTION
+  assert store.history["hand"][0]["handId"] == "hand-10"
+
+  sink = JsonlHandSink(str(tmp_path / "hands.jsonl"))
+  sink.write_batch([_hand(1), _hand(2)])
+  lines = (tmp_path / "hands.jsonl").read_text(encoding="utf8").splitlines()
+  assert [json.loads(line)["handId"] for line in lines] == ["hand-1", "hand-2"]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from server.heartbeat import HeartbeatWheel
+from server.p2p_sync import DEAD_PEER_CLOSE_CODE, P2PSyncController
+from server.room_manager import room_manager
+
+
+class Peer:
+  def __init__(self, last_seen):
+    self.last_seen = last_seen
+
+
+class RecordingSocket:
+  def __init__(self):
+    self.frames = []
+    self.close_code = None
+
+  async def accept(self):
+    return None
+
+  async def send_text(self, text):
+    self.frames.append(json.loads(text))
+
+  async def close(self, code=1000):
+    self.close_code = code
+
+
+@pytest.fixture(autouse=True)
+def _room():
+  # Sessions are only registered for rooms that exist on this shard.
+  room_manager.create_room("room")
+  yield
+  room_manager.remove_room("room")
+
+
+def test_wheel_batches_each_slot_and_evicts_stale_peers():
+  batches, evicted = [], []
+
+  async def scenario():
+    wheel = HeartbeatWheel(batches.append, evicted.append, interval=3.0, timeout=10.0, tick=1.0)
+    fresh, stale = Peer(last_seen=100.0), Peer(last_seen=0.0)
+    wheel.add(fresh)
+    wheel.add(stale)
+
+    wheel.run_tick(now=105.0)
+    wheel.run_tick(now=106.0)
+    assert batches == [] and evicted == []
+
+    # A full interval after registering, their slot comes round.
+    wheel.run_tick(now=107.0)
+    assert batches == [[fresh]]
+    assert evicted == [stale]
+    assert wheel.metrics()["live"] == 1
+    assert wheel.metrics()["evicted"] == 1
+    await wheel.stop()
+
+  asyncio.run(scenario())
+
+
+def test_controller_uses_one_heartbeat_task_and_evicts_silent_sessions():
+  async def scenario():
+    controller = P2PSyncController(heartbeat_interval=0.02, heartbeat_timeout=0.1, heartbeat_tick=0.01)
+    talkative_socket, silent_socket = RecordingSocket(), RecordingSocket()
+    talkative = await controller.connect("room", talkative_socket)
+    silent = await controller.connect("room", silent_socket)
+    tasks_with_sessions = len(asyncio.all_tasks())
+
+    for _ in range(20):
+      await asyncio.sleep(0.01)
+      await controller.handle(talkative, {"event": "heartbeat_ack", "payload": {}})
+
+    assert silent.closed
+    assert silent_socket.close_code == DEAD_PEER_CLOSE_CODE
+    assert controller.rooms["room"] == [talkative]
+    assert any(frame["event"] == "heartbeat" for frame in talkative_socket.frames)
+    metrics = controller.metrics()["heartbeat"]
+    assert metrics["live"] == 1
+    assert metrics["evicted"] == 1
+    # Main task + one writer per session + the shared wheel.
+    assert tasks_with_sessions == 1 + 2 + 1
+
+    await controller.disconnect(talkative)
+    await asyncio.sleep(0.03)
+    assert not controller.heartbeats.metrics()["running"]
+
+  asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import asyncio
+
+from server.loadtest import LoadConfig, ResourceSampler, _free_port, _start_server, percentile, run_load
+
+
+def test_percentile_uses_nearest_rank():
+  samples = [float(value) for value in range(1, 101)]
+  assert percentile(samples, 0.50) == 50.0
+  assert percentile(samples, 0.99) == 99.0
+  assert percentile([3.0], 0.99) == 3.0
+  assert percentile([], 0.5) is None
+
+
+def test_load_run_against_local_uvicorn_reports_latency_and_resources():
+  port = _free_port("127.0.0.1")
+  process = _start_server("127.0.0.1", port)
+  try:
+    config = LoadConfig(
+      base_url=f"http://127.0.0.1:{port}",
+      rooms=2,
+      bots=2,
+      duration=1.5,
+      action_rate=10.0,
+      heartbeat_interval=0.5,
+      seed=7,
+    )
+    report = asyncio.run(run_load(config, ResourceSampler(process.pid)))
+  finally:
+    process.terminate()
+    process.wait(timeout=10)
+
+  assert report["connectFailures"] == 0
+  assert report["actions"] > 0
+  assert report["latencyMs"]["samples"] > 0
+  assert report["latencyMs"]["p50"] <= report["latencyMs"]["p99"]
+  assert report["messages"]["byEvent"]["secure_deal"] >= 2
+  assert report["messages"]["receivedPerSecond"] > 0
+  assert report["server"]["rssBytes"] > 0
+  assert report["serverMetrics"]["sessions"] == 4
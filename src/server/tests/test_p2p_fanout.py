@@ -0,0 +1,225 @@
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from server import p2p_sync
+from server.p2p_sync import COMPRESSION_MIN_BYTES, ROOM_EXPIRED_CLOSE_CODE, P2PSyncController, SLOW_CONSUMER_CLOSE_CODE
+from server.room_manager import Participant, room_manager
+
+
+class RecordingSocket:
+  def __init__(self):
+    self.frames = []
+    self.close_code = None
+
+  async def accept(self):
+    return None
+
+  async def send_text(self, text):
+    self.frames.append(json.loads(text))
+
+  async def send_bytes(self, data):
+    self.frames.append(json.loads(zlib.decompress(data)))
+    self.binary_frames = getattr(self, "binary_frames", 0) + 1
+
+  async def close(self, code=1000):
+    self.close_code = code
+
+
+class StalledSocket(RecordingSocket):
+  async def send_text(self, text):
+    await asyncio.Event().wait()
+
+
+class BrokenSocket(RecordingSocket):
+  async def send_text(self, text):
+    raise RuntimeError("Cannot call send once a close message has been sent")
+
+
+async def _settle():
+  for _ in range(5):
+    await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def _room():
+  # Sessions are only registered for rooms that exist on this shard.
+  room_manager.create_room("room")
+  yield
+  room_manager.remove_room("room")
+
+
+def test_broadcast_is_not_held_up_by_a_stalled_socket():
+  async def scenario():
+    controller = P2PSyncController()
+    fast, stalled = RecordingSocket(), StalledSocket()
+    fast_session = await controller.connect("room", fast)
+    await controller.connect("room", stalled)
+    for seq in range(5):
+      await asyncio.wait_for(controller.broadcast("room", "updated_state", {"sequenceId": seq}), 0.1)
+    await _settle()
+    assert [frame["payload"]["sequenceId"] for frame in fast.frames] == [0, 1, 2, 3, 4]
+    assert controller.metrics()["sessions"] == 2
+    await controller.disconnect(fast_session)
+
+  asyncio.run(scenario())
+
+
+def test_slow_consumer_sheds_heartbeats_then_disconnects():
+  async def scenario():
+    controller = P2PSyncController(max_queue_size=2)
+    stalled = StalledSocket()
+    session = await controller.connect("room", stalled)
+    await _settle()  # let the writer park on the empty outbox
+
+    await controller.send_event(session, "heartbeat", {"timestamp": 0})
+    await _settle()  # the writer is now stuck sending the heartbeat
+    await controller.send_event(session, "heartbeat", {"timestamp": 1})
+    await controller.broadcast("room", "updated_state", {"sequenceId": 1})
+    await controller.broadcast("room", "updated_state", {"sequenceId": 2})
+    assert session.dropped_frames == 1
+    assert [json.loads(frame.text)["payload"]["sequenceId"] for frame in session.outbox] == [1, 2]
+
+    await controller.broadcast("room", "updated_state", {"sequenceId": 3})
+    await _settle()
+    assert session.closed
+    assert stalled.close_code == SLOW_CONSUMER_CLOSE_CODE
+    assert "room" not in controller.rooms
+    assert controller.metrics()["slowDisconnects"] == 1
+
+  asyncio.run(scenario())
+
+
+def test_dead_sessions_are_reaped():
+  async def scenario():
+    controller = P2PSyncController()
+    healthy = RecordingSocket()
+    healthy_session = await controller.connect("room", healthy)
+    dead_session = await controller.connect("room", BrokenSocket())
+    await controller.broadcast("room", "room_state", {"roomId": "room"})
+    await _settle()
+    assert dead_session.closed
+    assert controller.rooms["room"] == [healthy_session]
+    assert controller.reaped_sessions == 1
+    assert healthy.frames[0]["event"] == "room_state"
+    await controller.disconnect(healthy_session)
+
+  asyncio.run(scenario())
+
+
+def test_broadcast_serialises_once_and_compresses_for_negotiated_sessions(monkeypatch):
+  calls = []
+  original_dumps = p2p_sync.dumps
+
+  def counting_dumps(envelope):
+    calls.append(envelope["event"])
+    return original_dumps(envelope)
+
+  monkeypatch.setattr(p2p_sync, "dumps", counting_dumps)
+
+  async def scenario():
+    controller = P2PSyncController()
+    plain, deflate = RecordingSocket(), RecordingSocket()
+    plain_session = await controller.connect("room", plain)
+    deflate_session = await controller.connect("room", deflate)
+    deflate_session.compression = "deflate"
+
+    big_state = {"roomId": "room", "playerStates": [{"id": f"p{i}", "displayName": "x" * 64} for i in range(32)]}
+    await controller.broadcast("room", "room_state", big_state)
+    await controller.broadcast("room", "room_state", {"roomId": "room"})
+    await controller.broadcast("room", "updated_state", {"sequenceId": 1, "pad": "y" * COMPRESSION_MIN_BYTES})
+    await _settle()
+
+    assert calls == ["room_state", "room_state", "updated_state"]
+    assert plain.frames == deflate.frames
+    assert plain.frames[0]["payload"] == big_state
+    assert not hasattr(plain, "binary_frames")
+    # Only the large room_state goes out compressed; small or non-compressible events stay text.
+    assert deflate.binary_frames == 1
+    await controller.disconnect(plain_session)
+    await controller.disconnect(deflate_session)
+
+  asyncio.run(scenario())
+
+
+def test_sweeper_closes_sessions_of_expired_rooms_and_updates_survivors():
+  async def scenario():
+    controller = P2PSyncController()
+    controller.sweeper.participant_ttl, controller.sweeper.room_ttl = 50, 1000
+    expired = room_manager.create_room("sweep-expired")
+    room_manager.join_room("sweep-expired", Participant(id="gone", display_name="Gone"))
+    kept = room_manager.create_room("sweep-kept")
+    for pid in ("hero", "ghost"):
+      room_manager.join_room("sweep-kept", Participant(id=pid, display_name=pid))
+    expired_socket, kept_socket = RecordingSocket(), RecordingSocket()
+    await controller.connect("sweep-expired", expired_socket)
+    hero = await controller.connect("sweep-kept", kept_socket)
+    hero.player_id = "hero"
+
+    now = kept.last_action_at + 100
+    await controller.handle(hero, {"event": "heartbeat_ack"})
+    kept.players["hero"].last_seen = now
+    kept.last_action_at = expired.last_action_at = now
+    await controller.sweeper.run_once(now=now)
+    await _settle()
+
+    assert expired_socket.close_code == ROOM_EXPIRED_CLOSE_CODE
+    assert room_manager.get_room("sweep-expired") is None
+    assert list(kept.players) == ["hero"]
+    room_states = [frame for frame in kept_socket.frames if frame["event"] == "room_state"]
+    assert room_states[-1]["payload"]["players"] == ["hero"]
+    assert controller.metrics()["roomSweeper"]["participantsEvicted"] == 1
+    room_manager.remove_room("sweep-kept")
+
+  asyncio.run(scenario())
+
+
+def test_sweeping_the_actor_mid_hand_finalizes_the_hand():
+  async def scenario():
+    controller = P2PSyncController()
+    controller.sweeper.participant_ttl, controller.sweeper.room_ttl = 50, 1000
+    room = room_manager.create_room("sweep-mid-hand")
+    for pid in ("hero", "ghost"):
+      room_manager.join_room("sweep-mid-hand", Participant(id=pid, display_name=pid))
+    room_manager.reset_hand("sweep-mid-hand")
+    room.reset_turns(["ghost", "hero"])
+    socket = RecordingSocket()
+    await controller.connect("sweep-mid-hand", socket)
+
+    now = room.last_action_at + 100
+    room.players["hero"].last_seen = now
+    await controller.sweeper.run_once(now=now)
+    await _settle()
+
+    showdowns = [frame for frame in socket.frames if frame["event"] == "showdown"]
+    assert [frame["payload"]["winner"] for frame in showdowns] == ["hero"]
+    assert room.phase == "waiting"
+    assert not any(frame["event"] == "secure_deal" for frame in socket.frames)
+    room_manager.remove_room("sweep-mid-hand")
+
+  asyncio.run(scenario())
+
+
+def test_sockets_for_missing_rooms_are_closed_instead_of_kept():
+  async def scenario():
+    controller = P2PSyncController()
+    missing_socket = RecordingSocket()
+    missing = await controller.connect("never-created", missing_socket)
+    assert missing.closed
+    assert missing_socket.close_code == ROOM_EXPIRED_CLOSE_CODE
+    assert missing_socket.frames[0]["payload"]["code"] == "room_missing"
+
+    room_manager.create_room("swept-before-join")
+    late_socket = RecordingSocket()
+    late = await controller.connect("swept-before-join", late_socket)
+    room_manager.remove_room("swept-before-join")
+    await controller.handle(late, {"event": "join_room", "payload": {"playerId": "hero"}})
+    assert late.closed
+    assert late_socket.close_code == ROOM_EXPIRED_CLOSE_CODE
+    assert [frame["payload"]["code"] for frame in late_socket.frames if frame["event"] == "error"] == ["room_missing"]
+    assert controller.metrics()["sessions"] == 0
+    assert controller.heartbeats.metrics()["live"] == 0
+
+  asyncio.run(scenario())
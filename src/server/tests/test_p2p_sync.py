@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 
 from server.main import app
+from server.room_manager import room_manager
 from server.storage import db
 
 
@@ -97,6 +98,8 @@ def test_websocket_ready_draw_showdown_and_next_hand():
         saw_ready_state = saw_ready_state or any(player["id"] == "hero" and player["ready"] for player in states)
       if msg.get("event") == "secure_deal":
         saw_secure_deal = True
+      if saw_ready_state and saw_secure_deal:
+        break
     assert saw_ready_state
     assert saw_secure_deal
 
@@ -166,3 +169,49 @@ def test_websocket_reconnect_replays_recent_history():
         if saw_replay:
           break
     assert saw_replay
+
+
+
+def test_websocket_sends_deltas_and_resyncs_since_sequence():
+  client = TestClient(app)
+  create_resp = client.post("/api/rooms/create", json={"owner_id": "hero", "max_players": 2, "mode": "friend"})
+  room_id = create_resp.json()["data"]["roomId"]
+  client.post(
+    "/api/rooms/join",
+    json={"room_id": room_id, "player_id": "hero", "display_name": "Hero", "role": "player"},
+  )
+
+  with client.websocket_connect(f"/ws/room/{room_id}/play") as ws:
+    snapshot = ws.receive_json()
+    assert snapshot["event"] == "room_state"
+    assert snapshot["payload"]["snapshot"] is True
+    assert snapshot["payload"]["playerStates"][0]["displayName"] == "Hero"
+    assert snapshot["payload"]["stacks"] == {"hero": 1500}
+
+    ws.send_json({"event": "join_room", "payload": {"playerId": "hero", "displayName": "Hero"}})
+    ws.send_json({"event": "action", "payload": {"playerId": "hero", "type": "call", "amount": 20}})
+    delta = None
+    for _ in range(6):
+      msg = ws.receive_json()
+      if msg.get("event") == "updated_state" and msg["payload"].get("pot") == 20:
+        delta = msg["payload"]
+        break
+    assert delta["stacks"] == {"hero": 1480}
+    assert "handId" not in delta and "phase" not in delta
+
+    ws.send_json({"event": "resync", "payload": {"since": delta["sequenceId"] - 1}})
+    replayed = None
+    for _ in range(12):
+      msg = ws.receive_json()
+      if msg["payload"].get("sequenceId") == delta["sequenceId"]:
+        replayed = msg
+        break
+    assert replayed == {"event": "updated_state", "payload": delta}
+    last_sequence = room_manager.get_room(room_id).sequence_id
+
+  with client.websocket_connect(f"/ws/room/{room_id}/play?since={last_sequence}") as caught_up:
+    caught_up.send_json({"event": "heartbeat", "payload": {}})
+    assert caught_up.receive_json()["event"] == "heartbeat"
+
+  with client.websocket_connect(f"/ws/room/{room_id}/play?since=999") as stale:
+    assert stale.receive_json()["payload"]["snapshot"] is True
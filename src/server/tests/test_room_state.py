@@ -0,0 +1,133 @@
+import asyncio
+from collections import deque
+
+from server.room_manager import ROOM_HISTORY_SIZE, InMemoryRoomManager, Participant, RoomState, RoomSweeper
+
+
+def test_publish_returns_only_changed_fields_under_a_new_sequence():
+  room = RoomState(id="room", created_at=0.0)
+  first = room.publish("updated_state", {"pot": 0, "bets": {"hero": 0}, "phase": "playing"})
+  assert first == {"sequenceId": 1, "pot": 0, "bets": {"hero": 0}, "phase": "playing"}
+
+  assert room.publish("updated_state", {"pot": 0, "bets": {"hero": 0}, "phase": "playing"}) is None
+  assert room.sequence_id == 1
+
+  second = room.publish("updated_state", {"pot": 20, "bets": {"hero": 20}, "phase": "playing"})
+  assert second == {"sequenceId": 2, "pot": 20, "bets": {"hero": 20}}
+
+
+def test_deltas_since_replays_or_asks_for_a_snapshot():
+  room = RoomState(id="room", created_at=0.0)
+  room.state_deltas = deque(maxlen=3)
+  for pot in range(1, 6):
+    room.publish("updated_state", {"pot": pot})
+
+  assert [entry["payload"]["sequenceId"] for entry in room.deltas_since(3)] == [4, 5]
+  assert [entry["payload"]["pot"] for entry in room.deltas_since(2)] == [3, 4, 5]
+  assert room.deltas_since(5) == []
+  # Sequence 2 has fallen out of the ring, and 9 was never issued.
+  assert room.deltas_since(1) is None
+  assert room.deltas_since(9) is None
+
+
+def test_turn_rotation_skips_folded_and_departed_seats():
+  room = RoomState(id="room", created_at=0.0)
+  room.reset_turns(["a", "b", "c", "d"])
+  assert room.current_actor == "a"
+  assert room.advance_turn() == "b"
+
+  # The actor folding passes the turn to the next seat, not the one after it.
+  room.fold("b")
+  assert room.current_actor == "c"
+  assert room.active_players() == ["c", "d", "a"]
+
+  room.remove_seat("d")
+  assert room.advance_turn() == "a"
+  assert room.advance_turn() == "c"
+  assert room.turn_order == ["a", "b", "c"]
+  assert room.folded == {"b"}
+  assert not room.is_showdown()
+
+  room.fold("c")
+  assert room.current_actor == "a"
+  assert room.is_showdown()
+
+
+def test_players_seated_mid_hand_act_at_the_end_of_the_rotation():
+  room = RoomState(id="room", created_at=0.0)
+  room.reset_turns(["a", "b", "c"])
+  room.advance_turn()
+  room.add_seat("e")
+  assert room.active_players() == ["b", "c", "a", "e"]
+  assert room.turn_order == ["a", "b", "c", "e"]
+
+  room.reset_turns(room.turn_order)
+  assert room.active_players() == ["a", "b", "c", "e"]
+  assert room.active_count == 4
+
+
+def test_last_player_leaving_clears_the_actor():
+  room = RoomState(id="room", created_at=0.0)
+  room.reset_turns(["solo"])
+  assert room.advance_turn() == "solo"
+  room.remove_seat("solo")
+  assert room.current_actor is None
+  assert room.advance_turn() is None
+  assert room.is_showdown()
+
+
+def test_room_history_is_a_ring_buffer():
+  manager = InMemoryRoomManager()
+  room = manager.create_room("room")
+  for index in range(ROOM_HISTORY_SIZE + 10):
+    manager.record_log("room", {"action": str(index)})
+  assert len(room.history) == ROOM_HISTORY_SIZE
+  assert [entry["action"] for entry in room.recent_history(2)] == [str(ROOM_HISTORY_SIZE + 8), str(ROOM_HISTORY_SIZE + 9)]
+  assert room.history[-1]["action"] == str(ROOM_HISTORY_SIZE + 9)
+
+
+def test_sweep_evicts_stale_participants_and_idle_rooms():
+  manager = InMemoryRoomManager()
+  busy = manager.create_room("busy")
+  for pid in ("hero", "villain", "ghost"):
+    manager.join_room("busy", Participant(id=pid, display_name=pid))
+  abandoned = manager.create_room("abandoned")
+  manager.join_room("abandoned", Participant(id="gone", display_name="gone"))
+  lobby = manager.create_room("lobby")
+  manager.join_room("lobby", Participant(id="sitter", display_name="sitter"))
+  manager.create_room("empty")
+
+  now = busy.last_action_at + 100
+  for pid in ("hero", "villain"):
+    busy.players[pid].last_seen = now
+  # Nobody acted in the lobby for longer than room_ttl, but its player still answers heartbeats.
+  lobby.players["sitter"].last_seen = now
+  busy.last_action_at = abandoned.last_action_at = now
+  busy.reset_turns(["ghost", "hero", "villain"])
+
+  report = manager.sweep(participant_ttl=50, room_ttl=80, now=now)
+  assert sorted(report.evicted_rooms) == ["abandoned", "empty"]
+  assert report.evicted_participants == {"busy": ["ghost"]}
+  assert report.bytes_reclaimed > 0
+  assert sorted(room.id for room in manager.list_rooms()) == ["busy", "lobby"]
+  # The swept player was the actor, so the turn moved on.
+  assert busy.current_actor == "hero"
+  assert "ghost" not in busy.players
+
+
+def test_sweeper_accumulates_metrics_and_calls_back():
+  manager = InMemoryRoomManager()
+  room = manager.create_room("room")
+  manager.join_room("room", Participant(id="hero", display_name="Hero"))
+  seen = []
+
+  async def on_sweep(report):
+    seen.append(report.evicted_rooms)
+
+  sweeper = RoomSweeper(manager, on_sweep, participant_ttl=10, room_ttl=100)
+  asyncio.run(sweeper.run_once(now=room.last_action_at + 5))
+  asyncio.run(sweeper.run_once(now=room.last_action_at + 500))
+  metrics = sweeper.metrics()
+  assert seen == [["room"]]
+  assert metrics["sweeps"] == 2 and metrics["roomsEvicted"] == 1
+  assert metrics["bytesReclaimed"] > 0
@@ -0,0 +1,35 @@
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from server.security import DealEncryptionService, new_room_secret
+
+
+def test_deal_tokens_round_trip_and_are_bound_to_their_slot():
+  service = DealEncryptionService()
+  key_id = service.open_hand("room-1", "hand-1", new_room_secret())
+  tokens = service.encrypt_deal(key_id, [("seat-0", "A♠"), ("seat-1", "K♦")])
+
+  assert [service.decrypt_card(key_id, f"seat-{idx}", token) for idx, token in enumerate(tokens)] == ["A♠", "K♦"]
+  assert all("=" not in token and "+" not in token and "/" not in token for token in tokens)
+  with pytest.raises(InvalidTag):
+    service.decrypt_card(key_id, "seat-1", tokens[0])
+
+
+def test_hand_keys_are_derived_per_hand_and_expire():
+  service = DealEncryptionService()
+  secret = new_room_secret()
+  first = service.open_hand("room-1", "hand-1", secret)
+  token = service.encrypt_deal(first, [("seat-0", "2♣")])[0]
+
+  # Re-deriving the same hand yields the same key; the next hand drops it.
+  assert service.open_hand("room-1", "hand-1", secret) == first
+  assert service.decrypt_card(first, "seat-0", token) == "2♣"
+  second = service.open_hand("room-1", "hand-2", secret)
+  assert service.live_keys() == [second]
+  with pytest.raises(KeyError):
+    service.decrypt_card(first, "seat-0", token)
+
+  service.open_hand("room-2", "hand-1", new_room_secret())
+  assert service.expire_hand(second)
+  assert service.expire_room("room-2")
+  assert service.live_keys() == []
@@ -0,0 +1,234 @@
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import p2p_sync
+from server.main import app
+from server.p2p_sync import P2PSyncController
+from server.room_manager import room_manager
+from server.sharding import HashRing, InProcessPubSub, ShardMap, UnixSocketBroker, UnixSocketPubSub
+
+
+class RecordingSocket:
+  def __init__(self):
+    self.frames = []
+
+  async def accept(self):
+    return None
+
+  async def send_text(self, text):
+    self.frames.append(json.loads(text))
+
+  async def close(self, code=1000):
+    return None
+
+
+async def _settle():
+  for _ in range(5):
+    await asyncio.sleep(0)
+
+
+def test_hash_ring_spreads_keys_and_moves_few_on_resize():
+  keys = [f"room-{index}" for index in range(4000)]
+  ring = HashRing(["shard-0", "shard-1", "shard-2", "shard-3"])
+  before = {key: ring.node_for(key) for key in keys}
+  counts = Counter(before.values())
+  assert all(700 < count < 1300 for count in counts.values())
+
+  ring.add("shard-4")
+  moved = [key for key in keys if ring.node_for(key) != before[key]]
+  assert 400 < len(moved) < 1300
+  assert all(ring.node_for(key) == "shard-4" for key in moved)
+
+
+def test_shard_map_from_env_and_owned_room_ids(monkeypatch):
+  monkeypatch.setenv("P2P_SHARDS", "a=http://127.0.0.1:8001,b=http://127.0.0.1:8002")
+  monkeypatch.setenv("P2P_SHARD_ID", "b")
+  shard_map = ShardMap.from_env()
+  assert shard_map.shard_id == "b"
+  room_id = shard_map.new_room_id()
+  assert shard_map.owns(room_id)
+  assert shard_map.owner_url(room_id) == "http://127.0.0.1:8002"
+
+  monkeypatch.delenv("P2P_SHARDS")
+  assert ShardMap.from_env() is None
+
+
+def test_spectators_on_another_shard_receive_relayed_broadcasts():
+  urls = {"a": "http://a", "b": "http://b"}
+  owner_map, relay_map = ShardMap("a", urls), ShardMap("b", urls)
+  room = room_manager.create_room(room_id=owner_map.new_room_id())
+
+  async def scenario():
+    bus = InProcessPubSub()
+    owner, relay = P2PSyncController(shard_map=owner_map), P2PSyncController(shard_map=relay_map)
+    await owner.attach_bus(bus)
+    await relay.attach_bus(bus)
+    published = []
+
+    async def tap(text):
+      published.append(text)
+
+    await bus.subscribe(f"room:{room.id}", tap)
+    await owner.broadcast(room.id, "updated_state", {"sequenceId": room.sequence_id, "pot": 0})
+    assert published == []
+
+    socket = RecordingSocket()
+    session = await relay.connect(room.id, socket)
+    await relay.watch_remote(session)
+    await owner.broadcast(room.id, "updated_state", {"sequenceId": room.sequence_id + 1, "pot": 40})
+    await _settle()
+
+    assert socket.frames[0]["event"] == "room_state"
+    assert socket.frames[0]["payload"]["snapshot"] is True
+    assert socket.frames[1] == {"event": "updated_state", "payload": {"sequenceId": room.sequence_id + 1, "pot": 40}}
+    assert relay.metrics()["relayedRooms"] == 1
+    assert owner.metrics()["remoteWatchedRooms"] == 1
+
+    await relay.disconnect(session)
+    await _settle()
+    assert relay.metrics()["relayedRooms"] == 0
+    assert owner.metrics()["remoteWatchedRooms"] == 0
+
+  try:
+    asyncio.run(scenario())
+  finally:
+    room_manager.remove_room(room.id)
+
+
+def test_broadcast_does_not_wait_for_a_stalled_bus():
+  urls = {"a": "http://a", "b": "http://b"}
+  owner_map = ShardMap("a", urls)
+  room = room_manager.create_room(room_id=owner_map.new_room_id())
+
+  class StalledPubSub(InProcessPubSub):
+    def __init__(self):
+      super().__init__()
+      self.release = asyncio.Event()
+      self.published = []
+
+    async def publish(self, channel, data):
+      await self.release.wait()
+      self.published.append(data)
+
+  async def scenario():
+    bus = StalledPubSub()
+    owner = P2PSyncController(shard_map=owner_map, max_publish_queue=2)
+    await owner.attach_bus(bus)
+    owner._remote_watchers[room.id] = {"b"}
+    socket = RecordingSocket()
+    await owner.connect(room.id, socket)
+    for sequence_id in range(4):
+      await asyncio.wait_for(owner.broadcast(room.id, "updated_state", {"sequenceId": sequence_id}), 0.5)
+    await _settle()
+    assert [frame["payload"]["sequenceId"] for frame in socket.frames] == [0, 1, 2, 3]
+    # One frame is held by the stalled publish, two wait in the queue, one is dropped.
+    assert owner.metrics()["queuedPublishes"] == 2
+    assert owner.metrics()["droppedPublishes"] == 1
+
+    bus.release.set()
+    await _settle()
+    assert [json.loads(text)["payload"]["sequenceId"] for text in bus.published] == [0, 1, 2]
+    await owner.detach_bus()
+    assert owner.bus is None
+
+  try:
+    asyncio.run(scenario())
+  finally:
+    room_manager.remove_room(room.id)
+
+
+def test_unix_socket_bus_relays_between_clients(tmp_path):
+  async def scenario():
+    broker = UnixSocketBroker(str(tmp_path / "bus.sock"))
+    await broker.start()
+    publisher, subscriber = UnixSocketPubSub(broker.path), UnixSocketPubSub(broker.path)
+    await publisher.start()
+    await subscriber.start()
+    received = asyncio.Queue()
+
+    async def handler(data):
+      await received.put(data)
+
+    await subscriber.subscribe("room:x", handler)
+    await asyncio.sleep(0.05)
+    await publisher.publish("room:x", '{"event":"room_state"}')
+    assert await asyncio.wait_for(received.get(), 1.0) == '{"event":"room_state"}'
+
+    await publisher.close()
+    await subscriber.close()
+    await broker.stop()
+
+  asyncio.run(scenario())
+
+
+def test_unix_socket_bus_survives_handler_errors_and_broker_restart(tmp_path):
+  async def scenario():
+    broker = UnixSocketBroker(str(tmp_path / "bus.sock"))
+    await broker.start()
+    publisher, subscriber = UnixSocketPubSub(broker.path), UnixSocketPubSub(broker.path)
+    await publisher.start()
+    await subscriber.start()
+    received = asyncio.Queue()
+
+    async def broken(data):
+      raise RuntimeError("boom")
+
+    async def handler(data):
+      await received.put(data)
+
+    await subscriber.subscribe("room:x", broken)
+    await subscriber.subscribe("room:x", handler)
+    await asyncio.sleep(0.05)
+    await publisher.publish("room:x", '{"n":1}')
+    assert await asyncio.wait_for(received.get(), 1.0) == '{"n":1}'
+
+    await broker.stop()
+    broker = UnixSocketBroker(broker.path)
+    await broker.start()
+    for _ in range(100):
+      if publisher.reconnects and subscriber.reconnects:
+        break
+      await asyncio.sleep(0.05)
+    await asyncio.sleep(0.05)
+    await publisher.publish("room:x", '{"n":2}')
+    assert await asyncio.wait_for(received.get(), 1.0) == '{"n":2}'
+
+    await publisher.close()
+    await subscriber.close()
+    await broker.stop()
+
+  asyncio.run(scenario())
+
+
+def test_start_sharding_refuses_an_in_process_bus_for_several_shards(monkeypatch):
+  monkeypatch.setattr(p2p_sync.controller, "shard_map", ShardMap("a", {"a": "http://a", "b": "http://b"}))
+  monkeypatch.delenv("P2P_PUBSUB_URL", raising=False)
+  with pytest.raises(RuntimeError, match="P2P_PUBSUB_URL"):
+    asyncio.run(p2p_sync.start_sharding())
+  assert p2p_sync.controller.bus is None
+
+
+def test_rest_and_websocket_redirect_rooms_owned_elsewhere(monkeypatch):
+  shard_map = ShardMap("a", {"a": "http://127.0.0.1:8001", "b": "http://127.0.0.1:8002"})
+  foreign_room = next(f"room-{index}" for index in range(1000) if shard_map.owner(f"room-{index}") == "b")
+  monkeypatch.setattr(p2p_sync.controller, "shard_map", shard_map)
+  client = TestClient(app)
+
+  response = client.post(
+    "/api/rooms/join",
+    json={"room_id": foreign_room, "player_id": "hero", "display_name": "Hero", "role": "player"},
+  )
+  assert response.status_code == 421
+  assert response.json()["detail"]["url"] == "http://127.0.0.1:8002"
+
+  created = client.post("/api/rooms/create", json={"owner_id": "hero", "max_players": 2, "mode": "ring"})
+  assert shard_map.owns(created.json()["data"]["roomId"])
+
+  with client.websocket_connect(f"/ws/room/{foreign_room}/play") as ws:
+    redirect = ws.receive_json()
+  assert redirect["event"] == "redirect"
+  assert redirect["payload"]["url"] == f"ws://127.0.0.1:8002/ws/room/{foreign_room}/play"
@@ -260,6 +260,21 @@ function getEventSequenceId(entry) {
   return Number.isFinite(value) ? value : null;
 }
 
+const SEQUENCED_ROOM_EVENTS = new Set(["room_state", "updated_state"]);
+const RECONNECT_BASE_DELAY_MS = 500;
+const RECONNECT_MAX_DELAY_MS = 10000;
+// Server close codes after which retrying the same URL cannot succeed.
+const WRONG_SHARD_CLOSE_CODE = 4421;
+const ROOM_EXPIRED_CLOSE_CODE = 4410;
+
+// True when a live delta skips past the next expected sequenceId.
+function isSequenceGap(entry, sequenceId, latestSequenceId) {
+  if (!SEQUENCED_ROOM_EVENTS.has(entry?.event) || entry?.replayed || entry?.payload?.snapshot) {
+    return false;
+  }
+  return latestSequenceId > 0 && sequenceId !== null && sequenceId > latestSequenceId + 1;
+}
+
 function normalizeRoomEvent(entry) {
   if (entry?.event === "history" && Array.isArray(entry?.payload?.events)) {
     return entry.payload.events.map((historyEntry, index) => ({
@@ -305,15 +320,24 @@ function applyRoomEventToTableState(current, entry) {
   const payload = entry?.payload ?? {};
   if (entry?.event === "room_state") {
     const players = payload.players ?? current.players;
+    // Deltas carry only changed fields; snapshots also carry the betting state.
+    const stacks = payload.stacks ?? current.stacks;
+    const bets = payload.bets ?? current.bets;
     return {
       ...current,
       roomId: payload.roomId ?? current.roomId,
       phase: payload.phase ?? current.phase,
       handId: payload.handId ?? current.handId,
+      pot: Number(payload.pot ?? current.pot ?? 0),
+      bets,
+      stacks,
+      lastAction: payload.lastAction ?? current.lastAction,
       players,
-      playerStates: mergePlayerStates(players, payload.playerStates, current.stacks, current.bets),
+      playerStates: mergePlayerStates(players, payload.playerStates ?? current.playerStates, stacks, bets),
       warnings: payload.warnings ?? current.warnings,
-      currentTurnPlayerId: payload.currentTurnPlayerId ?? current.currentTurnPlayerId,
+      // Deltas send `currentTurnPlayerId: null` when the turn clears, so test for the key.
+      currentTurnPlayerId:
+        "currentTurnPlayerId" in payload ? payload.currentTurnPlayerId : current.currentTurnPlayerId,
       showdown: payload.phase === "playing" ? null : current.showdown,
     };
   }
@@ -327,7 +351,8 @@ function applyRoomEventToTableState(current, entry) {
       bets: payload.bets ?? current.bets,
       stacks: payload.stacks ?? current.stacks,
       lastAction: payload.lastAction ?? current.lastAction,
-      currentTurnPlayerId: payload.currentTurnPlayerId ?? current.currentTurnPlayerId,
+      currentTurnPlayerId:
+        "currentTurnPlayerId" in payload ? payload.currentTurnPlayerId : current.currentTurnPlayerId,
       players,
       playerStates: mergePlayerStates(players, current.playerStates, payload.stacks, payload.bets),
     };
@@ -405,8 +430,8 @@ export default function FriendMatchSetupScreen({ language = null } = {}) {
 
   useEffect(() => {
     if (!createdRoom?.roomId || typeof WebSocket === "undefined") return undefined;
-    const url = buildRoomWebSocketUrl(createdRoom.roomId);
-    if (!url) return undefined;
+    const baseUrl = buildRoomWebSocketUrl(createdRoom.roomId);
+    if (!baseUrl) return undefined;
 
     setSyncStatus("connecting");
     setRoomEvents([]);
@@ -421,64 +446,119 @@ export default function FriendMatchSetupScreen({ language = null } = {}) {
     setLatestSequenceId(0);
     setStaleEventCount(0);
     latestSequenceRef.current = 0;
-    const socket = new WebSocket(url);
-    socketRef.current = socket;
+    const openState = WebSocket.OPEN ?? 1;
+    let disposed = false;
+    let reconnectTimer = null;
+    let reconnectAttempts = 0;
+    // Replaced by the owning shard's URL when the server sends `redirect`.
+    let roomUrl = baseUrl;
 
-    socket.addEventListener("open", () => {
-      setSyncStatus("connected");
-      socket.send(
-        JSON.stringify({
+    const connect = () => {
+      // Reconnects ask for the deltas after the last applied frame instead of a fresh snapshot.
+      const since = latestSequenceRef.current;
+      const socket = new WebSocket(since > 0 ? `${roomUrl}?since=${since}` : roomUrl);
+      socketRef.current = socket;
+      let resyncPending = false;
+      let redirectUrl = null;
+      const send = (message) => {
+        if (socket.readyState === openState) socket.send(JSON.stringify(message));
+      };
+
+      socket.addEventListener("open", () => {
+        reconnectAttempts = 0;
+        setSyncStatus("connected");
+        send({
           event: "join_room",
           payload: {
             playerId: createdRoom.ownerId,
             displayName: createdRoom.displayName ?? copy.hostName,
           },
-        }),
-      );
-    });
-    socket.addEventListener("message", (event) => {
-      const parsed = (() => {
-        try {
-          return JSON.parse(event.data);
-        } catch {
-          return { event: "message", payload: event.data };
-        }
-      })();
-      const normalizedEvents = normalizeRoomEvent(parsed);
-      const accepted = [];
-      let staleCount = 0;
-      normalizedEvents.forEach((entry) => {
-        const sequenceId = getEventSequenceId(entry);
-        if (sequenceId !== null && sequenceId < latestSequenceRef.current) {
-          staleCount += 1;
+        });
+      });
+      socket.addEventListener("message", (event) => {
+        const parsed = (() => {
+          try {
+            return JSON.parse(event.data);
+          } catch {
+            return { event: "message", payload: event.data };
+          }
+        })();
+        if (parsed?.event === "redirect") {
+          // Another shard owns the room; the server closes with 4421 right after this.
+          const target = parsed?.payload?.url;
+          if (typeof target === "string" && target && target !== roomUrl) redirectUrl = target;
           return;
         }
-        if (sequenceId !== null) {
-          latestSequenceRef.current = sequenceId;
-          setLatestSequenceId(sequenceId);
+        if (parsed?.event === "heartbeat") {
+          // The server evicts sockets it has not heard from within its heartbeat timeout.
+          send({ event: "heartbeat_ack", payload: {} });
+        }
+        const normalizedEvents = normalizeRoomEvent(parsed);
+        const accepted = [];
+        let staleCount = 0;
+        normalizedEvents.forEach((entry) => {
+          const sequenceId = getEventSequenceId(entry);
+          if (sequenceId !== null && sequenceId < latestSequenceRef.current) {
+            staleCount += 1;
+            return;
+          }
+          if (isSequenceGap(entry, sequenceId, latestSequenceRef.current)) {
+            // Drop it and ask for the missing deltas once; the replay includes this frame.
+            if (!resyncPending) {
+              resyncPending = true;
+              send({ event: "resync", payload: { since: latestSequenceRef.current } });
+            }
+            return;
+          }
+          if (sequenceId !== null) {
+            resyncPending = false;
+            latestSequenceRef.current = sequenceId;
+            setLatestSequenceId(sequenceId);
+          }
+          accepted.push(entry);
+        });
+        if (staleCount > 0) {
+          setStaleEventCount((count) => count + staleCount);
+        }
+        if (accepted.length > 0) {
+          setP2pTableState((current) =>
+            accepted.reduce((nextState, entry) => applyRoomEventToTableState(nextState, entry), current),
+          );
+          setRoomEvents((prev) => [...accepted.reverse(), ...prev].slice(0, 8));
         }
-        accepted.push(entry);
       });
-      if (staleCount > 0) {
-        setStaleEventCount((count) => count + staleCount);
-      }
-      if (accepted.length > 0) {
-        setP2pTableState((current) =>
-          accepted.reduce((nextState, entry) => applyRoomEventToTableState(nextState, entry), current),
-        );
-        setRoomEvents((prev) => [...accepted.reverse(), ...prev].slice(0, 8));
-      }
-    });
-    socket.addEventListener("close", () => {
-      setSyncStatus("closed");
-    });
-    socket.addEventListener("error", () => {
-      setSyncStatus("error");
-    });
+      socket.addEventListener("close", (event) => {
+        setSyncStatus("closed");
+        if (socketRef.current === socket) socketRef.current = null;
+        if (disposed) return;
+        if (redirectUrl) {
+          roomUrl = redirectUrl;
+          setSyncStatus("connecting");
+          connect();
+          return;
+        }
+        if (event?.code === WRONG_SHARD_CLOSE_CODE || event?.code === ROOM_EXPIRED_CLOSE_CODE) return;
+        const delay = Math.min(RECONNECT_MAX_DELAY_MS, RECONNECT_BASE_DELAY_MS * 2 ** reconnectAttempts);
+        reconnectAttempts += 1;
+        reconnectTimer = setTimeout(() => {
+          reconnectTimer = null;
+          setSyncStatus("connecting");
+          connect();
+        }, delay);
+      });
+      socket.addEventListener("error", () => {
+        setSyncStatus("error");
+      });
+    };
+
+    connect();
 
     return () => {
+      disposed = true;
+      if (reconnectTimer !== null) clearTimeout(reconnectTimer);
+      const socket = socketRef.current;
       socketRef.current = null;
-      socket.close();
+      socket?.close();
     };
   }, [createdRoom, copy.hostName]);
 
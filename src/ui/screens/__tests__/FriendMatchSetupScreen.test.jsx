@@ -369,6 +369,97 @@ describe("FriendMatchSetupScreen", () => {
     expect(screen.getByTestId("p2p-fold")).toHaveProperty("disabled", true);
   });
 
+  it("resyncs on sequence gaps, resumes with ?since= and clears the turn", async () => {
+    const sockets = [];
+    class MockWebSocket {
+      constructor(url) {
+        this.url = url;
+        this.listeners = {};
+        this.readyState = 1;
+        this.send = vi.fn();
+        this.close = vi.fn();
+        sockets.push(this);
+      }
+
+      addEventListener(type, handler) {
+        this.listeners[type] = handler;
+      }
+    }
+    globalThis.WebSocket = MockWebSocket;
+    const deliver = (socket, event, payload) =>
+      socket.listeners.message({ data: JSON.stringify({ event, payload }) });
+
+    render(<FriendMatchSetupScreen language="en" />);
+    fireEvent.click(screen.getByRole("button", { name: /create room/i }));
+    expect(await screen.findByText(/room created/i)).toBeTruthy();
+    await waitFor(() => expect(sockets).toHaveLength(1));
+
+    await act(async () => {
+      sockets[0].listeners.open();
+      deliver(sockets[0], "updated_state", { sequenceId: 4, phase: "playing", currentTurnPlayerId: "guest-player" });
+      deliver(sockets[0], "updated_state", { sequenceId: 7, pot: 90 });
+      deliver(sockets[0], "updated_state", { sequenceId: 8, pot: 120 });
+    });
+    const resyncs = sockets[0].send.mock.calls.filter(([message]) => message.includes('"event":"resync"'));
+    expect(resyncs).toEqual([[JSON.stringify({ event: "resync", payload: { since: 4 } })]]);
+    expect(screen.getByText(/Waiting for opponent/i)).toBeTruthy();
+
+    await act(async () => {
+      deliver(sockets[0], "updated_state", { sequenceId: 5, currentTurnPlayerId: null });
+      sockets[0].listeners.close();
+    });
+    expect(screen.queryByText(/Waiting for opponent/i)).toBeNull();
+    await waitFor(() => expect(sockets).toHaveLength(2));
+    expect(sockets[1].url).toBe("ws://localhost/ws/room/room-test/play?since=5");
+  });
+
+  it("follows shard redirects and stops reconnecting after terminal close codes", async () => {
+    const sockets = [];
+    class MockWebSocket {
+      constructor(url) {
+        this.url = url;
+        this.listeners = {};
+        this.readyState = 1;
+        this.send = vi.fn();
+        this.close = vi.fn();
+        sockets.push(this);
+      }
+
+      addEventListener(type, handler) {
+        this.listeners[type] = handler;
+      }
+    }
+    globalThis.WebSocket = MockWebSocket;
+    const deliver = (socket, event, payload) =>
+      socket.listeners.message({ data: JSON.stringify({ event, payload }) });
+
+    render(<FriendMatchSetupScreen language="en" />);
+    fireEvent.click(screen.getByRole("button", { name: /create room/i }));
+    expect(await screen.findByText(/room created/i)).toBeTruthy();
+    await waitFor(() => expect(sockets).toHaveLength(1));
+
+    await act(async () => {
+      sockets[0].listeners.open();
+      deliver(sockets[0], "updated_state", { sequenceId: 3, phase: "playing" });
+      deliver(sockets[0], "redirect", { roomId: "room-test", url: "ws://shard-b/ws/room/room-test/play" });
+      sockets[0].listeners.close({ code: 4421 });
+    });
+    expect(sockets).toHaveLength(2);
+    expect(sockets[1].url).toBe("ws://shard-b/ws/room/room-test/play?since=3");
+
+    vi.useFakeTimers();
+    try {
+      await act(async () => {
+        sockets[1].listeners.close({ code: 4410 });
+        vi.advanceTimersByTime(60000);
+      });
+    } finally {
+      vi.useRealTimers();
+    }
+    expect(sockets).toHaveLength(2);
+    expect(screen.getByText("closed")).toBeTruthy();
+  });
+
   it("restores the active room after refresh and reconnects websocket", async () => {
     window.sessionStorage.setItem(
       "mgx_friend_match_active_room_v1",